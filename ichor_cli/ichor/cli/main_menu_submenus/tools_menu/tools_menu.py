@@ -7,8 +7,14 @@ from consolemenu.items import FunctionItem
 from ichor.cli.console_menu import add_items_to_menu, ConsoleMenu
 from ichor.cli.menu_description import MenuDescription
 from ichor.cli.menu_options import MenuOptions
-from ichor.cli.useful_functions import user_input_path
-from ichor.core.files import PointsDirectory, PointsDirectoryParent
+from ichor.cli.useful_functions import user_input_bool, user_input_path
+from ichor.core.files import (
+    ParsedFileCache,
+    PointsArchive,
+    PointsDirectory,
+    PointsDirectoryParent,
+)
+from ichor.core.models import Models
 from ichor.hpc.main import submit_check_points_directory_for_missing_files
 
 
@@ -22,6 +28,8 @@ TOOLS_MENU_DESCRIPTION = MenuDescription(
 class ToolsMenuOptions(MenuOptions):
     # defaults to the current working directory
     selected_points_directory_path: Path
+    # whether files are read from the parsed file cache (in this process and in python jobs submitted from ichor)
+    use_parsed_file_cache: bool
 
     def check_path(self):
 
@@ -40,7 +48,8 @@ class ToolsMenuOptions(MenuOptions):
 
 # initialize dataclass for storing information for menu
 tools_menu_options = ToolsMenuOptions(
-    ichor.cli.global_menu_variables.SELECTED_POINTS_DIRECTORY_PATH
+    ichor.cli.global_menu_variables.SELECTED_POINTS_DIRECTORY_PATH,
+    ParsedFileCache.enabled,
 )
 
 
@@ -67,6 +76,68 @@ class ToolsMenuFunctions:
         pd_path = ichor.cli.global_menu_variables.SELECTED_POINTS_DIRECTORY_PATH
         submit_check_points_directory_for_missing_files(pd_path)
 
+    @staticmethod
+    def select_use_parsed_file_cache():
+        """Asks the user whether to read files from the parsed file cache, so that files which have been read before
+        are not parsed again. This is also used by the python jobs which are submitted to compute nodes."""
+        tools_menu_options.use_parsed_file_cache = user_input_bool(
+            "Use parsed file cache (yes/no): ",
+            tools_menu_options.use_parsed_file_cache,
+        )
+        ParsedFileCache.enable(tools_menu_options.use_parsed_file_cache)
+
+    @staticmethod
+    def clear_parsed_file_cache():
+        """Removes the parsed file caches of the selected PointsDirectory (or PointsDirectoryParent),
+        so that all files are parsed again the next time they are read."""
+
+        pd_path = ichor.cli.global_menu_variables.SELECTED_POINTS_DIRECTORY_PATH
+        info = ParsedFileCache.info(pd_path)
+        ParsedFileCache.clear(pd_path)
+        print(
+            f"Removed {info['directories']} parsed file caches ({info['files']} files, {info['bytes']} bytes)."
+        )
+        input("Press Enter to go back to menu.")
+
+    @staticmethod
+    def pack_points_directory():
+        """Packs the selected PointsDirectory into a points archive (one file) next to it."""
+
+        pd_path = ichor.cli.global_menu_variables.SELECTED_POINTS_DIRECTORY_PATH
+        archive = PointsArchive.pack(pd_path)
+        print(f"Packed {len(archive)} points into {archive.path}.")
+        input("Press Enter to go back to menu.")
+
+    @staticmethod
+    def unpack_points_archive():
+        """Asks for a points archive and unpacks it into a PointsDirectory next to it."""
+
+        archive_path = user_input_path("Enter points archive path: ")
+        points_dir = PointsArchive(archive_path).unpack()
+        print(f"Unpacked {len(points_dir)} points into {points_dir.path}.")
+        input("Press Enter to go back to menu.")
+
+    @staticmethod
+    def write_binary_models():
+        """Asks for a directory of models and writes the binary models of all models in it,
+        which are read instead of the model files (and are much faster to read)."""
+
+        models_path = user_input_path("Enter models directory path: ")
+        binary_paths = Models(models_path).write_binary_models()
+        print(f"Wrote {len(binary_paths)} binary models in {models_path}.")
+        input("Press Enter to go back to menu.")
+
+    @staticmethod
+    def write_models_index():
+        """Asks for a directory of models and writes the index of the headers of the models in it,
+        so that models can be selected without reading the model files."""
+
+        models_path = user_input_path("Enter models directory path: ")
+        models = Models(models_path)
+        index_path = models.write_index()
+        print(f"Wrote the index of {len(models)} models to {index_path}.")
+        input("Press Enter to go back to menu.")
+
 
 tools_menu = ConsoleMenu(
     this_menu_options=tools_menu_options,
@@ -89,6 +160,30 @@ tools_menu_items = [
         "Submit check PointDirectory to compute.",
         ToolsMenuFunctions.submit_check_gaussian_and_aimall,
     ),
+    FunctionItem(
+        "Use parsed file cache when reading files.",
+        ToolsMenuFunctions.select_use_parsed_file_cache,
+    ),
+    FunctionItem(
+        "Clear parsed file cache of PointsDirectory.",
+        ToolsMenuFunctions.clear_parsed_file_cache,
+    ),
+    FunctionItem(
+        "Pack PointsDirectory into a points archive.",
+        ToolsMenuFunctions.pack_points_directory,
+    ),
+    FunctionItem(
+        "Unpack points archive into a PointsDirectory.",
+        ToolsMenuFunctions.unpack_points_archive,
+    ),
+    FunctionItem(
+        "Convert models in a directory to binary models.",
+        ToolsMenuFunctions.write_binary_models,
+    ),
+    FunctionItem(
+        "Write index of the models in a directory.",
+        ToolsMenuFunctions.write_models_index,
+    ),
 ]
 
 add_items_to_menu(tools_menu, tools_menu_items)
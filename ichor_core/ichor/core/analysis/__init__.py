@@ -1,3 +1,12 @@
-from ichor.core.analysis.trajectory_analysis import Stability, TrajectoryAnalysis
+from ichor.core.common.lazy_import import lazy_attributes
+
+# the analysis classes are only imported when they are used, because they import plotting libraries
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        "TrajectoryAnalysis": "ichor.core.analysis.trajectory_analysis",
+        "Stability": "ichor.core.analysis.trajectory_analysis",
+    },
+)
 
 __all__ = ["TrajectoryAnalysis", "Stability"]
@@ -32,7 +32,7 @@ def read_fflux(fflux_file: Path) -> Dict[str, np.ndarray]:
 
 
 def read_wfn_energy(wfn_file: Path) -> float:
-    return WFN(wfn_file).energy
+    return WFN(wfn_file).total_energy
 
 
 def get_dlpoly_energies(
@@ -0,0 +1,142 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# the maximum number of elements of the arrays made for one chunk of timesteps (about 32 MB of float64 values)
+_MAX_CHUNK_ELEMENTS = 2**22
+
+
+def pair_chunk_size(npairs: int) -> int:
+    """Returns the number of timesteps for which the distances of `npairs` pairs of atoms are calculated at once,
+    so that the memory used for one chunk of timesteps does not depend on the length of the trajectory."""
+    return max(1, _MAX_CHUNK_ELEMENTS // max(1, 3 * npairs))
+
+
+def pair_distances(
+    coordinates: np.ndarray, pairs: Tuple[np.ndarray, np.ndarray]
+) -> np.ndarray:
+    """Returns the distances between the given pairs of atoms for every timestep. Only the distances of these
+    pairs are calculated (e.g. the upper triangle of the distance matrix), not the whole distance matrix.
+
+    :param coordinates: The coordinates of the atoms, an array of shape n_timesteps x n_atoms x 3
+    :param pairs: A tuple of two arrays of the indices of the first and second atom of every pair,
+        e.g. `np.triu_indices(n_atoms, k=1)`
+    :return: An array of shape n_timesteps x n_pairs
+    """
+    differences = coordinates[:, pairs[0], :] - coordinates[:, pairs[1], :]
+    return np.sqrt(np.einsum("tpi,tpi->tp", differences, differences))
+
+
+class PairDistanceHistogram:
+    """
+    Histogram of the distances between all pairs of atoms over the timesteps of a trajectory, which is
+    accumulated chunk by chunk of timesteps (see `add`). The distances of every pair of atoms are only
+    calculated once per timestep (from the upper triangle of the distance matrix) and are counted in the bins
+    of all pair types in one pass, so the memory used does not depend on the length of the trajectory.
+    The counts are also kept per pair type, i.e. the elements of the two atoms (e.g. O-H).
+
+    :param types: The element of every atom, e.g. ["O", "H", "H"]
+    :param edges: The edges of the bins, the distances in (edges[i], edges[i + 1]) are counted in bin i.
+        As in `TrajectoryAnalysis.delta_dirac`, distances which are equal to an edge are not counted.
+    """
+
+    def __init__(self, types: Sequence[str], edges: np.ndarray):
+
+        self.types = list(types)
+        self.edges = np.asarray(edges, dtype=float)
+        self.pairs = np.triu_indices(len(self.types), k=1)
+
+        # the elements of a pair type are in the order in which the elements first appear in the atoms
+        elements = list(dict.fromkeys(self.types))
+        element_indices = np.array([elements.index(ty) for ty in self.types], dtype=int)
+        first = element_indices[self.pairs[0]]
+        second = element_indices[self.pairs[1]]
+        pair_codes = np.minimum(first, second) * len(elements) + np.maximum(
+            first, second
+        )
+
+        # the pair types are numbered in the order in which they first appear in the pairs
+        codes, first_pairs, pair_type_indices = np.unique(
+            pair_codes, return_index=True, return_inverse=True
+        )
+        order = np.argsort(first_pairs)
+        self.pair_types: List[Tuple[str, str]] = [
+            (elements[code // len(elements)], elements[code % len(elements)])
+            for code in codes[order]
+        ]
+        self._pair_type_indices = np.argsort(order)[pair_type_indices.ravel()]
+
+        self.counts = np.zeros((len(self.pair_types), len(self.edges) - 1), dtype=int)
+        self.ntimesteps = 0
+
+    @classmethod
+    def from_trajectory(
+        cls,
+        trajectory: "ichor.core.files.Trajectory",  # noqa F821
+        edges: np.ndarray,
+        chunk_size: Optional[int] = None,
+    ) -> "PairDistanceHistogram":
+        """Makes the histogram of the pair distances of all timesteps of a trajectory. The trajectory is gone over
+        in chunks of timesteps (see `Trajectory.iter_chunks`), so only one chunk of a streamed trajectory is read
+        into memory at a time.
+
+        :param trajectory: The trajectory, all timesteps must contain the same atoms
+        :param edges: The edges of the bins
+        :param chunk_size: The number of timesteps for which the distances are calculated at once,
+            defaults to None, in which case it is calculated from the number of pairs of atoms
+        """
+
+        histogram = cls(trajectory.types_extended, edges)
+        chunk_size = chunk_size or pair_chunk_size(len(histogram.pairs[0]))
+        for chunk in trajectory.iter_chunks(chunk_size):
+            histogram.add(chunk.coordinates)
+        return histogram
+
+    def add(self, coordinates: np.ndarray):
+        """Adds the pair distances of a chunk of timesteps to the histogram.
+
+        :param coordinates: The coordinates of the atoms, an array of shape n_timesteps x n_atoms x 3
+            (or n_atoms x 3 for one timestep)
+        """
+
+        coordinates = np.asarray(coordinates, dtype=float)
+        if coordinates.ndim == 2:
+            coordinates = coordinates[np.newaxis, ...]
+
+        nbins = self.counts.shape[1]
+        distances = pair_distances(coordinates, self.pairs)
+        # the index of the bin of every distance, distances outside of the bins
+        # and distances equal to an edge of a bin are not counted
+        bins = np.searchsorted(self.edges, distances, side="left")
+        on_edge = bins != np.searchsorted(self.edges, distances, side="right")
+        bins -= 1
+        in_bins = (bins >= 0) & (bins < nbins) & ~on_edge
+
+        # the bins of all pair types are counted at once
+        flat_bins = (self._pair_type_indices[np.newaxis, :] * nbins + bins)[in_bins]
+        self.counts += np.bincount(flat_bins, minlength=self.counts.size).reshape(
+            self.counts.shape
+        )
+        self.ntimesteps += len(coordinates)
+
+    @property
+    def total_counts(self) -> np.ndarray:
+        """Returns the number of distances in every bin for all pair types."""
+        return self.counts.sum(axis=0)
+
+    @property
+    def _normalisation(self) -> int:
+        natoms = len(self.types)
+        return max(1, self.ntimesteps * natoms * (natoms - 1))
+
+    def hr(self) -> np.ndarray:
+        """Returns the distribution of the distances, the counts averaged over the timesteps and atoms."""
+        return self.total_counts / self._normalisation
+
+    def hr_by_pair_type(self) -> Dict[Tuple[str, str], np.ndarray]:
+        """Returns the distribution of the distances of every pair type, normalised in the same way as `hr`,
+        so that the distributions of all pair types add up to `hr`."""
+        return {
+            pair_type: counts / self._normalisation
+            for pair_type, counts in zip(self.pair_types, self.counts)
+        }
@@ -5,6 +5,7 @@ import pandas as pd
 from ichor.core.atoms import ListOfAtoms
 from ichor.core.files import PointsDirectory
 from ichor.core.models import Models
+from ichor.core.models.grouped_predictor import GroupedPredictor
 
 
 def get_predicted(
@@ -28,11 +29,18 @@ def get_predicted(
     if types is None:
         types = models.types
 
+    features = models.get_features_dict(points)
+
+    # the predictions of all models (of the given types) of one atom are made at once
     predicted = {}
     for atom in atoms:
-        predicted[atom] = {}
-        for type_ in types:
-            predicted[atom][type_] = models[atom][type_].predict(points).array()
+        atom_models = [model for model in models[atom] if model.type in types]
+        predicted[atom] = dict(
+            zip(
+                [model.type for model in atom_models],
+                GroupedPredictor(atom_models).predict(features[atom]),
+            )
+        )
 
     return pd.DataFrame(predicted)
 
@@ -10,6 +10,7 @@ from ichor.core.common.constants import ha_to_kj_mol, multipole_names
 from ichor.core.common.sorting import ignore_alpha
 from ichor.core.files import PointsDirectory
 from ichor.core.models import Models
+from ichor.core.models.grouped_predictor import GroupedPredictor
 from natsort import natsorted
 
 ascii_uppercase = list(ascii_uppercase)
@@ -284,6 +285,18 @@ def calculate_compact_s_curves_from_files(
     nested_dict = lambda: defaultdict(nested_dict)
     total_dict = nested_dict()
 
+    # the predictions of all models of one atom are made at once, see `GroupedPredictor`
+    predictions = {}
+    for atom_name, features_array_for_atom in features_dict.items():
+        atom_models = [model for model in models if model.atom_name == atom_name]
+        if atom_models:
+            predictions.update(
+                zip(
+                    [model.path for model in atom_models],
+                    GroupedPredictor(atom_models).predict(features_array_for_atom),
+                )
+            )
+
     for model in models:
         atom_name = model.atom_name
         property_name = model.prop
@@ -306,7 +319,7 @@ def calculate_compact_s_curves_from_files(
 
             if atomic_true_values is not None:
 
-                model_predictions = model.predict(features_array_for_atom)
+                model_predictions = predictions[model.path]
                 errors = atomic_true_values - model_predictions
 
                 if property_name in ("iqa_energy", "iqa", "wfn_energy"):
@@ -1,10 +1,13 @@
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
-import matplotlib.pyplot as plt
 import numpy as np
+from ichor.core.analysis.pair_distances import (
+    pair_chunk_size,
+    pair_distances,
+    PairDistanceHistogram,
+)
 from ichor.core.calculators import default_connectivity_calculator
-from ichor.core.common.pairwise import pairwise
 from ichor.core.files import DlPolyHistory, GJF, Trajectory, XYZ
 from ichor.core.files.file import ReadFile
 
@@ -27,6 +30,10 @@ class TrajectoryAnalysis(ReadFile):
         traj = TrajectoryAnalysis('path/to/trajectory')
         traj.hr(nbins=1000,max_dist=10.0)
         traj.plot_hr('path/to/figure.png')
+
+    .. note::
+        The distributions of distances are calculated in one pass over the trajectory, chunk by chunk of
+        timesteps (see `PairDistanceHistogram`), so the memory used does not depend on the length of the trajectory.
     """
 
     _filetype = ".xyz"
@@ -39,35 +46,44 @@ class TrajectoryAnalysis(ReadFile):
             if trajectory_path.suffix == ".xyz"
             else DlPolyHistory(trajectory_path)
         )
-        self.distances_vectors = self._compute_distances_vectors()
-        self._bond_lengths_matrix = None
+        # the distances of all pairs of atoms at every timestep, only calculated if they are needed
+        # (see `distances_vectors`) and calculated again if the trajectory is changed
+        self._distances_vectors = None
+        self._distances_vectors_trajectory = None
 
     def _read_file(self):
         self.trajectory._read_file()
 
+    @property
+    def distances_vectors(self) -> np.ndarray:
+        """Returns the distances of all pairs of atoms at every timestep, an array of shape ntimesteps x ndistances.
+        This is only needed for `delta_dirac`, the distributions of distances are calculated without it."""
+        if self._distances_vectors_trajectory is not self.trajectory:
+            self._distances_vectors = self._compute_distances_vectors()
+            self._distances_vectors_trajectory = self.trajectory
+        return self._distances_vectors
+
     def _compute_distances_vectors(self):
         """
         Computes the distance between atoms for each timestep and stores.
         The diagonal is not needed because that contains 0.0 values, additionally
-        only half of the distance matrix is needed because it is symmetric
+        only half of the distance matrix is needed because it is symmetric,
+        so only the distances in the upper triangle are calculated.
         """
-        d = np.zeros(
-            (len(self.trajectory), self.trajectory.natoms, self.trajectory.natoms)
-        )
-
-        for i, t in enumerate(self.trajectory):
-            d[i] = Distance.euclidean_distance(t.coordinates, t.coordinates)
 
         # indices of the upper triangular matrix but without the main diagonal
         # the main diagonal only has 0.0 in it because it is distance of atom from itself
-        # only need to get these once because they remain the same
-        indices = np.triu_indices_from(d[0], k=1)
+        indices = np.triu_indices(self.trajectory.natoms, k=1)
 
-        # grab the upper triangular part as a vector
         # store into a ntimesteps x ndistances matrix
-        d2 = np.array([tmp[indices] for tmp in d])
-
-        return d2
+        return np.concatenate(
+            [
+                pair_distances(chunk.coordinates, indices)
+                for chunk in self.trajectory.iter_chunks(
+                    pair_chunk_size(len(indices[0]))
+                )
+            ]
+        )
 
     def delta_dirac(self, r0: float, r1: float) -> int:
         """
@@ -92,6 +108,25 @@ class TrajectoryAnalysis(ReadFile):
         # start with a very low number to remove 0.0
         return np.linspace(0.0, max_dist, nbins)
 
+    def pair_distance_histogram(
+        self,
+        nbins: int = 1000,
+        max_dist: float = 10.0,
+        chunk_size: Optional[int] = None,
+    ) -> PairDistanceHistogram:
+        """
+        Computes the histogram of all pair-wise distances across a whole trajectory in one pass over the
+        trajectory, keeping the counts of every pair type (e.g. O-H) as well.
+
+        :param nbins: number of bins to consider for the distance range considered, defaults to 1000
+        :param max_dist: maximum distance to consider for the distribution, defaults to 10.0
+        :param chunk_size: number of timesteps for which the distances are computed at once, defaults to None,
+            in which case it is chosen so that the memory used for a chunk is about 32 MB
+        """
+        return PairDistanceHistogram.from_trajectory(
+            self.trajectory, self.r(nbins, max_dist), chunk_size
+        )
+
     def hr(
         self, nbins: Optional[int] = 1000, max_dist: Optional[float] = 10.0
     ) -> List[float]:
@@ -103,21 +138,21 @@ class TrajectoryAnalysis(ReadFile):
         :param nbins: number of bins to consider for the distance range considered, defaults to 1000
         :param max_dist: maximum distance to consider for the distribution, defaults to 10.0
         """
-        distributions_list = []
+        # the counts are averaged over the timesteps and the atoms
+        return list(self.pair_distance_histogram(nbins, max_dist).hr())
 
-        r = self.r(nbins, max_dist)
-
-        natoms = self.trajectory.natoms
-        ntimesteps = len(self.trajectory)
-
-        for pair in pairwise(r):
-            distribution = self.delta_dirac(pair[0], pair[1])
-            distributions_list.append(
-                distribution
-                / (ntimesteps * (natoms * (natoms - 1)))  # this is to average it out
-            )
+    def hr_by_pair_type(
+        self, nbins: int = 1000, max_dist: float = 10.0
+    ) -> Dict[Tuple[str, str], np.ndarray]:
+        """
+        Computes the distributions of distances separately for every pair type (the elements of the
+        two atoms, e.g. ("O", "H")). The distributions are normalised in the same way as `hr`,
+        so they add up to the distribution of all pair-wise distances.
 
-        return distributions_list
+        :param nbins: number of bins to consider for the distance range considered, defaults to 1000
+        :param max_dist: maximum distance to consider for the distribution, defaults to 10.0
+        """
+        return self.pair_distance_histogram(nbins, max_dist).hr_by_pair_type()
 
     def plot_hr(
         self,
@@ -138,6 +173,8 @@ class TrajectoryAnalysis(ReadFile):
         r = self.r(nbins, max_dist)
 
         if ax is None:
+            import matplotlib.pyplot as plt
+
             fig, ax = plt.subplots(figsize=(12, 6))
 
         ax.plot(r[:-1], self.hr(nbins=nbins, max_dist=max_dist), label=label)
@@ -178,41 +215,40 @@ class Stability(TrajectoryAnalysis):
             if reference_path.suffix == ".xyz"
             else GJF(reference_path)
         )
-        self._bond_lengths_matrix = None
         self.threshold = threshold
         self.connectivity_ref = self.reference.connectivity(
             default_connectivity_calculator
         )
 
     @property
-    def bond_lengths_matrix(self) -> np.ndarray:
-        """
-        Returns a distances matrix only for bonds.
+    def _bonded_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the indices of the first and second atom of every bond of the reference geometry."""
+        return np.nonzero(np.triu(self.connectivity_ref, k=1))
 
-        :return: numpy array of (timesteps,natoms,natoms) dimensions
+    def iter_bond_lengths_matrices(self) -> Iterator[np.ndarray]:
         """
-        if self._bond_lengths_matrix is None:
-            self._compute_bond_lengths_matrix()
-        return self._bond_lengths_matrix
+        Yields the distance matrix of the bonded distances of every timestep of the trajectory, i.e. the distances
+        masked with the connectivity of the reference geometry. Only the distances of the bonded pairs are
+        calculated (chunk by chunk of timesteps), and the matrices are made one timestep at a time,
+        so the memory used does not depend on the length of the trajectory.
 
-    def _compute_bond_lengths_matrix(self):
-        """
-        Computes a distance matrix of all distances along a trajectory and masks it with
-        the connectivity of the reference geometry.
+        :return: An iterator of numpy arrays of (natoms,natoms) dimensions
         """
-        self._bond_lengths_matrix = np.zeros_like(self.distances_matrix)
-        # mask = connectivity[np.newaxis, ...].repeat(self.distances_matrix.shape[0], axis=0)
-        distances_matrix_masked = np.where(
-            self.connectivity_ref, self.distances_matrix, 0
-        )
-        self._bond_lengths_matrix = distances_matrix_masked
-
-    def bond_lengths_differences_matrix(self) -> np.ndarray:
+        natoms = self.trajectory.natoms
+        bonded_pairs = self._bonded_pairs
+        for chunk in self.trajectory.iter_chunks(pair_chunk_size(len(bonded_pairs[0]))):
+            for bond_lengths in pair_distances(chunk.coordinates, bonded_pairs):
+                bond_lengths_matrix = np.zeros((natoms, natoms))
+                bond_lengths_matrix[bonded_pairs] = bond_lengths
+                bond_lengths_matrix[bonded_pairs[::-1]] = bond_lengths
+                yield bond_lengths_matrix
+
+    def iter_bond_lengths_differences_matrices(self) -> Iterator[np.ndarray]:
         """
-        Computes a matrix of the differences of distances
-        between a reference geometry and all the timesteps of a trajectory.
+        Yields the matrices of the differences of distances between a reference geometry and every timestep
+        of a trajectory, in which the differences above the threshold are 1 and the rest are 0.
 
-        :return: numpy array of dimensions (timesteps,natoms,natoms)
+        :return: An iterator of numpy arrays of (natoms,natoms) dimensions
         """
         reference_distance_matrix = Distance.euclidean_distance(
             self.reference.coordinates, self.reference.coordinates
@@ -220,29 +256,57 @@ class Stability(TrajectoryAnalysis):
         reference_distance_matrix_masked = np.where(
             self.connectivity_ref, reference_distance_matrix, 0
         )
-        diff = (
-            self.bond_lengths_matrix
-            - reference_distance_matrix_masked[np.newaxis, :, :]
+        for bond_lengths_matrix in self.iter_bond_lengths_matrices():
+            diff = bond_lengths_matrix - reference_distance_matrix_masked
+            # Now creating a mask matrix where all the differences of distances
+            # that are above a threshold return 1 while the rest is 0
+            yield np.where(np.abs(diff) > self.threshold, 1, 0)
+
+    def first_unstable_timestep(
+        self, chunk_size: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Finds the first timestep at which the difference of a bond length to the bond length in the reference
+        geometry is above the threshold. The trajectory is gone over in chunks of timesteps and stops at the first
+        unstable timestep, only the lengths of the bonds of the reference geometry are calculated.
+
+        :param chunk_size: number of timesteps for which the bond lengths are computed at once, defaults to None,
+            in which case it is chosen so that the memory used for a chunk is about 32 MB
+        :return: The index of the first unstable timestep, or None if the whole trajectory is stable
+        """
+        bonded_pairs = self._bonded_pairs
+        reference_bond_lengths = pair_distances(
+            self.reference.coordinates[np.newaxis, ...], bonded_pairs
         )
-        # Now creating a mask matrix where all the differences of distances
-        # that are above a threshold return 1 while the rest is 0
-        mask = np.where(np.abs(diff) > self.threshold, 1, 0)
-        return mask
+        chunk_size = chunk_size or pair_chunk_size(len(bonded_pairs[0]))
+
+        start = 0
+        for chunk in self.trajectory.iter_chunks(chunk_size):
+            bond_lengths = pair_distances(chunk.coordinates, bonded_pairs)
+            unstable = np.nonzero(
+                np.any(
+                    np.abs(bond_lengths - reference_bond_lengths) > self.threshold,
+                    axis=1,
+                )
+            )[0]
+            if len(unstable) > 0:
+                return start + int(unstable[0])
+            start += len(bond_lengths)
+
+        return None
 
     def stable_trajectory(self):
         """
-        Computes the bond_lengths_differences_matrix and then checks
-        at which timesteps the trajectory is not stable and overwrites the original
-        trajectory attribute with the stable trajectory only so that the distribution of distances
+        Checks at which timestep the trajectory is not stable (see `first_unstable_timestep`) and overwrites
+        the original trajectory attribute with the stable trajectory only so that the distribution of distances
         hr can then be computed on the stable part of the trajectory.
         """
-        mask = self.bond_lengths_differences_matrix()
-        # indices where the trajectory is unstable above the threshold value
-        indices = np.nonzero(mask)
-        if indices[0].any():
+        # index where the trajectory is unstable above the threshold value
+        unstable_timestep = self.first_unstable_timestep()
+        if unstable_timestep is not None:
             print(
-                f"Timestep {indices[0][0]} has bonds over the threshold! Trajectory is unstable after this."
+                f"Timestep {unstable_timestep} has bonds over the threshold! Trajectory is unstable after this."
             )
-            self.trajectory = self.trajectory[: indices[0][0]]
+            self.trajectory = self.trajectory[:unstable_timestep]
         else:
             print(f"Trajectory is fully stable for {len(self.trajectory)} steps")
@@ -3,6 +3,7 @@
 
 from ichor.core.atoms.alf import ALF
 from ichor.core.atoms.atoms import Atom, Atoms
+from ichor.core.atoms.atoms_array import AtomsArray
 from ichor.core.atoms.atoms_not_found_exception import AtomNotFound, AtomsNotFoundError
 from ichor.core.atoms.list_of_atoms import ListOfAtoms
 from ichor.core.atoms.list_of_atoms_atom_view import AtomView
@@ -11,6 +12,7 @@ __all__ = [
     "ALF",
     "Atom",
     "Atoms",
+    "AtomsArray",
     "AtomNotFound",
     "AtomsNotFoundError",
     "ListOfAtoms",
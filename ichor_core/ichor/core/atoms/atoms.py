@@ -15,12 +15,18 @@ class Atoms(list):
 
     e.g. if we have a trajectory of methanol (6 atoms) with 1000 timesteps, we will have 1000 Atoms instances. Each
     of the Atoms instances will hold 6 instances of the Atom class.
+
+    .. note::
+        `Atoms` instances that are returned from an `AtomsArray` (e.g. the timesteps of a `Trajectory`)
+        are views of the coordinates stored in the array, so `Atoms.coordinates` does not need to make a copy.
     """
 
     def __init__(self, atoms: Optional[Sequence[Atom]] = None):
         super().__init__()
         self._centred = False
         self._counter = it.count(1)
+        # n_atoms x 3 array which the coordinates of the `Atom` instances are views of (if any)
+        self._coordinates: Optional[np.ndarray] = None
         if atoms is not None:
             for atom in atoms:
                 self.add(atom)
@@ -37,6 +43,8 @@ class Atoms(list):
         atom.parent = self
         if atom._index is None:
             atom.index = next(self._counter)
+        # the new atom's coordinates are not part of the stored coordinate array
+        self._coordinates = None
         super().append(atom)
 
     def copy(self) -> "Atoms":
@@ -90,6 +98,8 @@ class Atoms(list):
     @property
     def coordinates(self) -> np.ndarray:
         """Returns an array that contains the coordinates for each Atom instance held in the Atoms instance."""
+        if self._coordinates is not None and len(self._coordinates) == len(self):
+            return self._coordinates
         return np.array([atom.coordinates for atom in self])
 
     @property
@@ -293,7 +303,8 @@ class Atoms(list):
         centroid = self.centroid
         self.centre()
         for atom in self:
-            atom.coordinates = R.dot(atom.coordinates.T).T
+            # modify in place, the atom coordinates could be a view of a coordinate array
+            atom.coordinates[:] = R.dot(atom.coordinates.T).T
         self.translate(centroid)
 
     def translate(self, v: np.ndarray):
@@ -334,8 +345,11 @@ class Atoms(list):
             raise TypeError(
                 f"Index {i} has to be of type int. Currently index is type {type(i)}"
             )
-        else:
-            del self[i]
+        if isinstance(i, str):
+            i = self.atom_names.index(i.capitalize())
+        # the stored coordinate array no longer matches the atoms
+        self._coordinates = None
+        super().__delitem__(i)
 
     def __str__(self):
         return "\n".join(str(atom) for atom in self)
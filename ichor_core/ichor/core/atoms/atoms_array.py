@@ -0,0 +1,240 @@
+from typing import Dict, List, Optional, Sequence, Type
+
+import numpy as np
+from ichor.core.atoms.atom import Atom
+from ichor.core.atoms.atoms import Atoms
+from ichor.core.common.units import AtomicDistance
+
+
+def _as_float_array(values: np.ndarray) -> np.ndarray:
+    """Converts to a numpy array, only making a copy if the values are not floating point numbers."""
+    values = np.asarray(values)
+    if not np.issubdtype(values.dtype, np.floating):
+        values = values.astype(float)
+    return values
+
+
+class AtomsArray:
+    """
+    Structure-of-arrays storage for many geometries of the same system (e.g. all timesteps of a trajectory).
+    Instead of holding one `Atom` instance per atom per timestep, the coordinates of all geometries are stored
+    in one contiguous float64 block of shape `n_geometries` x `n_atoms` x `3`, while the atom types and indices
+    (and therefore atom names) are stored once for the whole system.
+
+    `Atoms` instances are only made when a geometry is accessed (see `atoms`). Their `Atom` instances
+    hold views into the coordinate block, so modifying the coordinates of the returned `Atom`
+    instances in place (e.g. `Atoms.centre`) modifies the stored geometry.
+
+    :param types: The atom types (elements) of the system, e.g. ['O', 'H', 'H']
+    :param indices: The atom indices (1-indexed) used for the atom names. If None, atoms are numbered
+        sequentially starting from 1 (as done by `Atoms`).
+    :param units: The units of the stored coordinates
+    :param vector_fields: Names of additional per-atom 3D vector fields (e.g. velocities or forces)
+        which are stored in blocks with the same shape as the coordinates.
+    :param capacity: The initial number of geometries for which memory is allocated.
+
+    .. note::
+        The block is reallocated when geometries are appended past its capacity. `Atoms`
+        instances that were obtained before that point are no longer linked to the stored coordinates.
+    """
+
+    def __init__(
+        self,
+        types: Sequence[str],
+        indices: Optional[Sequence[int]] = None,
+        units: AtomicDistance = AtomicDistance.Angstroms,
+        vector_fields: Sequence[str] = (),
+        capacity: int = 16,
+    ):
+        self.types: List[str] = [ty.capitalize() for ty in types]
+        self.indices: List[int] = (
+            list(indices)
+            if indices is not None
+            else list(range(1, len(self.types) + 1))
+        )
+        self.units = units
+
+        capacity = max(capacity, 1)
+        self._ngeometries = 0
+        self._coordinates = np.empty((capacity, self.natoms, 3))
+        self._vector_fields: Dict[str, np.ndarray] = {
+            field: np.empty((capacity, self.natoms, 3)) for field in vector_fields
+        }
+
+    @classmethod
+    def from_atoms(cls, atoms: Atoms, **kwargs) -> "AtomsArray":
+        """Makes an empty `AtomsArray` for the system described by the given `Atoms` instance.
+        The geometry of `atoms` is not added."""
+        return cls(
+            [atom.type for atom in atoms],
+            [atom.index for atom in atoms],
+            units=atoms[0].units if len(atoms) > 0 else AtomicDistance.Angstroms,
+            **kwargs,
+        )
+
+    @classmethod
+    def from_coordinates(
+        cls,
+        types: Sequence[str],
+        coordinates: np.ndarray,
+        indices: Optional[Sequence[int]] = None,
+        units: AtomicDistance = AtomicDistance.Angstroms,
+        **vector_fields: np.ndarray,
+    ) -> "AtomsArray":
+        """Wraps an existing `n_geometries` x `n_atoms` x `3` coordinate array without copying it
+        (if it is already a floating point array, e.g. a float32 `np.memmap`).
+
+        :param types: The atom types (elements) of the system
+        :param coordinates: The coordinates of all geometries
+        :param indices: The atom indices (1-indexed), see `AtomsArray`
+        :param units: The units of the coordinates
+        :param vector_fields: Additional per-atom vector fields, with the same shape as the coordinates
+        """
+        atoms_array = cls(types, indices, units, capacity=1)
+        atoms_array._coordinates = _as_float_array(coordinates)
+        atoms_array._vector_fields = {
+            field: _as_float_array(values) for field, values in vector_fields.items()
+        }
+        atoms_array._ngeometries = len(atoms_array._coordinates)
+        return atoms_array
+
+    @property
+    def natoms(self) -> int:
+        """Returns the number of atoms in the system."""
+        return len(self.types)
+
+    @property
+    def atom_names(self) -> List[str]:
+        """Returns the atom names of the system, e.g. ['O1', 'H2', 'H3']"""
+        return [f"{ty}{idx}" for ty, idx in zip(self.types, self.indices)]
+
+    @property
+    def vector_fields(self) -> List[str]:
+        """Returns the names of the additional per-atom vector fields that are stored."""
+        return list(self._vector_fields.keys())
+
+    @property
+    def coordinates(self) -> np.ndarray:
+        """Returns the coordinates of all geometries as an `n_geometries` x `n_atoms` x `3` array.
+        This is a view of the stored data (no copy is made)."""
+        return self._coordinates[: self._ngeometries]
+
+    def vector_field(self, field: str) -> np.ndarray:
+        """Returns an additional per-atom vector field for all geometries (no copy is made).
+
+        :param field: The name of the vector field, e.g. 'velocities'
+        """
+        return self._vector_fields[field][: self._ngeometries]
+
+    def matches(self, atoms: Atoms) -> bool:
+        """Checks if an `Atoms` instance is a geometry of the system stored in self, i.e. the
+        atom types, names and units are the same. Subclasses of `Atoms` are not matched as any extra
+        information they hold would be lost when stored in the array."""
+        return (
+            type(atoms) is Atoms
+            and len(atoms) == self.natoms
+            and all(
+                atom.type == ty and atom._index == idx and atom.units is self.units
+                for atom, ty, idx in zip(atoms, self.types, self.indices)
+            )
+        )
+
+    def _reserve(self, ngeometries: int):
+        """Makes sure memory is allocated for at least `ngeometries` geometries."""
+        capacity = len(self._coordinates)
+        if ngeometries <= capacity:
+            return
+        new_capacity = max(ngeometries, 2 * capacity)
+
+        def grow(block: np.ndarray) -> np.ndarray:
+            new_block = np.empty((new_capacity,) + block.shape[1:])
+            new_block[: self._ngeometries] = block[: self._ngeometries]
+            return new_block
+
+        self._coordinates = grow(self._coordinates)
+        self._vector_fields = {
+            field: grow(values) for field, values in self._vector_fields.items()
+        }
+
+    def append(self, coordinates: np.ndarray, **vector_fields: np.ndarray):
+        """Appends one geometry to the end of the array.
+
+        :param coordinates: An `n_atoms` x `3` array of coordinates
+        :param vector_fields: Values (`n_atoms` x `3`) of the additional vector fields for this geometry
+        """
+        self.extend(
+            np.asarray(coordinates)[np.newaxis, ...],
+            **{
+                field: np.asarray(values)[np.newaxis, ...]
+                for field, values in vector_fields.items()
+            },
+        )
+
+    def extend(self, coordinates: np.ndarray, **vector_fields: np.ndarray):
+        """Appends multiple geometries to the end of the array.
+
+        :param coordinates: An `n_geometries` x `n_atoms` x `3` array of coordinates
+        :param vector_fields: Values (`n_geometries` x `n_atoms` x `3`) of the additional vector fields
+        """
+        start = self._ngeometries
+        end = start + len(coordinates)
+        self._reserve(end)
+        self._coordinates[start:end] = coordinates
+        for field, values in self._vector_fields.items():
+            values[start:end] = vector_fields.get(field, np.nan)
+        self._ngeometries = end
+
+    def atoms(
+        self,
+        i: int,
+        atoms_cls: Type[Atoms] = Atoms,
+        atom_cls: Type[Atom] = Atom,
+    ) -> Atoms:
+        """Returns the i-th geometry as an `Atoms` instance. The coordinates of the `Atom` instances
+        are views into the stored coordinate block.
+
+        :param i: The index of the geometry (negative indices are allowed)
+        :param atoms_cls: The `Atoms` class to make
+        :param atom_cls: The `Atom` class to make for every atom
+        """
+        if i < 0:
+            i += self._ngeometries
+        if not 0 <= i < self._ngeometries:
+            raise IndexError(f"Geometry index {i} is out of range.")
+
+        coordinates = self._coordinates[i]
+        atoms = atoms_cls()
+        for ty, idx, atom_coordinates in zip(self.types, self.indices, coordinates):
+            atom = atom_cls(ty, 0.0, 0.0, 0.0, index=idx, units=self.units)
+            atom.coordinates = atom_coordinates
+            atoms.add(atom)
+        # set after adding atoms, as adding atoms resets the stored coordinates of `Atoms`
+        atoms._coordinates = coordinates
+
+        return atoms
+
+    def __getitem__(self, item) -> "AtomsArray":
+        """Returns a new `AtomsArray` containing a subset of the geometries. Indexing by a slice
+        gives a view of the stored data, indexing by a list/array of indices makes a copy."""
+        if isinstance(item, (int, np.integer)):
+            item = [item]
+        return AtomsArray.from_coordinates(
+            self.types,
+            self.coordinates[item],
+            self.indices,
+            self.units,
+            **{
+                field: self.vector_field(field)[item]
+                for field in self._vector_fields.keys()
+            },
+        )
+
+    def __len__(self) -> int:
+        """Returns the number of geometries stored."""
+        return self._ngeometries
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(atom_names: {self.atom_names}, "
+            f"n_geometries: {len(self)}, units: {self.units})"
+        )
@@ -1,10 +1,32 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Callable, Dict, List, Optional, Union
+from typing import Callable, Dict, Iterable, List, Optional, Union
 
 import numpy as np
 from ichor.core.atoms.atoms import ALF, Atoms
-from ichor.core.calculators import calculate_alf_features
+from ichor.core.calculators import calculate_alf_features, calculate_alf_features_batch
+from ichor.core.common.constants import bohr2ang
+from ichor.core.common.units import AtomicDistance
+
+
+def coordinates_in_angstroms(atoms_instances: Iterable[Atoms]) -> np.ndarray:
+    """Stacks the coordinates of multiple `Atoms` instances (which all contain the same atoms) into
+    one array, converting any coordinates that are in Bohr into Angstroms.
+
+    :param atoms_instances: An iterable of `Atoms` instances, e.g. the timesteps of a trajectory
+    :return: A numpy array of shape `n_timesteps` x `n_atoms` x `3`, in Angstroms
+    """
+    coordinates = []
+    for atoms in atoms_instances:
+        coordinates.append(
+            [
+                atom.coordinates * bohr2ang
+                if atom.units is AtomicDistance.Bohr
+                else atom.coordinates
+                for atom in atoms
+            ]
+        )
+    return np.array(coordinates, dtype=float)
 
 
 class ListOfAtoms(list, ABC):
@@ -67,6 +89,12 @@ class ListOfAtoms(list, ABC):
         """
         ...
 
+    def _coordinates_in_angstroms(self) -> np.ndarray:
+        """Returns the coordinates of all timesteps in Angstroms, shape `n_timesteps` x `n_atoms` x `3`"""
+        return coordinates_in_angstroms(
+            getattr(timestep, "atoms", timestep) for timestep in self
+        )
+
     def features(
         self,
         feature_calculator: Callable[..., np.ndarray],
@@ -93,6 +121,13 @@ class ListOfAtoms(list, ABC):
             If a non-atomic calculator is passed, a `n_timesteps` x features (features could be vector, matrix, etc)
             is returned.
         """
+        # the ALF features of all atoms can be calculated for all timesteps at once
+        if is_atomic and feature_calculator is calculate_alf_features:
+            coordinates = self._coordinates_in_angstroms()
+            return calculate_alf_features_batch(
+                coordinates, *args, atom_indices=range(coordinates.shape[1]), **kwargs
+            ).transpose(1, 0, 2)
+
         return np.array(
             [
                 timestep.features(
@@ -3,6 +3,8 @@ from typing import Callable, List, Union
 import numpy as np
 from ichor.core.atoms import ListOfAtoms
 from ichor.core.atoms.alf import ALF
+from ichor.core.atoms.list_of_atoms import coordinates_in_angstroms
+from ichor.core.calculators import calculate_alf_features, calculate_alf_features_batch
 
 
 class AtomView(ListOfAtoms):
@@ -52,6 +54,11 @@ class AtomView(ListOfAtoms):
         Since only one atom type is present, it returns a list with one element"""
         return [self[0].type]
 
+    def _coordinates_in_angstroms(self) -> np.ndarray:
+        """Returns the coordinates of all timesteps (of the whole system, not only the atom of the view)
+        in Angstroms, shape `n_timesteps` x `n_atoms` x `3`"""
+        return coordinates_in_angstroms(atom.parent for atom in self)
+
     def connectivity(self, connectivity_calculator: Callable):
         """Returns the alf calculated from the first Atom object inside the ListOfAtomsAtomView object"""
         # get the connectivity for the first Atom instance
@@ -78,6 +85,13 @@ class AtomView(ListOfAtoms):
         :return: The array has shape ``n_timesteps`` x ``n_features``.
         """
 
+        # the ALF features of the atom can be calculated for all timesteps at once
+        if feature_calculator is calculate_alf_features and len(self) > 0:
+            coordinates = self._coordinates_in_angstroms()
+            return calculate_alf_features_batch(
+                coordinates, *args, atom_indices=[self[0].i], **kwargs
+            )[0]
+
         return np.array(
             [atom.features(feature_calculator, *args, **kwargs) for atom in self]
         )
@@ -8,10 +8,14 @@ from ichor.core.calculators.alf import (
 from ichor.core.calculators.alf_features_to_coordinates_calculator import (
     alf_features_to_coordinates,
 )
-from ichor.core.calculators.c_matrix_calculator import calculate_c_matrix
+from ichor.core.calculators.c_matrix_calculator import (
+    calculate_c_matrices,
+    calculate_c_matrix,
+)
 from ichor.core.calculators.connectivity import default_connectivity_calculator
 from ichor.core.calculators.features import (
     calculate_alf_features,
+    calculate_alf_features_batch,
     default_feature_calculator,
     feature_calculators,
 )
@@ -41,8 +45,10 @@ __all__ = [
     "get_atom_alf",
     "alf_features_to_coordinates",
     "calculate_c_matrix",
+    "calculate_c_matrices",
     "default_connectivity_calculator",
     "calculate_alf_features",
+    "calculate_alf_features_batch",
     "default_feature_calculator",
     "feature_calculators",
     "angle_names",
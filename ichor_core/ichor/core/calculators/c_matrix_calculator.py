@@ -86,3 +86,50 @@ def calculate_c_matrix(
         c_matrix[2, :] = row3
 
         return c_matrix
+
+
+def calculate_c_matrices(
+    coordinates: np.ndarray,
+    alf: "ichor.core.atoms.ALF",  # noqa F821
+) -> np.ndarray:
+    """Returns the C rotation matrices of one central atom for a whole batch of geometries at once.
+    This gives the same result as calling `calculate_c_matrix` on the central atom of every geometry,
+    but all geometries are handled in one NumPy pass.
+
+    :param coordinates: A numpy array of shape `n_geometries` x `n_atoms` x `3` containing the
+        Cartesian coordinates of the geometries. A 2D `n_atoms` x `3` array is treated as one geometry.
+    :param alf: An Atomic Local Frame instance (or list of 3 indices) for the central atom.
+
+    :return: A numpy array of shape `n_geometries` x 3 x 3 containing the C rotation matrices.
+    """
+
+    coordinates = np.asarray(coordinates, dtype=float)
+    if coordinates.ndim == 2:
+        coordinates = coordinates[np.newaxis, ...]
+
+    origin_coordinates = coordinates[:, alf[0], :]
+    x_axis_diff = coordinates[:, alf[1], :] - origin_coordinates
+
+    if coordinates.shape[1] > 2:
+        xy_plane_diff = coordinates[:, alf[2], :] - origin_coordinates
+    # if we only have 2 atoms, e.g HCl, there is no xy-plane atom, so we make
+    # a dummy atom that is somewhere away from the central atom and x-axis atom
+    else:
+        xy_plane_diff = (
+            origin_coordinates + coordinates[:, alf[1], :] + np.array([1.0, 1.0, 1.0])
+        ) - origin_coordinates
+
+    # first row
+    row1 = x_axis_diff / np.linalg.norm(x_axis_diff, axis=-1, keepdims=True)
+
+    # second row
+    sigma_fflux = -np.einsum("ij,ij->i", x_axis_diff, xy_plane_diff) / np.einsum(
+        "ij,ij->i", x_axis_diff, x_axis_diff
+    )
+    y_vec = sigma_fflux[:, np.newaxis] * x_axis_diff + xy_plane_diff
+    row2 = y_vec / np.linalg.norm(y_vec, axis=-1, keepdims=True)
+
+    # third row
+    row3 = np.cross(row1, row2)
+
+    return np.stack((row1, row2, row3), axis=1)
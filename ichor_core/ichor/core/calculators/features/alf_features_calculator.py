@@ -1,9 +1,12 @@
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Sequence, Union
 
 import numpy as np
 from ichor.core.calculators.alf import get_atom_alf
-from ichor.core.calculators.c_matrix_calculator import calculate_c_matrix
-from ichor.core.common.constants import ang2bohr
+from ichor.core.calculators.c_matrix_calculator import (
+    calculate_c_matrices,
+    calculate_c_matrix,
+)
+from ichor.core.common.constants import ang2bohr, bohr2ang
 from ichor.core.common.units import AtomicDistance
 
 
@@ -127,3 +130,132 @@ def calculate_alf_features(
             i_feat += 1
 
     return feature_array
+
+
+def _alfs_by_origin_index(
+    alf: Union[
+        "ichor.core.atoms.ALF",  # noqa F821
+        List["ichor.core.atoms.ALF"],  # noqa F821
+        List[List[int]],
+        Dict[str, "ichor.core.atoms.ALF"],  # noqa F821
+    ],
+) -> Dict[int, Sequence[int]]:
+    """Returns a dictionary of central atom index (0-indexed) to the ALF of that atom,
+    for any of the ways in which the ALF can be passed to the feature calculators."""
+
+    from ichor.core.atoms.alf import ALF
+
+    if isinstance(alf, ALF):
+        return {alf.origin_idx: alf}
+    elif isinstance(alf, dict):
+        alf = alf.values()
+
+    return {a[0]: a for a in alf}
+
+
+def calculate_alf_features_batch(
+    coordinates: np.ndarray,
+    alf: Union[
+        "ichor.core.atoms.ALF",  # noqa F821
+        List["ichor.core.atoms.ALF"],  # noqa F821
+        List[List[int]],
+        Dict[str, "ichor.core.atoms.ALF"],  # noqa F821
+    ],
+    distance_unit: AtomicDistance = default_distance_unit,
+    coordinates_unit: AtomicDistance = AtomicDistance.Angstroms,
+    atom_indices: Optional[Sequence[int]] = None,
+) -> np.ndarray:
+    """Calculates the ALF features of many atoms for a whole batch of geometries at once.
+    The features are the same as the ones given by `calculate_alf_features`, however all geometries
+    are handled in one NumPy pass instead of looping over `Atom` instances in Python.
+
+    :param coordinates: A numpy array of shape `n_timesteps` x `n_atoms` x `3` containing
+        the Cartesian coordinates of every geometry. A 2D `n_atoms` x `3` array is treated as one geometry.
+    :param alf: The ALF(s) which define the features. This can be a single `ALF` instance
+        (only the features for that central atom are calculated), a list of `ALF` instances / lists of
+        indices, or a dictionary of atom names to `ALF` instances.
+    :param distance_unit: The distance units to use for the calculated distances
+        which are part of the features. The default distance is Bohr.
+    :param coordinates_unit: The units of the given coordinates. The default is Angstroms.
+    :param atom_indices: The indices (0-indexed) of the central atoms for which to calculate features.
+        If None, the features are calculated for every central atom that is present in `alf`.
+
+    :return: A numpy array of shape `len(atom_indices)` x `n_timesteps` x `n_features`, where
+        `n_features` is 3N-6 (or 1 if there are only two atoms in the system).
+    """
+
+    coordinates = np.asarray(coordinates, dtype=float)
+    if coordinates.ndim == 2:
+        coordinates = coordinates[np.newaxis, ...]
+
+    natoms = coordinates.shape[1]
+    if natoms < 2:
+        raise ValueError(
+            "Geometries need to have more than 1 atom in order to calculate features."
+        )
+
+    # Convert to angstroms first to give the same values as `calculate_alf_features`
+    if coordinates_unit is AtomicDistance.Bohr:
+        coordinates = coordinates * bohr2ang
+
+    unit_conversion = 1.0 if distance_unit is AtomicDistance.Angstroms else ang2bohr
+
+    alfs = _alfs_by_origin_index(alf)
+    if atom_indices is None:
+        atom_indices = sorted(alfs.keys())
+
+    nfeatures = 3 * natoms - 6 if natoms > 2 else 1
+    feature_array = np.empty((len(atom_indices), coordinates.shape[0], nfeatures))
+
+    for i, atom_idx in enumerate(atom_indices):
+        if atom_idx not in alfs:
+            raise ValueError(
+                f"The list of ALFs does not contain the alf of the atom with index {atom_idx}"
+            )
+        atom_alf = alfs[atom_idx]
+
+        origin_coordinates = coordinates[:, atom_idx, :]
+        x_axis_vect = unit_conversion * (
+            coordinates[:, atom_alf[1], :] - origin_coordinates
+        )
+        x_bond_norm = np.linalg.norm(x_axis_vect, axis=-1)
+        feature_array[i, :, 0] = x_bond_norm
+
+        # only 1 feature (the distance) is needed if there are 2 atoms
+        if natoms == 2:
+            continue
+
+        xy_plane_vect = unit_conversion * (
+            coordinates[:, atom_alf[2], :] - origin_coordinates
+        )
+        xy_bond_norm = np.linalg.norm(xy_plane_vect, axis=-1)
+
+        feature_array[i, :, 1] = xy_bond_norm
+        feature_array[i, :, 2] = np.arccos(
+            np.einsum("ij,ij->i", x_axis_vect, xy_plane_vect)
+            / (x_bond_norm * xy_bond_norm)
+        )
+
+        if natoms == 3:
+            continue
+
+        c_matrices = calculate_c_matrices(coordinates, atom_alf)
+
+        # the rest of the atoms are described as 3 features each (in the same order as in the geometry):
+        # distance(r), polar angle(theta), and azimuthal angle(phi) - physics convention
+        remaining_atoms = [j for j in range(natoms) if j not in atom_alf]
+
+        r_vect = unit_conversion * (
+            coordinates[:, remaining_atoms, :] - origin_coordinates[:, np.newaxis, :]
+        )
+        r_vect_norm = np.linalg.norm(r_vect, axis=-1)
+        zeta = np.einsum("tij,tkj->tki", c_matrices, r_vect)
+
+        feature_array[i, :, 3::3] = r_vect_norm
+        # clip as zeta[2] / r_vect_norm can be evaluated as +-1.0000000001, which is outside of the range of arccos
+        feature_array[i, :, 4::3] = np.arccos(
+            np.clip(zeta[..., 2] / r_vect_norm, -1.0, 1.0)
+        )
+        feature_array[i, :, 5::3] = np.arctan2(zeta[..., 1], zeta[..., 0])
+
+    return feature_array
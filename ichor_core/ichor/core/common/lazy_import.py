@@ -0,0 +1,37 @@
+import importlib
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_attributes(
+    package_name: str, attributes: Dict[str, str]
+) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """Returns the module level `__getattr__` and `__dir__` functions (see PEP 562) of a package
+    whose attributes are only imported from their modules when they are accessed for the first time.
+    This is used so that importing a package (or one attribute of it) does not import all of its modules,
+    as well as the (slow to import) libraries which these modules use.
+
+    Example usage in the `__init__.py` of a package:
+
+    .. code-block:: python
+
+        __getattr__, __dir__ = lazy_attributes(__name__, {"GJF": "ichor.core.files.gaussian"})
+
+    :param package_name: The name of the package, i.e. `__name__` in the `__init__.py` of the package
+    :param attributes: A dictionary of the names of the attributes and the modules they are imported from
+    :return: The `__getattr__` and `__dir__` functions of the package
+    """
+
+    def __getattr__(name: str):
+        if name not in attributes:
+            raise AttributeError(f"module '{package_name}' has no attribute '{name}'")
+        value = getattr(importlib.import_module(attributes[name]), name)
+        # the attribute is set on the package, so __getattr__ is not called for it again
+        setattr(importlib.import_module(package_name), name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(
+            set(vars(importlib.import_module(package_name))) | set(attributes)
+        )
+
+    return __getattr__, __dir__
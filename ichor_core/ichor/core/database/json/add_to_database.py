@@ -27,11 +27,13 @@ def get_data_for_point(
     point_dict = {}
     point_dict["name"] = point.name_without_suffix
 
-    for _f in point.path.iterdir():
+    for _f in point.iterdir():
         if _f.suffix == ".sh":
-            print(
-                f"A shell file (.sh) was found in {point.path.absolute()}, so AIMAll probably crashed. Not added to db."
-            )
+            if print_missing_data:
+                print(
+                    f"A shell file (.sh) was found in {point.path.absolute()}, "
+                    "so AIMAll probably crashed. Not added to db."
+                )
             return
 
     ###############################
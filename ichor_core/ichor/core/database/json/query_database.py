@@ -1,6 +1,9 @@
 import json
+from array import array
 from pathlib import Path
+from typing import Dict, List, Optional, Set, Union
 
+import numpy as np
 import pandas as pd
 from ichor.core.common.sorting import ignore_alpha
 from natsort import natsorted
@@ -60,135 +63,179 @@ dataframe_cols = [
 ]
 
 
-def get_one_json_dir_info(json_dir: Path, id_counter=1):
-    """_summary_
+# columns which are not floats, all other columns are stored in arrays of floats while reading
+_integer_cols = ["id"]
+_string_cols = ["date_added", "name", "atom_name"]
+_float_cols = [col for col in dataframe_cols if col not in _integer_cols + _string_cols]
+_multipole_cols = [col for col in dataframe_cols if col.startswith("q")]
 
-    :param json_dir: _description_
-    :type json_dir: Path
-    :param id_counter: _description_, defaults to 1
-    :type id_counter: int, optional
-    :return: _description_
-    :rtype: _type_
+
+def _empty_columns() -> Dict[str, Union[array, list]]:
+    """Returns a dictionary of empty columns, in which the rows for all atoms of all points are stored
+    while reading a json database. Numbers are stored in arrays, which take much less memory than lists
+    of Python floats, and the DataFrame is only made once all points have been read."""
+
+    columns = {}
+    for col in dataframe_cols:
+        if col in _integer_cols:
+            columns[col] = array("q")
+        elif col in _float_cols:
+            columns[col] = array("d")
+        else:
+            columns[col] = []
+    return columns
+
+
+def _float_or_nan(value) -> float:
+    return float("nan") if value is None else value
+
+
+def _add_json_file_to_columns(
+    json_file: Path,
+    columns: Dict[str, Union[array, list]],
+    id_counter: int,
+    atom_names: Optional[Set[str]] = None,
+) -> int:
+    """Adds the rows for all atoms of all points in one json file to the columns.
+    Only one json file is loaded into memory at a time.
+
+    :param json_file: The json file containing a list of points, as written by `write_to_json_database`
+    :param columns: The columns to which the rows are added, see `_empty_columns`
+    :param id_counter: The id of the first point in the file
+    :param atom_names: The atoms for which rows are added, defaults to None, in which case all atoms are added
+    :return: The id of the first point of the next file
     """
 
-    all_dfs = []
+    with open(json_file, "r") as f:
+        json_data = json.load(f)
 
-    for d in natsorted(Path(json_dir).iterdir(), key=ignore_alpha):
+    for point in json_data:
 
-        with open(d, "r") as f:
+        # points for which AIMAll likely crashed are written as null
+        if not point or not point.get("atomic_data"):
+            continue
 
-            json_data = json.load(f)
+        for atom_name, atom_data in point["atomic_data"].items():
 
-        for point in json_data:
+            if atom_names is not None and atom_name not in atom_names:
+                continue
 
-            # store info for all atoms
-            data_for_all_atoms_in_point = []
+            # this is data that is going to be the same for all atoms
+            # since they come from the same point
+            columns["id"].append(id_counter)
+            columns["date_added"].append(point["date_added"])
+            columns["name"].append(point["name"])
+            columns["wfn_energy"].append(_float_or_nan(point["wfn_energy"]))
 
-            point_name = point["name"]
-            date_added = point["date_added"]
-            wfn_energy = point["wfn_energy"]
+            for col, value in zip(("x", "y", "z"), atom_data["coordinates"]):
+                columns[col].append(value)
+            for col, value in zip(
+                ("force_x", "force_y", "force_z"), atom_data["global_forces"]
+            ):
+                columns[col].append(_float_or_nan(value))
 
-            atomic_data = point.get("atomic_data")
+            # .int file data is missing if the .int file for the atom did not exist
+            columns["iqa"].append(_float_or_nan(atom_data.get("iqa")))
+            columns["integration_error"].append(
+                _float_or_nan(atom_data.get("integration_error"))
+            )
+            multipoles = atom_data.get("global_spherical_multipole_moments", {})
+            for col in _multipole_cols:
+                columns[col].append(_float_or_nan(multipoles.get(col)))
+
+            columns["atom_name"].append(atom_name)
+
+        id_counter += 1
+
+    return id_counter
 
-            if atomic_data:
-                for atom_name, atom_data_dict in atomic_data.items():
 
-                    # this is data that is going to be the same for all atoms
-                    # since they come from the same point
-                    global_data_for_one_atom = []
-                    global_data_for_one_atom.extend(
-                        [id_counter, date_added, point_name, wfn_energy]
-                    )
+def _columns_to_dataframe(columns: Dict[str, Union[array, list]]) -> pd.DataFrame:
+    """Makes the DataFrame from the columns. Every column is removed from the dictionary
+    once it has been copied to the DataFrame, so that the data is only stored twice for one column."""
 
-                    atomic_data_for_one_atom = []
-                    atom_coords = atom_data_dict["coordinates"]
-                    global_forces = atom_data_dict["global_forces"]
-                    iqa = atom_data_dict["iqa"]
-                    integration_error = atom_data_dict["integration_error"]
-                    global_spherical_multipoles_dict = atom_data_dict[
-                        "global_spherical_multipole_moments"
-                    ]
+    data = {}
+    for col in dataframe_cols:
+        values = columns.pop(col)
+        data[col] = np.array(values) if isinstance(values, array) else values
+    return pd.DataFrame(data, columns=dataframe_cols)
 
-                    atomic_data_for_one_atom.extend(atom_coords)
-                    atomic_data_for_one_atom.extend(global_forces)
-                    atomic_data_for_one_atom.append(iqa)
-                    atomic_data_for_one_atom.append(integration_error)
-                    atomic_data_for_one_atom.extend(
-                        list(global_spherical_multipoles_dict.values())
-                    )
-                    atomic_data_for_one_atom.append(atom_name)
 
-                    global_data_for_one_atom.extend(atomic_data_for_one_atom)
-                    data_for_all_atoms_in_point.append(global_data_for_one_atom)
+def _json_files(json_dir: Path) -> List[Path]:
+    return natsorted(Path(json_dir).iterdir(), key=ignore_alpha)
 
-                id_counter += 1
 
-            inner_df = pd.DataFrame(data_for_all_atoms_in_point, columns=dataframe_cols)
-            all_dfs.append(inner_df)
+def get_one_json_dir_info(
+    json_dir: Path, id_counter=1, atom_names: Optional[List[str]] = None
+):
+    """Reads the data of all points in one json directory, as written by `PointsDirectory.write_to_json_database`.
+
+    :param json_dir: The directory containing json files
+    :param id_counter: The id given to the first point, defaults to 1
+    :param atom_names: The atoms for which to read data, defaults to None, in which case all atoms are read
+    :return: Tuple of: List of point ids, List of atom names, a pd.DataFrame object containing one row for
+        every atom of every point and the id of the first point in the next directory
+    """
+
+    if atom_names is not None:
+        atom_names = set(atom_names)
 
-    total_df = pd.concat(all_dfs)
-    # reset the index column so that it starts at 1
-    # drop=True to remove the old index col
-    total_df = total_df.reset_index(drop=True)
+    columns = _empty_columns()
+    for json_file in _json_files(json_dir):
+        id_counter = _add_json_file_to_columns(
+            json_file, columns, id_counter, atom_names
+        )
+    total_df = _columns_to_dataframe(columns)
 
     return (
-        list(set(total_df["id"])),
-        list(set(total_df["atom_name"])),
+        total_df["id"].unique().tolist(),
+        total_df["atom_name"].unique().tolist(),
         total_df,
         id_counter,
     )
 
 
-def get_json_db_info(db_path):
+def get_json_db_info(db_path, atom_names: Optional[List[str]] = None):
     """Gets important information from json database (a directory containing
     multiple json files) and returns point ids, atom names, and full
-    pandas dataframe, which can be processed into atomic csvs
+    pandas dataframe, which can be processed into atomic csvs.
+    The json files are read one at a time and the dataframe is made once all of them have been read.
 
     :param db_path: path to directory containing json files storing data
         Could be a single directory or a parent directory with multiple dirs inside.
+    :param atom_names: The atoms for which to read data, defaults to None, in which case all atoms are read
     """
 
-    contains_many_directories = False
-
     # quick check if inside there are other directories or json files
     # there could be many directories (one for each pointsdirecotry in a parentpointsdir)
     # or just one directory from one pointsdirectory
-
-    for d in Path(db_path).iterdir():
-        if d.is_dir():
-            contains_many_directories = True
-            break
+    contains_many_directories = any(d.is_dir() for d in Path(db_path).iterdir())
 
     if contains_many_directories:
-
-        dfs_list = []
-        all_ids = []
-
-        # id column counter
-        counter = 1
-
-        # if there are many inner directories, we need to get the data out from each one
-        # and make a new dataframe and group ids
-        for one_dir in natsorted(Path(db_path).iterdir(), key=ignore_alpha):
-
-            # modify the counter, so that the next directory does not begin with the same id
-            ids, atom_names, partial_df, counter = get_one_json_dir_info(
-                one_dir, counter
-            )
-            dfs_list.append(partial_df)
-            all_ids.extend(ids)
-
-        all_dfs = pd.concat(dfs_list)
-        # reset the index column so that it starts at 1
-        # drop=True to remove the old index col
-        all_dfs = all_dfs.reset_index(drop=True)
-
-        # atom names should be the same for all directories
-        return all_ids, atom_names, all_dfs
-
+        # if there are many inner directories, the files of all of them are read (in order)
+        # and the ids continue from one directory to the next
+        json_files = [
+            json_file
+            for one_dir in natsorted(Path(db_path).iterdir(), key=ignore_alpha)
+            for json_file in _json_files(one_dir)
+        ]
     else:
+        json_files = _json_files(db_path)
 
-        # do not need last column
-        all_ids, atom_names, all_dfs, _ = get_one_json_dir_info(db_path)
+    if atom_names is not None:
+        atom_names = set(atom_names)
 
-        return all_ids, atom_names, all_dfs
+    columns = _empty_columns()
+    # id column counter
+    id_counter = 1
+    for json_file in json_files:
+        id_counter = _add_json_file_to_columns(
+            json_file, columns, id_counter, atom_names
+        )
+    all_dfs = _columns_to_dataframe(columns)
+
+    return (
+        all_dfs["id"].unique().tolist(),
+        all_dfs["atom_name"].unique().tolist(),
+        all_dfs,
+    )
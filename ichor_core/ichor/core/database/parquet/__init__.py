@@ -0,0 +1,13 @@
+from ichor.core.database.parquet.add_to_database import write_points_data_to_parquet
+from ichor.core.database.parquet.query_database import (
+    get_parquet_db_information,
+    read_parquet_database,
+    read_parquet_points_for_atom,
+)
+
+__all__ = [
+    "write_points_data_to_parquet",
+    "get_parquet_db_information",
+    "read_parquet_database",
+    "read_parquet_points_for_atom",
+]
@@ -0,0 +1,107 @@
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import pandas as pd
+from ichor.core.common.io import mkdir
+from ichor.core.common.itertools import chunker
+from ichor.core.database.json.query_database import dataframe_cols
+from ichor.core.database.parquet.query_database import read_parquet_database
+
+# the columns of every file in the parquet database. The atom name is not stored in the files because
+# the files are partitioned by atom name (e.g. `atom_name=O1/part_1.parquet`), so that the data of some
+# atoms can be read without reading the files of the other atoms. The index of the atom in the point
+# is stored, so that the atoms of every point can be put back in the order of the geometry.
+parquet_cols = [col for col in dataframe_cols if col != "atom_name"] + ["atom_index"]
+
+_string_cols = {"date_added", "name"}
+_integer_cols = {"id", "atom_index"}
+
+
+def _last_point_id(root_path: Path) -> int:
+    """Returns the largest point id in an existing parquet database, or 0 if it does not contain any points."""
+
+    if not any(root_path.glob("atom_name=*/*.parquet")):
+        return 0
+
+    return int(read_parquet_database(root_path, columns=["id"])["id"].max())
+
+
+def write_points_data_to_parquet(
+    root_path: Union[str, Path],
+    points_data: Iterable[Optional[dict]],
+    npoints_per_file: int = 10000,
+) -> int:
+    """Writes the data of many points, as returned by `get_data_for_point`, to a parquet database.
+    The database is a directory containing one directory for every atom, each of which contains one
+    parquet file for every `npoints_per_file` points. If the database already exists, the points are
+    added to it, with point ids following on from the ids of the points in the database.
+    `points_data` can be a generator, so that points can be read while they are written.
+
+    :param root_path: The directory of the parquet database
+    :param points_data: An iterable of dictionaries containing the data of one point each.
+        Points for which the data is None (e.g. because AIMAll likely crashed) are not added.
+    :param npoints_per_file: The number of points written to every file, defaults to 10000
+    :return: The number of points which were added to the database
+    """
+
+    root_path = Path(root_path)
+    mkdir(root_path)
+
+    point_id = _last_point_id(root_path)
+    npoints = 0
+
+    for chunk in chunker(points_data, npoints_per_file):
+
+        rows = []
+        first_point_id = point_id + 1
+
+        for point_data in chunk:
+
+            # points for which AIMAll likely crashed do not have any data
+            if point_data is None:
+                continue
+
+            point_id += 1
+            npoints += 1
+
+            for atom_index, (atom_name, atom_data) in enumerate(
+                point_data["atomic_data"].items()
+            ):
+                multipoles = atom_data.get("global_spherical_multipole_moments", {})
+                row = {
+                    "id": point_id,
+                    "date_added": point_data["date_added"],
+                    "name": point_data["name"],
+                    "wfn_energy": point_data["wfn_energy"],
+                    "iqa": atom_data.get("iqa"),
+                    "integration_error": atom_data.get("integration_error"),
+                    "atom_name": atom_name,
+                    "atom_index": atom_index,
+                }
+                row["x"], row["y"], row["z"] = atom_data["coordinates"]
+                row["force_x"], row["force_y"], row["force_z"] = atom_data[
+                    "global_forces"
+                ]
+                rows.append({**multipoles, **row})
+
+        if not rows:
+            continue
+
+        df = pd.DataFrame(rows, columns=parquet_cols + ["atom_name"])
+        # missing data (e.g. from missing .int files) is stored as NaN, so all files have the same schema
+        df = df.astype(
+            {
+                col: float
+                for col in parquet_cols
+                if col not in _string_cols | _integer_cols
+            }
+        )
+
+        for atom_name, atom_df in df.groupby("atom_name", sort=False):
+            atom_dir = root_path / f"atom_name={atom_name}"
+            mkdir(atom_dir)
+            atom_df[parquet_cols].to_parquet(
+                atom_dir / f"part_{first_point_id}.parquet", index=False
+            )
+
+    return npoints
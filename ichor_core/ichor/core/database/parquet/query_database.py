@@ -0,0 +1,117 @@
+import operator
+from functools import reduce
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from ichor.core.database.json.query_database import dataframe_cols
+
+
+def read_parquet_database(
+    db_path: Union[str, Path],
+    columns: Optional[List[str]] = None,
+    atom_names: Optional[List[str]] = None,
+    max_integration_error: Optional[float] = None,
+    point_ids: Optional[List[int]] = None,
+) -> pd.DataFrame:
+    """Reads (part of) a parquet database into a DataFrame with the same columns as the DataFrame
+    read from a SQLite or json database, with one row for every atom of every point. Only the requested
+    columns and atoms are read from the files and the integration error filter is applied while the files
+    are read, so only the rows that are needed are loaded into memory.
+
+    :param db_path: The directory of the parquet database
+    :param columns: The columns to read, defaults to None, in which case all columns are read.
+        The `id` and `atom_name` columns are always read.
+    :param atom_names: The atoms for which to read rows, defaults to None, in which case all atoms are read
+    :param max_integration_error: If given, only rows for which the absolute integration error
+        is below this value are read, defaults to None
+    :param point_ids: The points for which to read rows, defaults to None, in which case all points are read
+    :return: A DataFrame sorted by point id, in which the rows of every point are in the order
+        of the atoms in the geometry
+    """
+
+    dataset = ds.dataset(Path(db_path), format="parquet", partitioning="hive")
+
+    if columns is None:
+        columns = dataframe_cols
+    columns = [col for col in dataframe_cols if col in {"id", "atom_name", *columns}]
+
+    filter_expressions = []
+    if atom_names is not None:
+        filter_expressions.append(ds.field("atom_name").isin(list(atom_names)))
+    if max_integration_error is not None:
+        filter_expressions.append(
+            pc.abs(ds.field("integration_error")) < max_integration_error
+        )
+    if point_ids is not None:
+        filter_expressions.append(ds.field("id").isin(list(point_ids)))
+    filter_expression = (
+        reduce(operator.and_, filter_expressions) if filter_expressions else None
+    )
+
+    table = dataset.to_table(
+        columns=columns + ["atom_index"], filter=filter_expression
+    ).sort_by([("id", "ascending"), ("atom_index", "ascending")])
+
+    return table.select(columns).to_pandas()
+
+
+def read_parquet_points_for_atom(
+    db_path: Union[str, Path],
+    atom_name: str,
+    columns: Optional[List[str]] = None,
+    max_integration_error: Optional[float] = None,
+) -> pd.DataFrame:
+    """Reads the rows of all atoms of the points which can be used in the dataset of one atom, which are the
+    points in which the absolute integration error of the atom is below the threshold (or which do not have an
+    iqa energy for the atom). The points are selected while the files of the atom are read, and then only
+    the requested columns of these points are read, so the rest of the database is never loaded into memory.
+
+    :param db_path: The directory of the parquet database
+    :param atom_name: The atom for which to select the points
+    :param columns: The columns to read, defaults to None, in which case all columns are read
+    :param max_integration_error: The threshold of the absolute integration error of the atom,
+        defaults to None, in which case all points are read
+    :return: A DataFrame in the same format as the one returned by `read_parquet_database`
+    """
+
+    point_ids = None
+    if max_integration_error is not None:
+        dataset = ds.dataset(Path(db_path), format="parquet", partitioning="hive")
+        point_ids = (
+            dataset.to_table(
+                columns=["id"],
+                filter=(ds.field("atom_name") == atom_name)
+                & (
+                    (pc.abs(ds.field("integration_error")) < max_integration_error)
+                    | ds.field("iqa").is_null()
+                ),
+            )
+            .column("id")
+            .to_pylist()
+        )
+
+    return read_parquet_database(db_path, columns=columns, point_ids=point_ids)
+
+
+def get_parquet_db_information(
+    db_path: Union[str, Path],
+) -> Tuple[List[int], List[str], pd.DataFrame]:
+    """Gets relevant information from a parquet database needed to post process data and generate datasets
+    for machine learning
+
+    :param db_path: Path to the directory of the parquet database
+    :return: Tuple of: List of point ids (integers) contained in the db,
+                    List of atom names (str) contained in db,
+                    a pd.DataFrame object containing all relevant data needed to construct the datasets.
+    """
+
+    full_df = read_parquet_database(db_path)
+
+    point_ids = full_df["id"].unique().tolist()
+    # the atom names in the order of the atoms in the first point
+    atom_names = full_df["atom_name"].unique().tolist()
+
+    return point_ids, atom_names, full_df
@@ -1,95 +1,35 @@
+from collections import namedtuple
 from pathlib import Path
-from typing import List, Union
+from typing import Callable, List, Tuple, Union
 
+import numpy as np
 import pandas as pd
 from ichor.core.atoms import ALF, Atom, Atoms
 from ichor.core.calculators import (
     calculate_alf_atom_sequence,
-    calculate_alf_features,
-    get_atom_alf,
-)
-from ichor.core.common.constants import (
-    spherical_dipole_labels,
-    spherical_hexadecapole_labels,
-    spherical_monopole_labels,
-    spherical_octupole_labels,
-    spherical_quadrupole_labels,
+    calculate_alf_features_batch,
+    calculate_c_matrices,
 )
+from ichor.core.common.constants import multipole_names
 from ichor.core.common.str import get_characters
 from ichor.core.database.json import get_json_db_info
+from ichor.core.database.parquet import (
+    get_parquet_db_information,
+    read_parquet_database,
+    read_parquet_points_for_atom,
+)
 from ichor.core.database.sql import get_sqlite_db_information
 from ichor.core.models.gaussian_energy_derivative_wrt_features import (
-    convert_to_feature_forces,
-    form_b_matrix,
-)
-from ichor.core.multipoles import (
-    rotate_dipole,
-    rotate_hexadecapole,
-    rotate_octupole,
-    rotate_quadrupole,
+    convert_to_feature_forces_batch,
+    form_b_matrices,
 )
-
-
-# TODO: move this to somewhere  else
-def rotate_multipole_moments(row_with_atom_info, C):
-
-    local_spherical_multipoles = {
-        spherical_monopole_labels[0]: row_with_atom_info["q00"].item()
-    }
-
-    local_dipole_moments = rotate_dipole(
-        *(
-            row_with_atom_info[dipole_label].item()
-            for dipole_label in spherical_dipole_labels
-        ),
-        C,
-    )
-    for dipole_name, dipole_value in zip(spherical_dipole_labels, local_dipole_moments):
-        local_spherical_multipoles[dipole_name] = dipole_value
-
-    local_quadrupole_moments = rotate_quadrupole(
-        *(
-            row_with_atom_info[quadrupole_label].item()
-            for quadrupole_label in spherical_quadrupole_labels
-        ),
-        C,
-    )
-    for quadrupole_name, quadrupole_value in zip(
-        spherical_quadrupole_labels, local_quadrupole_moments
-    ):
-        local_spherical_multipoles[quadrupole_name] = quadrupole_value
-
-    local_octupole_moments = rotate_octupole(
-        *(
-            row_with_atom_info[octupole_label].item()
-            for octupole_label in spherical_octupole_labels
-        ),
-        C,
-    )
-    for octupole_name, octupole_value in zip(
-        spherical_octupole_labels, local_octupole_moments
-    ):
-        local_spherical_multipoles[octupole_name] = octupole_value
-
-    local_hexadecapole_moments = rotate_hexadecapole(
-        *(
-            row_with_atom_info[hexadecapole_label].item()
-            for hexadecapole_label in spherical_hexadecapole_labels
-        ),
-        C,
-    )
-    for hexadecapole_name, hexadecapole_value in zip(
-        spherical_hexadecapole_labels, local_hexadecapole_moments
-    ):
-        local_spherical_multipoles[hexadecapole_name] = hexadecapole_value
-
-    return local_spherical_multipoles
+from ichor.core.multipoles import rotate_multipoles
 
 
 def check_supported_db_types(db_type: str):
     """Checks the given database type, raises ValueError if it is not present."""
 
-    _supported_databases = ["json", "sqlite"]
+    _supported_databases = ["json", "sqlite", "parquet"]
 
     if db_type not in _supported_databases:
         raise ValueError(
@@ -99,10 +39,10 @@ def check_supported_db_types(db_type: str):
 
 def get_database_info_from_db_type(db_path: Union[str, Path], db_type: str, echo=False):
     """Gets the required information from the database to make processed csvs.
-    Works for sqlite or json
+    Works for sqlite, json or parquet
 
     :param db_path: path to database
-    :param db_type: the type of database containing info, currently only "json" and "sqlite" are supported.
+    :param db_type: the type of database containing info, currently "json", "sqlite" and "parquet" are supported.
     :raises ValueError: If the value of db_type is not in supported databases.
     """
 
@@ -114,6 +54,8 @@ def get_database_info_from_db_type(db_path: Union[str, Path], db_type: str, echo
         )
     elif db_type == "json":
         point_ids, all_atom_names, full_df = get_json_db_info(db_path)
+    elif db_type == "parquet":
+        point_ids, all_atom_names, full_df = get_parquet_db_information(db_path)
 
     return point_ids, all_atom_names, full_df
 
@@ -128,7 +70,7 @@ def get_alf_from_first_db_geometry(
     Returns the atomic local frame for every atom from the first point.
 
     :param db_path: Path to SQLite3 database containing `Points`, `AtomNames`, and `Dataset` tables.
-    :param db_type: The type of database, currently only sqlite and json supported
+    :param db_type: The type of database, currently sqlite, json and parquet are supported
     :param alf_calc_func: The function to calculate ALF with on an Atoms instance
     :param echo: Whether to echo executed SQL queries, defaults to False
     :return: A list of ALF instances for every atom in the system.
@@ -136,7 +78,12 @@ def get_alf_from_first_db_geometry(
 
     check_supported_db_types(db_type)
 
-    ids, _, full_df = get_database_info_from_db_type(db_path, db_type, echo=echo)
+    # only the coordinates need to be read from a parquet database
+    if db_type == "parquet":
+        full_df = read_parquet_database(db_path, columns=["x", "y", "z"])
+        ids = full_df["id"].tolist()
+    else:
+        ids, _, full_df = get_database_info_from_db_type(db_path, db_type, echo=echo)
 
     first_point_id = ids[0]
 
@@ -165,6 +112,111 @@ def worker(x):
     return _func(x)
 
 
+# the full DataFrame reshaped so that every point has one row per atom, see `_tabulate_points`
+_PointsTable = namedtuple("_PointsTable", ["point_ids", "atom_names", "table"])
+
+
+def _tabulate_points(full_df: pd.DataFrame, point_ids: List[int]) -> _PointsTable:
+    """Reshapes the DataFrame extracted from the database (one row for every atom of every point) so
+    that every point has exactly one row for each atom, with the atoms in the same order for all points.
+    Every column of the table can then be viewed as an `n_points` x `n_atoms` array, so the points do not
+    need to be selected from the DataFrame one by one.
+
+    :param full_df: DataFrame object extracted from SQLite database (or json database).
+    :param point_ids: A list of integers representing the `id` column of the points table of the SQLite database.
+    :return: A `_PointsTable` containing the point ids (in the order of `point_ids`), the atom names and the
+        table indexed by point id and atom name. Points which do not contain all atoms are not included.
+    """
+
+    full_df = full_df.loc[full_df["id"].isin(point_ids)]
+    present_ids = set(full_df["id"])
+    point_ids = list(
+        dict.fromkeys(point_id for point_id in point_ids if point_id in present_ids)
+    )
+
+    if not point_ids:
+        return _PointsTable([], [], full_df.iloc[0:0])
+
+    # the atoms are ordered in the same way as the rows of the first point, which is the
+    # order of the atoms in the geometry that the ALF indices refer to
+    atom_names = full_df.loc[full_df["id"] == point_ids[0], "atom_name"].tolist()
+
+    # points for which an atom is missing cannot be used to calculate features
+    atoms_per_point = (
+        full_df.loc[full_df["atom_name"].isin(atom_names)]
+        .groupby("id")["atom_name"]
+        .nunique()
+    )
+    complete_ids = set(atoms_per_point.index[atoms_per_point == len(atom_names)])
+    point_ids = [point_id for point_id in point_ids if point_id in complete_ids]
+
+    table = (
+        full_df.drop_duplicates(["id", "atom_name"])
+        .set_index(["id", "atom_name"])
+        .reindex(
+            pd.MultiIndex.from_product(
+                [point_ids, atom_names], names=["id", "atom_name"]
+            )
+        )
+    )
+
+    return _PointsTable(point_ids, atom_names, table)
+
+
+def _points_tables_for_atoms(
+    db_path: Union[str, Path],
+    db_type: str,
+    max_integration_error: float,
+    calc_multipoles: bool,
+    calc_forces: bool,
+    echo=False,
+) -> Tuple[List[str], Callable[[str], _PointsTable]]:
+    """Returns the names of the atoms in a database and a function which returns the tabulated points
+    (see `_tabulate_points`) used to write the processed csv of an atom.
+
+    SQLite and json databases are read into one DataFrame, which is tabulated once and shared by all atoms.
+    Parquet databases are read atom by atom instead: only the points in which the integration error of the atom
+    is below the threshold and only the columns written to the processed csvs are read from the files.
+    """
+
+    if db_type == "parquet":
+
+        columns = ["name", "wfn_energy", "x", "y", "z", "iqa", "integration_error"]
+        if calc_multipoles:
+            columns += list(multipole_names)
+        if calc_forces:
+            columns += ["force_x", "force_y", "force_z"]
+
+        def points_table_for_atom(atom_name: str) -> _PointsTable:
+            atom_df = read_parquet_points_for_atom(
+                db_path,
+                atom_name,
+                columns=columns,
+                max_integration_error=max_integration_error,
+            )
+            # if none of the points can be used for the atom, the first point is read so that the atoms
+            # are known, it is filtered out again when the csv is written
+            if atom_df.empty:
+                atom_df = read_parquet_database(
+                    db_path, columns=columns, point_ids=first_point_ids
+                )
+            return _tabulate_points(atom_df, atom_df["id"].unique().tolist())
+
+        atom_names_df = read_parquet_database(db_path, columns=[])
+        first_point_ids = atom_names_df["id"].iloc[:1].tolist()
+        all_atom_names = atom_names_df["atom_name"].unique().tolist()
+
+        return all_atom_names, points_table_for_atom
+
+    point_ids, all_atom_names, full_df = get_database_info_from_db_type(
+        db_path, db_type, echo=echo
+    )
+    # the points are only tabulated once and then shared by all atoms
+    points_table = _tabulate_points(full_df, point_ids)
+
+    return all_atom_names, lambda atom_name: points_table
+
+
 def write_processed_data_for_atoms_parallel(
     db_path: Union[str, Path],
     db_type: List[str],
@@ -191,7 +243,7 @@ def write_processed_data_for_atoms_parallel(
 
     :param db_path: Path to SQLite3 database containing `Points`, `AtomNames`, and `Dataset` tables.
         or a json database (a directory), potentially containing multiple directories
-    :param db_type: The type of database that is given, currently only json or sqlite formats supported.
+    :param db_type: The type of database that is given, json, sqlite or parquet formats are supported.
     :param alf: A list of ALF instances to be used when calculating features
         and calculating C matrices.
     :param ncores: The number of cores to use for the parallel calculations. Each core will calculate
@@ -218,8 +270,13 @@ def write_processed_data_for_atoms_parallel(
             f"The number of available cores {CPU_COUNT} is less than the selected number of cores {ncores}."
         )
 
-    point_ids, all_atom_names, full_df = get_database_info_from_db_type(
-        db_path, db_type, echo=echo
+    all_atom_names, points_table_for_atom = _points_tables_for_atoms(
+        db_path,
+        db_type,
+        max_integration_error,
+        calc_multipoles,
+        calc_forces,
+        echo=echo,
     )
 
     # if no names given, make csvs for all atoms
@@ -229,9 +286,8 @@ def write_processed_data_for_atoms_parallel(
     # needed for parallel lambda
     def func_for_parallel(atom_name):
 
-        write_processed_one_atom_data_to_csv(
-            full_df,
-            point_ids,
+        _write_processed_one_atom_data_from_table(
+            points_table_for_atom(atom_name),
             atom_name=atom_name,
             alf=alf,
             max_diff_iqa_wfn=max_diff_iqa_wfn,
@@ -268,7 +324,7 @@ def write_processed_data_for_atoms(
         corresponding atomic datasets.
 
     :param db_path: Path to SQLite3 database containing `Points`, `AtomNames`, and `Dataset` tables.
-    :param db_type: type of database, sqlite or json
+    :param db_type: type of database, sqlite, json or parquet
     :param alf: A list of ALF instances to be used when calculating features
         and calculating C matrices.
     :param max_integration_error: Maximum integration error that a point needs to have for the atom
@@ -282,8 +338,13 @@ def write_processed_data_for_atoms(
     :param properties: Which properties to write out to csv files.
     """
 
-    point_ids, all_atom_names, full_df = get_database_info_from_db_type(
-        db_path, db_type, echo=echo
+    all_atom_names, points_table_for_atom = _points_tables_for_atoms(
+        db_path,
+        db_type,
+        max_integration_error,
+        calc_multipoles,
+        calc_forces,
+        echo=echo,
     )
 
     if not atom_names:
@@ -291,9 +352,8 @@ def write_processed_data_for_atoms(
 
     for atom_name in atom_names:
 
-        write_processed_one_atom_data_to_csv(
-            full_df,
-            point_ids,
+        _write_processed_one_atom_data_from_table(
+            points_table_for_atom(atom_name),
             atom_name=atom_name,
             alf=alf,
             max_integration_error=max_integration_error,
@@ -333,260 +393,178 @@ def write_processed_one_atom_data_to_csv(
         of interest. Having a higher (absolute) integration error for the atom of interest means that
         this point will not be added in the dataset for the atom of interest. However, the same
         point can be added in the dataset for another atom, if the integration error is good, defaults to 0.001
-    :param calc_forces: Whether to calculate -dE/df forces (which takes a long time currently), default False.
+    :param calc_forces: Whether to calculate -dE/df forces, default False.
     """
 
-    # make directory where csvs are going to be stored
-    parent_directory.mkdir(exist_ok=True)
+    _write_processed_one_atom_data_from_table(
+        _tabulate_points(full_df, point_ids),
+        atom_name=atom_name,
+        alf=alf,
+        max_diff_iqa_wfn=max_diff_iqa_wfn,
+        max_integration_error=max_integration_error,
+        write_index_col=write_index_col,
+        calc_multipoles=calc_multipoles,
+        calc_forces=calc_forces,
+        parent_directory=parent_directory,
+    )
 
-    # final dictionary that is going to be converted to pd.DataFrame and written to csv
-    total_dict = {}
 
-    # loop over points
-    for point_id in point_ids:
+def _write_processed_one_atom_data_from_table(
+    points_table: _PointsTable,
+    atom_name: str,
+    alf: List[ALF],
+    max_diff_iqa_wfn: float = 4.184,
+    max_integration_error: float = 0.001,
+    write_index_col=False,
+    calc_multipoles: bool = True,
+    calc_forces: bool = False,
+    parent_directory: Path = Path("processed_csvs"),
+):
+    """Writes the processed csv of one atom (see `write_processed_one_atom_data_to_csv`) from points which
+    have already been tabulated with `_tabulate_points`. The points are filtered with boolean masks and the
+    features and C matrices of all points are calculated at once, instead of looping over the points."""
 
-        # find geometry which matches the id
-        one_point_df = full_df.loc[full_df["id"] == point_id]
+    # make directory where csvs are going to be stored
+    parent_directory.mkdir(exist_ok=True)
 
-        # need to check that iqa is populated for all atoms before summing
-        if not (one_point_df["iqa"].isnull().all()):
-            sum_iqa_energies = one_point_df["iqa"].sum()
-            # the wfn energy will be the same for all atoms, since they come from same geometry
-            # so just grab first value
-            abs_diff_wfn_iqa_kj_mol = (
-                abs(one_point_df["wfn_energy"].values[0] - sum_iqa_energies) * 2625.5
+    point_ids, atom_names, table = points_table
+    npoints, natoms = len(point_ids), len(atom_names)
+    central_atom_index = atom_names.index(atom_name)  # 0-indexed
+
+    def as_array(column: str, dtype=float) -> np.ndarray:
+        """Returns a column of the table as an `n_points` x `n_atoms` array."""
+        if dtype is float:
+            return (
+                pd.to_numeric(table[column])
+                .to_numpy(dtype=float)
+                .reshape(npoints, natoms)
             )
-            # do not add point to the processed csv if difference is too large
-            if abs_diff_wfn_iqa_kj_mol >= max_diff_iqa_wfn:
-                continue
-
-        # check that integration error is below threshold, otherwise do not calculate features
-        # for the atom and do not add this point to training set for this atom.
-        # if other atoms have good integration errors, the same point can be used in their training sets.
-        row_with_atom_info = one_point_df.loc[one_point_df["atom_name"] == atom_name]
+        return table[column].to_numpy().reshape(npoints, natoms)
+
+    # filter out points for which the difference between the wfn energy and the sum of the
+    # iqa energies is too large. This is only checked if iqa is populated for any of the atoms
+    iqa = as_array("iqa")
+    # the wfn energy will be the same for all atoms, since they come from same geometry
+    # so just grab first value
+    wfn_energy = as_array("wfn_energy")[:, 0]
+    with np.errstate(invalid="ignore"):
+        abs_diff_wfn_iqa_kj_mol = np.abs(wfn_energy - np.nansum(iqa, axis=1)) * 2625.5
+        good_energy = np.all(np.isnan(iqa), axis=1) | ~(
+            abs_diff_wfn_iqa_kj_mol >= max_diff_iqa_wfn
+        )
 
-        if calc_forces:
-            if not one_point_df["force_x"].isnull().values.any():
-                global_forces_array = one_point_df[
-                    ["force_x", "force_y", "force_z"]
-                ].to_numpy()
-            else:
-                global_forces_array = None
-        else:
-            global_forces_array = None
-
-        # If the atomic information (.int file) was missing, then this
-        # iqa energy will be None, so it will not get executed
-        if row_with_atom_info["iqa"].item():
-
-            # if the absolute of the integration error is less than threshold, then calculate features
-            if (
-                abs(row_with_atom_info["integration_error"].item())
-                < max_integration_error
-            ):
-
-                # create atoms instance which will be used to calculate features
-                atoms = Atoms()
-                for row_id, row_data in one_point_df.iterrows():
-                    # atoms accepts atom type (but database contains the atom index as well)
-                    atom_type = get_characters(row_data.atom_name)
-                    atoms.append(Atom(atom_type, row_data.x, row_data.y, row_data.z))
-
-                natoms = len(atoms)
-                in_alf_atom_indices = get_atom_alf(atoms[atom_name], alf)
-                not_in_alf_indices = [
-                    i for i in range(natoms) if i not in in_alf_atom_indices
-                ]
-
-                x_axis_name = atoms[in_alf_atom_indices[1]].name
-
-                # if there are only 2 atoms, this will be None
-                check_for_xy_plane_atom = in_alf_atom_indices[2]
-
-                # if not none, then do xy-plane and potentially others
-                if check_for_xy_plane_atom is not None:
-
-                    xy_plane_atom_name = atoms[in_alf_atom_indices[2]].name
-                    # the xy plane atom moves in the xy plane, so it itself determines what the valence angle is
-                    # the x-axis atom always stays on the x-axis
-                    val_angle_name = xy_plane_atom_name
-
-                    atom_ordering_in_features = [
-                        x_axis_name,
-                        xy_plane_atom_name,
-                        val_angle_name,
-                    ] + [atoms[i].name for i in not_in_alf_indices for _ in range(3)]
-
-                # if it is none, then we only have x-axis feature
-                else:
-                    atom_ordering_in_features = [x_axis_name]
-
-                C = atoms[atom_name].C(alf)
-                central_atom_index = atoms[atom_name].i  # 0-indexed
-                # calculate features for the atom of interest
-                one_atom_features = atoms[atom_name].features(
-                    calculate_alf_features, alf
-                )
-                n_features = len(one_atom_features)
-
-                if global_forces_array is not None:
-                    b_matrix = form_b_matrix(atoms, alf, central_atom_index)
-                    negative_dE_df = convert_to_feature_forces(
-                        global_forces_array, b_matrix, alf, central_atom_index
-                    )
-                else:
-                    negative_dE_df = [None] * n_features
-
-                # make dictionary of rotated multipoles
-                if calc_multipoles:
-                    local_spherical_multipoles = rotate_multipole_moments(
-                        row_with_atom_info, C
-                    )
-
-                # add the point_id and name of point to dictionary
-                point_id_str = str(point_id)
-                total_dict[point_id_str] = {
-                    "point_id": point_id,
-                    "point_name": row_with_atom_info["name"].item(),
-                }
-                # add features to dictionary
-                total_dict[point_id_str].update(
-                    {
-                        f"f{i}_{a}": one_atom_feature
-                        for a, i, one_atom_feature in zip(
-                            atom_ordering_in_features,
-                            range(1, n_features + 1),
-                            one_atom_features,
-                        )
-                    }
-                )
-                # add wfn energy to dictionary
-                total_dict[point_id_str].update(
-                    {"wfn_energy": row_with_atom_info["wfn_energy"].item()}
-                )
+    # If the atomic information (.int file) was missing, then the iqa energy of the atom will be None
+    # and only the features (and -dE/df) are written for the point
+    has_iqa = np.frompyfunc(bool, 1, 1)(
+        as_array("iqa", dtype=object)[:, central_atom_index]
+    ).astype(bool)
+    # if the iqa energy is there, the absolute of the integration error must be less than the threshold,
+    # otherwise the point is not added to the training set for this atom.
+    # if other atoms have good integration errors, the same point can be used in their training sets.
+    with np.errstate(invalid="ignore"):
+        good_integration_error = (
+            np.abs(as_array("integration_error")[:, central_atom_index])
+            < max_integration_error
+        )
 
-                # add feature forces to dictionary (these are negative of gradient)
-                if calc_forces:
-                    # add -dE/df (forces wrt features) to dict
-                    total_dict[point_id_str].update(
-                        {
-                            f"-dE/df{i}": neg_dE_df
-                            for i, neg_dE_df in zip(
-                                range(1, n_features + 1), negative_dE_df
-                            )
-                        }
-                    )
-
-                # add iqa to dictionary
-                total_dict[point_id_str].update(
-                    {"iqa": row_with_atom_info["iqa"].item()}
-                )
+    selected = good_energy & (~has_iqa | good_integration_error)
+    with_iqa = has_iqa[selected]
+    coordinates = np.stack([as_array("x"), as_array("y"), as_array("z")], axis=-1)[
+        selected
+    ]
+    n_selected = len(coordinates)
+
+    atom_alf = alf[central_atom_index]
+    not_in_alf_indices = [i for i in range(natoms) if i not in atom_alf]
+    x_axis_name = atom_names[atom_alf[1]]
+    # if there are only 2 atoms, there is no xy-plane atom
+    if atom_alf[2] is not None:
+        xy_plane_atom_name = atom_names[atom_alf[2]]
+        # the xy plane atom moves in the xy plane, so it itself determines what the valence angle is
+        # the x-axis atom always stays on the x-axis
+        val_angle_name = xy_plane_atom_name
+        atom_ordering_in_features = [
+            x_axis_name,
+            xy_plane_atom_name,
+            val_angle_name,
+        ] + [atom_names[i] for i in not_in_alf_indices for _ in range(3)]
+    # if it is none, then we only have x-axis feature
+    else:
+        atom_ordering_in_features = [x_axis_name]
+    n_features = len(atom_ordering_in_features)
+
+    # calculate features for the atom of interest for all selected points at once
+    if n_selected:
+        features = calculate_alf_features_batch(
+            coordinates, alf, atom_indices=[central_atom_index]
+        )[0]
+    else:
+        features = np.empty((0, n_features))
+
+    # -dE/df are only calculated for points in which all forces are present
+    negative_dE_df = np.full((n_selected, n_features), np.nan)
+    if calc_forces:
+        global_forces = np.stack(
+            [as_array("force_x"), as_array("force_y"), as_array("force_z")], axis=-1
+        )[selected]
+        has_forces = ~np.any(np.isnan(global_forces[..., 0]), axis=1)
+        if np.any(has_forces):
+            b_matrices = form_b_matrices(
+                coordinates[has_forces], alf, [central_atom_index]
+            )[0]
+            negative_dE_df[has_forces] = convert_to_feature_forces_batch(
+                global_forces[has_forces], b_matrices
+            )
 
-                # add integration_error to dictionary
-                total_dict[point_id_str].update(
-                    {
-                        "integration_error": row_with_atom_info[
-                            "integration_error"
-                        ].item()
-                    }
-                )
+    atom_rows = table.xs(atom_name, level="atom_name")[selected]
 
-                if calc_multipoles:
-                    # add all the rotated multipole moments
-                    total_dict[point_id_str].update(local_spherical_multipoles)
-
-        # if no iqa information found
-        else:
-
-            # create atoms instance which will be used to calculate features
-            atoms = Atoms()
-            for row_id, row_data in one_point_df.iterrows():
-                # atoms accepts atom type (but database contains the atom index as well)
-                atom_type = get_characters(row_data.atom_name)
-                atoms.append(Atom(atom_type, row_data.x, row_data.y, row_data.z))
-
-            natoms = len(atoms)
-            in_alf_atom_indices = get_atom_alf(atoms[atom_name], alf)
-            not_in_alf_indices = [
-                i for i in range(natoms) if i not in in_alf_atom_indices
-            ]
-
-            x_axis_name = atoms[in_alf_atom_indices[1]].name
-
-            # if there are only 2 atoms, this will be None
-            check_for_xy_plane_atom = in_alf_atom_indices[2]
-
-            # if not none, then do xy-plane and potentially others
-            if check_for_xy_plane_atom is not None:
-
-                xy_plane_atom_name = atoms[in_alf_atom_indices[2]].name
-                # the xy plane atom moves in the xy plane, so it itself determines what the valence angle is
-                # the x-axis atom always stays on the x-axis
-                val_angle_name = xy_plane_atom_name
-
-                atom_ordering_in_features = [
-                    x_axis_name,
-                    xy_plane_atom_name,
-                    val_angle_name,
-                ] + [atoms[i].name for i in not_in_alf_indices for _ in range(3)]
-
-            # if it is none, then we only have x-axis feature
-            else:
-                atom_ordering_in_features = [x_axis_name]
-
-            C = atoms[atom_name].C(alf)
-            central_atom_index = atoms[atom_name].i  # 0-indexed
-            # calculate features for the atom of interest
-            one_atom_features = atoms[atom_name].features(calculate_alf_features, alf)
-            n_features = len(one_atom_features)
-
-            if global_forces_array is not None:
-                b_matrix = form_b_matrix(atoms, alf, central_atom_index)
-                negative_dE_df = convert_to_feature_forces(
-                    global_forces_array, b_matrix, alf, central_atom_index
-                )
-            else:
-                negative_dE_df = [None] * n_features
-            # add the point_id and name of point to dictionary
-            point_id_str = str(point_id)
-            total_dict[point_id_str] = {
-                "point_id": point_id,
-                "point_name": row_with_atom_info["name"].item(),
-            }
-            # add features to dictionary
-            total_dict[point_id_str].update(
-                {
-                    f"f{i}_{a}": one_atom_feature
-                    for a, i, one_atom_feature in zip(
-                        atom_ordering_in_features,
-                        range(1, n_features + 1),
-                        one_atom_features,
-                    )
-                }
-            )
-            # add wfn energy to dictionary
-            total_dict[point_id_str].update(
-                {"wfn_energy": row_with_atom_info["wfn_energy"].item()}
+    total_dict = {
+        "point_id": atom_rows.index.to_numpy(),
+        "point_name": atom_rows["name"].to_numpy(),
+    }
+    # add features to dictionary
+    total_dict.update(
+        {
+            f"f{i}_{a}": one_feature
+            for i, (a, one_feature) in enumerate(
+                zip(atom_ordering_in_features, features.T), start=1
             )
+        }
+    )
+    total_dict["wfn_energy"] = atom_rows["wfn_energy"].to_numpy()
+    # add feature forces to dictionary (these are negative of gradient)
+    if calc_forces:
+        total_dict.update(
+            {
+                f"-dE/df{i}": neg_dE_df
+                for i, neg_dE_df in enumerate(negative_dE_df.T, start=1)
+            }
+        )
 
-            if calc_forces:
-                # add -dE/df (forces wrt features) to dict
-                total_dict[point_id_str].update(
-                    {
-                        f"-dE/df{i}": neg_dE_df
-                        for i, neg_dE_df in zip(
-                            range(1, n_features + 1), negative_dE_df
-                        )
-                    }
-                )
+    # iqa, integration error and multipoles are only written if any of the points has an iqa energy
+    if np.any(with_iqa):
+        total_dict["iqa"] = np.where(with_iqa, atom_rows["iqa"].to_numpy(), np.nan)
+        total_dict["integration_error"] = np.where(
+            with_iqa, atom_rows["integration_error"].to_numpy(), np.nan
+        )
+
+        if calc_multipoles:
+            local_multipoles = np.full((n_selected, len(multipole_names)), np.nan)
+            local_multipoles[with_iqa] = rotate_multipoles(
+                atom_rows[list(multipole_names)]
+                .apply(pd.to_numeric)
+                .to_numpy(dtype=float)[with_iqa],
+                calculate_c_matrices(coordinates[with_iqa], atom_alf),
+            )
+            total_dict.update(dict(zip(multipole_names, local_multipoles.T)))
 
     # add 1 because model files start with atom index 1
     # need to check if i is an integer because it can also be None if less than 3 atom system
-    alf_for_current_atom = [i + 1 for i in alf[central_atom_index] if i is not None]
+    alf_for_current_atom = [i + 1 for i in atom_alf if i is not None]
     alf_str = "alf_" + "_".join(list(map(str, alf_for_current_atom)))
 
     # write the total dict containing information for all points to a DataFrame and save
-    total_df = pd.DataFrame.from_dict(total_dict, orient="index")
+    total_df = pd.DataFrame(total_dict, index=atom_rows.index.astype(str))
     total_df.to_csv(
         parent_directory / f"{atom_name}_processed_data_{alf_str}.csv",
         index=write_index_col,
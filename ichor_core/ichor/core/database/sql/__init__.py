@@ -1,16 +1,36 @@
 from ichor.core.database.sql.add_to_database import (
     add_atom_names_to_database,
+    add_point_data_to_database,
     add_point_to_database,
+    add_points_data_to_database,
     create_database_session,
+    sqlite_pragmas,
 )
 
-from ichor.core.database.sql.database import create_database
+from ichor.core.database.sql.database import (
+    create_database,
+    create_database_indexes,
+    create_database_tables,
+)
 from ichor.core.database.sql.query_database import get_sqlite_db_information
+from ichor.core.database.sql.sync_database import (
+    DatabaseSyncReport,
+    read_point_fingerprints,
+    sync_points_to_database,
+)
 
 __all__ = [
     "add_atom_names_to_database",
+    "add_point_data_to_database",
     "add_point_to_database",
+    "add_points_data_to_database",
     "create_database_session",
+    "sqlite_pragmas",
     "create_database",
+    "create_database_indexes",
+    "create_database_tables",
     "get_sqlite_db_information",
+    "DatabaseSyncReport",
+    "read_point_fingerprints",
+    "sync_points_to_database",
 ]
@@ -1,27 +1,64 @@
-import warnings
-from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, List, Optional
 
+from ichor.core.common.itertools import chunker
+from ichor.core.database.json.add_to_database import get_data_for_point
 from ichor.core.database.sql.database import AtomNames, Dataset, Points
 
-from sqlalchemy import create_engine, select
+from sqlalchemy import create_engine, event, func, insert, select
 from sqlalchemy.orm import Session, sessionmaker
 
-
-def create_database_session(database_path: Path, echo=False):
+# PRAGMAs which are set for every connection made by `create_database_session`.
+# Write-ahead logging allows the database to be read while points are being written to it and,
+# together with synchronous=NORMAL, makes every commit much cheaper (the database can still not
+# be corrupted by a crash). Note that write-ahead logging does not work on network filesystems.
+sqlite_pragmas = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    # negative values are in KiB, so this is a 64 MiB page cache
+    "cache_size": -65536,
+}
+
+# the columns of the dataset table which are written for every atom of every point
+_dataset_columns = [
+    column.name for column in Dataset.__table__.columns if column.name != "id"
+]
+_insert_dataset_statement = (
+    f"INSERT INTO {Dataset.__tablename__} ({', '.join(_dataset_columns)}) "
+    f"VALUES ({', '.join('?' * len(_dataset_columns))})"
+)
+
+
+def create_database_session(
+    database_path: Path, echo=False, pragmas: Optional[Dict[str, object]] = None
+):
     """Creates a sqlalchemy Engine object as well as a Session object
     which are used to interact with the SQLite database.
 
     :param database_path: pathlib.Path object to database
     :param echo: Whether for SQLAlchemy to echo SQL commands used, defaults to False
+    :param pragmas: A dictionary of PRAGMAs (and their values) to set for every connection,
+        defaults to None, in which case `sqlite_pragmas` are set. Use an empty dictionary
+        to keep the SQLite defaults (e.g. for databases on network filesystems).
     """
 
+    if pragmas is None:
+        pragmas = sqlite_pragmas
+
     database_path = str(Path(database_path).absolute())
     # create new database and start session
     engine = create_engine(
         f"sqlite+pysqlite:///{database_path}", echo=echo, future=True
     )
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in pragmas.items():
+            cursor.execute(f"PRAGMA {pragma}={value};")
+        cursor.close()
+
     Session = sessionmaker(bind=engine)
     session = Session()
 
@@ -40,8 +77,6 @@ def add_atom_names_to_database(session: Session, atom_names: List[str], echo=Fal
     session.commit()
 
 
-# TODO: make this more robust as some data might be absent. Check that .wfn exists before adding wfn data
-# TODO: check that gaussian out forces exist. Check that int file exists.
 def add_point_to_database(
     session: Session,
     point: "ichor.core.files.PointDirectory",  # noqa F821
@@ -57,208 +92,137 @@ def add_point_to_database(
     .. note:: Even if atomic data (.int file) is missing for a particular atom in the system,
         the information for the point will still be added to the database. This is because
         the rest the point can still be used in the training set for the other atoms.
+        Points which contain a shell script (.sh) file (which AIMAll deletes if it ran successfully)
+        are never added, also when `print_missing_data` is False.
+    """
+
+    # the data is read in the same way as for the json database, so both databases contain the same data
+    point_data = get_data_for_point(point, print_missing_data=print_missing_data)
+    add_point_data_to_database(session, point_data)
+
+
+def add_point_data_to_database(session: Session, point_data: Optional[dict]):
+    """Adds the data of one point, as returned by `get_data_for_point`, to the database.
+    The data can be read from the point in another process (see `PointsDirectory.write_to_sqlite3_database`),
+    so that only the writing to the database is done in the process which holds the session.
+
+    :param session: The session of the database to which the point is added
+    :param point_data: A dictionary containing the data of one point. If None (e.g. because AIMAll
+        likely crashed for the point), nothing is added to the database.
     """
 
-    # check for .sh file in directory as AIMALL should delete it if it ran successfully
-    # if .sh file is found then do not append this point to the database as it can cause problems
-    # when reading the database
-
-    for _f in point.path.iterdir():
-        if _f.suffix == ".sh":
-            if print_missing_data:
-                print(
-                    f"A '.sh' was found in {point.path.absolute()}, so AIMAll likely crashed. Not added to db."
-                )
-                return
-
-    ###############################
-    # wfn information
-    ###############################
-
-    # if wfn file exists
-    if point.wfn:
-        # ORM for points table
-        db_point = Points(
-            date_added=datetime.today().strftime("%Y-%m-%d %H:%M:%S"),
-            name=point.name_without_suffix,
-            wfn_energy=point.wfn.total_energy,
-        )
-    # if file does not exist, still add to database, but do not contain wfn information
-    else:
-        # ORM for points table
-        db_point = Points(
-            date_added=datetime.today().strftime("%Y-%m-%d %H:%M:%S"),
-            # wfn energy might not exist if Gaussian has not been ran yet (or wfn file does not exist.)
-            # add a None for wfn energy if wfn energy is not present
-            name=point.name_without_suffix,
-            wfn_energy=None,
-        )
-        if print_missing_data:
-            print(
-                f"Point {point.path} does not contain a Gaussian wavefunction (.wfn) file."
-            )
-
-    ###############################
-    # gaussian output file check
-    ###############################
-
-    if not point.gaussian_output:
-        if print_missing_data:
-            print(f"Point {point.path} does not contain a Gaussian output (.gau) file.")
-
-    ###############################
-    # _atomicfiles directory check
-    ###############################
-
-    if not point.ints:
-
-        if print_missing_data:
-            print(
-                f"Point {point.path} does not contain an atomicfiles directory (containing AIMAll .int)."
-            )
-
-    # add database point to session. Need to do this before adding the dataset stuff
-    # because the id needs to be assigned to the point (because dataset contains foreign key point_id)
-    session.add(db_point)
-
-    # use this list later to bulk add all Dataset instances to database
-    # there are multiple Dataset instances because each single point (one row in points table)
-    # relates to multiple rows in the dataset table
-    # (because one point contains many atoms and each atom has information for it)
-    db_dataset_list = []
-
-    # list that will add missing int files
-    # (if _atomicfiles directory exists) but .int file for an atom does not.
-    missing_int_files = []
-
-    # add information to dataset table for each atom
-    for atom_name in point.atom_names:
-
-        # make select statement to get atom name
-        atom_select_statement = select(AtomNames).where(AtomNames.name == atom_name)
-        # get the id of the atom from the atom_names table.
-        # use scalars instead of execute and return the first row (there should be one row as atom names are unique)
-        atom_id = session.scalars(atom_select_statement).first().id
-
-        # get x, y, z coordinates of atom which can then be used to calculated features
-        # based on the coordinates of the other atoms in the molecule
-        atom_coordinates = point[atom_name].coordinates
-        x_coord = atom_coordinates[0]
-        y_coord = atom_coordinates[1]
-        z_coord = atom_coordinates[2]
-
-        ###############################
-        # .gau / gaussian output information
-        ###############################
-
-        # forces are saved directly from gaussian out file, thus they are in
-        # global cartesian coordinates. This means these forces need to be rotated later
-        # when an ALF is chosen for atoms.
-        if point.gaussian_output:
-            if point.gaussian_output.global_forces:
-                atom_global_forces = point.gaussian_output.global_forces[atom_name]
-                atom_force_x = atom_global_forces[0]
-                atom_force_y = atom_global_forces[1]
-                atom_force_z = atom_global_forces[2]
-
-            # in case that the force keyword was not used but gaussian out exists
-            else:
-                atom_force_x, atom_force_y, atom_force_z = None, None, None
-                print(
-                    f"Point {point.path} does not have forces in Gaussian output (.gau) file."
-                )
-        # in case that gaussian out does not exist in point directory
-        else:
-            atom_force_x, atom_force_y, atom_force_z = None, None, None
-
-        ###############################
-        # .int file information
-        ###############################
-        if point.ints:
-            # add information from int file for the current atom
-            # get the INT instance representing the .int file for the atom
-            # use get here to get a default value of None if .int file is missing for some atom
-            atom_int_file = point.ints.get(atom_name, None)
-
-            # if .int file / INT instance exists, then data can be read in
-            if atom_int_file:
-
-                # do not display warning from .int file if iqa energy is not there
-                # iqa energy will not be in an existing .int file in -encomp setting is below 3
-                with warnings.catch_warnings():
-                    warnings.filterwarnings("ignore")
-                    atom_iqa_energy = atom_int_file.iqa
-
-                # integration error should always exist
-                atom_integration_error = atom_int_file.integration_error
-
-                # note that these are not rotated because the alf has not been chosen yet
-                # the user can choose an alf and rotate the global spherical multipoles as needed
-                global_multipole_moments = atom_int_file.global_spherical_multipoles
-
-                # add the Dataset object to list so it can be bulk written later
-                db_dataset_list.append(
-                    Dataset(
-                        point_id=db_point.id,
-                        atom_id=atom_id,
-                        x=x_coord,
-                        y=y_coord,
-                        z=z_coord,
-                        force_x=atom_force_x,
-                        force_y=atom_force_y,
-                        force_z=atom_force_z,
-                        iqa=atom_iqa_energy,
-                        integration_error=atom_integration_error,
-                        **global_multipole_moments,
-                    )
-                )
-
-            # if .int file for an atom does not exist then (but _atomicfiles directory exists)
-            # then just append the coordinates and any other read in information
-            else:
-                # add the Dataset object to list so it can be bulk written later
-                db_dataset_list.append(
-                    Dataset(
-                        point_id=db_point.id,
-                        atom_id=atom_id,
-                        x=x_coord,
-                        y=y_coord,
-                        z=z_coord,
-                        force_x=atom_force_x,
-                        force_y=atom_force_y,
-                        force_z=atom_force_z,
-                        # the .int file arguments will be None by default
-                        # as they can be nullable because of the dataset SQL table definition
-                    )
-                )
-                missing_int_files.append(atom_name)
-
-        else:
-            # add the Dataset object to list so it can be bulk written later
-            db_dataset_list.append(
-                Dataset(
-                    point_id=db_point.id,
-                    atom_id=atom_id,
-                    x=x_coord,
-                    y=y_coord,
-                    z=z_coord,
-                    force_x=atom_force_x,
-                    force_y=atom_force_y,
-                    force_z=atom_force_z,
-                    # the .int file arguments will be None by default
-                    # as they can be nullable because of the dataset SQL table definition
-                )
-            )
-
-    # if there are missing atoms, then print these out
-    if len(missing_int_files) > 0:
-
-        if print_missing_data:
-            print(
-                f"Point {point.path} has missing .int files for atoms: {missing_int_files}."
-            )
-
-    # bulk save the information for all atoms in the point
-    session.bulk_save_objects(db_dataset_list)
-    # commit to database
+    add_points_data_to_database(session, [point_data])
+
+
+def add_points_data_to_database(
+    session: Session, points_data: Iterable[Optional[dict]], batch_size: int = 1000
+) -> int:
+    """Adds the data of many points, as returned by `get_data_for_point`, to the database.
+    The points are written in batches, each of which is written in one transaction, with
+    one insert statement for the rows of all atoms of all points in the batch.
+    `points_data` can be a generator, so the points can be read while they are written.
+
+    :param session: The session of the database to which the points are added
+    :param points_data: An iterable of dictionaries containing the data of one point each.
+        Points for which the data is None (e.g. because AIMAll likely crashed) are not added.
+    :param batch_size: The number of points written in one transaction, defaults to 1000
+    :return: The number of points which were added to the database
+    """
+
+    # the ids of the atoms in the atom_names table, atom names are unique
+    atom_ids = dict(session.execute(select(AtomNames.name, AtomNames.id)).all())
     session.commit()
+
+    npoints = 0
+
+    for batch in chunker(points_data, batch_size):
+
+        # points for which AIMAll likely crashed do not have any data
+        batch = [point_data for point_data in batch if point_data is not None]
+        if not batch:
+            continue
+
+        with session.begin():
+
+            # Core statements are used (instead of ORM objects) because they are executed with executemany
+            connection = session.connection()
+            _add_new_atom_names(connection, batch, atom_ids)
+            point_ids = _insert_points(connection, batch)
+            _insert_dataset_rows(connection, point_ids, batch, atom_ids)
+
+        npoints += len(batch)
+
+    return npoints
+
+
+def _add_new_atom_names(connection, batch: List[dict], atom_ids: Dict[str, int]):
+    """Atom names that are not in the database yet (e.g. when adding points to an existing database)
+    are added to the atom_names table. The ids of the new atom names are added to `atom_ids`."""
+
+    new_atom_names = dict.fromkeys(
+        atom_name
+        for point_data in batch
+        for atom_name in point_data["atomic_data"]
+        if atom_name not in atom_ids
+    )
+    for atom_name in new_atom_names:
+        atom_ids[atom_name] = connection.execute(
+            insert(AtomNames.__table__).values(name=atom_name)
+        ).inserted_primary_key[0]
+
+
+def _insert_points(connection, batch: List[dict]) -> range:
+    """Inserts the rows of a batch of points into the points table and returns the ids of the points."""
+
+    connection.execute(
+        insert(Points.__table__),
+        [
+            {
+                "date_added": point_data["date_added"],
+                "name": point_data["name"],
+                "wfn_energy": point_data["wfn_energy"],
+            }
+            for point_data in batch
+        ],
+    )
+
+    # SQLite assigns the ids of new rows as one more than the largest id in the table, so the points
+    # of the batch have consecutive ids ending in the largest id. No other connection can write to
+    # the database during the transaction, so the ids cannot be taken by other points.
+    last_point_id = connection.execute(select(func.max(Points.id))).scalar()
+    return range(last_point_id - len(batch) + 1, last_point_id + 1)
+
+
+def _insert_dataset_rows(
+    connection, point_ids: Iterable[int], batch: List[dict], atom_ids: Dict[str, int]
+):
+    """Inserts the rows of the dataset table (one for every atom) of a batch of points with the given ids."""
+
+    # the dataset rows are given to executemany of the driver directly, because constructing
+    # the parameters of the many (wide) rows in SQLAlchemy takes longer than inserting them
+    connection.exec_driver_sql(
+        _insert_dataset_statement,
+        [
+            _dataset_row(point_id, atom_ids[atom_name], atom_data)
+            for point_id, point_data in zip(point_ids, batch)
+            for atom_name, atom_data in point_data["atomic_data"].items()
+        ],
+    )
+
+
+def _dataset_row(point_id: int, atom_id: int, atom_data: dict) -> tuple:
+    """Returns the row of the dataset table for one atom of a point, with the values in the order of
+    `_dataset_columns`. The .int file data will be None if the .int file is missing,
+    as the columns are nullable because of the dataset SQL table definition."""
+
+    row = dict.fromkeys(_dataset_columns)
+
+    row["point_id"] = point_id
+    row["atom_id"] = atom_id
+    row["x"], row["y"], row["z"] = atom_data["coordinates"]
+    row["force_x"], row["force_y"], row["force_z"] = atom_data["global_forces"]
+    row["iqa"] = atom_data.get("iqa")
+    row["integration_error"] = atom_data.get("integration_error")
+    row.update(atom_data.get("global_spherical_multipole_moments", {}))
+
+    return tuple(row.values())
@@ -1,7 +1,16 @@
 from pathlib import Path
 from typing import Union
 
-from sqlalchemy import Column, create_engine, Float, ForeignKey, Integer, String
+from sqlalchemy import (
+    Column,
+    create_engine,
+    Float,
+    ForeignKey,
+    inspect,
+    Integer,
+    String,
+)
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -44,13 +53,30 @@ class Points(Base):
     )
 
 
+class PointFingerprints(Base):
+    """The manifest of the points written by `sync_points_to_database`, which contains the fingerprint of the
+    files of every point when it was written, so that only new or changed points are written again."""
+
+    __tablename__ = "point_fingerprints"
+
+    id = Column(Integer, primary_key=True)
+    point_id = Column(
+        Integer, ForeignKey("points.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    # point names are unique in the manifest, even if they are not unique in the points table
+    name = Column(String, unique=True, nullable=False)
+    fingerprint = Column(String, nullable=False)
+
+
 class Dataset(Base):
 
     __tablename__ = "dataset"
 
     id = Column(Integer, primary_key=True)
-    point_id = Column(Integer, ForeignKey("points.id", ondelete="CASCADE"))
-    atom_id = Column(Integer, ForeignKey("atom_names.id"))
+    # the foreign keys are indexed, so that the data of points and atoms can be looked up (and joined)
+    # without scanning the whole dataset table
+    point_id = Column(Integer, ForeignKey("points.id", ondelete="CASCADE"), index=True)
+    atom_id = Column(Integer, ForeignKey("atom_names.id"), index=True)
 
     points_parent = relationship("Points", back_populates="children")
     atom_names_parent = relationship("AtomNames", back_populates="children")
@@ -125,3 +151,29 @@ def create_database(database_path: Union[str, Path], echo=False):
 
     # create the table on disk
     Base.metadata.create_all(engine)
+
+
+def create_database_tables(engine: Engine):
+    """Creates the tables (and their indexes) which do not exist in an existing database yet.
+    Databases made with older versions of ichor do not have the point_fingerprints table.
+
+    :param engine: The engine of the database
+    """
+
+    Base.metadata.create_all(engine)
+
+
+def create_database_indexes(engine: Engine):
+    """Creates the indexes of the tables in an existing database, if they do not exist yet.
+    Databases made with older versions of ichor do not have indexes on the foreign keys of the dataset table.
+
+    :param engine: The engine of the database
+    """
+
+    # tables which do not exist yet are made with their indexes by `create_database_tables`
+    existing_tables = inspect(engine).get_table_names()
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
@@ -0,0 +1,207 @@
+from collections import namedtuple
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ichor.core.common.itertools import chunker
+from ichor.core.database.json.add_to_database import get_data_for_point
+from ichor.core.database.sql.add_to_database import (
+    _add_new_atom_names,
+    _insert_dataset_rows,
+    _insert_points,
+)
+from ichor.core.database.sql.database import (
+    AtomNames,
+    create_database_tables,
+    Dataset,
+    PointFingerprints,
+    Points,
+)
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+# the names of the points which were added to or updated in the database, the names of the points
+# which were not written again because their files have not changed and the names of the new or changed
+# points which were not written because their data could not be read (e.g. because AIMAll likely crashed)
+DatabaseSyncReport = namedtuple(
+    "DatabaseSyncReport", ["added", "updated", "unchanged", "not_written"]
+)
+
+
+def read_point_fingerprints(session: Session) -> Dict[str, Tuple[int, Optional[str]]]:
+    """Reads the manifest of the points in the database.
+
+    :param session: The session of the database
+    :return: A dictionary with the names of the points in the database as keys and the id of the point and
+        the fingerprint of its files as values. Points which were not written by `sync_points_to_database`
+        (e.g. points of databases made by older versions) do not have a fingerprint, which is None.
+        If there are many points with the same name, the id of the last one is used.
+    """
+
+    manifest = {
+        name: (point_id, None)
+        for name, point_id in session.execute(
+            select(Points.name, func.max(Points.id)).group_by(Points.name)
+        )
+    }
+    for name, point_id, fingerprint in session.execute(
+        select(
+            PointFingerprints.name,
+            PointFingerprints.point_id,
+            PointFingerprints.fingerprint,
+        )
+    ):
+        manifest[name] = (point_id, fingerprint)
+    session.commit()
+
+    return manifest
+
+
+def sync_points_to_database(
+    session: Session,
+    points: "ichor.core.files.PointsDirectory",  # noqa F821
+    print_missing_data=True,
+    ncores: int = 1,
+    batch_size: int = 1000,
+) -> DatabaseSyncReport:
+    """Writes only the points which are new or whose files have changed since they were last written to the database.
+    The fingerprint of the files of every point (see `PointDirectory.fingerprint`) is compared to the fingerprint
+    stored in the manifest of the database, so the unchanged points are not read at all. New points are inserted,
+    changed points are updated in place (keeping their ids) and the manifest is updated in the same transaction.
+    Points which are in the database but not in `points` are kept. Points whose data cannot be read are not
+    written and are reported in `DatabaseSyncReport.not_written`. If such a point was written before, the rows
+    written before are kept (and its old fingerprint as well, so it is read again the next time).
+
+    :param session: The session of the database to write to
+    :param points: The PointsDirectory containing the points to write
+    :param print_missing_data: Whether to print out any missing data of the points which are read, defaults to True
+    :param ncores: The number of processes in which the points are read, defaults to 1
+    :param batch_size: The number of points written in one transaction, defaults to 1000
+    :return: A `DatabaseSyncReport` containing the names of the added, updated, unchanged and not written points
+    """
+
+    # databases made by older versions do not have the manifest table
+    create_database_tables(session.get_bind())
+    manifest = read_point_fingerprints(session)
+
+    points_to_read, fingerprints, unchanged = [], [], []
+    for point in points:
+        fingerprint = point.fingerprint
+        point_id, written_fingerprint = manifest.get(
+            point.name_without_suffix, (None, None)
+        )
+        if fingerprint == written_fingerprint:
+            unchanged.append(point.name_without_suffix)
+        else:
+            points_to_read.append(point)
+            fingerprints.append(fingerprint)
+
+    added, updated, not_written = write_changed_points_data_to_database(
+        session,
+        zip(
+            [point.name_without_suffix for point in points_to_read],
+            points.map_points(
+                partial(get_data_for_point, print_missing_data=print_missing_data),
+                ncores=ncores,
+                points=points_to_read,
+            ),
+            fingerprints,
+        ),
+        {name: point_id for name, (point_id, _) in manifest.items()},
+        batch_size=batch_size,
+    )
+
+    return DatabaseSyncReport(added, updated, unchanged, not_written)
+
+
+def write_changed_points_data_to_database(
+    session: Session,
+    points_data: Iterable[Tuple[str, Optional[dict], str]],
+    point_ids: Dict[str, int],
+    batch_size: int = 1000,
+) -> Tuple[List[str], List[str], List[str]]:
+    """Writes the data of new and changed points, as returned by `get_data_for_point`, to the database.
+    Points which are already in the database are updated in place, their rows in the dataset table are
+    replaced. The fingerprints of the points are written to the manifest in the same transaction as their data,
+    so the manifest always matches the data in the database.
+
+    :param session: The session of the database to write to
+    :param points_data: An iterable of tuples of the name of a point, the data of the point and the fingerprint
+        of its files. Points for which the data is None (e.g. because AIMAll likely crashed) are not written
+        (and their manifest entries are not changed), so they are read again the next time the database is synced.
+    :param point_ids: The ids of the points which are already in the database, with the names of the points as keys
+    :param batch_size: The number of points written in one transaction, defaults to 1000
+    :return: The names of the points which were added, the names of the points which were updated
+        and the names of the points which were not written because their data is None
+    """
+
+    # the ids of the atoms in the atom_names table, atom names are unique
+    atom_ids = dict(session.execute(select(AtomNames.name, AtomNames.id)).all())
+    session.commit()
+
+    added, updated, not_written = [], [], []
+
+    for batch in chunker(points_data, batch_size):
+
+        not_written.extend(name for name, point_data, _ in batch if point_data is None)
+        batch = [
+            (point_data, fp) for _, point_data, fp in batch if point_data is not None
+        ]
+        if not batch:
+            continue
+
+        new_batch = [(d, fp) for d, fp in batch if d["name"] not in point_ids]
+        changed_batch = [(d, fp) for d, fp in batch if d["name"] in point_ids]
+
+        with session.begin():
+
+            connection = session.connection()
+            _add_new_atom_names(connection, [d for d, _ in batch], atom_ids)
+
+            # changed points keep their ids, only the data in their rows is replaced
+            changed_ids = [point_ids[d["name"]] for d, _ in changed_batch]
+            for point_id, (point_data, _) in zip(changed_ids, changed_batch):
+                connection.execute(
+                    update(Points.__table__)
+                    .where(Points.id == point_id)
+                    .values(
+                        date_added=point_data["date_added"],
+                        wfn_energy=point_data["wfn_energy"],
+                    )
+                )
+            if changed_ids:
+                connection.execute(
+                    delete(Dataset.__table__).where(Dataset.point_id.in_(changed_ids))
+                )
+
+            new_ids = (
+                _insert_points(connection, [d for d, _ in new_batch])
+                if new_batch
+                else []
+            )
+
+            batch_ids = [*changed_ids, *new_ids]
+            batch = [*changed_batch, *new_batch]
+            _insert_dataset_rows(connection, batch_ids, [d for d, _ in batch], atom_ids)
+
+            # the manifest entries of the points are replaced by their new fingerprints
+            names = [d["name"] for d, _ in batch]
+            connection.execute(
+                delete(PointFingerprints.__table__).where(
+                    PointFingerprints.name.in_(names)
+                )
+            )
+            connection.execute(
+                insert(PointFingerprints.__table__),
+                [
+                    {"point_id": point_id, "name": d["name"], "fingerprint": fp}
+                    for point_id, (d, fp) in zip(batch_ids, batch)
+                ],
+            )
+
+        for point_id, (point_data, _) in zip(new_ids, new_batch):
+            point_ids[point_data["name"]] = point_id
+        added.extend(d["name"] for d, _ in new_batch)
+        updated.extend(d["name"] for d, _ in changed_batch)
+
+    return added, updated, not_written
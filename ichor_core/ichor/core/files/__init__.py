@@ -1,44 +1,57 @@
-# aimall files
-from ichor.core.files.aimall import AbInt, Aim, Int, IntDirectory
+from ichor.core.common.lazy_import import lazy_attributes
 
-# dlpoly files
-from ichor.core.files.dl_poly import (
-    DlPolyConfig,
-    DlPolyControl,
-    DlPolyFFLUX,
-    DlPolyField,
-    DlPolyHistory,
-    DlPolyIQAEnergies,
-    DlPolyIQAForces,
-    FFLUXDirectory,
+# the file classes are only imported from their modules when they are used, so that
+# importing one type of file does not import the modules (and libraries) of all other file types
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        # aimall files
+        "AbInt": "ichor.core.files.aimall",
+        "Aim": "ichor.core.files.aimall",
+        "Int": "ichor.core.files.aimall",
+        "IntDirectory": "ichor.core.files.aimall",
+        # binary trajectory files
+        "BinaryTrajectory": "ichor.core.files.binary_trajectory",
+        # dlpoly files
+        "DlPolyConfig": "ichor.core.files.dl_poly",
+        "DlPolyControl": "ichor.core.files.dl_poly",
+        "DlPolyFFLUX": "ichor.core.files.dl_poly",
+        "DlPolyField": "ichor.core.files.dl_poly",
+        "DlPolyHistory": "ichor.core.files.dl_poly",
+        "DlPolyIQAEnergies": "ichor.core.files.dl_poly",
+        "DlPolyIQAForces": "ichor.core.files.dl_poly",
+        "FFLUXDirectory": "ichor.core.files.dl_poly",
+        # cache of parsed file contents
+        "ParsedFileCache": "ichor.core.files.file_cache",
+        # gaussian files
+        "GaussianOutput": "ichor.core.files.gaussian",
+        "GJF": "ichor.core.files.gaussian",
+        "WFN": "ichor.core.files.gaussian",
+        "WFX": "ichor.core.files.gaussian",
+        # md (amber) simulation files
+        "Mol2": "ichor.core.files.mol2",
+        # orca files
+        "OrcaEngrad": "ichor.core.files.orca",
+        "OrcaInput": "ichor.core.files.orca",
+        "OrcaOutput": "ichor.core.files.orca",
+        # pandora files
+        "MorfiDirectory": "ichor.core.files.pandora",
+        "PandoraDirectory": "ichor.core.files.pandora",
+        "PandoraInput": "ichor.core.files.pandora",
+        "PySCFDirectory": "ichor.core.files.pandora",
+        # points directory stuff
+        "PointDirectory": "ichor.core.files.point_directory",
+        "ArchivedPointDirectory": "ichor.core.files.points_archive",
+        "PointsArchive": "ichor.core.files.points_archive",
+        "PointsDirectory": "ichor.core.files.points_directory",
+        "PointsDirectoryParent": "ichor.core.files.points_directory_parent",
+        # xyz files
+        "Trajectory": "ichor.core.files.xyz",
+        "TrajectoryIndex": "ichor.core.files.xyz",
+        "XYZ": "ichor.core.files.xyz",
+    },
 )
 
-# gaussian files
-from ichor.core.files.gaussian import GaussianOutput, GJF, WFN, WFX
-
-# md (amber) simulation files
-from ichor.core.files.mol2 import Mol2
-
-# orca files
-from ichor.core.files.orca import OrcaEngrad, OrcaInput, OrcaOutput
-
-# pandora files
-from ichor.core.files.pandora import (
-    MorfiDirectory,
-    PandoraDirectory,
-    PandoraInput,
-    PySCFDirectory,
-)
-
-# points directory stuff
-from ichor.core.files.point_directory import PointDirectory
-from ichor.core.files.points_directory import PointsDirectory
-from ichor.core.files.points_directory_parent import PointsDirectoryParent
-
-# xyz files
-from ichor.core.files.xyz import Trajectory, XYZ
-
-
 __all__ = [
     "Int",
     "AbInt",
@@ -52,6 +65,8 @@ __all__ = [
     "OrcaEngrad",
     "OrcaOutput",
     "Trajectory",
+    "TrajectoryIndex",
+    "BinaryTrajectory",
     "DlPolyHistory",
     "DlPolyField",
     "DlPolyConfig",
@@ -64,8 +79,11 @@ __all__ = [
     "PointDirectory",
     "PointsDirectory",
     "PointsDirectoryParent",
+    "PointsArchive",
+    "ArchivedPointDirectory",
     "XYZ",
     "Mol2",
+    "ParsedFileCache",
     "PySCFDirectory",
     "MorfiDirectory",
     "PandoraDirectory",
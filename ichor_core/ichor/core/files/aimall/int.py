@@ -4,25 +4,14 @@ from typing import Dict, List, Union
 from warnings import warn
 
 import numpy as np
-from ichor.core.common.constants import (
-    spherical_dipole_labels,
-    spherical_hexadecapole_labels,
-    spherical_monopole_labels,
-    spherical_octupole_labels,
-    spherical_quadrupole_labels,
-)
+from ichor.core.common.constants import multipole_names
 from ichor.core.common.io import relpath
 from ichor.core.common.str import get_digits
 from ichor.core.common.types import Coordinates3D
 from ichor.core.common.types.version import Version
 from ichor.core.files.file import FileContents, ReadFile
 from ichor.core.files.file_data import HasData
-from ichor.core.multipoles import (
-    rotate_dipole,
-    rotate_hexadecapole,
-    rotate_octupole,
-    rotate_quadrupole,
-)
+from ichor.core.multipoles import rotate_multipoles
 
 
 class CriticalPointType(Enum):
@@ -59,6 +48,22 @@ class Int(ReadFile, HasData):
 
     _filetype = ".int"
 
+    _parsed_file_cache_attributes = (
+        "current_directory",
+        "_inp_file_path",
+        "_wfn_file_path",
+        "_out_file_path",
+        "atom_name",
+        "title",
+        "critical_points",
+        "dft_model",
+        "net_charge",
+        "basin_integration_results",
+        "global_spherical_multipoles",
+        "iqa_energy_components",
+        "total_time",
+    )
+
     def __init__(self, path: Union[Path, str]):
 
         # calls File.__init__(), which subsequently calls PathObject.__init__()
@@ -66,9 +71,10 @@ class Int(ReadFile, HasData):
 
         # we can use this to figure out the contents which need to be read in
         self.current_directory: Path = FileContents
-        self.inp_file_path: Path = FileContents
-        self.wfn_file_path: Path = FileContents
-        self.out_file_path: Path = FileContents
+        # paths of the AIMAll files as they are written in the .int file
+        self._inp_file_path: Path = FileContents
+        self._wfn_file_path: Path = FileContents
+        self._out_file_path: Path = FileContents
 
         self.atom_name: str = FileContents
         self.title: str = FileContents
@@ -126,11 +132,30 @@ class Int(ReadFile, HasData):
         return self.global_spherical_multipoles
 
     def _path_relative_to_aimall(self, int_path: Path, other: Path) -> Path:
+        # the paths are only known once the .int file has been read
+        if int_path is FileContents or other is FileContents:
+            return FileContents
         return relpath(self.path.parent, Path.cwd()) / relpath(other, int_path.parent)
 
+    # TODO: not sure if these are correct or if they are needed. Potentially remove.
+    @property
+    def inp_file_path(self) -> Path:
+        """Returns the path to the AIMAll input file, relative to the current working directory."""
+        return self._path_relative_to_aimall(self._out_file_path, self._inp_file_path)
+
+    @property
+    def wfn_file_path(self) -> Path:
+        """Returns the path to the wavefunction file, relative to the current working directory."""
+        return self._path_relative_to_aimall(self._out_file_path, self._wfn_file_path)
+
+    @property
+    def out_file_path(self) -> Path:
+        """Returns the path to the AIMAll output file, relative to the current working directory."""
+        return self._path_relative_to_aimall(self._out_file_path, self._out_file_path)
+
     def _read_file(self):
-        """Read an .int file. The first time that the .int file is read successfully, a json file with the
-        important information is written in the same directory.
+        """Read an .int file. If the parsed file cache is enabled (see `ParsedFileCache`), the contents
+        are stored in the cache the first time the .int file is read, so that it is not parsed again.
         """
 
         with open(self.path, "r") as f:
@@ -157,16 +182,9 @@ class Int(ReadFile, HasData):
                 wfn_file_path = Path(next(f).split()[-1])
                 out_file_path = Path(next(f).split()[-1])
 
-            # TODO: not sure if these are correct or if they are needed. Potentially remove.
-            self.inp_file_path = self._path_relative_to_aimall(
-                out_file_path, inp_file_path
-            )
-            self.wfn_file_path = self._path_relative_to_aimall(
-                out_file_path, wfn_file_path
-            )
-            self.out_file_path = self._path_relative_to_aimall(
-                out_file_path, out_file_path
-            )
+            self._inp_file_path = inp_file_path
+            self._wfn_file_path = wfn_file_path
+            self._out_file_path = out_file_path
 
             next(f)  # blank line
             self.title = next(f).split()[-1].strip()
@@ -333,54 +351,10 @@ class Int(ReadFile, HasData):
             with the int file does not exist. Then we cannot calculate multipoles.
         """
 
-        local_spherical_multipoles = {spherical_monopole_labels[0]: self.q00}
-
-        local_dipole_moments = rotate_dipole(
-            *(
-                self.global_spherical_multipoles[dipole_label]
-                for dipole_label in spherical_dipole_labels
-            ),
-            C,
-        )
-        for dipole_name, dipole_value in zip(
-            spherical_dipole_labels, local_dipole_moments
-        ):
-            local_spherical_multipoles[dipole_name] = dipole_value
-
-        local_quadrupole_moments = rotate_quadrupole(
-            *(
-                self.global_spherical_multipoles[quadrupole_label]
-                for quadrupole_label in spherical_quadrupole_labels
-            ),
-            C,
-        )
-        for quadrupole_name, quadrupole_value in zip(
-            spherical_quadrupole_labels, local_quadrupole_moments
-        ):
-            local_spherical_multipoles[quadrupole_name] = quadrupole_value
-
-        local_octupole_moments = rotate_octupole(
-            *(
-                self.global_spherical_multipoles[octupole_label]
-                for octupole_label in spherical_octupole_labels
-            ),
-            C,
-        )
-        for octupole_name, octupole_value in zip(
-            spherical_octupole_labels, local_octupole_moments
-        ):
-            local_spherical_multipoles[octupole_name] = octupole_value
-
-        local_hexadecapole_moments = rotate_hexadecapole(
-            *(
-                self.global_spherical_multipoles[hexadecapole_label]
-                for hexadecapole_label in spherical_hexadecapole_labels
-            ),
-            C,
-        )
-        for hexadecapole_name, hexadecapole_value in zip(
-            spherical_hexadecapole_labels, local_hexadecapole_moments
-        ):
-            local_spherical_multipoles[hexadecapole_name] = hexadecapole_value
+        global_multipoles = [self.q00] + [
+            self.global_spherical_multipoles[multipole_name]
+            for multipole_name in multipole_names[1:]
+        ]
+        local_multipoles = rotate_multipoles(global_multipoles, C)[0]
 
-        return local_spherical_multipoles
+        return dict(zip(multipole_names, local_multipoles))
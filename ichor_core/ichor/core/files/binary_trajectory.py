@@ -0,0 +1,389 @@
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from ichor.core.atoms import Atoms, AtomsArray
+from ichor.core.common.constants import bohr2ang
+from ichor.core.common.units import AtomicDistance
+from ichor.core.files.file import FileContents, FileState
+from ichor.core.files.xyz import Trajectory
+
+# identifies the file as a binary trajectory, followed by the length of the json header
+_MAGIC = b"ICHORTRJ"
+_VERSION = 1
+# blocks are aligned so that they can be memory mapped efficiently
+_ALIGNMENT = 64
+# per-timestep blocks that are stored as vector fields of the `AtomsArray`
+_VECTOR_FIELDS = ("velocities", "forces")
+
+
+def _aligned(n: int) -> int:
+    return -(-n // _ALIGNMENT) * _ALIGNMENT
+
+
+def _read_header(path: Path) -> Tuple[dict, int]:
+    """Reads the header of a binary trajectory file.
+
+    :return: The header and the byte offset at which the data blocks start
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(_MAGIC))
+        if magic != _MAGIC:
+            raise ValueError(f"'{path}' is not a binary trajectory file.")
+        header_length = int(np.frombuffer(f.read(8), dtype="<u8")[0])
+        header = json.loads(f.read(header_length).decode())
+    return header, _aligned(len(_MAGIC) + 8 + header_length)
+
+
+class BinaryTrajectoryWriter:
+    """
+    Writes a binary trajectory file (see `BinaryTrajectory`) block by block, so that trajectories
+    which do not fit into memory can be converted. Each block of timesteps is added with `append`.
+    The data of every per-timestep quantity is kept in a temporary file until the writer is closed,
+    after which the header and the contiguous blocks are written to `path`.
+
+    Use as a context manager, the file is only written if no exception is raised:
+
+        with BinaryTrajectoryWriter("traj.btraj", ["O", "H", "H"]) as writer:
+            writer.append(coordinates, velocities=velocities)
+
+    :param path: The path of the binary trajectory file to write
+    :param types: The atom types (elements) of the system, e.g. ['O', 'H', 'H']
+    :param indices: The atom indices (1-indexed) used for the atom names. If None, atoms are numbered
+        sequentially starting from 1.
+    :param dtype: The floating point type in which coordinates (and other float data) are stored,
+        np.float32 halves the size of the file
+    """
+
+    def __init__(
+        self,
+        path: Union[Path, str],
+        types: Sequence[str],
+        indices: Optional[Sequence[int]] = None,
+        dtype: np.dtype = np.float64,
+    ):
+        self.path = Path(path)
+        self.types = [ty.capitalize() for ty in types]
+        self.indices = (
+            list(indices)
+            if indices is not None
+            else list(range(1, len(self.types) + 1))
+        )
+        self.dtype = np.dtype(dtype)
+        self.nframes = 0
+        # name: (dtype, shape of one timestep, temporary file)
+        self._blocks: Optional[
+            Dict[str, Tuple[np.dtype, tuple, tempfile.TemporaryFile]]
+        ] = None
+
+    def append(self, coordinates: np.ndarray, **timestep_data: np.ndarray):
+        """Appends a block of timesteps to the file.
+
+        :param coordinates: An `n_timesteps` x `n_atoms` x `3` array of coordinates in Angstroms
+        :param timestep_data: Other per-timestep data, where the first dimension is `n_timesteps`,
+            e.g. velocities and forces (`n_timesteps` x `n_atoms` x `3`). The same data has to be given
+            every time a block is appended.
+        """
+        blocks = {"coordinates": np.asarray(coordinates)}
+        blocks.update(
+            {name: np.asarray(values) for name, values in timestep_data.items()}
+        )
+
+        if blocks["coordinates"].shape[1:] != (len(self.types), 3):
+            raise ValueError(
+                f"Coordinates of shape {blocks['coordinates'].shape} do not match {len(self.types)} atoms."
+            )
+
+        if self._blocks is None:
+            self._blocks = {
+                name: (
+                    np.dtype(np.int64)
+                    if np.issubdtype(values.dtype, np.integer)
+                    else self.dtype,
+                    values.shape[1:],
+                    tempfile.TemporaryFile(dir=self.path.parent),
+                )
+                for name, values in blocks.items()
+            }
+        elif set(blocks) != set(self._blocks):
+            raise ValueError(
+                f"Data given for {sorted(blocks)}, but the file contains {sorted(self._blocks)}."
+            )
+
+        for name, values in blocks.items():
+            dtype, shape, f = self._blocks[name]
+            if values.shape != (len(blocks["coordinates"]),) + shape:
+                raise ValueError(
+                    f"Shape of '{name}' {values.shape} does not match the shape of one timestep {shape}."
+                )
+            f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+        self.nframes += len(blocks["coordinates"])
+
+    def close(self):
+        """Writes the binary trajectory file. The file is first written to a temporary path which is then
+        moved to `path`, so an existing file (which might be memory mapped) is replaced in one go."""
+
+        if self._blocks is None:
+            self._blocks = {
+                "coordinates": (
+                    self.dtype,
+                    (len(self.types), 3),
+                    tempfile.TemporaryFile(dir=self.path.parent),
+                )
+            }
+
+        header = {
+            "version": _VERSION,
+            "natoms": len(self.types),
+            "nframes": self.nframes,
+            "types": self.types,
+            "indices": self.indices,
+            "units": AtomicDistance.Angstroms.name,
+            "blocks": {},
+        }
+        # offsets of the blocks relative to the start of the data
+        offsets = {}
+        offset = 0
+        for name, (dtype, shape, f) in self._blocks.items():
+            offsets[name] = offset
+            header["blocks"][name] = {
+                "dtype": dtype.str,
+                "shape": list(shape),
+                "offset": offset,
+            }
+            offset = _aligned(offset + f.tell())
+        header = json.dumps(header).encode()
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "wb") as o:
+            o.write(_MAGIC)
+            o.write(np.array(len(header), dtype="<u8").tobytes())
+            o.write(header)
+            data_start = _aligned(o.tell())
+            for name, (_, _, f) in self._blocks.items():
+                o.write(b"\0" * (data_start + offsets[name] - o.tell()))
+                f.seek(0)
+                shutil.copyfileobj(f, o)
+        os.replace(tmp_path, self.path)
+        self._discard()
+
+    def _discard(self):
+        if self._blocks is not None:
+            for _, _, f in self._blocks.values():
+                f.close()
+        self._blocks = None
+
+    def __enter__(self) -> "BinaryTrajectoryWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+
+class BinaryTrajectory(Trajectory):
+    """
+    Handles binary trajectory files, which store the coordinates of all timesteps of a trajectory as one
+    contiguous float32 or float64 block, so that they do not need to be parsed from text. The file starts
+    with a json header containing the atom types and names, the number of timesteps and the location of
+    the data blocks. The coordinates block is followed by optional blocks such as velocities and forces
+    (e.g. from a DL_POLY HISTORY file) or other per-timestep data.
+
+    Reading the file only reads the header, the blocks are memory mapped (`np.memmap`), so opening
+    even very large trajectories is instant and only the timesteps that are used are loaded from disk.
+    Otherwise, the class can be used in the same way as a `Trajectory`.
+
+    Binary trajectories can be made from a `Trajectory` (or `DlPolyHistory`) with `from_trajectory`,
+    or from an Amber mdcrd file with `ichor.core.molecular_dynamics.amber.mdcrd_to_binary_trajectory`.
+
+    :param path: The path to a .btraj file
+    :param timesteps: Optional timesteps to add to the trajectory, see `Trajectory`
+    :param read_geometries: Whether to read the timesteps of an existing file, see `Trajectory`
+
+    .. note::
+        The blocks are memory mapped copy-on-write, so modifying the coordinates of a timestep
+        in place does not modify the file. Use `write` to save the modified trajectory.
+    """
+
+    _filetype = ".btraj"
+
+    def __init__(
+        self,
+        path: Union[Path, str],
+        timesteps: Optional[Union[Sequence[Atoms], AtomsArray]] = None,
+        read_geometries: bool = True,
+    ):
+        super().__init__(path, timesteps, read_geometries)
+
+        self.dtype = FileContents
+        self.timestep_data = FileContents
+
+    def _read_file(self):
+
+        header, data_start = _read_header(self.path)
+
+        blocks = {}
+        for name, block in header["blocks"].items():
+            dtype = np.dtype(block["dtype"])
+            shape = (header["nframes"],) + tuple(block["shape"])
+            if header["nframes"] == 0:
+                blocks[name] = np.empty(shape, dtype=dtype)
+            else:
+                blocks[name] = np.memmap(
+                    self.path,
+                    dtype=dtype,
+                    mode="c",
+                    offset=data_start + block["offset"],
+                    shape=shape,
+                )
+
+        coordinates = blocks.pop("coordinates")
+        vector_fields = {
+            field: blocks.pop(field) for field in _VECTOR_FIELDS if field in blocks
+        }
+        self.dtype = coordinates.dtype
+        self.timestep_data = blocks
+
+        atoms_array = AtomsArray.from_coordinates(
+            header["types"],
+            coordinates,
+            header["indices"],
+            AtomicDistance[header["units"]],
+            **vector_fields,
+        )
+        # timesteps which were given when making the instance come first
+        if self._atoms_array is None and list.__len__(self) == 0:
+            self._atoms_array = atoms_array
+        else:
+            for i in range(len(atoms_array)):
+                self.append(atoms_array.atoms(i))
+
+    @property
+    def velocities(self) -> np.ndarray:
+        """Returns the velocities of all atoms for all timesteps, shape `n_timesteps` x `n_atoms` x `3`"""
+        return self._vector_field("velocities")
+
+    @property
+    def forces(self) -> np.ndarray:
+        """Returns the forces on all atoms for all timesteps, shape `n_timesteps` x `n_atoms` x `3`"""
+        return self._vector_field("forces")
+
+    def _vector_field(self, field: str) -> np.ndarray:
+        if self.state is not FileState.Read:
+            self.read()
+        if self._atoms_array is not None and field in self._atoms_array.vector_fields:
+            return self._atoms_array.vector_field(field)
+        raise ValueError(f"'{self.path}' does not contain {field}.")
+
+    @classmethod
+    def from_trajectory(
+        cls,
+        trajectory: Trajectory,
+        path: Union[Path, str],
+        dtype: np.dtype = np.float64,
+        chunk_size: int = 10000,
+    ) -> "BinaryTrajectory":
+        """Converts a trajectory to a binary trajectory file. Velocities and forces are also written
+        if they are stored in the trajectory (e.g. for a `DlPolyHistory`), as well as any other
+        per-timestep data the trajectory has (e.g. the unit cell of each DL_POLY timestep).
+        Streamed trajectories are converted chunk by chunk.
+
+        :param trajectory: The trajectory to convert. All timesteps must contain the same atoms.
+        :param path: The path of the binary trajectory file to write
+        :param dtype: The floating point type in which the coordinates are stored
+        :param chunk_size: The number of timesteps that are written at once
+        :return: The written binary trajectory
+        """
+
+        if trajectory.streamed:
+            atoms_arrays = (
+                chunk._atoms_array for chunk in trajectory.iter_chunks(chunk_size)
+            )
+            timestep_data = {}
+        else:
+            # makes sure the trajectory is read
+            ntimesteps = len(trajectory)
+            atoms_arrays = (
+                trajectory._atoms_array[start : start + chunk_size]
+                if trajectory._atoms_array is not None
+                else None
+                for start in range(0, ntimesteps, chunk_size)
+            )
+            # per-timestep data is only kept if it is given for every timestep
+            timestep_data = {
+                name: values
+                for name, values in trajectory._timestep_data().items()
+                if len(values) == ntimesteps
+            }
+
+        writer = None
+        start = 0
+        try:
+            for atoms_array in atoms_arrays:
+                if atoms_array is None or (
+                    writer is not None
+                    and (
+                        atoms_array.types != writer.types
+                        or atoms_array.indices != writer.indices
+                    )
+                ):
+                    raise ValueError(
+                        "Binary trajectories can only store timesteps which contain the same atoms."
+                    )
+                if writer is None:
+                    writer = BinaryTrajectoryWriter(
+                        path, atoms_array.types, atoms_array.indices, dtype
+                    )
+
+                coordinates = atoms_array.coordinates
+                if atoms_array.units is AtomicDistance.Bohr:
+                    coordinates = coordinates * bohr2ang
+                stop = start + len(atoms_array)
+                writer.append(
+                    coordinates,
+                    **{
+                        field: atoms_array.vector_field(field)
+                        for field in atoms_array.vector_fields
+                    },
+                    **{
+                        name: values[start:stop]
+                        for name, values in timestep_data.items()
+                    },
+                )
+                start = stop
+        except Exception:
+            if writer is not None:
+                writer._discard()
+            raise
+
+        if writer is None:
+            raise ValueError("Cannot write a binary trajectory without timesteps.")
+        writer.close()
+
+        return cls(path)
+
+    def write(
+        self,
+        path: Optional[Union[Path, str]] = None,
+        dtype: Optional[np.dtype] = None,
+    ):
+        """Writes the trajectory as a binary trajectory file.
+
+        :param path: The path to write to, defaults to the path of the instance
+        :param dtype: The floating point type in which the coordinates are stored, defaults to
+            the type of the file that was read (or float64)
+        """
+        if dtype is None:
+            dtype = np.float64 if self.dtype is FileContents else self.dtype
+        BinaryTrajectory.from_trajectory(self, Path(path or self.path), dtype=dtype)
+
+    def _timestep_data(self) -> Dict[str, np.ndarray]:
+        """Returns the per-timestep data (other than coordinates, velocities and forces) of the file."""
+        return dict(self.timestep_data) if self.timestep_data else {}
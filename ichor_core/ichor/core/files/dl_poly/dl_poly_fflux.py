@@ -3,8 +3,6 @@ from typing import List, Union
 
 import numpy as np
 
-import pandas as pd
-
 from ichor.core.files.file import FileContents, ReadFile
 
 
@@ -34,6 +32,8 @@ class DlPolyFFLUX(ReadFile):
 
     def _read_file(self):
 
+        import pandas as pd
+
         self.df = pd.read_csv(
             self.path,
             skiprows=2,
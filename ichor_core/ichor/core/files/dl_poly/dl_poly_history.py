@@ -1,13 +1,15 @@
+import mmap
+import re
+from collections import namedtuple
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
-from ichor.core.atoms import Atom, Atoms
+from ichor.core.atoms import Atom, Atoms, AtomsArray
 from ichor.core.common.io import convert_to_path
-from ichor.core.common.str import split_by
 from ichor.core.common.units import AtomicDistance
-from ichor.core.files.file import FileContents
+from ichor.core.files.file import FileContents, FileState
 from ichor.core.files.xyz import Trajectory
 
 
@@ -93,6 +95,183 @@ class DlpolyTimestep(Atoms):
         self.timestep = None
 
 
+_DlpolyTimestepInfo = namedtuple(
+    "_DlpolyTimestepInfo",
+    "ntimestep number_of_atoms trajectory_key periodic_boundary timestep_length timestep",
+)
+
+
+def _make_dlpoly_timestep(
+    atoms_array: AtomsArray,
+    i: int,
+    timestep_info: _DlpolyTimestepInfo,
+    unit_cell: np.ndarray,
+) -> DlpolyTimestep:
+    """Makes a `DlpolyTimestep` for the i-th geometry stored in an `AtomsArray`. The coordinates,
+    velocities and forces of the atoms are views of the arrays."""
+
+    timestep = atoms_array.atoms(i, DlpolyTimestep, DlpolyTimestepAtom)
+    for key, value in timestep_info._asdict().items():
+        setattr(timestep, key, value)
+    timestep.unit_cell = unit_cell
+
+    if "velocities" in atoms_array.vector_fields:
+        for atom, velocity in zip(timestep, atoms_array.vector_field("velocities")[i]):
+            atom.velocity = velocity
+    if "forces" in atoms_array.vector_fields:
+        for atom, force in zip(timestep, atoms_array.vector_field("forces")[i]):
+            atom.force = force
+
+    return timestep
+
+
+# per-atom vectors after the coordinates, depending on the trajectory key
+_VECTOR_FIELDS = ("velocities", "forces")
+
+# header lines of timesteps, which start with `timestep`
+_TIMESTEP_HEADER = re.compile(rb"^timestep", re.MULTILINE)
+
+
+def _parse_timestep_header(line: bytes) -> Optional[_DlpolyTimestepInfo]:
+    """Parses the header line of a timestep, returns None if the line is not a valid header."""
+    # record = 'timestep' ntimestep number_of_atoms keytraj keypbc timestep_length timestep
+    record = line.split()
+    try:
+        return _DlpolyTimestepInfo(
+            ntimestep=int(record[1]),
+            number_of_atoms=int(record[2]),
+            trajectory_key=DlpolyTrajectoryKey(int(record[3])),
+            periodic_boundary=DlpolyPeriodicBoundary(int(record[4])),
+            timestep_length=float(record[5]),
+            timestep=float(record[6]),
+        )
+    except (IndexError, ValueError):
+        return None
+
+
+def _to_floats(lines: np.ndarray, nvalues: int) -> Optional[np.ndarray]:
+    """Converts all numbers in an array of lines to floats at once. Returns None if the lines
+    do not contain `nvalues` numbers."""
+    tokens = b" ".join(lines.ravel()).split()
+    if len(tokens) != nvalues:
+        return None
+    try:
+        return np.array(tokens).astype(float)
+    except ValueError:
+        return None
+
+
+def _decode_timesteps(
+    timesteps_lines: List[List[bytes]], natoms: int, nvectors: int
+) -> Optional[Tuple[List[str], np.ndarray, np.ndarray]]:
+    """Decodes the lines of timesteps (after the header line) which all contain the same atoms.
+
+    :param timesteps_lines: The lines of each timestep
+    :param natoms: The number of atoms in each timestep
+    :param nvectors: The number of vectors per atom, 1 (coordinates), 2 (+velocities) or 3 (+forces)
+    :return: The atom types, an `n_timesteps` x `3` x `3` array of unit cells and an
+        `n_timesteps` x `n_atoms` x `nvectors` x `3` array of coordinates, velocities and forces.
+        None if the timesteps cannot be decoded or do not contain the same atoms.
+    """
+    ntimesteps = len(timesteps_lines)
+    lines = np.empty((ntimesteps, 3 + natoms * (nvectors + 1)), dtype=object)
+    lines[:] = timesteps_lines
+
+    unit_cells = _to_floats(lines[:, :3], ntimesteps * 9)
+
+    atom_lines = lines[:, 3:].reshape(ntimesteps, natoms, nvectors + 1)
+    vectors = _to_floats(atom_lines[:, :, 1:], ntimesteps * natoms * nvectors * 3)
+
+    if unit_cells is None or vectors is None:
+        return None
+
+    # record = atom_type atom_index atomic_mass charge, in fixed-width fields of 8, 10, 12 and 12 characters
+    # converting to 8 character byte strings keeps only the atom type field of every record
+    types = np.char.strip(
+        np.array(list(atom_lines[:, :, 0].ravel()), dtype="S8")
+    ).reshape(ntimesteps, natoms)
+    if np.any(types == b"") or np.any(types != types[0]):
+        return None
+
+    return (
+        [ty.decode() for ty in types[0]],
+        unit_cells.reshape(ntimesteps, 3, 3),
+        vectors.reshape(ntimesteps, natoms, nvectors, 3),
+    )
+
+
+def _iter_history_timesteps(
+    mm: mmap.mmap, start: int, chunk_size: int
+) -> Iterator[Tuple[List[str], List[_DlpolyTimestepInfo], np.ndarray, np.ndarray]]:
+    """Finds the timesteps in a HISTORY file by their `timestep` header lines and decodes them.
+    A timestep is skipped if its header cannot be parsed, if it contains binary data
+    or if lines are missing. As every timestep is found by its own header, a corrupted
+    timestep does not affect the timesteps after it.
+
+    Consecutive valid timesteps with the same number of atoms and trajectory key are decoded in bulk,
+    in chunks of up to `chunk_size` timesteps. If a chunk cannot be decoded at once (e.g. because the
+    atom types change), its timesteps are decoded one by one.
+
+    :param mm: The memory mapped HISTORY file
+    :param start: The byte offset after the header of the file
+    :param chunk_size: The maximum number of timesteps decoded at once
+    :return: Yields the atom types, timestep headers, an `n_timesteps` x `3` x `3` array of unit cells and an
+        `n_timesteps` x `n_atoms` x `n_vectors` x `3` array of coordinates (and velocities and forces).
+    """
+
+    headers = [m.start() for m in _TIMESTEP_HEADER.finditer(mm, start)]
+    ends = headers[1:] + [len(mm)]
+
+    def decode(chunk):
+        timesteps_info = [timestep_info for timestep_info, _ in chunk]
+        natoms = timesteps_info[0].number_of_atoms
+        nvectors = timesteps_info[0].trajectory_key.value + 1
+        decoded = _decode_timesteps([lines for _, lines in chunk], natoms, nvectors)
+        if decoded is not None:
+            types, unit_cells, vectors = decoded
+            yield types, timesteps_info, unit_cells, vectors
+        elif len(chunk) > 1:
+            for timestep in chunk:
+                yield from decode([timestep])
+
+    chunk = []
+    for header_start, end in zip(headers, ends):
+
+        header_end = mm.find(b"\n", header_start, end)
+        if header_end == -1:
+            continue
+        timestep_info = _parse_timestep_header(mm[header_start:header_end])
+        if timestep_info is None:
+            continue
+
+        # unit cell lines, then a line with the atom record followed by the vectors for every atom
+        nlines = 3 + timestep_info.number_of_atoms * (
+            timestep_info.trajectory_key.value + 2
+        )
+        data = mm[header_end + 1 : end]
+        lines = data.split(b"\n", nlines)
+        if len(lines) < nlines:
+            continue
+        # binary data in lines after the timestep (before the next header) does not matter
+        data_length = (
+            len(data) - len(lines[nlines]) - 1 if len(lines) > nlines else len(data)
+        )
+        if data.find(b"\x00", 0, data_length) != -1:
+            continue
+
+        if chunk and (
+            len(chunk) == chunk_size
+            or chunk[0][0].number_of_atoms != timestep_info.number_of_atoms
+            or chunk[0][0].trajectory_key is not timestep_info.trajectory_key
+        ):
+            yield from decode(chunk)
+            chunk = []
+        chunk.append((timestep_info, lines[:nlines]))
+
+    if chunk:
+        yield from decode(chunk)
+
+
 class DlPolyHistory(Trajectory):
     """
     DLPOLY HISTORY File
@@ -133,282 +312,182 @@ class DlPolyHistory(Trajectory):
         self.existing_timesteps = FileContents
         self.removed_timesteps = FileContents
 
+        # information of every timestep that is stored in self._atoms_array
+        self._timesteps_info: List[_DlpolyTimestepInfo] = []
+        self._unit_cells: List[np.ndarray] = []
+
     @classmethod
     def check_path(cls, path: Path) -> bool:
         return path.stem == "HISTORY"
 
-    def _read_file(self):
-
-        # we will read the first lines to get number of atoms
-        # then read in a chunk of lines, if binary is encountered then discard all geometries
-        # this will likely discard extra geometries, but will ensure that
-        # all geometries are read in correctly at least
-
-        try:
-
-            with open(self.path, "r") as f:
-
-                line = next(f)
-                self.title = line
-                line = next(f)
-                record = line.split()
+    def _add_timesteps(
+        self,
+        types: List[str],
+        coordinates: np.ndarray,
+        timesteps_info: List[_DlpolyTimestepInfo],
+        unit_cells: np.ndarray,
+        **vector_fields: np.ndarray,
+    ):
+        """Adds consecutive timesteps with the same atoms read from the HISTORY file.
+        The coordinates (and velocities/forces) are stored in the `AtomsArray` of the trajectory,
+        while the rest of the timestep information is stored per timestep.
+
+        :param types: The atom types of the timesteps
+        :param coordinates: `n_timesteps` x `n_atoms` x `3` array of coordinates
+        :param timesteps_info: The information in the header of each timestep
+        :param unit_cells: `n_timesteps` x `3` x `3` array of unit cell vectors
+        :param vector_fields: velocities and/or forces, same shape as the coordinates
+        """
+
+        if self._atoms_array is None and list.__len__(self) == 0:
+            self._atoms_array = AtomsArray(types, vector_fields=list(vector_fields))
+
+        if (
+            self._atoms_array is not None
+            and self._atoms_array.types == [ty.capitalize() for ty in types]
+            and set(self._atoms_array.vector_fields) == set(vector_fields)
+        ):
+            self._atoms_array.extend(coordinates, **vector_fields)
+            self._timesteps_info.extend(timesteps_info)
+            self._unit_cells.extend(unit_cells)
+        else:
+            atoms_array = AtomsArray(types, vector_fields=list(vector_fields))
+            atoms_array.extend(coordinates, **vector_fields)
+            for i, (timestep_info, unit_cell) in enumerate(
+                zip(timesteps_info, unit_cells)
+            ):
+                self.add(
+                    _make_dlpoly_timestep(atoms_array, i, timestep_info, unit_cell)
+                )
+
+    def _timestep(self, i: int) -> DlpolyTimestep:
+        """Returns the i-th timestep from the `AtomsArray` in which the timesteps are stored."""
+        if i < 0:
+            i += len(self._atoms_array)
+        return _make_dlpoly_timestep(
+            self._atoms_array, i, self._timesteps_info[i], self._unit_cells[i]
+        )
+
+    def _timestep_data(self) -> Dict[str, np.ndarray]:
+        """Returns the DL_POLY timestep number, time and unit cell of every timestep."""
+        if self._atoms_array is None:
+            timesteps_info = [
+                _DlpolyTimestepInfo(
+                    **{key: getattr(ts, key) for key in _DlpolyTimestepInfo._fields}
+                )
+                for ts in self
+            ]
+            unit_cells = [ts.unit_cell for ts in self]
+        else:
+            timesteps_info, unit_cells = self._timesteps_info, self._unit_cells
+        return {
+            "ntimestep": np.array(
+                [info.ntimestep for info in timesteps_info], dtype=np.int64
+            ),
+            "timestep": np.array([info.timestep for info in timesteps_info]),
+            "unit_cell": np.array(unit_cells).reshape(-1, 3, 3),
+        }
+
+    def _subset(self, item) -> Trajectory:
+        """Returns a new `Trajectory` containing the `DlpolyTimestep` instances
+        given by a slice or a list of indices."""
+        if self._atoms_array is not None:
+            if isinstance(item, slice):
+                item = range(len(self._atoms_array))[item]
+            return Trajectory(
+                self.path, [self._timestep(i) for i in item], read_geometries=False
+            )
+        return super()._subset(item)
+
+    def _read_file(self, chunk_size: int = 10000):
+        """Reads the HISTORY file. Sometimes binary data is written to the HISTORY file, which
+        corrupts the timestep(s) it is written to. Every timestep is found by its `timestep` header
+        line and checked separately, so only the corrupted timesteps are removed. Timesteps
+        are decoded in chunks (see `_iter_history_timesteps`).
+
+        :param chunk_size: The number of timesteps that are decoded at once
+        """
+
+        with open(self.path, "rb") as f:
+            if not f.read(1):
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+
+                title_end = mm.find(b"\n")
+                self.title = mm[: title_end + 1].decode()
+                record_end = mm.find(b"\n", title_end + 1)
+                # record = keytrj imcon megatm nstraj
+                record = mm[title_end + 1 : record_end].split()
                 self.trajectory_key = DlpolyTrajectoryKey(int(record[0]))
-                self.periodic_boundary = DlpolyTrajectoryKey(int(record[1]))
+                self.periodic_boundary = DlpolyPeriodicBoundary(int(record[1]))
                 self.number_of_atoms = int(record[2])
                 self.ntimesteps = int(record[3])
 
-                # read number of lines depending of whether
-                # coordinates, velocities, and/or forces are written in the file
-                if self.trajectory_key is DlpolyTrajectoryKey.Coordinate:
-                    nlines_to_read = self.number_of_atoms * 2 + 3
-                elif self.trajectory_key is DlpolyTrajectoryKey.CoordinateVelocity:
-                    nlines_to_read = self.number_of_atoms * 3 + 3
-                elif self.trajectory_key is DlpolyTrajectoryKey.CoordinateVelocityForce:
-                    nlines_to_read = self.number_of_atoms * 4 + 3
-
-                while True:
-
-                    # default is that the timestep does not contain binary
-                    timestep_contains_binary = False
-
-                    line = next(f)
-                    # if timestep is in beginning of line, this should be beginning of geometry
-                    # and there should not be binary in that line
-                    if "timestep" == line.split()[0]:
-
-                        this_timestep_lines = []
-                        this_timestep_lines.append(line)
-                        for _ in range(nlines_to_read):
-                            line = next(f)
-                            this_timestep_lines.append(line)
-
-                        # check if any line has binary
-                        # if it does, then do not add this timestep
-                        # doing so might also remove next timesteps
-                        # because of lines missing that are read from the next geometry
-                        for i in this_timestep_lines:
-                            if "\x00" in i:
-                                timestep_contains_binary = True
-                                break
-
-                        # if there is no binary in timestep, then it should have clean
-                        # data, so we can read it as normal
-                        # iterate over the list containing all tines for this timestep
-                        if not timestep_contains_binary:
-
-                            this_timestep_lines = iter(this_timestep_lines)
-
-                            timestep = DlpolyTimestep()
-
-                            # loop over lines in the timestep that has been read in
-                            line = next(this_timestep_lines)
-                            # record = 'timestep' ntimestep number_of_atoms keytraj keypbc timestep_length timestep
-                            record = line.split()
-                            # since this timestep not contain binary
-                            # the timestep that is in the file should be correct
-                            timestep.ntimestep = int(record[1])
-
-                            timestep.number_of_atoms = int(record[2])
-                            timestep.trajectory_key = DlpolyTrajectoryKey(
-                                int(record[3])
+                for (
+                    types,
+                    timesteps_info,
+                    unit_cells,
+                    vectors,
+                ) in _iter_history_timesteps(mm, record_end + 1, chunk_size):
+                    self._add_timesteps(
+                        types,
+                        vectors[:, :, 0],
+                        timesteps_info,
+                        unit_cells,
+                        **{
+                            field: vectors[:, :, i + 1]
+                            for i, field in enumerate(
+                                _VECTOR_FIELDS[: vectors.shape[2] - 1]
                             )
-                            timestep.periodic_boundary = DlpolyPeriodicBoundary(
-                                int(record[4])
-                            )
-                            timestep.timestep_length = float(record[5])
-                            timestep.timestep = float(record[6])
-
-                            timestep.unit_cell[0, :] = np.array(
-                                [float(ai) for ai in next(this_timestep_lines).split()]
-                            )  # a vector of unit cell
-                            timestep.unit_cell[1, :] = np.array(
-                                [float(bi) for bi in next(this_timestep_lines).split()]
-                            )  # b vector of unit cell
-                            timestep.unit_cell[2, :] = np.array(
-                                [float(ci) for ci in next(this_timestep_lines).split()]
-                            )  # c vector of unit cell
-
-                            for _ in range(timestep.number_of_atoms):
-
-                                line = next(this_timestep_lines)
-                                # record = atom_type atom_index atomic_mass charge
-                                record = split_by(line, [8, 10, 12, 12])
-
-                                timestep_atom_type = str(record[0])
-
-                                line = next(this_timestep_lines)
-                                timestep_atom_coordinates = np.array(
-                                    [float(ci) for ci in line.split()]
-                                )
-
-                                timestep_atom = DlpolyTimestepAtom(
-                                    timestep_atom_type,
-                                    timestep_atom_coordinates[0],
-                                    timestep_atom_coordinates[1],
-                                    timestep_atom_coordinates[2],
-                                )
-
-                                if timestep.trajectory_key in [
-                                    DlpolyTrajectoryKey.CoordinateVelocity,
-                                    DlpolyTrajectoryKey.CoordinateVelocityForce,
-                                ]:
-                                    timestep_atom.velocity = np.array(
-                                        [
-                                            float(vi)
-                                            for vi in next(this_timestep_lines).split()
-                                        ]
-                                    )
-
-                                if (
-                                    timestep.trajectory_key
-                                    is DlpolyTrajectoryKey.CoordinateVelocityForce
-                                ):
-                                    timestep_atom.force = np.array(
-                                        [
-                                            float(fi)
-                                            for fi in next(this_timestep_lines).split()
-                                        ]
-                                    )
-
-                                timestep.add(timestep_atom)
-
-                            # this timestep should be safe to add
-                            # and no binary data should be present
-                            self.add(timestep)
-
-        except StopIteration:
-            # these are the timesteps that are read in
-            # get the ntimestep attribute
-            # which should always be correct even if data is missing
+                        },
+                    )
+
+        # these are the timesteps that are read in
+        # get the ntimestep attribute
+        # which should always be correct even if data is missing
+        if self._atoms_array is not None:
+            existing_timesteps = [info.ntimestep for info in self._timesteps_info]
+        else:
             existing_timesteps = [i.ntimestep for i in self]
 
-            # these are the missing timesteps because of binary in HISTORY file
-            removed_timesteps = []
-            # loop over all timesteps that are in the HISTORY file
-            # note that the initial geometry is also counted a timestep
-            # so setting the CONTROL timesteps to 500 for example will give 501 geometries in HISTORY file
-            for i in range(self.ntimesteps):
-                if i not in existing_timesteps:
-                    removed_timesteps.append(i)
-
-            self.existing_timesteps = existing_timesteps
-            self.removed_timesteps = removed_timesteps
-
-    # TODO: potentially return this implementation once the issues with
-    # binary code in the HISTORY file is resolved.
-
-    # def _read_file(self):
-
-    #     with open(self.path, "r") as f:
-
-    #         self.title = next(f)
-    #         record = next(f).split()
-    #         self.trajectory_key = DlpolyTrajectoryKey(int(record[0]))
-    #         self.periodic_boundary = DlpolyTrajectoryKey(int(record[1]))
-    #         self.number_of_atoms = int(record[2])
-    #         self.ntimesteps = int(record[3])
-
-    #         removed_timesteps = []
-    #         timestep_contains_binary = False
-
-    #         try:
-    #             while True:
-
-    #                 # sometimes binary data is written in HISTORY file
-    #                 # the binary is written to the same line as the next line that contains timestep info
-    #                 if not timestep_contains_binary:
-    #                     line = next(f)
-
-    #                 # reset the variables used to check if the timestep contains binary data
-    #                 add_this_timestep = True
-    #                 timestep_contains_binary = False
-
-    #                 if "timestep" in line:
-
-    #                     # used for dealing with binary data in HISTORY file sometimes
-    #                     # ideally this issue should be fixed in FFLUX
-    #                     timestep = DlpolyTimestep()
-
-    #                     # record = 'timestep' ntimestep number_of_atoms keytraj keypbc timestep_length timestep
-    #                     record = line.split()
-    #                     if "\x00" in record[0]:
-    #                         del record[0]
-    #                     timestep.ntimestep = int(record[1])
-    #                     timestep.number_of_atoms = int(record[2])
-    #                     timestep.trajectory_key = DlpolyTrajectoryKey(int(record[3]))
-    #                     timestep.periodic_boundary = DlpolyPeriodicBoundary(
-    #                         int(record[4])
-    #                     )
-    #                     timestep.timestep_length = float(record[5])
-    #                     timestep.timestep = float(record[6])
-
-    #                     timestep.unit_cell[0, :] = np.array(
-    #                         [float(ai) for ai in next(f).split()]
-    #                     )  # a vector of unit cell
-    #                     timestep.unit_cell[1, :] = np.array(
-    #                         [float(bi) for bi in next(f).split()]
-    #                     )  # b vector of unit cell
-    #                     timestep.unit_cell[2, :] = np.array(
-    #                         [float(ci) for ci in next(f).split()]
-    #                     )  # c vector of unit cell
-
-    #                     for _ in range(timestep.number_of_atoms):
-
-    #                         # for some reason binary is being written to the HISTORY file sometimes
-    #                         # this then causes issues with parsing
-    #                         # if the line has timestep in it, it means that the geometry is missing
-    #                         line = next(f)
-    #                         if "timestep" in line:
-    #                             # do not add timestep to the resulting history
-    #                             # ie history will have 1 less timestep
-    #                             add_this_timestep = False
-    #                             # this variable is used in the beginning of the while loop
-    #                             # setting to True means that the next(f) would not be called
-    #                             timestep_contains_binary = True
-    #                             # add the messed up timestep to a list
-    #                             removed_timesteps.append(timestep.ntimestep)
-    #                             break
-
-    #                         # record = atom_type atom_index atomic_mass charge
-    #                         record = split_by(line, [8, 10, 12, 12])
-
-    #                         timestep_atom_type = str(record[0])
-
-    #                         timestep_atom_coordinates = np.array(
-    #                             [float(ci) for ci in next(f).split()]
-    #                         )
-
-    #                         timestep_atom = DlpolyTimestepAtom(
-    #                             timestep_atom_type,
-    #                             timestep_atom_coordinates[0],
-    #                             timestep_atom_coordinates[1],
-    #                             timestep_atom_coordinates[2],
-    #                         )
-
-    #                         if timestep.trajectory_key in [
-    #                             DlpolyTrajectoryKey.CoordinateVelocity,
-    #                             DlpolyTrajectoryKey.CoordinateVelocityForce,
-    #                         ]:
-    #                             timestep_atom.velocity = np.array(
-    #                                 [float(vi) for vi in next(f).split()]
-    #                             )
-
-    #                         if (
-    #                             timestep.trajectory_key
-    #                             is DlpolyTrajectoryKey.CoordinateVelocityForce
-    #                         ):
-    #                             timestep_atom.force = np.array(
-    #                                 [float(fi) for fi in next(f).split()]
-    #                             )
-
-    #                         timestep.add(timestep_atom)
-
-    #                     if add_this_timestep:
-    #                         self.add(timestep)
-
-    #         # if end of file is reached, add the removed timesteps attribute
-    #         except StopIteration:
-    #             self.removed_timesteps = removed_timesteps
+        # these are the missing timesteps because of binary in HISTORY file
+        # loop over all timesteps that are in the HISTORY file
+        # note that the initial geometry is also counted a timestep
+        # so setting the CONTROL timesteps to 500 for example will give 501 geometries in HISTORY file
+        existing = set(existing_timesteps)
+        self.existing_timesteps = existing_timesteps
+        self.removed_timesteps = [
+            i for i in range(self.ntimesteps) if i not in existing
+        ]
+
+    @property
+    def positions(self) -> np.ndarray:
+        """Returns the positions of all atoms for all timesteps, shape `n_timesteps` x `n_atoms` x `3`.
+        Same as `coordinates`."""
+        return self.coordinates
+
+    @property
+    def velocities(self) -> np.ndarray:
+        """Returns the velocities of all atoms for all timesteps, shape `n_timesteps` x `n_atoms` x `3`."""
+        return self._vector_field("velocities", VelocityNotDefined)
+
+    @property
+    def forces(self) -> np.ndarray:
+        """Returns the forces on all atoms for all timesteps, shape `n_timesteps` x `n_atoms` x `3`."""
+        return self._vector_field("forces", ForceNotDefined)
+
+    def _vector_field(self, field: str, exception: type) -> np.ndarray:
+        if self.state is not FileState.Read:
+            self.read()
+        if self._atoms_array is not None:
+            if field not in self._atoms_array.vector_fields:
+                raise exception(f"{field} not written to '{self.path}'")
+            return self._atoms_array.vector_field(field)
+        # timesteps with different atoms are stored as instances
+        attribute = {"velocities": "velocity", "forces": "force"}[field]
+        return np.array(
+            [[getattr(atom, attribute) for atom in timestep] for timestep in self]
+        )
 
     @convert_to_path
     def write_to_trajectory(self, path: str = "TRAJECTORY.xyz"):
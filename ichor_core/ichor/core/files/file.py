@@ -2,11 +2,12 @@ from abc import ABC, abstractmethod
 from contextlib import contextmanager, suppress
 from enum import Enum
 from pathlib import Path
-from typing import Optional, Union
+from typing import Dict, Optional, Tuple, Union
 
 from ichor.core.common.functools import buildermethod
 from ichor.core.common.io import move
 from ichor.core.common.types import NoStr
+from ichor.core.files.file_cache import ParsedFileCache
 from ichor.core.files.path_object import PathObject
 
 
@@ -51,6 +52,11 @@ class FileContentsType(NoStr):
 
         return "FileContents"
 
+    def __reduce__(self):
+        """Unpickle as the `FileContents` instance, so that `is FileContents` checks still work
+        for contents which are loaded from the parsed file cache."""
+        return "FileContents"
+
 
 # make an instance of FileContentsType which to use everywhere.
 FileContents = FileContentsType()
@@ -139,6 +145,14 @@ class ReadFile(File, ABC):
 
     _filetype = ""
 
+    # attributes which are stored in the parsed file cache (see `ParsedFileCache`) after the file
+    # is parsed, so that the file does not have to be parsed again the next time it is read
+    _parsed_file_cache_attributes: Tuple[str, ...] = ()
+
+    # attributes which can be read without reading the whole file, mapped to the name of the method
+    # which only reads the part of the file that contains the attribute (e.g. the header or the last lines)
+    _partial_read_methods: Dict[str, str] = {}
+
     def _initialise_contents(self):
         """Initialize contents of a file to default values. This is needed in the case
         a file does not exist on disk yet (so the file cannot be read from). This means
@@ -161,9 +175,19 @@ class ReadFile(File, ABC):
             self.state = FileState.Reading
             self._initialise_contents()
             if self.path.exists():
-                self._read_file(
-                    *args, **kwargs
-                )  # self._read_file is different based on which type of file is being read (GJF, AIMALL, etc.)
+                # only files which are read in full are cached
+                use_cache = (
+                    ParsedFileCache.enabled
+                    and self._parsed_file_cache_attributes
+                    and not (args or kwargs)
+                )
+                if not (use_cache and self._read_from_parsed_file_cache()):
+                    unread = self._unread_parsed_file_cache_attributes()
+                    self._read_file(
+                        *args, **kwargs
+                    )  # self._read_file is different based on which type of file is being read (GJF, AIMALL, etc.)
+                    if use_cache:
+                        self._write_to_parsed_file_cache(unread)
                 # else:
                 #     raise FileNotFoundError(f"File with path path {self.path}
                 # of type {self.__class__.__name__} does not exist on disk.") # todo: talk to yulian about this
@@ -171,6 +195,51 @@ class ReadFile(File, ABC):
             else:
                 self.state = FileState.Unread
 
+    def _set_read_contents(self, **contents):
+        """Sets attributes read in from (part of) the file. Attributes which have already been read in
+        or which have been set by the user are kept. This does not trigger reading of the file, so it can
+        be used by the methods in `_partial_read_methods`."""
+        read_attributes = vars(self).setdefault("_read_attributes", set())
+        for attr, value in contents.items():
+            if vars(self).get(attr, FileContents) is FileContents:
+                setattr(self, attr, value)
+                read_attributes.add(attr)
+
+    def _unread_parsed_file_cache_attributes(self) -> Tuple[str, ...]:
+        """Returns the cached attributes which have not been set by the user, i.e. the ones which are read in.
+        Attributes which have already been read from part of the file (see `_set_read_contents`) are included,
+        so that the contents stored in the cache are complete."""
+        read_attributes = vars(self).get("_read_attributes", ())
+        return tuple(
+            attr
+            for attr in self._parsed_file_cache_attributes
+            if attr in read_attributes
+            or vars(self).get(attr, FileContents) is FileContents
+        )
+
+    def _read_from_parsed_file_cache(self) -> bool:
+        """Sets the attributes which are read in from the contents stored in the parsed file cache.
+        Attributes which have been set by the user are kept, as when the file is parsed.
+
+        :return: Whether the contents of the file were found in the cache
+        """
+        unread = self._unread_parsed_file_cache_attributes()
+        contents = ParsedFileCache.for_directory(self.path.parent).get(
+            self.path, self.__class__.__name__, unread
+        )
+        if contents is None:
+            return False
+        for attr in unread:
+            setattr(self, attr, contents[attr])
+        return True
+
+    def _write_to_parsed_file_cache(self, attributes: Tuple[str, ...]):
+        """Stores the attributes which were read in from the file in the parsed file cache."""
+        contents = {attr: vars(self).get(attr, FileContents) for attr in attributes}
+        ParsedFileCache.for_directory(self.path.parent).set(
+            self.path, self.__class__.__name__, contents
+        )
+
     @abstractmethod
     def _read_file(self, *args, **kwargs):
         """Abstract method detailing how to read contents of a file. Every type of file (gjf, int, etc.)
@@ -199,7 +268,16 @@ class ReadFile(File, ABC):
 
         with suppress(AttributeError):
             if object.__getattribute__(self, item) is FileContents:
-                self.read()
+                # only read the part of the file containing the attribute if possible
+                partial_read_method = type(self)._partial_read_methods.get(item)
+                if (
+                    partial_read_method is not None
+                    and self.state is FileState.Unread
+                    and self.path.exists()
+                ):
+                    getattr(self, partial_read_method)()
+                if object.__getattribute__(self, item) is FileContents:
+                    self.read()
 
         try:
             return object.__getattribute__(self, item)
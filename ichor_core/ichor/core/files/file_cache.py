@@ -0,0 +1,218 @@
+import atexit
+import os
+import pickle
+from collections import Counter, OrderedDict
+from contextlib import suppress
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+
+class ParsedFileCache:
+    """
+    Cache of the parsed contents of the files in one directory. The contents of every file are stored
+    (pickled) in one cache file per directory, together with the size and modification time of the file.
+    The cached contents of a file are only used if the size and modification time of the file are still
+    the same, otherwise the file is parsed again and the cache is updated.
+
+    Files which are read through `ReadFile.read` are looked up in the cache if caching is enabled
+    and the file type lists the attributes to store in its `_parsed_file_cache_attributes` class variable.
+    The cache is disabled by default, because it writes a cache file in every directory from which files are read.
+    It is enabled by setting the `ICHOR_PARSED_FILE_CACHE` environment variable to 1 (e.g. in ~/.bashrc, so that
+    jobs running on compute nodes also use the cache), by calling `ParsedFileCache.enable`
+    or from the tools menu of the ichor cli.
+
+    Files added to the cache are only kept in memory until the cache file of the directory is written with
+    `save` (or `save_all`), which is done after every point read by `PointsDirectory.map_points`,
+    when the cache of a directory is no longer kept in memory and when the program exits.
+
+    .. note::
+        The cache file is a pickle, so only enable the cache for directories which you trust.
+
+    :param directory: The directory whose files are cached
+    """
+
+    _filename = ".ichor_parsed_files.pkl"
+    # environment variable which enables the cache
+    environment_variable = "ICHOR_PARSED_FILE_CACHE"
+
+    # whether files are read from (and written to) the cache
+    enabled = os.environ.get(environment_variable, "").lower() in ("1", "true", "yes")
+    # number of cache hits, misses and writes (of the cache files) since the statistics were reset
+    statistics = Counter()
+
+    # the caches of the most recently used directories are kept in memory, so that the cache file of a
+    # directory does not have to be loaded again for every file in the directory
+    _loaded: "OrderedDict[Path, ParsedFileCache]" = OrderedDict()
+    _max_loaded = 128
+
+    def __init__(self, directory: Union[Path, str]):
+        self.directory = Path(directory)
+        self._entries = None
+        self._changed = False
+
+    @classmethod
+    def enable(cls, enabled: bool = True):
+        """Enables (or disables) reading parsed file contents from the cache. The environment variable
+        which enables the cache is set as well, so that processes started by this process use the cache too."""
+        cls.enabled = enabled
+        os.environ[cls.environment_variable] = "1" if enabled else "0"
+
+    @classmethod
+    def disable(cls):
+        """Disables reading parsed file contents from the cache. Files are parsed every time they are read."""
+        cls.enable(False)
+
+    @classmethod
+    def reset_statistics(cls):
+        """Sets the number of cache hits, misses and writes back to 0."""
+        cls.statistics.clear()
+
+    @classmethod
+    def cache_path(cls, directory: Union[Path, str]) -> Path:
+        """Returns the path of the cache file of a directory."""
+        return Path(directory) / cls._filename
+
+    @classmethod
+    def for_directory(cls, directory: Union[Path, str]) -> "ParsedFileCache":
+        """Returns the cache of a directory, which is only loaded from disk once while it is used."""
+        directory = Path(directory).absolute()
+        cache = cls._loaded.pop(directory, None)
+        if cache is None:
+            cache = cls(directory)
+        cls._loaded[directory] = cache
+        if len(cls._loaded) > cls._max_loaded:
+            cls._loaded.popitem(last=False)[1].save()
+        return cache
+
+    @classmethod
+    def save_all(cls):
+        """Writes the cache files of all caches in memory to which files have been added."""
+        for cache in list(cls._loaded.values()):
+            cache.save()
+
+    @property
+    def entries(self) -> Dict[str, tuple]:
+        """Returns a dictionary of file name to a tuple of the size, modification time, file type
+        and pickled contents of the file. A cache file which cannot be loaded is ignored."""
+        if self._entries is None:
+            self._entries = {}
+            cache_path = self.cache_path(self.directory)
+            if cache_path.exists():
+                try:
+                    with open(cache_path, "rb") as f:
+                        self._entries = pickle.load(f)
+                except Exception:
+                    self._entries = {}
+        return self._entries
+
+    def get(
+        self, path: Union[Path, str], filetype: str, attributes: Iterable[str] = ()
+    ) -> Optional[dict]:
+        """Returns the cached contents of a file, or None if the file is not in the cache,
+        if it has been modified since it was cached or if the cached contents do not contain all given attributes.
+
+        :param path: The path to the file, which has to be in the cached directory
+        :param filetype: The name of the class with which the file was read
+        :param attributes: The attributes which the cached contents need to contain
+        """
+        path = Path(path)
+        stat = path.stat()
+        entry = self.entries.get(path.name)
+        contents = None
+        if entry is not None and entry[:3] == (
+            stat.st_size,
+            stat.st_mtime_ns,
+            filetype,
+        ):
+            # the contents are unpickled every time, so files read from the cache do not share objects
+            contents = pickle.loads(entry[3])
+        if contents is None or any(attr not in contents for attr in attributes):
+            self.statistics["misses"] += 1
+            return None
+        self.statistics["hits"] += 1
+        return contents
+
+    def set(self, path: Union[Path, str], filetype: str, contents: dict):
+        """Adds the contents of a file to the cache. The cache file is not written until `save` is called,
+        so that the cache file of a directory is written once, not once for every file in the directory.
+
+        :param path: The path to the file, which has to be in the cached directory
+        :param filetype: The name of the class with which the file was read
+        :param contents: A dictionary of attribute names and values, which must be picklable
+        """
+        path = Path(path)
+        stat = path.stat()
+        # contents which cannot be pickled are not cached, the file is parsed every time instead
+        try:
+            pickled_contents = pickle.dumps(contents, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        self.entries[path.name] = (
+            stat.st_size,
+            stat.st_mtime_ns,
+            filetype,
+            pickled_contents,
+        )
+        self._changed = True
+
+    def save(self):
+        """Writes the cache file if any files have been added to the cache since it was last written. The file is
+        written to a temporary file first, so that the cache file is never partially written. Directories which
+        cannot be written to are not cached."""
+        if not self._changed:
+            return
+        self._changed = False
+        cache_path = self.cache_path(self.directory)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(self.entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            with suppress(OSError):
+                tmp_path.unlink()
+            return
+        self.statistics["writes"] += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    @classmethod
+    def _cache_files(cls, root: Union[Path, str]):
+        root = Path(root)
+        if root.is_file():
+            root = root.parent
+        return root.rglob(cls._filename)
+
+    @classmethod
+    def info(cls, root: Union[Path, str]) -> Dict[str, int]:
+        """Returns the number of cache files, the number of cached files and the total size
+        (in bytes) of the cache files in a directory and all of its subdirectories.
+
+        :param root: The directory in which to look for cache files
+        """
+        info = Counter(directories=0, files=0, bytes=0)
+        for cache_path in cls._cache_files(root):
+            info["directories"] += 1
+            info["files"] += len(cls(cache_path.parent))
+            info["bytes"] += cache_path.stat().st_size
+        return dict(info)
+
+    @classmethod
+    def clear(cls, root: Union[Path, str]) -> int:
+        """Removes the cache files of a directory and all of its subdirectories,
+        so that all files in them are parsed again the next time they are read.
+
+        :param root: The directory in which to remove cache files
+        :return: The number of cache files which were removed
+        """
+        removed = 0
+        for cache_path in list(cls._cache_files(root)):
+            cache_path.unlink()
+            cls._loaded.pop(cache_path.parent.absolute(), None)
+            removed += 1
+        return removed
+
+
+# files which were added to the caches after the last points were read are written when the program exits
+atexit.register(ParsedFileCache.save_all)
@@ -27,6 +27,18 @@ class GaussianOutput(ReadFile, HasAtoms, HasData):
 
     _filetype = [".gaussianoutput", ".gau"]
 
+    _parsed_file_cache_attributes = (
+        "global_forces",
+        "charge",
+        "multiplicity",
+        "atoms",
+        "molecular_dipole",
+        "molecular_quadrupole",
+        "traceless_molecular_quadrupole",
+        "molecular_octupole",
+        "molecular_hexadecapole",
+    )
+
     def __init__(
         self,
         path: Union[Path, str],
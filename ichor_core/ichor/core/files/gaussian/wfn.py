@@ -1,22 +1,28 @@
 from pathlib import Path
-from typing import Dict, Union
+from typing import Dict, List, Tuple, Union
 
+import numpy as np
 from ichor.core.atoms import Atom, Atoms
-from ichor.core.common.float import from_scientific_double
+from ichor.core.common.io import tail
 from ichor.core.common.itertools import chunker
 from ichor.core.common.str import split_by
 from ichor.core.common.units import AtomicDistance
-from ichor.core.files.file import FileContents, ReadFile, WriteFile
+from ichor.core.files.file import FileContents, FileState, ReadFile, WriteFile
 from ichor.core.files.file_data import HasAtoms, HasData
 
 
+def _from_scientific_doubles(lines: List[str]) -> np.ndarray:
+    """Converts lines of numbers written in scientific notation with a D (e.g. 1.0D-02) to a NumPy array."""
+    return np.array(" ".join(lines).replace("D", "E").split(), dtype=float)
+
+
 class MolecularOrbital:
     def __init__(
         self,
         index: int,
         occupation_number: float,
         energy: float,
-        primitives: list,
+        primitives: np.ndarray,
     ):
         self.index = index
         self.occupation_number = occupation_number
@@ -46,6 +52,11 @@ class WFN(HasAtoms, HasData, ReadFile, WriteFile):
     :ivar energy: The molecular energy read in from the bottom of the .wfn file
     :ivar virial: The virial read in from the bottom of the .wfn file
 
+    .. note::
+        Accessing the header (e.g. `atoms`) or the energy of a .wfn file which has not been read yet
+        only reads the header or the last lines of the file. The basis and molecular orbitals, which make
+        up most of the file, are only parsed (into NumPy arrays) when they are accessed.
+
     .. note::
         Since the wfn file is written out by Gaussian, we do not really
         have to modify it when writing out except we need to add the method used,
@@ -56,6 +67,31 @@ class WFN(HasAtoms, HasData, ReadFile, WriteFile):
 
     _filetype = ".wfn"
 
+    # the header and the energy can be read without parsing the basis and molecular orbitals
+    _partial_read_methods = {
+        "method": "read_header",
+        "atoms": "read_header",
+        "n_orbitals": "read_header",
+        "n_primitives": "read_header",
+        "n_nuclei": "read_header",
+        "total_energy": "read_energy",
+        "virial_ratio": "read_energy",
+    }
+
+    _parsed_file_cache_attributes = (
+        "method",
+        "atoms",
+        "n_orbitals",
+        "n_primitives",
+        "n_nuclei",
+        "centre_assignments",
+        "type_assignments",
+        "primitive_exponents",
+        "molecular_orbitals",
+        "total_energy",
+        "virial_ratio",
+    )
+
     def __init__(
         self,
         path: Union[Path, str],
@@ -80,103 +116,146 @@ class WFN(HasAtoms, HasData, ReadFile, WriteFile):
     def raw_data(self) -> Dict[str, float]:
         return {"energy": self.total_energy, "virial_ratio": self.virial_ratio}
 
-    def _read_file(self):
-        """Parse through a .wfn file to look for the relevant information.
-        This is automatically called if an attribute is being accessed, but the
-        FileState of the file is FileState.Unread"""
-        atoms = Atoms()
+    def read_header(self):
+        """Reads only the header of the .wfn file (the number of orbitals, primitives and nuclei,
+        the method and the atoms). This is automatically called if one of these attributes is accessed
+        before the whole file has been read, so the rest of the file does not need to be parsed."""
+        if self.state is not FileState.Unread or not self.path.exists():
+            return
         with open(self.path, "r") as f:
-            # title = next(f).strip() # title differs from program to program which writes wfn files
-            next(f)
-            header = next(f).split()
-            n_orbitals = int(header[1])
-            n_primitives = int(header[4])
-            n_nuclei = int(header[6])
-            # method is not written by Gaussian in wfn file, we have to modify wfn file so that aimall knows
-            # what method was used in Gaussian calculation
-            method = header[-1] if header[-1] != "NUCLEI" else FileContents
+            header, _ = self._read_header(f)
+        self._set_read_contents(**header)
+
+    def read_energy(self):
+        """Reads only the total energy and virial ratio from the last lines of the .wfn file, without reading
+        the rest of the file. This is automatically called if one of these attributes is accessed
+        before the whole file has been read."""
+        if self.state is not FileState.Unread or not self.path.exists():
+            return
+        for line in reversed(tail(self.path, lines=4).splitlines()):
+            if "TOTAL ENERGY" in line:
+                self._set_read_contents(**self._read_energy_line(line))
+                return
+
+    @staticmethod
+    def _read_header(f) -> Tuple[dict, str]:
+        """Reads the header of the .wfn file from an open file, returning the header contents
+        and the first line after the header."""
+        # title = next(f).strip() # title differs from program to program which writes wfn files
+        next(f)
+        header = next(f).split()
+        n_orbitals = int(header[1])
+        n_primitives = int(header[4])
+        n_nuclei = int(header[6])
+        # method is not written by Gaussian in wfn file, we have to modify wfn file so that aimall knows
+        # what method was used in Gaussian calculation
+        method = header[-1] if header[-1] != "NUCLEI" else FileContents
 
-            line = next(f)
-            while not line.startswith(r"CENTRE ASSIGNMENTS"):
-                # have to split like this because
-                # if any coordinate is above -10
-                # there is no whitespace between the coordinates
-                # so cannot split directly by whitespace
-                record = split_by(
-                    line, [4, 4, 16, 12, 12, 12, 10], return_remainder=True
-                )
-                atom_type = record[0]
-                x = float(record[3])
-                y = float(record[4])
-                z = float(record[5])
-                # _ = float(record[-1])  # nuclear charge, not used
-                atoms.add(
-                    Atom(
-                        atom_type,
-                        x,
-                        y,
-                        z,
-                        units=AtomicDistance.Bohr,
-                    )
-                )
-                line = next(f)
-
-            centre_assignments = []
-            while not line.startswith(r"TYPE ASSIGNMENTS"):
-                centre_assignments.extend(list(map(int, line.split()[2:])))
-                line = next(f)
-
-            type_assignments = []
-            while not line.startswith(r"EXPONENTS"):
-                type_assignments.extend(list(map(int, line.split()[2:])))
-                line = next(f)
-
-            primitive_exponents = []
-            while not line.startswith(r"MO"):
-                primitive_exponents.extend(
-                    list(map(from_scientific_double, line.split()[1:]))
-                )
-                line = next(f)
-
-            molecular_orbitals = []
-            while not line.startswith(r"END DATA"):
-                record = line.split()
-                imo = int(record[1])
-                occupation_number = float(record[-5])
-                energy = float(record[-1])
-
-                primitives = []
-                line = next(f)
-                while not (line.startswith(r"MO") or line.startswith(r"END DATA")):
-                    primitives.extend(list(map(from_scientific_double, line.split())))
-                    line = next(f)
-                molecular_orbitals.append(
-                    MolecularOrbital(
-                        imo,
-                        occupation_number,
-                        energy,
-                        primitives,
-                    )
+        atoms = Atoms()
+        line = next(f)
+        while not line.startswith(r"CENTRE ASSIGNMENTS"):
+            # have to split like this because
+            # if any coordinate is above -10
+            # there is no whitespace between the coordinates
+            # so cannot split directly by whitespace
+            record = split_by(line, [4, 4, 16, 12, 12, 12, 10], return_remainder=True)
+            atom_type = record[0]
+            x = float(record[3])
+            y = float(record[4])
+            z = float(record[5])
+            # _ = float(record[-1])  # nuclear charge, not used
+            atoms.add(
+                Atom(
+                    atom_type,
+                    x,
+                    y,
+                    z,
+                    units=AtomicDistance.Bohr,
                 )
+            )
+            line = next(f)
+
+        header_contents = {
+            "n_orbitals": n_orbitals,
+            "n_primitives": n_primitives,
+            "n_nuclei": n_nuclei,
+            "method": method,
+            "atoms": atoms,
+        }
+
+        return header_contents, line
+
+    @staticmethod
+    def _read_energy_line(line: str) -> dict:
+        record = line.split()
+        # parse with -ve numbers because gaussian/orca have slightly different lines here
+        return {"total_energy": float(record[-4]), "virial_ratio": float(record[-1])}
 
-            record = next(f).split()
-            # parse with -ve numbers because gaussian/orca have slightly different lines here
-            total_energy = float(record[-4])
-            virial_ratio = float(record[-1])
+    def _read_file(self):
+        """Parse through a .wfn file to look for the relevant information.
+        This is automatically called if an attribute is being accessed, but the
+        FileState of the file is FileState.Unread
 
-        self.n_orbitals = self.n_orbitals or n_orbitals
-        self.n_primitives = self.n_primitives or n_primitives
-        self.n_nuclei = self.n_nuclei or n_nuclei
-        self.method = self.method or method
+        The numbers of the basis and molecular orbitals are parsed all at once into NumPy arrays,
+        which is much faster than parsing them one by one for large .wfn files."""
 
-        self.atoms = self.atoms or atoms
-        self.centre_assignments = self.centre_assignments or centre_assignments
-        self.type_assignments = self.type_assignments or type_assignments
-        self.primitive_exponents = self.primitive_exponents or primitive_exponents
-        self.molecular_orbitals = self.molecular_orbitals or molecular_orbitals
+        with open(self.path, "r") as f:
+            header, line = self._read_header(f)
+            lines = [line] + f.read().splitlines()
+
+        n_primitives = header["n_primitives"]
+
+        # lines of the different sections of the file, which follow each other
+        centre_lines, type_lines, exponent_lines, mo_lines, coefficient_lines = (
+            [],
+            [],
+            [],
+            [],
+            [],
+        )
+        energy_line = None
+        for i, line in enumerate(lines):
+            if line.startswith("CENTRE ASSIGNMENTS"):
+                centre_lines.append(line[18:])
+            elif line.startswith("TYPE ASSIGNMENTS"):
+                type_lines.append(line[16:])
+            elif line.startswith("EXPONENTS"):
+                exponent_lines.append(line[9:])
+            elif line.startswith("MO"):
+                mo_lines.append(line)
+            elif line.startswith("END DATA"):
+                energy_line = lines[i + 1]
+                break
+            else:
+                coefficient_lines.append(line)
+
+        centre_assignments = np.array(" ".join(centre_lines).split(), dtype=int)
+        type_assignments = np.array(" ".join(type_lines).split(), dtype=int)
+        primitive_exponents = _from_scientific_doubles(exponent_lines)
+        coefficients = _from_scientific_doubles(coefficient_lines).reshape(
+            len(mo_lines), n_primitives
+        )
+
+        molecular_orbitals = []
+        for mo_line, primitives in zip(mo_lines, coefficients):
+            record = mo_line.split()
+            molecular_orbitals.append(
+                MolecularOrbital(
+                    int(record[1]),
+                    float(record[-5]),
+                    float(record[-1]),
+                    primitives,
+                )
+            )
 
-        self.total_energy = self.total_energy or total_energy
-        self.virial_ratio = self.virial_ratio or virial_ratio
+        self._set_read_contents(
+            **header,
+            centre_assignments=centre_assignments,
+            type_assignments=type_assignments,
+            primitive_exponents=primitive_exponents,
+            molecular_orbitals=molecular_orbitals,
+            **self._read_energy_line(energy_line),
+        )
 
     def _write_file(self, path: Path):
         """Write method needs to be implemented because the correct functional needs to be added to the .wfn file,
@@ -3,6 +3,7 @@ from typing import Dict, Union
 
 from ichor.core.atoms import Atom, Atoms
 from ichor.core.common.constants import type2nuclear_charge
+from ichor.core.common.io import tail
 from ichor.core.files.file import FileContents, FileState, ReadFile
 from ichor.core.files.file_data import HasAtoms, HasData
 
@@ -55,6 +56,18 @@ class WFX(HasAtoms, HasData, ReadFile):
 
     _filetype = ".wfx"
 
+    # the header and the energy can be read without reading the rest of the file
+    _partial_read_methods = {
+        "title": "read_header",
+        "method": "read_header",
+        "atoms": "read_header",
+        "n_orbitals": "read_header",
+        "n_primitives": "read_header",
+        "n_nuclei": "read_header",
+        "total_energy": "read_energy",
+        "virial_ratio": "read_energy",
+    }
+
     def __init__(
         self,
         path: Union[Path, str],
@@ -76,85 +89,117 @@ class WFX(HasAtoms, HasData, ReadFile):
         self.total_energy = FileContents
         self.virial_ratio = FileContents
 
-    def _read_file(self):
-        """Parse through a .wfn file to look for the relevant information.
-        This is automatically called if an attribute is being accessed, but the
-        FileState of the file is FileState.Unread"""
+    def read_header(self):
+        """Reads only the header of the .wfx file (the title, method, numbers of orbitals, primitives
+        and nuclei and the atoms). This is automatically called if one of these attributes is accessed
+        before the whole file has been read, so the rest of the file does not need to be read."""
+        if self.state is not FileState.Unread or not self.path.exists():
+            return
+        with open(self.path, "r") as f:
+            self._set_read_contents(
+                **self._read_sections(f, stop_at="<Primitive Centers>")
+            )
+
+    def read_energy(self):
+        """Reads only the total energy and virial ratio from the end of the .wfx file, without reading
+        the rest of the file. This is automatically called if one of these attributes is accessed
+        before the whole file has been read."""
+        if self.state is not FileState.Unread or not self.path.exists():
+            return
+        # the energy is followed by the virial ratio and possibly the energy gradients of the nuclei,
+        # so more lines are read from the end of the file until the energy is found
+        nlines = 64
+        while True:
+            last_lines = tail(self.path, lines=nlines).splitlines()
+            contents = self._read_sections(iter(last_lines))
+            if "total_energy" in contents or len(last_lines) < nlines:
+                break
+            nlines *= 4
+        self._set_read_contents(**contents)
+
+    @staticmethod
+    def _read_sections(f, stop_at: str = None) -> dict:
+        """Reads the sections of a .wfx file from an iterator over its lines.
+
+        :param f: An open file or other iterator over the lines of (part of) the file
+        :param stop_at: A tag at which to stop reading, defaults to None, in which case all lines are read
+        :return: A dictionary of the contents which were found
+        """
 
-        atoms = Atoms()
+        contents = {}
 
         atom_names = []
         atom_coordinates = []
 
-        with open(self.path, "r") as f:
+        for line in f:
 
-            for line in f:
+            if stop_at is not None and stop_at in line:
+                break
 
-                if "<Title>" in line:
-                    title = next(f).strip()
+            if "<Title>" in line:
+                contents["title"] = next(f).strip()
 
-                elif "<Model>" in line:
-                    method = next(f).strip()
+            elif "<Model>" in line:
+                contents["method"] = next(f).strip()
 
-                elif "<Number of Nuclei>" in line:
-                    n_nuclei = int(next(f).strip())
+            elif "<Number of Nuclei>" in line:
+                contents["n_nuclei"] = int(next(f).strip())
 
-                elif "<Number of Occupied Molecular Orbitals>" in line:
-                    n_orbitals = int(next(f).strip())
+            elif "<Number of Occupied Molecular Orbitals>" in line:
+                contents["n_orbitals"] = int(next(f).strip())
 
-                # elif "<Number of Perturbations>" in line:
-                #     n_perturbations = int(next(f).strip())
+            # elif "<Number of Perturbations>" in line:
+            #     n_perturbations = int(next(f).strip())
 
-                # elif "<Net Charge>" in line:
-                #     net_charge = int(next(f).strip())
+            # elif "<Net Charge>" in line:
+            #     net_charge = int(next(f).strip())
 
-                # elif "<Number of Electrons>" in line:
-                #     n_electrons = int(next(f).strip())
+            # elif "<Number of Electrons>" in line:
+            #     n_electrons = int(next(f).strip())
 
-                # elif "<Electronic Spin Multiplicity>" in line:
-                #     spin_multiplicity = int(next(f).strip())
+            # elif "<Electronic Spin Multiplicity>" in line:
+            #     spin_multiplicity = int(next(f).strip())
 
-                elif "<Atomic Numbers>" in line:
-                    for _ in range(n_nuclei):
-                        atom_names.append(nuclear_charge_to_type[int(next(f).strip())])
+            elif "<Atomic Numbers>" in line:
+                for _ in range(contents["n_nuclei"]):
+                    atom_names.append(nuclear_charge_to_type[int(next(f).strip())])
 
-                elif "<Nuclear Cartesian Coordinates>" in line:
-                    for _ in range(n_nuclei):
-                        atom_coordinates.append(
-                            list(map(float, next(f).strip().split()))
-                        )
+            elif "<Nuclear Cartesian Coordinates>" in line:
+                for _ in range(contents["n_nuclei"]):
+                    atom_coordinates.append(list(map(float, next(f).strip().split())))
 
-                elif "<Number of Primitives>" in line:
-                    n_primitives = int(next(f).strip())
+            elif "<Number of Primitives>" in line:
+                contents["n_primitives"] = int(next(f).strip())
 
-                elif "<Energy = T + Vne + Vee + Vnn>" in line:
-                    total_energy = float(next(f).strip())
+            elif "<Energy = T + Vne + Vee + Vnn>" in line:
+                contents["total_energy"] = float(next(f).strip())
 
-                elif "<Virial Ratio (-V/T)>" in line:
-                    virial_ratio = float(next(f).strip())
+            elif "<Virial Ratio (-V/T)>" in line:
+                contents["virial_ratio"] = float(next(f).strip())
 
         # make atoms instance
-        for atom_type, atom_coord in zip(atom_names, atom_coordinates):
-            atoms.append(Atom(atom_type, *atom_coord))
+        if atom_coordinates:
+            atoms = Atoms()
+            for atom_type, atom_coord in zip(atom_names, atom_coordinates):
+                atoms.append(Atom(atom_type, *atom_coord))
+            contents["atoms"] = atoms
 
-        self.title = self.title or title
-        self.n_orbitals = self.n_orbitals or n_orbitals
-        self.n_primitives = self.n_primitives or n_primitives
-        self.n_nuclei = self.n_nuclei or n_nuclei
-        self.method = self.method or method
+        return contents
 
-        self.atoms = self.atoms or atoms
-        # TODO: implement reading of these
-        # self.centre_assignments = self.centre_assignments or centre_assignments
-        # self.type_assignments = self.type_assignments or type_assignments
-        # self.primitive_exponents = self.primitive_exponents or primitive_exponents
-        # self.molecular_orbitals = self.molecular_orbitals or molecular_orbitals
+    def _read_file(self):
+        """Parse through a .wfn file to look for the relevant information.
+        This is automatically called if an attribute is being accessed, but the
+        FileState of the file is FileState.Unread"""
+
+        with open(self.path, "r") as f:
+            contents = self._read_sections(f)
 
-        self.total_energy = self.total_energy or total_energy
-        self.virial_ratio = self.virial_ratio or virial_ratio
+        # TODO: implement reading of centre_assignments, type_assignments,
+        #   primitive_exponents and molecular_orbitals
+        self._set_read_contents(**contents)
 
     @property
-    def properties(self) -> Dict[str, float]:
+    def raw_data(self) -> Dict[str, float]:
         return {"energy": self.total_energy, "virial_ratio": self.virial_ratio}
 
     def _check_values_before_writing(self):
@@ -1,3 +1,5 @@
+import hashlib
+import stat
 from pathlib import Path
 from typing import Callable, Union
 
@@ -5,6 +7,7 @@ from ichor.core.atoms import Atoms, AtomsNotFoundError
 from ichor.core.files import OrcaInput, OrcaOutput
 from ichor.core.files.aimall import Aim, IntDirectory
 from ichor.core.files.directory import AnnotatedDirectory
+from ichor.core.files.file_cache import ParsedFileCache
 from ichor.core.files.file_data import HasAtoms, HasData
 from ichor.core.files.gaussian import GaussianOutput, GJF, WFN
 from ichor.core.files.xyz import XYZ
@@ -33,11 +36,35 @@ class PointDirectory(AnnotatedDirectory, HasAtoms, HasData):
     def __init__(self, path: Union[Path, str]):
         AnnotatedDirectory.__init__(self, path)
 
+    def __reduce__(self):
+        """Points are pickled (e.g. to send them to other processes) as their path,
+        the files of the point are found (and read) again when the point is unpickled."""
+        return self.__class__, (self.path,)
+
     @classmethod
     def check_path(cls, path: Path) -> bool:
         """Makes sure that path is PointDirectory-like"""
         return (path.suffix == cls._suffix) and path.is_dir()
 
+    @property
+    def fingerprint(self) -> str:
+        """Returns a fingerprint of the files of the point, which changes when files are added, removed or modified.
+        The fingerprint is made from the paths, sizes and modification times of the files (and not their contents),
+        so it can be calculated without reading the files. The parsed file cache files (see `ParsedFileCache`)
+        are not included, as they are written when the files of the point are read."""
+
+        digest = hashlib.sha1()
+        for path in sorted(self.path.rglob("*")):
+            # also skips the temporary files to which the cache files are written
+            if path.name.startswith(ParsedFileCache._filename):
+                continue
+            path_stat = path.stat()
+            if stat.S_ISREG(path_stat.st_mode):
+                digest.update(
+                    f"{path.relative_to(self.path).as_posix()}:{path_stat.st_size}:{path_stat.st_mtime_ns}\n".encode()
+                )
+        return digest.hexdigest()
+
     @property
     def raw_data(self) -> dict:
 
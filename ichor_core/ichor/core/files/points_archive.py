@@ -0,0 +1,488 @@
+import hashlib
+import json
+import pickle
+import struct
+import tempfile
+import zlib
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from ichor.core.common.io import mkdir
+from ichor.core.common.sorting import ignore_alpha
+from ichor.core.files.directory import AnnotatedDirectory
+from ichor.core.files.file import File, FileContents, FileState, ReadFile
+from ichor.core.files.file_cache import ParsedFileCache
+from ichor.core.files.optional_content import OptionalContent
+from ichor.core.files.path_object import PathObject
+from ichor.core.files.point_directory import PointDirectory
+from ichor.core.files.points_directory import PointsDirectory
+from natsort import natsorted
+
+# identifies the file as a points archive, followed by the version of the format
+_MAGIC = b"ICHORPTS"
+_VERSION = 1
+_HEADER = struct.Struct("<8sI")
+# every point is stored as one record: the name of the point followed by two zlib compressed pickles,
+# the parsed contents of the files (which are read when the point is used) and the files themselves
+# (which are only read when the archive is unpacked)
+_RECORD_MAGIC = b"PNT1"
+_RECORD_HEADER = struct.Struct("<4sIQQ")
+# the index of the records is written (as json) after the last record and is followed by its offset
+_FOOTER = struct.Struct("<Q8s")
+
+# instance attributes of files which are not part of the contents of the file
+_NON_CONTENT_ATTRIBUTES = ("path", "state", "_save_state", "_read_attributes")
+
+
+def _read_index(f) -> Tuple[Dict[str, list], int]:
+    """Reads the index of an open points archive. If the archive was not closed properly
+    (e.g. a job was killed while points were added), the index is rebuilt from the records.
+
+    :param f: The archive, opened in binary mode
+    :return: A dictionary of point name to the offset and lengths of the record of the point,
+        and the offset at which the records end (at which new records are added)
+    """
+
+    f.seek(0)
+    magic, version = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != _MAGIC:
+        raise ValueError(f"'{f.name}' is not a points archive.")
+    if version != _VERSION:
+        raise ValueError(f"Points archive version {version} is not supported.")
+
+    size = f.seek(0, 2)
+    if size >= _HEADER.size + _FOOTER.size:
+        f.seek(size - _FOOTER.size)
+        index_offset, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+        if magic == _MAGIC and _HEADER.size <= index_offset <= size - _FOOTER.size:
+            f.seek(index_offset)
+            try:
+                return (
+                    json.loads(f.read(size - _FOOTER.size - index_offset)),
+                    index_offset,
+                )
+            except ValueError:
+                pass
+
+    # rebuild the index from all complete records
+    index = {}
+    offset = _HEADER.size
+    f.seek(offset)
+    while offset + _RECORD_HEADER.size <= size:
+        magic, name_length, contents_length, files_length = _RECORD_HEADER.unpack(
+            f.read(_RECORD_HEADER.size)
+        )
+        record_end = (
+            offset + _RECORD_HEADER.size + name_length + contents_length + files_length
+        )
+        if magic != _RECORD_MAGIC or record_end > size:
+            break
+        name = f.read(name_length).decode()
+        index[name] = [
+            offset + _RECORD_HEADER.size + name_length,
+            contents_length,
+            files_length,
+        ]
+        offset = f.seek(record_end)
+
+    return index, offset
+
+
+def _write_index(f, index: Dict[str, list], offset: int):
+    """Writes the index (and the footer) at the given offset and truncates the archive after it."""
+    f.seek(offset)
+    f.write(json.dumps(index, separators=(",", ":")).encode())
+    f.write(_FOOTER.pack(offset, _MAGIC))
+    f.truncate()
+
+
+def _read_blob(archive_path: Path, offset: int, length: int):
+    """Reads and unpickles one of the compressed blobs of a record."""
+    with open(archive_path, "rb") as f:
+        f.seek(offset)
+        return pickle.loads(zlib.decompress(f.read(length)))
+
+
+def _parsed_contents(directory: AnnotatedDirectory) -> Dict[str, tuple]:
+    """Reads all files of an annotated directory (and its annotated subdirectories) and returns their parsed
+    contents, with the paths relative to the directory as keys and the name of the file class and a dictionary
+    of the attributes read from the file as values. Files whose contents cannot be pickled are skipped."""
+
+    parsed = {}
+
+    for name in directory.contents:
+        path_objects = getattr(directory, name)
+        if not isinstance(path_objects, list):
+            path_objects = [path_objects]
+
+        for path_object in path_objects:
+            if isinstance(path_object, ReadFile):
+                path_object.read()
+                attributes = {
+                    attr: value
+                    for attr, value in vars(path_object).items()
+                    if attr not in _NON_CONTENT_ATTRIBUTES and value is not FileContents
+                }
+                try:
+                    pickle.dumps(attributes)
+                except (pickle.PicklingError, TypeError, AttributeError):
+                    continue
+                parsed[path_object.path.name] = (
+                    type(path_object).__name__,
+                    attributes,
+                )
+            elif isinstance(path_object, AnnotatedDirectory):
+                for relative_path, contents in _parsed_contents(path_object).items():
+                    parsed[f"{path_object.path.name}/{relative_path}"] = contents
+
+    return parsed
+
+
+def _pack_point(
+    point: PointDirectory, store_files: bool = True
+) -> Tuple[str, bytes, bytes]:
+    """Packs one point into the two compressed blobs of its record. This is applied to
+    every point with `PointsDirectory.map_points`, so points can be packed in parallel.
+
+    :param point: The PointDirectory to pack
+    :param store_files: Whether to store the files themselves, which are needed to unpack the point
+    :return: The name of the point, the compressed parsed contents and the compressed files
+    """
+
+    files = {}
+    for f in natsorted(point.path.rglob("*"), key=ignore_alpha):
+        if f.is_file() and f.name != ParsedFileCache._filename:
+            files[f.relative_to(point.path).as_posix()] = (
+                f.read_bytes() if store_files else None
+            )
+
+    contents = {"files": list(files), "parsed": _parsed_contents(point)}
+
+    return (
+        point.name,
+        zlib.compress(pickle.dumps(contents, protocol=pickle.HIGHEST_PROTOCOL)),
+        zlib.compress(pickle.dumps(files, protocol=pickle.HIGHEST_PROTOCOL))
+        if store_files
+        else b"",
+    )
+
+
+class ArchivedPointDirectory(PointDirectory):
+    """A `PointDirectory` whose files are stored in a `PointsArchive` instead of a directory on disk.
+    The files of the point are not read again, the contents which were parsed when the point was packed
+    are used instead. The contents are only loaded from the archive when the files of the point are accessed.
+
+    .. note::
+        The path of an `ArchivedPointDirectory` is the path the point directory would have if the
+        archive was unpacked in place, it does not exist on disk.
+
+    :param path: The path of the point inside the archive, i.e. the archive path followed by the name of the point
+    :param archive_path: The path to the archive containing the point
+    :param entry: The index entry of the point (the offset and lengths of its record)
+    """
+
+    def __init__(self, path: Union[Path, str], archive_path: Union[Path, str], entry):
+        PathObject.__init__(self, path)
+        self.archive_path = Path(archive_path)
+        self.entry = tuple(entry)
+        self._listing = None
+        self._extracted = None
+
+    def __reduce__(self):
+        return self.__class__, (self.path, self.archive_path, self.entry)
+
+    def __getattr__(self, item):
+        """The files of the point are set when they are accessed for the first time."""
+        if item in type(self).contents and vars(self).get("_listing", False) is None:
+            self._parse()
+            return getattr(self, item)
+        raise AttributeError(
+            f"'{self.__class__.__name__}' object has no attribute '{item}'"
+        )
+
+    def _parse(self):
+        """Sets the files and directories of the point from the contents stored in the archive."""
+        offset, contents_length, _ = self.entry
+        contents = _read_blob(self.archive_path, offset, contents_length)
+        self._listing = contents["files"]
+        self._parse_archived(self, "", contents["parsed"])
+
+    def _parse_archived(
+        self, directory: AnnotatedDirectory, prefix: str, parsed: Dict[str, tuple]
+    ):
+        """Does the same as `AnnotatedDirectory._parse`, but for the files stored in the archive.
+
+        :param directory: The annotated directory (the point or one of its subdirectories) to set the contents of
+        :param prefix: The path of the directory relative to the point, ending in "/" (or empty for the point)
+        :param parsed: The parsed contents of the files of the point
+        """
+
+        for var in directory.pathtypes:
+            setattr(directory, var, OptionalContent)
+
+        # the names of the files and subdirectories directly inside the directory
+        children = {}
+        for relative_path in self._listing:
+            if relative_path.startswith(prefix):
+                name, *rest = relative_path[len(prefix) :].split("/", 1)
+                children[name] = children.get(name, False) or bool(rest)
+
+        for var, pathtype in directory.pathtypes.items():
+            list_with_same_extension = []
+            for name in natsorted(children, key=ignore_alpha):
+                path = directory.path / name
+                is_dir = children[name]
+
+                if (
+                    issubclass(pathtype, File)
+                    and not is_dir
+                    and pathtype.check_path(path)
+                ):
+                    list_with_same_extension.append(
+                        self._archived_file(pathtype, path, prefix + name, parsed)
+                    )
+                elif (
+                    issubclass(pathtype, AnnotatedDirectory)
+                    and is_dir
+                    and pathtype.check_path(path)
+                ):
+                    subdirectory = pathtype.__new__(pathtype)
+                    PathObject.__init__(subdirectory, path)
+                    self._parse_archived(subdirectory, f"{prefix}{name}/", parsed)
+                    list_with_same_extension.append(subdirectory)
+
+            if len(list_with_same_extension) == 1:
+                setattr(directory, var, list_with_same_extension[0])
+            elif list_with_same_extension:
+                setattr(directory, var, list_with_same_extension)
+
+    def _archived_file(
+        self, filetype, path: Path, relative_path: str, parsed: Dict[str, tuple]
+    ) -> File:
+        """Makes the file instance of an archived file, with the contents which were parsed when it was packed.
+        Files whose contents were not stored are extracted to a temporary directory and read from there."""
+
+        if relative_path in parsed and parsed[relative_path][0] == filetype.__name__:
+            f = filetype(path)
+            for attr, value in parsed[relative_path][1].items():
+                setattr(f, attr, value)
+            f.state = FileState.Read
+            return f
+
+        if issubclass(filetype, ReadFile):
+            if self._extracted is None:
+                self._extracted = tempfile.TemporaryDirectory()
+            extracted_path = Path(self._extracted.name) / relative_path
+            mkdir(extracted_path.parent)
+            extracted_path.write_bytes(self.files_data()[relative_path])
+            return filetype(extracted_path)
+
+        return filetype(path)
+
+    @property
+    def fingerprint(self) -> str:
+        """Returns a fingerprint of the contents of the point stored in the archive,
+        which changes when the point is added to the archive again with different files."""
+        offset, contents_length, _ = self.entry
+        with open(self.archive_path, "rb") as f:
+            f.seek(offset)
+            return hashlib.sha1(f.read(contents_length)).hexdigest()
+
+    def files_data(self) -> Dict[str, bytes]:
+        """Returns the files of the point, with the paths relative to the point directory as keys
+        and the contents of the files as values.
+
+        :raises ValueError: If the files were not stored when the point was packed
+        """
+        offset, contents_length, files_length = self.entry
+        if not files_length:
+            raise ValueError(
+                f"The files of point '{self.name}' were not stored in '{self.archive_path}'."
+            )
+        return _read_blob(self.archive_path, offset + contents_length, files_length)
+
+    def iterdir(self):
+        """Returns the paths of the files and directories directly inside the point (which do not exist on disk)."""
+        if self._listing is None:
+            self._parse()
+        names = {relative_path.split("/", 1)[0] for relative_path in self._listing}
+        return iter(natsorted((self.path / name for name in names), key=ignore_alpha))
+
+    def unpack(self, path: Union[Path, str]) -> PointDirectory:
+        """Writes the files of the point to a point directory.
+
+        :param path: The path of the point directory to write
+        :return: The `PointDirectory` which was written
+        """
+        path = Path(path)
+        for relative_path, data in self.files_data().items():
+            file_path = path / relative_path
+            mkdir(file_path.parent)
+            file_path.write_bytes(data)
+        return PointDirectory(path)
+
+
+class PointsArchive(PointsDirectory):
+    """
+    Wraps around a points archive, which is one file that contains all points of a `PointsDirectory`.
+    Every point is stored as one record, which contains the contents parsed from the files of the point
+    (and optionally the files themselves, so that the archive can be unpacked again). The records are
+    indexed by the name of the point, so single points can be read without reading the rest of the archive.
+    A points archive can be used in the same way as a `PointsDirectory` (e.g. to write databases),
+    its points are `ArchivedPointDirectory` instances.
+
+    Archives are made from a `PointsDirectory` with `PointsArchive.pack`, points can be added to an existing
+    archive with `add_points` and the archive can be unpacked to a `PointsDirectory` with `unpack`.
+
+    .. note::
+        The parsed contents are stored as pickles, so only read archives which you trust.
+
+    :param path: Path to a points archive file
+    """
+
+    _suffix = ".pointsarchive"
+
+    @classmethod
+    def check_path(cls, path: Path) -> bool:
+        """Makes sure that path is a points archive"""
+        return (path.suffix == cls._suffix) and path.is_file()
+
+    def _parse(self) -> None:
+        """Makes an `ArchivedPointDirectory` for every point in the index of the archive.
+        The records of the points are not read until the points are used."""
+        with open(self.path, "rb") as f:
+            index, _ = _read_index(f)
+        # the points by name, so that points can be looked up by name without going through all points
+        self._points_by_name = {}
+        for name, entry in index.items():
+            point = ArchivedPointDirectory(self.path / name, self.path, entry)
+            self._points_by_name[name] = point
+            self.append(point)
+
+    @property
+    def point_names(self) -> List[str]:
+        """Returns the names of the points (directories) in the archive."""
+        return [point.path.name for point in self]
+
+    def get_point(self, name: str) -> ArchivedPointDirectory:
+        """Returns the point with the given name, e.g. `WATER0001.pointdir`.
+
+        :raises KeyError: If the point is not in the archive
+        """
+        try:
+            return self._points_by_name[name]
+        except KeyError:
+            raise KeyError(f"Point '{name}' is not in '{self.path}'.") from None
+
+    @classmethod
+    def create(cls, path: Union[Path, str]) -> "PointsArchive":
+        """Makes a new, empty points archive.
+
+        :param path: The path of the archive. The `.pointsarchive` suffix is added if it is not there.
+        """
+        path = Path(path)
+        if path.suffix != cls._suffix:
+            path = path.with_name(path.name + cls._suffix)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION))
+            _write_index(f, {}, _HEADER.size)
+        return cls(path)
+
+    @classmethod
+    def pack(
+        cls,
+        points_directory: Union[PointsDirectory, Path, str],
+        archive_path: Optional[Union[Path, str]] = None,
+        store_files: bool = True,
+        ncores: int = 1,
+    ) -> "PointsArchive":
+        """Packs a `PointsDirectory` into a new points archive.
+
+        :param points_directory: The PointsDirectory (or path to it) to pack
+        :param archive_path: The path of the archive, defaults to None, in which case the archive is written
+            next to the PointsDirectory, with the `.pointsarchive` suffix instead of `.pointsdir`
+        :param store_files: Whether to store the files of the points as well as their parsed contents,
+            defaults to True. The files are needed to unpack the archive.
+        :param ncores: The number of processes in which the points are read, defaults to 1
+        :return: The written archive
+        """
+        if not isinstance(points_directory, PointsDirectory):
+            points_directory = PointsDirectory(points_directory)
+        if archive_path is None:
+            archive_path = points_directory.path.with_suffix(cls._suffix)
+
+        archive = cls.create(archive_path)
+        archive.add_points(points_directory, store_files=store_files, ncores=ncores)
+        return archive
+
+    def add_points(
+        self,
+        points_directory: Union[PointsDirectory, Path, str],
+        store_files: bool = True,
+        ncores: int = 1,
+    ):
+        """Appends the points of a `PointsDirectory` to the archive. Points which are already in the archive
+        are replaced by the new ones (the space of the old records is not reused).
+
+        :param points_directory: The PointsDirectory (or path to it) whose points are added
+        :param store_files: Whether to store the files of the points as well as their parsed contents
+        :param ncores: The number of processes in which the points are read, defaults to 1
+        """
+        if not isinstance(points_directory, PointsDirectory):
+            points_directory = PointsDirectory(points_directory)
+
+        with open(self.path, "r+b") as f:
+            index, offset = _read_index(f)
+            f.seek(offset)
+            # the index is only written after all records, if packing fails it is rebuilt from the records
+            f.truncate()
+            try:
+                for name, contents, files in points_directory.map_points(
+                    partial(_pack_point, store_files=store_files), ncores=ncores
+                ):
+                    encoded_name = name.encode()
+                    f.write(
+                        _RECORD_HEADER.pack(
+                            _RECORD_MAGIC, len(encoded_name), len(contents), len(files)
+                        )
+                    )
+                    f.write(encoded_name)
+                    index[name] = [
+                        offset + _RECORD_HEADER.size + len(encoded_name),
+                        len(contents),
+                        len(files),
+                    ]
+                    f.write(contents)
+                    f.write(files)
+                    offset = f.tell()
+            finally:
+                _write_index(f, index, offset)
+
+        self.clear()
+        self._parse()
+
+    def unpack(self, path: Optional[Union[Path, str]] = None) -> PointsDirectory:
+        """Writes the points of the archive to a `PointsDirectory`, with the same directory layout
+        as the PointsDirectory which was packed.
+
+        :param path: The path of the PointsDirectory, defaults to None, in which case the PointsDirectory
+            is written next to the archive, with the `.pointsdir` suffix instead of `.pointsarchive`
+        :return: The written PointsDirectory
+        """
+        path = (
+            self.path.with_suffix(PointsDirectory._suffix)
+            if path is None
+            else Path(path)
+        )
+        mkdir(path)
+        for point in self:
+            point.unpack(path / point.path.name)
+        return PointsDirectory(path)
+
+    def __getitem__(self, item):
+        """Points can also be indexed by their name, e.g. `WATER0001.pointdir`, other indexing is the same
+        as for a `PointsDirectory`."""
+        if isinstance(item, str) and item.endswith(PointDirectory._suffix):
+            return self.get_point(item)
+        return super().__getitem__(item)
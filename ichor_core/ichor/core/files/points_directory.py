@@ -1,9 +1,10 @@
+import concurrent.futures
 import json
+from functools import partial
 from pathlib import Path
-from typing import Callable, Dict, List, Optional, Union
+from typing import Callable, Dict, Iterator, List, Optional, Union
 
 import numpy as np
-import pandas as pd
 from ichor.core.atoms import ALF, Atoms, ListOfAtoms
 from ichor.core.calculators.alf import default_alf_calculator
 from ichor.core.calculators.features.alf_features_calculator import (
@@ -12,20 +13,30 @@ from ichor.core.calculators.features.alf_features_calculator import (
 from ichor.core.common import constants
 from ichor.core.common.io import mkdir
 from ichor.core.common.itertools import chunker
-from ichor.core.database.json import get_data_for_point
-from ichor.core.database.sql import (
-    add_atom_names_to_database,
-    add_point_to_database,
-    create_database,
-    create_database_session,
-)
 from ichor.core.files import GJF
 from ichor.core.files.directory import Directory
+from ichor.core.files.file_cache import ParsedFileCache
 
 from ichor.core.files.file_data import HasData
 from ichor.core.files.point_directory import PointDirectory
 from ichor.core.files.xyz import Trajectory, XYZ
 
+# needed for parallel jobs, because the process pool cannot map closed over functions (or lambdas)
+# the function applied to every point is set by the initializer of the worker processes instead
+_point_func = None
+
+
+def _point_worker_init(func):
+    global _point_func
+    _point_func = func
+
+
+def _point_worker(point: PointDirectory):
+    result = _point_func(point)
+    # the worker processes do not write the parsed file caches when they exit
+    ParsedFileCache.save_all()
+    return result
+
 
 class PointsDirectory(ListOfAtoms, Directory, HasData):
     """
@@ -116,13 +127,71 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
             this PointsDirectoryParent instance.
         """
 
-        all_data_dict = {}
-        for p in self:
-            all_data_dict[p.stem] = p.raw_data
+        return self.get_raw_data()
+
+    def get_raw_data(self, ncores: int = 1) -> dict:
+        """Returns all raw data associated with the PointsDirectory instance, see `raw_data`.
+
+        :param ncores: The number of processes in which the points are read, defaults to 1
+        :returns: A dictionary of raw data, with the stem of each PointDirectory as keys.
+        """
+
+        return dict(
+            zip(
+                (p.stem for p in self),
+                self.map_points(_point_raw_data, ncores=ncores),
+            )
+        )
+
+    def map_points(
+        self,
+        func: Callable,
+        ncores: int = 1,
+        chunksize: int = 1,
+        points: Optional[List[PointDirectory]] = None,
+    ) -> Iterator:
+        """Applies a function to every PointDirectory and yields the results in the order of the points.
+        If more than one core is used, the points are read and the function is applied in a pool of
+        worker processes, each of which makes its own PointDirectory instance for every point it is given.
+        The results are yielded as soon as they are available (in order), so they can be consumed
+        (e.g. written to a database) while the remaining points are still being read.
+
+        .. note::
+            When more than one core is used, the results have to be picklable and the PointDirectory
+            instances contained in self are not changed (e.g. files read in the worker processes are not
+            read in self). The number of processes can be larger than the number of cores, which can be
+            useful when reading many points from a (slow) shared filesystem.
+
+        :param func: Callable which is applied to ONE PointDirectory
+        :param ncores: The number of worker processes used to read the points, defaults to 1,
+            in which case the points are read one after another in the current process
+        :param chunksize: The number of points sent to a worker process at a time, defaults to 1
+        :param points: The points to which the function is applied, defaults to None,
+            in which case the function is applied to all points
+        """
+
+        if ncores < 1:
+            raise ValueError(f"The number of cores must be at least 1, not {ncores}.")
+
+        if points is None:
+            points = list(self)
 
-        return all_data_dict
+        if ncores == 1:
+            for point in points:
+                result = func(point)
+                # the parsed file caches of the directories of the point are written once all files are read
+                ParsedFileCache.save_all()
+                yield result
+            return
 
-    def processed_data(self, processing_func, *args, **kwargs) -> dict:
+        # need to execute a globally defined a function, so this initializer and initialargs do that
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=ncores, initializer=_point_worker_init, initargs=(func,)
+        ) as executor:
+            # points are pickled as the arguments needed to make them again (see `PointDirectory.__reduce__`)
+            yield from executor.map(_point_worker, points, chunksize=chunksize)
+
+    def processed_data(self, processing_func, *args, ncores: int = 1, **kwargs) -> dict:
         """Processed data is some way, given any arguments and key words arguments,
         and returns a dictionary of the processed data, with keys
         Note that processing function can be any callable,
@@ -133,16 +202,21 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
 
         :param processing_func: Callable which is going to process ONE PointDirectory
         :param args: Positional arguments to pass to processing func
+        :param ncores: The number of processes in which the points are processed, see `map_points`, defaults to 1
         :returns: A dictionary of processed data.
             Keys of the dictionary are the stem of each PointDirectory contained inside
             this PointsDirectory instance.
         """
 
-        all_data_dict = {}
-        for p in self:
-            all_data_dict[p.stem] = p.processed_data(processing_func, *args, **kwargs)
-
-        return all_data_dict
+        return dict(
+            zip(
+                (p.stem for p in self),
+                self.map_points(
+                    partial(_point_processed_data, processing_func, *args, **kwargs),
+                    ncores=ncores,
+                ),
+            )
+        )
 
     # TODO: move to processing function
     @property
@@ -406,19 +480,43 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
         )
 
     def write_to_sqlite3_database(
-        self, db_path: Union[str, Path] = None, echo=False, print_missing_data=True
+        self,
+        db_path: Union[str, Path] = None,
+        echo=False,
+        print_missing_data=True,
+        ncores: int = 1,
+        batch_size: int = 1000,
+        pragmas: Optional[dict] = None,
+        incremental: bool = False,
     ) -> Path:
         """
         Write out important information from a PointsDirectory instance to an SQLite3 database.
 
         :param db_path: database to write to
-        :param echo: Whether to print out SQL queries from SQL Alchemy
         :param echo: Whether to print out SQL queries from SQL Alchemy, defaults to False
         :param print_missing_data: Whether to print out any missing data from each PointDirectory contained
             in self, defaults to False
+        :param ncores: The number of processes in which the points are read, defaults to 1.
+            The points are written to the database in the current process as they are read.
+        :param batch_size: The number of points written to the database in one transaction, defaults to 1000
+        :param pragmas: PRAGMAs to set for the database connection, see `create_database_session`, defaults to None
+        :param incremental: Whether to only write the points which are not in the database yet or whose files
+            have changed since they were written, see `sync_points_to_database`, defaults to False,
+            in which case all points are added to the database
         :return: The path to the written SQL database
         """
 
+        from ichor.core.database.json import get_data_for_point
+        from ichor.core.database.sql import (
+            add_atom_names_to_database,
+            add_points_data_to_database,
+            create_database,
+            create_database_indexes,
+            create_database_session,
+            create_database_tables,
+            sync_points_to_database,
+        )
+
         if not db_path:
             db_path = Path(f"{self.name_without_suffix}.sqlite")
         else:
@@ -427,31 +525,58 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
         # if db exists, then add new points to existing database.
         if db_path.exists():
             print("Database already exists. Adding new points to database...")
-            session = create_database_session(db_path)
-            for point in self:
-                add_point_to_database(
-                    session, point, echo=echo, print_missing_data=print_missing_data
-                )
+            session = create_database_session(db_path, echo=echo, pragmas=pragmas)
+            # databases made by older versions do not have all tables and indexes on the foreign keys
+            create_database_tables(session.get_bind())
+            create_database_indexes(session.get_bind())
         else:
             print("Making new database and adding points...")
             create_database(db_path, echo)
-            session = create_database_session(db_path)
+            session = create_database_session(db_path, echo=echo, pragmas=pragmas)
             add_atom_names_to_database(session, self.atom_names, echo=echo)
-            for point in self:
-                add_point_to_database(
-                    session, point, echo=echo, print_missing_data=print_missing_data
+
+        if incremental:
+            report = sync_points_to_database(
+                session,
+                self,
+                print_missing_data=print_missing_data,
+                ncores=ncores,
+                batch_size=batch_size,
+            )
+            session.close()
+            print(
+                f"Added {len(report.added)} new points, updated {len(report.updated)} changed points, "
+                f"{len(report.unchanged)} points were unchanged."
+            )
+            if report.not_written:
+                print(
+                    f"{len(report.not_written)} new or changed points could not be read and were not written "
+                    f"(rows written before for these points are kept): {', '.join(report.not_written)}"
                 )
+            return db_path
+
+        # the points are written in batches as they are read (possibly in other processes)
+        add_points_data_to_database(
+            session,
+            self.map_points(
+                partial(get_data_for_point, print_missing_data=print_missing_data),
+                ncores=ncores,
+            ),
+            batch_size=batch_size,
+        )
+        session.close()
 
         return db_path
 
     def write_to_json_database(
         self,
         root_path: Union[str, Path] = None,
-        datafunction: Callable = get_data_for_point,
+        datafunction: Optional[Callable] = None,
         npoints_per_json=500,
         print_missing_data=True,
         indent: int = 2,
         separators=(",", ":"),
+        ncores: int = 1,
     ) -> Path:
         """
         Write out important information from a PointsDirectory instance to a json file.
@@ -461,16 +586,24 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
             The reason for implementing like this is if using for multiple PointsDirectory-ies
             at once, so that data for each PointDirectory is written in a separate folder
         :param datafunction: A function used to get all data for a single point.
-            This data is going to get written to the json file.
+            This data is going to get written to the json file. Defaults to None,
+            in which case `get_data_for_point` is used.
         :param npoints_per_json: Maximum number of geometries to write to one json file
             This is done so that the individual files do not become very large.
         :param print_missing_data: Whether to print out any missing data from each PointDirectory contained
             in self, defaults to False
         :param indent: integer representing number of spaces to indent, defaults to 2
         :param separators: Separators used for each entry, default (",", ":")
+        :param ncores: The number of processes in which the data of the points is read, defaults to 1.
+            Every json file is written as soon as the data of all of its points has been read.
         :return: The path to the written json file
         """
 
+        if datafunction is None:
+            from ichor.core.database.json import get_data_for_point
+
+            datafunction = get_data_for_point
+
         # if no path is given use pointdirectory without suffix
         if not root_path:
             root_path = Path(self.name_without_suffix)
@@ -490,13 +623,14 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
 
         total_data_list = []
 
-        for chunk in chunker(self, npoints_per_json):
+        points_data = self.map_points(
+            partial(datafunction, print_missing_data=print_missing_data),
+            ncores=ncores,
+        )
 
-            for point in chunk:
+        for chunk in chunker(points_data, npoints_per_json):
 
-                total_data_list.append(
-                    datafunction(point, print_missing_data=print_missing_data)
-                )
+            total_data_list.extend(chunk)
 
             with open(json_file_path, "w") as json_db:
                 json.dump(
@@ -509,6 +643,47 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
 
         return root_path
 
+    def write_to_parquet_database(
+        self,
+        root_path: Union[str, Path] = None,
+        print_missing_data=True,
+        npoints_per_file: int = 10000,
+        ncores: int = 1,
+    ) -> Path:
+        """
+        Write out important information from a PointsDirectory instance to a parquet database.
+        The database is a directory which contains a directory of parquet files for every atom,
+        so that the data of only some atoms (and only some columns) can be read from it.
+
+        :param root_path: The directory of the database, defaults to None, in which case the name
+            of the PointsDirectory is used. If the database already exists, the points are added to it.
+        :param print_missing_data: Whether to print out any missing data from each PointDirectory contained
+            in self, defaults to True
+        :param npoints_per_file: Maximum number of points written to one parquet file (for every atom)
+        :param ncores: The number of processes in which the points are read, defaults to 1.
+            The points are written to the database in the current process as they are read.
+        :return: The path to the written parquet database
+        """
+
+        from ichor.core.database.json import get_data_for_point
+        from ichor.core.database.parquet import write_points_data_to_parquet
+
+        if not root_path:
+            root_path = Path(f"{self.name_without_suffix}.parquet")
+        else:
+            root_path = Path(root_path).with_suffix(".parquet")
+
+        write_points_data_to_parquet(
+            root_path,
+            self.map_points(
+                partial(get_data_for_point, print_missing_data=print_missing_data),
+                ncores=ncores,
+            ),
+            npoints_per_file=npoints_per_file,
+        )
+
+        return root_path
+
     # TODO: move processing code to processing func
     def features_with_properties_to_csv(
         self,
@@ -533,6 +708,8 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
             needs access to AIMALL information. Does not work for Trajectory instances.
         """
 
+        import pandas as pd
+
         if not atom_names:
             atom_names = self.atom_names
         elif isinstance(atom_names, str):
@@ -590,6 +767,8 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
         :type str_to_append_to_fname: str, optional
         """
 
+        import pandas as pd
+
         from ichor.core.models.gaussian_energy_derivative_wrt_features import (
             convert_to_feature_forces,
             form_b_matrix,
@@ -608,9 +787,7 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
             cart_forces = np.array(
                 list(point_dir.gaussian_output.global_forces.values())
             )
-            dE_df = convert_to_feature_forces(
-                cart_forces, b_matrix, alf_list, central_atom_idx
-            )
+            dE_df = convert_to_feature_forces(cart_forces, b_matrix)
             training_data.append([*features, wfn_energy, *dE_df])
 
             input_headers = [f"f{i+1}" for i in range(nfeatures)]
@@ -624,3 +801,13 @@ class PointsDirectory(ListOfAtoms, Directory, HasData):
             dtype=np.float64,
         )
         df.to_csv(fname, index=False)
+
+
+def _point_raw_data(point: PointDirectory) -> dict:
+    return point.raw_data
+
+
+def _point_processed_data(processing_func, *args, **kwargs):
+    # the point is the last positional argument, because the other arguments are given with partial
+    *args, point = args
+    return point.processed_data(processing_func, *args, **kwargs)
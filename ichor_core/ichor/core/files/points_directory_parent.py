@@ -126,7 +126,11 @@ class PointsDirectoryParent(list, Directory):
         return root_paths
 
     def write_to_sqlite3_database(
-        self, db_path: Union[str, Path] = None, echo=False, print_missing_data=True
+        self,
+        db_path: Union[str, Path] = None,
+        echo=False,
+        print_missing_data=True,
+        incremental: bool = False,
     ) -> Path:
         """
         Write out important information from a PointsDirectory instance to an SQLite3 database.
@@ -136,6 +140,8 @@ class PointsDirectoryParent(list, Directory):
         :param echo: Whether to print out SQL queries from SQL Alchemy, defaults to False
         :param print_missing_data: Whether to print out any missing data from each PointDirectory contained
             in self, defaults to False
+        :param incremental: Whether to only write the points which are new or whose files have changed
+            since they were written, defaults to False
         :return: The path to the written SQL database
         """
 
@@ -152,5 +158,46 @@ class PointsDirectoryParent(list, Directory):
             # write all data to a single database by passing in the same name for every PointsDirectory
             # get the method and pass in the database path name
             pointsdir.write_to_sqlite3_database(
-                db_path, echo=echo, print_missing_data=print_missing_data
+                db_path,
+                echo=echo,
+                print_missing_data=print_missing_data,
+                incremental=incremental,
+            )
+
+    def write_to_parquet_database(
+        self,
+        root_path: Union[str, Path] = None,
+        print_missing_data=True,
+        npoints_per_file: int = 10000,
+        ncores: int = 1,
+    ) -> Path:
+        """
+        Write out important information from the PointsDirectory-like directories contained inside
+        to a parquet database. All PointsDirectory-like directories will be written to the same database.
+
+        :param root_path: The directory of the database, defaults to None,
+            in which case the name of the PointsDirectoryParent is used
+        :param print_missing_data: Whether to print out any missing data from each PointDirectory contained
+            in self, defaults to True
+        :param npoints_per_file: Maximum number of points written to one parquet file (for every atom)
+        :param ncores: The number of processes in which the points are read, defaults to 1
+        :return: The path to the written parquet database
+        """
+
+        if not root_path:
+            root_path = Path(f"{self.name_without_suffix}_parent.parquet")
+        else:
+            root_path = Path(root_path)
+            root_path = root_path.with_name(f"{root_path.name}_parent.parquet")
+
+        for pointsdir in self:
+
+            # write all data to a single database by passing in the same name for every PointsDirectory
+            pointsdir.write_to_parquet_database(
+                root_path,
+                print_missing_data=print_missing_data,
+                npoints_per_file=npoints_per_file,
+                ncores=ncores,
             )
+
+        return root_path
@@ -1,4 +1,5 @@
 from ichor.core.files.xyz.trajectory import Trajectory
+from ichor.core.files.xyz.trajectory_index import TrajectoryIndex
 from ichor.core.files.xyz.xyz import XYZ
 
-__all__ = ["Trajectory", "XYZ"]
+__all__ = ["Trajectory", "TrajectoryIndex", "XYZ"]
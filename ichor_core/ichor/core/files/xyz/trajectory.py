@@ -1,17 +1,17 @@
-import re
 from pathlib import Path
-from typing import Callable, Dict, Iterable, List, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
 
 import numpy as np
-import pandas as pd
-from ichor.core.atoms import Atom, Atoms, ListOfAtoms
+from ichor.core.atoms import Atom, Atoms, AtomsArray, ListOfAtoms
 from ichor.core.atoms.alf import ALF
 from ichor.core.calculators import alf_features_to_coordinates
 from ichor.core.common.constants import bohr2ang
 from ichor.core.common.int import count_digits
 from ichor.core.common.io import convert_to_path, mkdir
 from ichor.core.common.itertools import chunker
+from ichor.core.common.units import AtomicDistance
 from ichor.core.files.file import FileState, ReadFile, WriteFile
+from ichor.core.files.xyz.trajectory_index import TrajectoryIndex
 
 
 class Trajectory(ReadFile, WriteFile, ListOfAtoms):
@@ -28,14 +28,52 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
         to keep the geometries in it (i.e. we want to overwrite the original trajectory),
         then set to False.If kept as True (the default), calling the write() method twice
         will cause a second set of the geometries to be added to the original trajectory file.
+    :param stream: If True, the timesteps of an existing trajectory file are not read into memory.
+        Instead, an index of where each timestep starts in the file is made (see `TrajectoryIndex`)
+        and timesteps are read from disk when they are accessed. Indexing by an integer gives an `Atoms`
+        instance, indexing by a slice or list gives an in-memory `Trajectory` containing only those timesteps,
+        and iterating (or `iter_chunks`) reads the file in chunks. This allows very large trajectories to be
+        sampled, split or featurized. Adding timesteps to a streamed trajectory reads the whole file first.
+    :param save_index: If True (and stream is True), the index of the trajectory file is saved next to
+        the file, so it does not have to be made again the next time the trajectory is streamed.
+
+    .. note::
+        If all timesteps contain the same atoms (which is the case for trajectories read from a file),
+        the coordinates of all timesteps are stored in one contiguous `AtomsArray` instead of
+        one `Atom` instance per atom per timestep. Indexing or iterating over the trajectory then gives
+        `Atoms` instances which are views of the stored coordinates, so modifying the coordinates
+        of a timestep in place (e.g. by calling `Atoms.centre`) modifies the trajectory.
+        If timesteps containing different atoms are added, or if timesteps are replaced, inserted or removed
+        (e.g. `del trajectory[0]`), the trajectory switches to storing the `Atoms` instances themselves.
+        These are the `Atoms` instances which were made for the stored coordinates, so
+        changes made to them before the switch are kept.
     """
 
     _filetype = ".xyz"
+    # number of timesteps of a streamed trajectory that are read into memory at once when iterating
+    _stream_chunk_size = 1000
 
-    def __init__(self, path: Union[Path, str], *args, read_geometries=True, **kwargs):
-        ListOfAtoms.__init__(self, *args, **kwargs)
+    def __init__(
+        self,
+        path: Union[Path, str],
+        timesteps: Optional[Union[Iterable[Atoms], AtomsArray]] = None,
+        read_geometries=True,
+        stream: bool = False,
+        save_index: bool = False,
+    ):
+        ListOfAtoms.__init__(self)
+        # structure-of-arrays storage of the timesteps
+        # None if the timesteps are stored as `Atoms` instances instead
+        self._atoms_array: Optional[AtomsArray] = None
+        # index of the timesteps in the trajectory file if the trajectory is streamed from disk
+        self._index: Optional[TrajectoryIndex] = None
         super(ReadFile, self).__init__(path)
 
+        if isinstance(timesteps, AtomsArray):
+            self._atoms_array = timesteps
+        elif timesteps is not None:
+            self.extend(timesteps)
+
         # needs to be here, because calling len for example will read the file again
         # in cases where atoms are added to trajectory, then trajectory is written
         # following calling len(trajectory) will result in the file being read
@@ -51,36 +89,152 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
         elif self.path.exists() and not read_geometries:
             self.state = FileState.Read
 
-    def _read_file(self):
+        # only keep the index of the timesteps, they are read from disk when needed
+        elif stream and timesteps is None:
+            self._index = TrajectoryIndex.from_file(self.path, save=save_index)
+            self.state = FileState.Read
+
+    def _read_file(self, chunk_size: int = 10000):
+        """Reads all timesteps into memory. The coordinates are parsed in chunks of timesteps
+        (see `TrajectoryIndex.read`), so the file is never held in memory as a whole.
 
-        with open(self.path, "r") as f:
-            # make empty Atoms instance in which to store one timestep
-            atoms = Atoms()
-            for line in f:
-                # match the line containing the number of atoms in timestep
-                if re.match(r"^\s*\d+", line):
-                    natoms = int(line)
-                    # this is the comment line of xyz files.
-                    # It can be empty or contain some useful information that can be stored.
-                    line = next(f)
-                    # if the comment line properties errors, we can store these
-
-                    # TODO: do we still need to get properties in trajectory? - if we do, implement without ast
-                    # if re.match(r"^\s*?i\s*?=\s*?\d+\s*properties_error", line):
-                    #     properties_error = line.split("=")[-1].strip()
-                    #     atoms.properties_error = ast.literal_eval(properties_error)
-
-                    # the next line after the comment line is where coordinates begin
-                    for _ in range(natoms):
-                        line = next(f)
-                        # add *_ to work for extended xyz which contain extra information after x,y,z coordinates
-                        atom_type, x, y, z, *_ = line.split()
-                        atoms.add(Atom(atom_type, float(x), float(y), float(z)))
-
-                    # add the Atoms instance to the Trajectory instance
-                    self.add(atoms)
-                    # make new Atoms instance where next timestep can be stored
-                    atoms = Atoms()
+        :param chunk_size: The number of timesteps that are parsed at once
+        """
+
+        # a streamed trajectory already has an index
+        index = self._index or TrajectoryIndex.from_file(self.path)
+        self._index = None
+
+        for start in range(0, len(index), chunk_size):
+            for types, coordinates in index.read(start, start + chunk_size):
+                self._add_geometries(types, coordinates)
+
+    @property
+    def streamed(self) -> bool:
+        """Whether the timesteps are read from disk when accessed instead of being held in memory."""
+        return self._index is not None
+
+    def _add_geometry(self, types: Sequence[str], coordinates: np.ndarray):
+        """Adds a timestep given as atom types and an `n_atoms` x `3` array of coordinates (in Angstroms)
+        to the end of the trajectory, without making `Atom` instances if the coordinates can be stored in
+        the `AtomsArray` of the trajectory."""
+
+        if (
+            self._atoms_array is not None
+            and self._atoms_array.units is AtomicDistance.Angstroms
+            and self._atoms_array.types == [ty.capitalize() for ty in types]
+            and self._atoms_array.indices == list(range(1, len(types) + 1))
+        ):
+            self._atoms_array.append(coordinates)
+        else:
+            self.add(
+                Atoms(
+                    [
+                        Atom(
+                            ty,
+                            atom_coordinates[0],
+                            atom_coordinates[1],
+                            atom_coordinates[2],
+                        )
+                        for ty, atom_coordinates in zip(types, coordinates)
+                    ]
+                )
+            )
+
+    def _add_geometries(self, types: Sequence[str], coordinates: np.ndarray):
+        """Adds multiple timesteps that contain the same atoms, given as atom types and an
+        `n_timesteps` x `n_atoms` x `3` array of coordinates (in Angstroms), see `_add_geometry`."""
+
+        if self._atoms_array is None and list.__len__(self) == 0 and len(types) > 0:
+            self._atoms_array = AtomsArray(types)
+
+        if (
+            self._atoms_array is not None
+            and self._atoms_array.units is AtomicDistance.Angstroms
+            and self._atoms_array.types == [ty.capitalize() for ty in types]
+            and self._atoms_array.indices == list(range(1, len(types) + 1))
+        ):
+            self._atoms_array.extend(coordinates)
+        else:
+            for geometry in coordinates:
+                self._add_geometry(types, geometry)
+
+    def _read_timesteps(self, indices: Iterable[int]) -> "Trajectory":
+        """Reads the given timesteps of a streamed trajectory from disk into a new in-memory `Trajectory`.
+        Consecutive indices that are close to each other are read and parsed together.
+
+        :param indices: The indices of the timesteps to read (non-negative)
+        """
+
+        trajectory = Trajectory(self.path, read_geometries=False)
+
+        # group indices which are increasing and within one chunk, so that they can be read in one go
+        groups = []
+        for i in indices:
+            i = int(i)
+            if groups and groups[-1][-1] < i < groups[-1][0] + self._stream_chunk_size:
+                groups[-1].append(i)
+            else:
+                groups.append([i])
+
+        for group in groups:
+            positions = np.array(group) - group[0]
+            block_start = 0
+            for types, coordinates in self._index.read(group[0], group[-1] + 1):
+                block_end = block_start + len(coordinates)
+                in_block = positions[
+                    (positions >= block_start) & (positions < block_end)
+                ]
+                trajectory._add_geometries(types, coordinates[in_block - block_start])
+                block_start = block_end
+
+        return trajectory
+
+    def iter_chunks(self, chunk_size: int = 1000) -> Iterator["Trajectory"]:
+        """Iterates over the trajectory in chunks of consecutive timesteps. For streamed trajectories,
+        only one chunk is read into memory at a time.
+
+        :param chunk_size: The number of timesteps in each chunk (the last chunk can be smaller)
+        :return: Yields `Trajectory` instances containing the timesteps of each chunk
+        """
+        for start in range(0, len(self), chunk_size):
+            yield self[start : start + chunk_size]
+
+    def _iter_every(self, every: int = 1) -> Iterator[Atoms]:
+        """Iterates over every nth timestep. The trajectory is gone over in chunks, so only
+        part of a streamed trajectory is in memory at any time."""
+        # chunks start at a multiple of every, so the selected timesteps are the same as self[::every]
+        for chunk in self.iter_chunks(self._stream_chunk_size * every):
+            yield from chunk[::every]
+
+    def _timestep_data(self) -> Dict[str, np.ndarray]:
+        """Returns data other than the geometry that is stored for each timestep (e.g. the unit cell
+        of DL_POLY timesteps), as arrays where the first dimension is the number of timesteps."""
+        return {}
+
+    def _timestep(self, i: int) -> Atoms:
+        """Returns the i-th timestep from the `AtomsArray` in which the timesteps are stored."""
+        return self._atoms_array.atoms(i)
+
+    def _store_as_atoms_instances(self):
+        """Switches from storing the timesteps in an `AtomsArray` to storing `Atoms` instances. This is
+        needed if a timestep that does not have the same atoms as the other timesteps is added."""
+        if self._atoms_array is not None:
+            timesteps = [self._timestep(i) for i in range(len(self._atoms_array))]
+            self._atoms_array = None
+            list.extend(self, timesteps)
+
+    def _coordinates_in_angstroms(self) -> np.ndarray:
+        """Returns the coordinates of all timesteps in Angstroms, shape `n_timesteps` x `n_atoms` x `3`"""
+        if self.state is not FileState.Read:
+            self.read()
+        if self.streamed:
+            return self.coordinates
+        if self._atoms_array is not None:
+            if self._atoms_array.units is AtomicDistance.Bohr:
+                return self._atoms_array.coordinates * bohr2ang
+            return self._atoms_array.coordinates
+        return super()._coordinates_in_angstroms()
 
     @property
     def types(self):
@@ -92,17 +246,23 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
     def types_extended(self):
         """Returns the atom elements for atoms, assumes each timesteps has the same atoms.
         Removes duplicates."""
+        if self._atoms_array is not None:
+            return list(self._atoms_array.types)
         return self[0].types_extended
 
     @property
     def atom_names(self):
         """Return the atom names from the first timestep. Assumes that all timesteps have the same
         number of atoms/atom names."""
+        if self._atoms_array is not None:
+            return self._atoms_array.atom_names
         return self[0].atom_names
 
     @property
     def natoms(self):
         """Returns the number of atoms in the first timestep. Each timestep should have the same number of atoms."""
+        if self._atoms_array is not None:
+            return self._atoms_array.natoms
         return len(self[0])
 
     @property
@@ -111,8 +271,20 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
         Returns:
             :type: `np.ndarray`
             the xyz coordinates of all atoms for all timesteps. Shape `n_timesteps` x `n_atoms` x `3`
+            If the timesteps are stored in an `AtomsArray`, this is a view of the stored coordinates.
+            For streamed trajectories, the coordinates are read from disk chunk by chunk.
         """
-
+        if self.state is not FileState.Read:
+            self.read()
+        if self.streamed:
+            return np.concatenate(
+                [
+                    chunk.coordinates
+                    for chunk in self.iter_chunks(self._stream_chunk_size)
+                ]
+            )
+        if self._atoms_array is not None:
+            return self._atoms_array.coordinates
         return np.array([timestep.coordinates for timestep in self])
 
     def connectivity(
@@ -153,6 +325,82 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
         else:
             raise ValueError(f"Cannot add an instance of {type(atoms)} to self.")
 
+    def append(self, atoms: Atoms):
+        """Appends a timestep to the end of the trajectory. The coordinates are copied into the `AtomsArray`
+        of the trajectory if the timestep has the same atoms as the other timesteps."""
+
+        # timesteps are only added to trajectories that are in memory
+        if self.streamed:
+            self._read_file()
+
+        # the first timestep defines the system that is stored in the array
+        if (
+            self._atoms_array is None
+            and list.__len__(self) == 0
+            and isinstance(atoms, Atoms)
+            and len(atoms) > 0
+        ):
+            self._atoms_array = AtomsArray.from_atoms(atoms)
+
+        if self._atoms_array is not None and self._atoms_array.matches(atoms):
+            self._atoms_array.append(atoms.coordinates)
+        else:
+            self._store_as_atoms_instances()
+            super().append(atoms)
+
+    def extend(self, timesteps: Iterable[Atoms]):
+        """Appends multiple timesteps to the end of the trajectory."""
+        for atoms in timesteps:
+            self.append(atoms)
+
+    def __iadd__(self, timesteps: Iterable[Atoms]) -> "Trajectory":
+        self.extend(timesteps)
+        return self
+
+    def _store_in_list(self):
+        """Makes sure the timesteps are stored as `Atoms` instances in the list itself, which is needed
+        before timesteps are replaced, inserted or removed. Streamed trajectories are read into memory first."""
+        if self.state is not FileState.Read:
+            self.read()
+        if self.streamed:
+            self._read_file()
+        self._store_as_atoms_instances()
+
+    def __setitem__(self, item, atoms):
+        """Replaces the timestep(s) at the given index or slice."""
+        self._store_in_list()
+        list.__setitem__(self, item, atoms)
+
+    def __delitem__(self, item):
+        """Removes the timestep(s) at the given index or slice."""
+        self._store_in_list()
+        list.__delitem__(self, item)
+
+    def insert(self, index: int, atoms: Atoms):
+        """Inserts a timestep before the given index."""
+        self._store_in_list()
+        list.insert(self, index, atoms)
+
+    def pop(self, index: int = -1) -> Atoms:
+        """Removes and returns the timestep at the given index (the last timestep by default)."""
+        self._store_in_list()
+        return list.pop(self, index)
+
+    def remove(self, atoms: Atoms):
+        """Removes the first timestep which is equal to the given `Atoms` instance."""
+        self._store_in_list()
+        list.remove(self, atoms)
+
+    def reverse(self):
+        """Reverses the order of the timesteps in place."""
+        self._store_in_list()
+        list.reverse(self)
+
+    def clear(self):
+        """Removes all timesteps."""
+        self._store_in_list()
+        list.clear(self)
+
     def rmsd(self, ref=None):
         if ref is None:
             ref = self[0]
@@ -251,8 +499,8 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
         mkdir(root_path / inner_dir_name, empty=True)
 
         # get only the every-th element of the trajectory
-        geometries_to_write = self[::every]
-        len_geoms_to_write = len(geometries_to_write)
+        geometries_to_write = self._iter_every(every)
+        len_geoms_to_write = len(range(0, len(self), every))
 
         total_geom_counter = 0
         geom_counter = 0
@@ -318,8 +566,8 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
         system_name = system_name.upper()
 
         # get only the every-th element of the trajectory
-        geometries_to_write = self[::every]
-        len_geoms_to_write = len(geometries_to_write)
+        geometries_to_write = self._iter_every(every)
+        len_geoms_to_write = len(range(0, len(self), every))
 
         # parent directory index
         root_idx = 0
@@ -378,7 +626,6 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
                 if total_geom_counter != len_geoms_to_write - 1:
                     mkdir(root_path / inner_dir_name, empty=True)
 
-    @convert_to_path
     def split_traj(
         self, root_dir: Path = Path("split_trajectory"), split_size: int = 1000
     ):
@@ -391,14 +638,15 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
         :param split_size: The split size by which to split original trajectory.
         """
 
+        # not using convert_to_path, as it would try to convert self
+        root_dir = Path(root_dir)
         mkdir(root_dir, empty=True)
-        chunks = [self[x : x + split_size] for x in range(0, len(self), split_size)]
         original_traj_stem = self.path.stem
 
-        for idx, chunk in enumerate(chunks):
+        # only one chunk is in memory at a time for streamed trajectories
+        for idx, chunk in enumerate(self.iter_chunks(split_size)):
             new_traj_name = f"{original_traj_stem}_split{idx}.xyz"
-            new_traj = Trajectory(root_dir / new_traj_name)
-            new_traj.extend(chunk)
+            new_traj = Trajectory(root_dir / new_traj_name, chunk)
             new_traj.write()
 
     @convert_to_path
@@ -458,6 +706,9 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
             that is in the file containing the features.
         """
 
+        # pandas is slow to import and is only needed here
+        import pandas as pd
+
         f = Path(f)
         if f.suffix == ".xlsx":
             features_array = pd.read_excel(
@@ -590,13 +841,16 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
     def __getitem__(self, item) -> Atoms:
         """Used to index a Trajectory instance by a str (eg. trajectory['C1']) or by integer (eg. trajectory[2]),
         remember that indeces in Python start at 0, so trajectory[2] is the 3rd timestep.
-        You can use something like (np.array([traj[i].features for i in range(2)]).shape) to features of a slice of
-        a trajectory as slice is not implemented in __getitem__"""
+        Indexing by a slice or a list of integers returns a new `Trajectory` instance."""
         if self.state is not FileState.Read:
             self.read()
 
         # if ListOfAtoms instance is indexed by an integer or np.int64, then index as a list
-        if isinstance(item, (int, np.int64)):
+        if isinstance(item, (int, np.integer)):
+            if self.streamed:
+                return self._read_timesteps([range(len(self))[item]])[0]
+            if self._atoms_array is not None:
+                return self._timestep(int(item))
             return list.__getitem__(self, item)
 
         # if ListOfAtoms is indexed by a string, such as an atom name (eg. C1, H2, O3, H4, etc.)
@@ -606,23 +860,9 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
             return AtomView(self, item)
 
         # if PointsDirectory is indexed by a slice e.g. [:50], [20:40], etc.
-        elif isinstance(item, slice):
-
-            # setting read_geometries to false will not read the file again
-            new_traj = Trajectory(
-                self.path, list.__getitem__(self, item), read_geometries=False
-            )
-
-            return new_traj
-
-        # if PointsDirectory is indexed by a list, e.g. [0, 5, 10]
-        elif isinstance(item, (list, np.ndarray)):
-
-            new_traj = Trajectory(self.path, [list.__getitem__(self, i) for i in item])
-            # need to set the filestate to read otherwise the file will be read again
-            new_traj.state = FileState.Read
-
-            return Trajectory(self.path, [list.__getitem__(self, i) for i in item])
+        # or if PointsDirectory is indexed by a list, e.g. [0, 5, 10]
+        elif isinstance(item, (slice, list, np.ndarray)):
+            return self._subset(item)
 
         # if indexing by something else that has not been programmed yet
         # should only be reached if not indexed by int, str, or slice
@@ -630,16 +870,61 @@ class Trajectory(ReadFile, WriteFile, ListOfAtoms):
             f"Cannot index type '{self.__class__.__name__}' with type '{type(item)}"
         )
 
+    def _subset(self, item: Union[slice, List[int], np.ndarray]) -> "Trajectory":
+        """Returns a new `Trajectory` containing the timesteps given by a slice or a list of indices.
+        For timesteps stored in an `AtomsArray`, slicing gives a view of the stored coordinates.
+
+        For streamed trajectories, only the given timesteps are read from disk.
+
+        Setting read_geometries to False ensures that the file is not read again."""
+        if self.streamed:
+            if isinstance(item, slice):
+                return self._read_timesteps(range(len(self))[item])
+            return self._read_timesteps(np.arange(len(self))[item])
+        if self._atoms_array is not None:
+            return Trajectory(self.path, self._atoms_array[item], read_geometries=False)
+        if isinstance(item, slice):
+            return Trajectory(
+                self.path, list.__getitem__(self, item), read_geometries=False
+            )
+        return Trajectory(
+            self.path,
+            [list.__getitem__(self, i) for i in item],
+            read_geometries=False,
+        )
+
     def __iter__(self) -> Iterable[Atoms]:
         """Used to iterate over timesteps (Atoms instances) in places such as for loops"""
         if self.state is not FileState.Read:
             self.read()
+        if self.streamed:
+            return (
+                atoms
+                for chunk in self.iter_chunks(self._stream_chunk_size)
+                for atoms in chunk
+            )
+        if self._atoms_array is not None:
+            return (self._timestep(i) for i in range(len(self._atoms_array)))
         return super().__iter__()
 
+    def __reversed__(self) -> Iterable[Atoms]:
+        """Used to iterate over timesteps (Atoms instances) in reverse order"""
+        if self.state is not FileState.Read:
+            self.read()
+        if self.streamed:
+            return (self[i] for i in reversed(range(len(self))))
+        if self._atoms_array is not None:
+            return (self._timestep(i) for i in reversed(range(len(self._atoms_array))))
+        return super().__reversed__()
+
     def __len__(self):
         """Returns the number of timesteps in the Trajectory instance"""
         if self.state is not FileState.Read:
             self.read()
+        if self.streamed:
+            return len(self._index)
+        if self._atoms_array is not None:
+            return len(self._atoms_array)
         return super().__len__()
 
     def __repr__(self) -> str:
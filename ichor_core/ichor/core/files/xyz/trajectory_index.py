@@ -0,0 +1,321 @@
+import mmap
+import re
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+def _parse_frames(
+    data: bytes, nframes: int, natoms: int
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Parses consecutive .xyz frames that all contain `natoms` atoms (and no blank lines between frames)
+    in bulk, without looping over the lines in Python.
+
+    :param data: The bytes of the frames, starting at the line containing the number of atoms of the first frame
+    :param nframes: The number of frames contained in `data`
+    :param natoms: The number of atoms in every frame
+    :return: An `nframes` x `natoms` array of atom types (as bytes) and an `nframes` x `natoms` x `3` array of
+        coordinates, or None if the frames do not have exactly 4 columns (e.g. extended xyz) and have to be
+        parsed line by line.
+    """
+    nlines = natoms + 2
+    lines = data.split(b"\n")
+    if len(lines) < nframes * nlines:
+        return None
+
+    # skip the number of atoms and comment line of each frame
+    atom_lines = np.array(lines[: nframes * nlines], dtype=object).reshape(
+        nframes, nlines
+    )[:, 2:]
+    tokens = b" ".join(atom_lines.ravel()).split()
+    if len(tokens) != nframes * natoms * 4:
+        return None
+
+    tokens = np.array(tokens).reshape(nframes, natoms, 4)
+    try:
+        coordinates = tokens[..., 1:].astype(float)
+    except ValueError:
+        return None
+
+    return tokens[..., 0], coordinates
+
+
+def _parse_frame(data: bytes, natoms: int) -> Tuple[List[str], np.ndarray]:
+    """Parses a single .xyz frame line by line. Extra columns after the x y z coordinates
+    (as in extended xyz files) are ignored."""
+    types = []
+    coordinates = np.empty((natoms, 3))
+    for i, line in enumerate(data.split(b"\n")[2 : natoms + 2]):
+        atom_type, x, y, z, *_ = line.split()
+        types.append(atom_type.decode())
+        coordinates[i] = float(x), float(y), float(z)
+    return types, coordinates
+
+
+def _scan_regular_frames(
+    mm: mmap.mmap, size: int, chunk_size: int
+) -> Optional[np.ndarray]:
+    """Finds the byte offsets of the frames of a trajectory in which every frame has the same number
+    of atoms and there are no blank lines between frames, which is the case for trajectories written
+    by MD codes. The newlines are found with numpy, so the file is not looped over line by line.
+
+    :return: The byte offsets of the frames, or None if the file does not have this layout.
+    """
+    first_newline = mm.find(b"\n")
+    header = mm[: first_newline if first_newline != -1 else size]
+    try:
+        natoms = int(header)
+    except ValueError:
+        return None
+    nlines_per_frame = natoms + 2
+
+    # offsets of the lines that are the first line of a frame, i.e. line numbers that
+    # are a multiple of the number of lines per frame
+    starts = [np.zeros(1, dtype=np.int64)]
+    nlines = 0
+    for chunk_start in range(0, size, chunk_size):
+        chunk = np.frombuffer(
+            mm,
+            dtype=np.uint8,
+            count=min(chunk_size, size - chunk_start),
+            offset=chunk_start,
+        )
+        newlines = np.flatnonzero(chunk == ord("\n"))
+        del chunk
+        line_numbers = np.arange(nlines + 1, nlines + 1 + len(newlines))
+        starts.append(
+            newlines[line_numbers % nlines_per_frame == 0].astype(np.int64)
+            + chunk_start
+            + 1
+        )
+        nlines += len(newlines)
+    # the last line does not end with a newline
+    if mm[size - 1 : size] != b"\n":
+        nlines += 1
+
+    starts = np.concatenate(starts)
+    nframes = nlines // nlines_per_frame
+    # anything after the last full frame has to be whitespace, otherwise the last frame is incomplete
+    # or the frames do not all have the same number of atoms
+    if len(starts) > nframes and mm[int(starts[nframes]) :].strip():
+        return None
+    offsets = starts[:nframes]
+
+    # check that every frame starts with the same number of atoms
+    # the header lines are compared as bytes first, only the ones that differ are parsed
+    expected = np.frombuffer(header + b"\n", dtype=np.uint8)
+    buffer = np.frombuffer(mm, dtype=np.uint8)
+    positions = np.minimum(offsets[:, np.newaxis] + np.arange(len(expected)), size - 1)
+    differs = np.flatnonzero(np.any(buffer[positions] != expected, axis=1))
+    del buffer
+    for i in differs:
+        start = int(offsets[i])
+        end = mm.find(b"\n", start)
+        try:
+            if int(mm[start : end if end != -1 else size]) != natoms:
+                return None
+        except ValueError:
+            return None
+
+    return offsets
+
+
+def _scan_frames(path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """Finds the byte offsets and number of atoms of the frames of any .xyz trajectory by going through
+    the file line by line. Lines that are not part of a frame (e.g. blank lines) are skipped."""
+    offsets = []
+    natoms = []
+    with open(path, "rb") as f:
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            # match the line containing the number of atoms in timestep
+            if re.match(rb"^\s*\d+", line):
+                offsets.append(offset)
+                natoms.append(int(line))
+                # skip the comment line and the atom lines
+                for _ in range(natoms[-1] + 1):
+                    f.readline()
+    return np.array(offsets, dtype=np.int64), np.array(natoms, dtype=np.int64)
+
+
+class TrajectoryIndex:
+    """
+    Index of the byte offsets at which the frames (timesteps) of an .xyz trajectory file start.
+    The index allows any frame or range of frames to be read from disk without reading the rest
+    of the file, which is needed for trajectories that are too large to be read into memory.
+
+    Building the index requires one pass over the file. The index can be saved next to the
+    trajectory file (see `from_file`), so that the next time it is loaded instead. A saved index is
+    only used if the size and modification time of the trajectory file are the ones it was built for.
+
+    :param path: The path to the .xyz trajectory file
+    :param offsets: The byte offset of the start of each frame
+    :param natoms: The number of atoms in each frame
+    :param file_size: The size of the trajectory file in bytes
+    :param mtime: The modification time of the trajectory file in nanoseconds
+    :param regular: Whether all frames have the same number of atoms and follow each other without
+        blank lines in between. Frames of such files are parsed in bulk.
+    """
+
+    _suffix = ".index.npz"
+
+    def __init__(
+        self,
+        path: Union[Path, str],
+        offsets: np.ndarray,
+        natoms: np.ndarray,
+        file_size: int,
+        mtime: int,
+        regular: bool,
+    ):
+        self.path = Path(path)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.natoms = np.asarray(natoms, dtype=np.int64)
+        self.file_size = int(file_size)
+        self.mtime = int(mtime)
+        self.regular = bool(regular)
+
+    @staticmethod
+    def index_path(path: Union[Path, str]) -> Path:
+        """Returns the path where the index of a trajectory file is saved."""
+        path = Path(path)
+        return path.with_name(path.name + TrajectoryIndex._suffix)
+
+    @classmethod
+    def build(
+        cls, path: Union[Path, str], chunk_size: int = 2**26
+    ) -> "TrajectoryIndex":
+        """Builds the index of a trajectory file by going over the file once.
+
+        :param path: The path to the .xyz trajectory file
+        :param chunk_size: The number of bytes that are searched for newlines at once
+        """
+        path = Path(path)
+        stat = path.stat()
+
+        offsets = None
+        if stat.st_size > 0:
+            with open(path, "rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mm:
+                offsets = _scan_regular_frames(mm, stat.st_size, chunk_size)
+
+        if offsets is not None:
+            with open(path, "rb") as f:
+                natoms = np.full(len(offsets), int(f.readline()), dtype=np.int64)
+            regular = True
+        else:
+            offsets, natoms = _scan_frames(path)
+            regular = False
+
+        return cls(path, offsets, natoms, stat.st_size, stat.st_mtime_ns, regular)
+
+    @classmethod
+    def load(cls, path: Union[Path, str]) -> Optional["TrajectoryIndex"]:
+        """Loads the saved index of a trajectory file. Returns None if there is no saved index or if
+        the trajectory file has been modified since the index was saved.
+
+        :param path: The path to the .xyz trajectory file (not the index file)
+        """
+        path = Path(path)
+        index_path = cls.index_path(path)
+        if not index_path.exists():
+            return None
+
+        stat = path.stat()
+        with np.load(index_path) as index:
+            if (
+                int(index["file_size"]) != stat.st_size
+                or int(index["mtime"]) != stat.st_mtime_ns
+            ):
+                return None
+            return cls(
+                path,
+                index["offsets"],
+                index["natoms"],
+                int(index["file_size"]),
+                int(index["mtime"]),
+                bool(index["regular"]),
+            )
+
+    def save(self):
+        """Saves the index next to the trajectory file."""
+        np.savez(
+            self.index_path(self.path),
+            offsets=self.offsets,
+            natoms=self.natoms,
+            file_size=self.file_size,
+            mtime=self.mtime,
+            regular=self.regular,
+        )
+
+    @classmethod
+    def from_file(cls, path: Union[Path, str], save: bool = False) -> "TrajectoryIndex":
+        """Loads the saved index of a trajectory file if it is up to date, otherwise builds it.
+
+        :param path: The path to the .xyz trajectory file
+        :param save: Whether to save a newly built index next to the trajectory file
+        """
+        index = cls.load(path)
+        if index is None:
+            index = cls.build(path)
+            if save:
+                index.save()
+        return index
+
+    def read(self, start: int, stop: int) -> Iterator[Tuple[List[str], np.ndarray]]:
+        """Reads the frames from `start` to `stop` (not included) from disk.
+
+        :param start: The index of the first frame to read
+        :param stop: The index of the frame to stop at
+        :return: Yields the atom types and an `n_frames` x `n_atoms` x `3` array of coordinates for each
+            block of consecutive frames which contain the same atoms.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if stop <= start:
+            return
+
+        begin = int(self.offsets[start])
+        end = int(self.offsets[stop]) if stop < len(self) else self.file_size
+        with open(self.path, "rb") as f:
+            f.seek(begin)
+            data = f.read(end - begin)
+
+        parsed = (
+            _parse_frames(data, stop - start, int(self.natoms[start]))
+            if self.regular
+            else None
+        )
+
+        if parsed is None:
+            for frame_start, frame_end, natoms in zip(
+                self.offsets[start:stop] - begin,
+                np.append(self.offsets[start + 1 : stop] - begin, len(data)),
+                self.natoms[start:stop],
+            ):
+                types, coordinates = _parse_frame(
+                    data[frame_start:frame_end], int(natoms)
+                )
+                yield types, coordinates[np.newaxis, ...]
+            return
+
+        types, coordinates = parsed
+        # split into blocks of frames that have the same atom types
+        changes = np.flatnonzero(np.any(types[1:] != types[:-1], axis=1)) + 1
+        for block_start, block_end in zip(
+            np.append(0, changes), np.append(changes, len(types))
+        ):
+            yield [ty.decode() for ty in types[block_start]], coordinates[
+                block_start:block_end
+            ]
+
+    def __len__(self) -> int:
+        """Returns the number of frames in the trajectory file."""
+        return len(self.offsets)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path: {self.path}, n_frames: {len(self)})"
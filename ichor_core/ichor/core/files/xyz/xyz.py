@@ -21,6 +21,8 @@ class XYZ(HasAtoms, ReadFile, WriteFile, File):
 
     _filetype = ".xyz"
 
+    _parsed_file_cache_attributes = ("atoms",)
+
     def __init__(self, path: Union[Path, str], atoms: Optional[Atoms] = None):
         File.__init__(self, path)
         self.atoms = atoms or FileContents
@@ -1,6 +1,22 @@
-from ichor.core.models.model import Model
-from ichor.core.models.model_with_gradient import ModelWithGradients
-from ichor.core.models.model_with_gradient_rbf_only import ModelWithGradientsRBF
-from ichor.core.models.models import Models
+from ichor.core.common.lazy_import import lazy_attributes
 
-__all__ = ["Model", "Models", "ModelWithGradients", "ModelWithGradientsRBF"]
+# the model classes are only imported when they are used, so that e.g. reading one model
+# does not import the modules needed to read and predict many models at once
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        "GroupedPredictor": "ichor.core.models.grouped_predictor",
+        "Model": "ichor.core.models.model",
+        "ModelWithGradients": "ichor.core.models.model_with_gradient",
+        "ModelWithGradientsRBF": "ichor.core.models.model_with_gradient_rbf_only",
+        "Models": "ichor.core.models.models",
+    },
+)
+
+__all__ = [
+    "Model",
+    "Models",
+    "ModelWithGradients",
+    "ModelWithGradientsRBF",
+    "GroupedPredictor",
+]
@@ -0,0 +1,172 @@
+import os
+import struct
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+
+# identifies the file as a binary model, followed by the version of the format
+_MAGIC = b"ICHORMDL"
+_VERSION = 1
+# magic, version, size and modification time (in ns) of the model file the binary model was written from,
+# length of the metadata, number of training points and number of features
+_HEADER = struct.Struct("<8sIQQQQQ")
+# the arrays start at a multiple of this offset, so that they are aligned when they are memory-mapped
+_ALIGNMENT = 64
+# the training inputs, training outputs and weights are written in this order as little endian float64 arrays
+_DTYPE = np.dtype("<f8")
+
+# binary models are written next to the model files, e.g. WATER_iqa_O1.model.bin next to WATER_iqa_O1.model
+BINARY_MODEL_SUFFIX = ".bin"
+
+# the text of the model file after which the training data starts, everything before it is the metadata
+_TRAINING_DATA_SECTION = "[training_data.x]"
+
+
+class BinaryModelContents(NamedTuple):
+    """The contents of a binary model. The metadata is the text of the model file before the training data
+    (which is parsed in the same way as the model file), the arrays are the training data and weights."""
+
+    metadata: str
+    x: np.ndarray
+    y: np.ndarray
+    weights: np.ndarray
+
+
+def binary_model_path(model_path: Union[Path, str]) -> Path:
+    """Returns the path of the binary model which belongs to a model file."""
+    model_path = Path(model_path)
+    return model_path.with_name(model_path.name + BINARY_MODEL_SUFFIX)
+
+
+def _data_offset(metadata_length: int) -> int:
+    """Returns the offset of the arrays, which start at the first aligned offset after the metadata."""
+    end = _HEADER.size + metadata_length
+    return -(-end // _ALIGNMENT) * _ALIGNMENT
+
+
+def _read_header(f) -> tuple:
+    magic, version, *header = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != _MAGIC:
+        raise ValueError(f"'{f.name}' is not a binary model.")
+    if version != _VERSION:
+        raise ValueError(f"Binary model version {version} is not supported.")
+    return tuple(header)
+
+
+def is_binary_model_current(model_path: Union[Path, str]) -> bool:
+    """Checks if the binary model of a model file exists and was written from the current version of the file.
+    The size and modification time of the model file are compared to the ones stored in the binary model
+    (in the same way as for `ichor.core.files.ParsedFileCache`), so binary models of model files which were
+    changed (or copied without their modification times) are not used.
+
+    :param model_path: The path of the model file
+    """
+
+    binary_path = binary_model_path(model_path)
+    try:
+        stat = os.stat(model_path)
+        with open(binary_path, "rb") as f:
+            source_size, source_mtime, *_ = _read_header(f)
+    except (OSError, ValueError, struct.error):
+        return False
+    return source_size == stat.st_size and source_mtime == stat.st_mtime_ns
+
+
+def read_binary_model(
+    path: Union[Path, str], mmap_mode: Optional[str] = None
+) -> BinaryModelContents:
+    """Reads a binary model. The arrays are read with one read of the file each (or memory-mapped),
+    instead of parsing one number at a time as for model files.
+
+    :param path: The path of the binary model
+    :param mmap_mode: The mode in which the arrays are memory-mapped (see `numpy.memmap`), defaults to None,
+        in which case the arrays are read into memory. Memory-mapped arrays keep the file open.
+    :return: The metadata text, training inputs (ntrain x nfeats), training outputs (ntrain x 1)
+        and weights (ntrain x 1) of the model
+    """
+
+    with open(path, "rb") as f:
+        _, _, metadata_length, ntrain, nfeats = _read_header(f)
+        metadata = f.read(metadata_length).decode()
+        offset = _data_offset(metadata_length)
+        count = ntrain * (nfeats + 2)
+
+        if mmap_mode is None:
+            f.seek(offset)
+            data = np.fromfile(f, dtype=_DTYPE, count=count)
+            if len(data) != count:
+                raise ValueError(f"Binary model '{path}' is incomplete.")
+        else:
+            data = np.memmap(
+                path, dtype=_DTYPE, mode=mmap_mode, offset=offset, shape=(count,)
+            )
+
+    x = data[: ntrain * nfeats].reshape(ntrain, nfeats)
+    y = data[ntrain * nfeats : ntrain * (nfeats + 1)].reshape(ntrain, 1)
+    weights = data[ntrain * (nfeats + 1) :].reshape(ntrain, 1)
+
+    return BinaryModelContents(metadata, x, y, weights)
+
+
+def _metadata_from_model_file(model_path: Path) -> str:
+    """Returns the text of a model file before its training data."""
+    metadata = []
+    with open(model_path, "r") as f:
+        for line in f:
+            if _TRAINING_DATA_SECTION in line:
+                break
+            metadata.append(line)
+    return "".join(metadata)
+
+
+def write_binary_model(
+    model: "ichor.core.models.Model",  # noqa F821
+    path: Optional[Union[Path, str]] = None,
+) -> Path:
+    """Writes the binary model of a model. If the model was read from a model file, the metadata of the file
+    is copied as is (so a model read from the binary model is the same as one read from the model file) and the
+    binary model is used instead of the file whenever the model is read, until the model file is changed.
+
+    :param model: The model to write
+    :param path: The path of the binary model, defaults to None, in which case the binary model
+        is written next to the model file (see `binary_model_path`)
+    :return: The path of the binary model
+    """
+
+    path = Path(path) if path is not None else binary_model_path(model.path)
+
+    model_path = Path(model.path)
+    if model_path.is_file():
+        metadata = _metadata_from_model_file(model_path)
+        stat = os.stat(model_path)
+        source_size, source_mtime = stat.st_size, stat.st_mtime_ns
+    else:
+        metadata = model._write_file(path).split(_TRAINING_DATA_SECTION)[0]
+        source_size, source_mtime = 0, 0
+
+    x = np.asarray(model.x, dtype=_DTYPE)
+    ntrain, nfeats = x.shape
+    encoded_metadata = metadata.encode()
+
+    # the binary model is written to a temporary file first, so a binary model is never left half written
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(
+            _HEADER.pack(
+                _MAGIC,
+                _VERSION,
+                source_size,
+                source_mtime,
+                len(encoded_metadata),
+                ntrain,
+                nfeats,
+            )
+        )
+        f.write(encoded_metadata)
+        f.write(b"\0" * (_data_offset(len(encoded_metadata)) - f.tell()))
+        for array in (x, model.y, model.weights):
+            f.write(np.ascontiguousarray(array, dtype=_DTYPE).tobytes())
+    os.replace(tmp_path, path)
+
+    return path
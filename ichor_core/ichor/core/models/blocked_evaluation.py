@@ -0,0 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import numpy as np
+from ichor.core.models.kernels.kernel import Kernel
+
+# the default number of bytes which the temporary arrays made to predict one block of test points can use (1 GiB)
+DEFAULT_MEMORY_BUDGET = 2**30
+
+
+def blocks_of_test_points(
+    ntest: int,
+    bytes_per_test_point: int,
+    memory_budget: Optional[int] = None,
+    ncores: int = 1,
+    block_size: Optional[int] = None,
+) -> List[slice]:
+    """Splits the test points into blocks, so that the arrays made for the blocks which are calculated at once
+    (one block for every thread) fit into the memory budget.
+
+    :param ntest: The number of test points
+    :param bytes_per_test_point: The number of bytes of the temporary arrays made for one test point
+    :param memory_budget: The number of bytes which all threads can use, defaults to None,
+        in which case `DEFAULT_MEMORY_BUDGET` is used
+    :param ncores: The number of threads in which the blocks are calculated, defaults to 1
+    :param block_size: The number of test points in every block, defaults to None, in which case
+        it is calculated from the memory budget
+    :return: A list of slices of the test points in every block
+    """
+
+    if block_size is None:
+        memory_budget = memory_budget or DEFAULT_MEMORY_BUDGET
+        block_size = max(1, memory_budget // (ncores * bytes_per_test_point))
+
+    # there is always at least one (possibly empty) block, so that results for no test points can be returned
+    return [
+        slice(start, start + block_size)
+        for start in range(0, max(ntest, 1), block_size)
+    ]
+
+
+def map_test_blocks(
+    func: Callable[[np.ndarray], np.ndarray],
+    x_test: np.ndarray,
+    bytes_per_test_point: int,
+    memory_budget: Optional[int] = None,
+    ncores: int = 1,
+    block_size: Optional[int] = None,
+) -> list:
+    """Applies a function to blocks of test points and returns the results for all blocks in order.
+    The blocks can be calculated in a pool of threads, because NumPy releases the GIL in the
+    matrix products, exponentials and sums which take most of the time of calculating kernels.
+
+    :param func: A function which is applied to one block of test points (an array of shape n_block x n_features)
+    :param x_test: The test points, an array of shape n_test x n_features
+    :param bytes_per_test_point: The number of bytes of the temporary arrays made by `func` for one test point
+    :param memory_budget: The number of bytes which all threads can use, see `blocks_of_test_points`
+    :param ncores: The number of threads in which the blocks are calculated, defaults to 1
+    :param block_size: The number of test points in every block, see `blocks_of_test_points`
+    :return: A list of the results of `func` for every block
+    """
+
+    blocks = blocks_of_test_points(
+        len(x_test), bytes_per_test_point, memory_budget, ncores, block_size
+    )
+
+    if ncores == 1 or len(blocks) == 1:
+        return [func(x_test[block]) for block in blocks]
+
+    with ThreadPoolExecutor(max_workers=ncores) as executor:
+        return list(executor.map(lambda block: func(x_test[block]), blocks))
+
+
+def train_test_covariance(
+    kernel: Kernel,
+    x_train: np.ndarray,
+    x_test: np.ndarray,
+    memory_budget: Optional[int] = None,
+) -> np.ndarray:
+    """Returns the n_train by n_test covariance matrix, calculated for blocks of training points if the
+    (n_train x n_test x n_features) difference arrays made by kernels do not fit into the memory budget.
+
+    :param kernel: The kernel of the model
+    :param x_train: The training points, an array of shape n_train x n_features
+    :param x_test: The test points, an array of shape n_test x n_features
+    :param memory_budget: The number of bytes the difference arrays can use, defaults to None,
+        in which case `DEFAULT_MEMORY_BUDGET` is used
+    """
+
+    memory_budget = memory_budget or DEFAULT_MEMORY_BUDGET
+    bytes_per_train_point = 8 * max(1, len(x_test) * x_train.shape[-1])
+    ntrain_block = max(1, memory_budget // bytes_per_train_point)
+
+    if ntrain_block >= len(x_train):
+        return kernel.r(x_train, x_test)
+
+    covariance = np.empty((len(x_train), len(x_test)))
+    for start in range(0, len(x_train), ntrain_block):
+        covariance[start : start + ntrain_block] = kernel.r(
+            x_train[start : start + ntrain_block], x_test
+        )
+
+    return covariance
@@ -1,362 +1,148 @@
+from typing import Tuple
+
 import numpy as np
 from ichor.core.models.fflux_derivative_helper_functions import *
 
 
-def fflux_predict_value(model_inst, test_x_features):
-
-    x_train_array = model_inst.x
-    weights = model_inst.weights.flatten()
-
-    kernels = model_inst.kernel
-    rbf_thetas = kernels.k1._thetas
-    periodic_thetas = kernels.k2._thetas
-
-    n_train = x_train_array.shape[0]
-    n_features = x_train_array.shape[1]
-
-    # make sure thetas are ordered correctly (cannot concat rbf thetas
-    # to periodic thetas because it leads to wrong indexing)
-    # first five thetas are for rbf dimensions (because non cyclic),
-    # then 6th (5th index) is a phi dimension, then two rbf, then periodic and so on
-    thetas = []
-    rbf_idx = 0
-    periodic_idx = 0
-    for i in range(n_features):
-        if ((i + 1) % 3) == 0 and i != 2:
-            thetas.append(periodic_thetas[periodic_idx])
-            periodic_idx += 1
-        else:
-            thetas.append(rbf_thetas[rbf_idx])
-            rbf_idx += 1
-    thetas = np.array(thetas)
-
-    Q_est = 0.0
-    dQ_df = np.zeros(n_features)
-    dQ_df_temp = np.zeros(n_features)
-
-    for j in range(n_train):
-
-        expo = 0.0
-
-        for h in range(n_features):
-
-            fdiff = x_train_array[j, h] - test_x_features[h]
-
-            # if phi dimension, then use periodic kernel
-            if ((h + 1) % 3) == 0 and h != 2:
-
-                # 4.0 because we use 1/(2*l^2), for every kernel.
-                # For the periodic kernel, there is no 2 in the definition
-                # gpytorch only divided by lambda (which is equal to l^2)
-                expo = expo + 4.0 * thetas[h] * np.sin((fdiff / 2.0)) ** 2
-                dQ_df_temp[h] = (
-                    weights[j]
-                    * (-4.0)
-                    * thetas[h]
-                    * sign_j(fdiff)
-                    * np.sin(abs(fdiff) / 2.0)
-                    * np.cos(abs(fdiff) / 2.0)
-                )
-
-            # if not phi dimension, use rbf kernel
-            else:
-
-                expo = expo + thetas[h] * fdiff * fdiff
-
-                dQ_df_temp[h] = (
-                    weights[j] * sign_j(fdiff) * -2.0 * thetas[h] * abs(fdiff)
-                )
-
-        expo = np.exp(-expo)
-
-        Q_est = Q_est + weights[j] * expo
-
-        dQ_df_temp = expo * dQ_df_temp
-
-        dQ_df = dQ_df + dQ_df_temp
-
-    Q_est = Q_est + model_inst.mean.value(np.zeros((1, 1)))
-    Q_est = Q_est.item()
-
-    return Q_est, dQ_df
-
-
-def fflux_predict_value_rbf_only(model_inst, test_x_features):
+def _fflux_periodic_dimensions(n_features: int) -> np.ndarray:
+    """Returns a boolean mask of the features which use the periodic kernel in FFLUX. These are
+    the phi features, i.e. every third feature starting from the 6th (5th index) feature."""
+    feature_indices = np.arange(n_features)
+    return ((feature_indices + 1) % 3 == 0) & (feature_indices != 2)
 
-    x_train_array = model_inst.x
-    weights = model_inst.weights.flatten()
 
-    kernels = model_inst.kernel
-    rbf_thetas = kernels._thetas
+def _fflux_training_arrays(model_inst, rbf_only: bool = False) -> dict:
+    """Returns the arrays of a model which are needed to make FFLUX predictions. The thetas of the rbf and
+    periodic kernels are merged in the order of the features, and the training data is scaled by the thetas
+    (or converted to sines and cosines for the periodic dimensions), so that the predictions for many test
+    points can be calculated with matrix products. The arrays are cached on the model, so they are only
+    calculated once.
 
-    n_train = x_train_array.shape[0]
-    n_features = x_train_array.shape[1]
-
-    # make sure thetas are ordered correctly
-    # (cannot concat rbf thetas to periodic thetas because it leads to wrong indexing)
-    # first five thetas are for rbf dimensions (because non cyclic),
-    # then 6th (5th index) is a phi dimension, then two rbf, then periodic and so on
-    thetas = np.array(rbf_thetas)
-
-    Q_est = 0.0
-    dQ_df = np.zeros(n_features)
-    dQ_df_temp = np.zeros(n_features)
-
-    for j in range(n_train):
-
-        expo = 0.0
-
-        for h in range(n_features):
-
-            fdiff = x_train_array[j, h] - test_x_features[h]
-            # use rbf for all dimensions
-            expo = expo + thetas[h] * fdiff * fdiff
-
-            dQ_df_temp[h] = weights[j] * sign_j(fdiff) * -2.0 * thetas[h] * abs(fdiff)
-
-        expo = np.exp(-expo)
-
-        Q_est = Q_est + weights[j] * expo
-
-        dQ_df_temp = expo * dQ_df_temp
+    :param model_inst: A `Model` instance
+    :param rbf_only: Whether the rbf kernel is used for all features (instead of the periodic kernel
+        being used for the phi features)
+    """
 
-        dQ_df = dQ_df + dQ_df_temp
+    def calculate():
 
-    Q_est = Q_est + model_inst.mean.value(np.zeros((1, 1)))
-    Q_est = Q_est.item()
+        x_train = np.asarray(model_inst.x, dtype=float)
+        n_features = x_train.shape[1]
 
-    return Q_est, dQ_df
+        if rbf_only:
+            periodic = np.zeros(n_features, dtype=bool)
+            thetas = np.array(model_inst.kernel._thetas, dtype=float)
+        else:
+            # make sure thetas are ordered correctly (cannot concat rbf thetas
+            # to periodic thetas because it leads to wrong indexing)
+            periodic = _fflux_periodic_dimensions(n_features)
+            thetas = np.empty(n_features)
+            thetas[~periodic] = model_inst.kernel.k1._thetas
+            thetas[periodic] = model_inst.kernel.k2._thetas
+
+        rbf_thetas = thetas[~periodic]
+        scaled_x_train = x_train[:, ~periodic] * np.sqrt(rbf_thetas)
+
+        return {
+            "periodic": periodic,
+            "rbf_thetas": rbf_thetas,
+            "periodic_thetas": thetas[periodic],
+            "weights": np.asarray(model_inst.weights, dtype=float).flatten(),
+            "x_train_rbf": x_train[:, ~periodic],
+            "scaled_x_train": scaled_x_train,
+            "scaled_x_train_squared": np.sum(scaled_x_train**2, axis=1),
+            "sin_x_train": np.sin(x_train[:, periodic]),
+            "cos_x_train": np.cos(x_train[:, periodic]),
+            "mean": model_inst.mean.value(np.zeros((1, 1))).item(),
+        }
+
+    return model_inst._cached(("fflux", rbf_only), calculate)
+
+
+def fflux_predict_values(
+    model_inst, test_x_features: np.ndarray, rbf_only: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Predicts the values and the derivatives of the predictions with respect to the features
+    for many test points at once, as done in FFLUX.
 
+    .. note::
+        For the periodic kernel, 4.0 * theta * sin(fdiff / 2) ** 2 is used because we use 1/(2*l^2),
+        for every kernel. For the periodic kernel, there is no 2 in the definition gpytorch only divided
+        by lambda (which is equal to l^2). Both exponents are expanded into matrix products with the
+        training data, so the test points are not looped over.
+
+    :param model_inst: A `Model` instance
+    :param test_x_features: An `n_test` x `n_features` array of features (a 1D array is one test point)
+    :param rbf_only: Whether the rbf kernel is used for all features (instead of the periodic kernel
+        being used for the phi features)
+    :return: A tuple of an `n_test` array of predictions and an `n_test` x `n_features` array of the
+        derivatives of the predictions with respect to the features (dQ/df)
+    """
 
-def fflux_derivs(iatm_idx, jatm_idx, atoms_instance, system_alf, model_inst):
+    arrays = _fflux_training_arrays(model_inst, rbf_only)
+    periodic = arrays["periodic"]
 
-    dQ_dx = 0.0
-    dQ_dy = 0.0
-    dQ_dz = 0.0
+    test_x_features = np.asarray(test_x_features, dtype=float)
+    if test_x_features.ndim == 1:
+        test_x_features = test_x_features[np.newaxis, :]
 
-    C = atoms_instance[jatm_idx].C(system_alf)
-    jatm_features = atoms_instance[jatm_idx].features(
-        calculate_alf_features, system_alf
+    # rbf dimensions, theta * fdiff ** 2 expanded as a matrix product
+    test_x_rbf = test_x_features[:, ~periodic]
+    scaled_x_test = test_x_rbf * np.sqrt(arrays["rbf_thetas"])
+    expo = (
+        arrays["scaled_x_train_squared"][np.newaxis, :]
+        + np.sum(scaled_x_test**2, axis=1)[:, np.newaxis]
+        - 2.0 * scaled_x_test @ arrays["scaled_x_train"].T
     )
 
-    Q_pred, dQ_df = fflux_predict_value(model_inst, jatm_features)
-
-    # feature 1
-    df_da = dR_da(
-        jatm_idx, system_alf[jatm_idx][1], 0, iatm_idx, atoms_instance, system_alf
+    # periodic dimensions, 4.0 * theta * sin(fdiff / 2) ** 2 = 2.0 * theta * (1 - cos(fdiff))
+    periodic_thetas = arrays["periodic_thetas"]
+    sin_x_test = np.sin(test_x_features[:, periodic])
+    cos_x_test = np.cos(test_x_features[:, periodic])
+    expo += 2.0 * np.sum(periodic_thetas) - 2.0 * (
+        (cos_x_test * periodic_thetas) @ arrays["cos_x_train"].T
+        + (sin_x_test * periodic_thetas) @ arrays["sin_x_train"].T
     )
-    dQ_dx = dQ_dx + dQ_df[0] * df_da[0]
-    dQ_dy = dQ_dy + dQ_df[0] * df_da[1]
-    dQ_dz = dQ_dz + dQ_df[0] * df_da[2]
 
-    # feature 2
-    df_da = dR_da(
-        jatm_idx, system_alf[jatm_idx][2], 1, iatm_idx, atoms_instance, system_alf
+    weighted_expo = np.exp(-expo) * arrays["weights"]
+    Q_est = np.sum(weighted_expo, axis=1)
+
+    # the derivative of the rbf kernel is 2.0 * theta * fdiff,
+    # the derivative of the periodic kernel is 2.0 * theta * sin(fdiff)
+    # where fdiff = x_train - x_test
+    dQ_df = np.empty_like(test_x_features)
+    dQ_df[:, ~periodic] = (
+        2.0
+        * arrays["rbf_thetas"]
+        * (weighted_expo @ arrays["x_train_rbf"] - Q_est[:, np.newaxis] * test_x_rbf)
     )
-    dQ_dx = dQ_dx + dQ_df[1] * df_da[0]
-    dQ_dy = dQ_dy + dQ_df[1] * df_da[1]
-    dQ_dz = dQ_dz + dQ_df[1] * df_da[2]
-
-    # feature 3
-    df_da = dChi_da(jatm_idx, iatm_idx, atoms_instance, system_alf)
-    dQ_dx = dQ_dx + dQ_df[2] * df_da[0]
-    dQ_dy = dQ_dy + dQ_df[2] * df_da[1]
-    dQ_dz = dQ_dz + dQ_df[2] * df_da[2]
-
-    # non-alf atoms
-    local_non_alf_atoms = [
-        i for i in range(len(atoms_instance)) if i not in system_alf[jatm_idx]
-    ]
-
-    feat_idx = 3
-    for k in range(len(atoms_instance) - 3):
-        diff = (
-            atoms_instance[local_non_alf_atoms[k]].coordinates
-            - atoms_instance[jatm_idx].coordinates
-        )
-
-        # R
-        df_da = dR_da(
-            jatm_idx,
-            local_non_alf_atoms[k],
-            feat_idx,
-            iatm_idx,
-            atoms_instance,
-            system_alf,
-        )
-        dQ_dx = dQ_dx + dQ_df[feat_idx] * df_da[0]
-        dQ_dy = dQ_dy + dQ_df[feat_idx] * df_da[1]
-        dQ_dz = dQ_dz + dQ_df[feat_idx] * df_da[2]
-
-        feat_idx += 1
-
-        zetas = np.dot(C, diff)
-        zeta1 = zetas[0]
-        zeta2 = zetas[1]
-        zeta3 = zetas[2]
-
-        # Theta
-        df_da = dTheta_da(
-            jatm_idx,
-            local_non_alf_atoms[k],
-            feat_idx,
-            zeta3,
-            iatm_idx,
-            atoms_instance,
-            system_alf,
-        )
-        dQ_dx = dQ_dx + dQ_df[feat_idx] * df_da[0]
-        dQ_dy = dQ_dy + dQ_df[feat_idx] * df_da[1]
-        dQ_dz = dQ_dz + dQ_df[feat_idx] * df_da[2]
-
-        feat_idx += 1
-
-        # Phi
-        df_da = dPhi_da(
-            jatm_idx,
-            local_non_alf_atoms[k],
-            zeta1,
-            zeta2,
-            feat_idx,
-            iatm_idx,
-            atoms_instance,
-            system_alf,
+    dQ_df[:, periodic] = (
+        2.0
+        * periodic_thetas
+        * (
+            (weighted_expo @ arrays["sin_x_train"]) * cos_x_test
+            - (weighted_expo @ arrays["cos_x_train"]) * sin_x_test
         )
-        dQ_dx = dQ_dx + dQ_df[feat_idx] * df_da[0]
-        dQ_dy = dQ_dy + dQ_df[feat_idx] * df_da[1]
-        dQ_dz = dQ_dz + dQ_df[feat_idx] * df_da[2]
-
-        feat_idx += 1
-
-    return np.array([dQ_dx, dQ_dy, dQ_dz])
-
-
-def fflux_derivs_rbf_only(iatm_idx, jatm_idx, atoms_instance, system_alf, model_inst):
-
-    dQ_dx = 0.0
-    dQ_dy = 0.0
-    dQ_dz = 0.0
-
-    C = atoms_instance[jatm_idx].C(system_alf)
-    jatm_features = atoms_instance[jatm_idx].features(
-        calculate_alf_features, system_alf
     )
 
-    Q_pred, dQ_df = fflux_predict_value_rbf_only(model_inst, jatm_features)
+    return Q_est + arrays["mean"], dQ_df
 
-    # feature 1
-    df_da = dR_da(
-        jatm_idx, system_alf[jatm_idx][1], 0, iatm_idx, atoms_instance, system_alf
-    )
-    dQ_dx = dQ_dx + dQ_df[0] * df_da[0]
-    dQ_dy = dQ_dy + dQ_df[0] * df_da[1]
-    dQ_dz = dQ_dz + dQ_df[0] * df_da[2]
 
-    # feature 2
-    df_da = dR_da(
-        jatm_idx, system_alf[jatm_idx][2], 1, iatm_idx, atoms_instance, system_alf
-    )
-    dQ_dx = dQ_dx + dQ_df[1] * df_da[0]
-    dQ_dy = dQ_dy + dQ_df[1] * df_da[1]
-    dQ_dz = dQ_dz + dQ_df[1] * df_da[2]
-
-    # feature 3
-    df_da = dChi_da(jatm_idx, iatm_idx, atoms_instance, system_alf)
-    dQ_dx = dQ_dx + dQ_df[2] * df_da[0]
-    dQ_dy = dQ_dy + dQ_df[2] * df_da[1]
-    dQ_dz = dQ_dz + dQ_df[2] * df_da[2]
-
-    # non-alf atoms
-    local_non_alf_atoms = [
-        i for i in range(len(atoms_instance)) if i not in system_alf[jatm_idx]
-    ]
-
-    feat_idx = 3
-    for k in range(len(atoms_instance) - 3):
-        diff = (
-            atoms_instance[local_non_alf_atoms[k]].coordinates
-            - atoms_instance[jatm_idx].coordinates
-        )
-
-        # R
-        df_da = dR_da(
-            jatm_idx,
-            local_non_alf_atoms[k],
-            feat_idx,
-            iatm_idx,
-            atoms_instance,
-            system_alf,
-        )
-        dQ_dx = dQ_dx + dQ_df[feat_idx] * df_da[0]
-        dQ_dy = dQ_dy + dQ_df[feat_idx] * df_da[1]
-        dQ_dz = dQ_dz + dQ_df[feat_idx] * df_da[2]
-
-        feat_idx += 1
-
-        zetas = np.dot(C, diff)
-        zeta1 = zetas[0]
-        zeta2 = zetas[1]
-        zeta3 = zetas[2]
-
-        # Theta
-        df_da = dTheta_da(
-            jatm_idx,
-            local_non_alf_atoms[k],
-            feat_idx,
-            zeta3,
-            iatm_idx,
-            atoms_instance,
-            system_alf,
-        )
-        dQ_dx = dQ_dx + dQ_df[feat_idx] * df_da[0]
-        dQ_dy = dQ_dy + dQ_df[feat_idx] * df_da[1]
-        dQ_dz = dQ_dz + dQ_df[feat_idx] * df_da[2]
-
-        feat_idx += 1
-
-        # Phi
-        df_da = dPhi_da(
-            jatm_idx,
-            local_non_alf_atoms[k],
-            zeta1,
-            zeta2,
-            feat_idx,
-            iatm_idx,
-            atoms_instance,
-            system_alf,
-        )
-        dQ_dx = dQ_dx + dQ_df[feat_idx] * df_da[0]
-        dQ_dy = dQ_dy + dQ_df[feat_idx] * df_da[1]
-        dQ_dz = dQ_dz + dQ_df[feat_idx] * df_da[2]
-
-        feat_idx += 1
-
-    return np.array([dQ_dx, dQ_dy, dQ_dz])
+def fflux_predict_value(model_inst, test_x_features):
+    """Predicts the value and the derivatives of the prediction with respect to the features
+    for one test point, using the rbf kernel for non-phi features and the periodic kernel for phi features."""
 
+    Q_est, dQ_df = fflux_predict_values(model_inst, test_x_features)
 
-def fflux_derivs_rbf_only_one_dimensional(
-    iatm_idx, jatm_idx, atoms_instance, system_alf, model_inst
-):
+    return Q_est.item(), dQ_df[0]
 
-    dQ_dx = 0.0
-    dQ_dy = 0.0
-    dQ_dz = 0.0
 
-    jatm_features = atoms_instance[jatm_idx].features(
-        calculate_alf_features, system_alf
-    )
-
-    Q_pred, dQ_df = fflux_predict_value_rbf_only(model_inst, jatm_features)
+def fflux_predict_value_rbf_only(model_inst, test_x_features):
+    """Predicts the value and the derivatives of the prediction with respect to the features
+    for one test point, using the rbf kernel for all features."""
 
-    # feature 1
-    df_da = dR_da(
-        jatm_idx, system_alf[jatm_idx][1], 0, iatm_idx, atoms_instance, system_alf
-    )
-    dQ_dx = dQ_dx + dQ_df[0] * df_da[0]
-    dQ_dy = dQ_dy + dQ_df[0] * df_da[1]
-    dQ_dz = dQ_dz + dQ_df[0] * df_da[2]
+    Q_est, dQ_df = fflux_predict_values(model_inst, test_x_features, rbf_only=True)
 
-    return np.array([dQ_dx, dQ_dy, dQ_dz])
+    return Q_est.item(), dQ_df[0]
 
 
 def fflux_derivs_da_df_matrix(jatm_idx, iatm_idx, atoms_instance, system_alf):
@@ -1,7 +1,10 @@
-from typing import List
+import warnings
+from typing import List, Optional, Sequence
 
 import numpy as np
 from ichor.core.atoms import ALF, Atoms
+from ichor.core.common.constants import ang2bohr
+from ichor.core.common.units import AtomicDistance
 from ichor.core.models.calculate_fflux_derivatives import fflux_derivs_da_df_matrix
 
 # TODO: Add method that converts back to Cartesian coordinates.
@@ -186,6 +189,186 @@ def b_matrix_true_finite_differences(atoms, system_alf, central_atom_idx=0, h=1e
     return analytical, finite_differences
 
 
+def _unit_vectors_with_derivatives(vectors: np.ndarray):
+    """Returns the unit vectors of an `n` x 3 array of vectors, as well as the `n` x 3 x 3
+    derivatives of the unit vectors with respect to the (unnormalized) vectors."""
+    norms = np.linalg.norm(vectors, axis=-1)
+    unit_vectors = vectors / norms[:, np.newaxis]
+    derivatives = (
+        np.eye(3) - unit_vectors[:, :, np.newaxis] * unit_vectors[:, np.newaxis, :]
+    ) / norms[:, np.newaxis, np.newaxis]
+    return unit_vectors, derivatives
+
+
+def _cross_product_matrices(vectors: np.ndarray) -> np.ndarray:
+    """Returns the `n` x 3 x 3 matrices which give the cross product a x b when multiplied by b."""
+    matrices = np.zeros(vectors.shape + (3,))
+    matrices[:, 0, 1], matrices[:, 0, 2] = -vectors[:, 2], vectors[:, 1]
+    matrices[:, 1, 0], matrices[:, 1, 2] = vectors[:, 2], -vectors[:, 0]
+    matrices[:, 2, 0], matrices[:, 2, 1] = -vectors[:, 1], vectors[:, 0]
+    return matrices
+
+
+def form_b_matrices(
+    coordinates: np.ndarray,
+    system_alf: List["ALF"],  # noqa F821
+    central_atom_indices: Optional[Sequence[int]] = None,
+    coordinates_unit: AtomicDistance = AtomicDistance.Angstroms,
+) -> np.ndarray:
+    r"""Calculates the Wilson B matrices of many central atoms for a whole batch of geometries at once.
+    The B matrices are the same as the ones given by `form_b_matrix`, however the derivatives of the
+    features are calculated analytically for all geometries in one NumPy pass, instead of looping over
+    atoms in Python for every geometry.
+
+    The derivatives are calculated with the chain rule from the derivatives of the rows of the C matrix
+    with respect to the x-axis and xy-plane vectors, so the columns of the B matrices are in the original
+    ordering of the atoms (as with `form_b_matrix`).
+
+    :param coordinates: A numpy array of shape `n_geometries` x `n_atoms` x `3` containing the Cartesian
+        coordinates of every geometry. A 2D `n_atoms` x `3` array is treated as one geometry.
+    :param system_alf: The system alf as a list of `ALF` instances (0-indexed)
+    :param central_atom_indices: The indices (0-indexed) of the central atoms for which to calculate
+        B matrices. If None, the B matrices of all atoms are calculated.
+    :param coordinates_unit: The units of the given coordinates. The default is Angstroms.
+        The B matrices are always calculated in Bohr, because the forces are per Bohr.
+
+    :return: A numpy array of shape `len(central_atom_indices)` x `n_geometries` x `n_features` x
+        `3*n_atoms` containing :math:`\frac{df_i}{dx_j}` for every central atom and geometry.
+    """
+
+    coordinates = np.asarray(coordinates, dtype=float)
+    if coordinates.ndim == 2:
+        coordinates = coordinates[np.newaxis, ...]
+    # make sure the coords are in Bohr because forces are calculated per Bohr
+    if coordinates_unit is AtomicDistance.Angstroms:
+        coordinates = coordinates * ang2bohr
+
+    ngeometries, natoms = coordinates.shape[:2]
+    if central_atom_indices is None:
+        central_atom_indices = range(natoms)
+    nfeatures = 3 * natoms - 6 if natoms > 2 else 1
+
+    # the last two dimensions are the atoms and x,y,z, so that derivatives can be added per atom
+    b_matrices = np.zeros(
+        (len(central_atom_indices), ngeometries, nfeatures, natoms, 3)
+    )
+
+    for i, central_atom_idx in enumerate(central_atom_indices):
+        alf = system_alf[central_atom_idx]
+        b_matrix = b_matrices[i]
+
+        # derivatives wrt. the x-axis vector (and xy-plane vector) are added to the x-axis atom
+        # (and xy-plane atom) and subtracted from the central atom
+        def add_derivatives(feature_idx, atom_idx, derivatives):
+            b_matrix[:, feature_idx, atom_idx] += derivatives
+            b_matrix[:, feature_idx, central_atom_idx] -= derivatives
+
+        x_axis_diff = coordinates[:, alf[1]] - coordinates[:, central_atom_idx]
+        row1, drow1_dx_axis = _unit_vectors_with_derivatives(x_axis_diff)
+
+        # first feature is the distance to the x-axis atom
+        add_derivatives(0, alf[1], row1)
+        if natoms == 2:
+            continue
+
+        # second and third features are the distance to the xy-plane atom and the valence angle
+        xy_plane_diff = coordinates[:, alf[2]] - coordinates[:, central_atom_idx]
+        xy_plane_unit, dxy_plane_unit = _unit_vectors_with_derivatives(xy_plane_diff)
+        add_derivatives(1, alf[2], xy_plane_unit)
+
+        cos_angle = np.einsum("ij,ij->i", row1, xy_plane_unit)
+        dangle_dcos = -1.0 / np.sqrt(1.0 - cos_angle**2)
+        add_derivatives(
+            2,
+            alf[1],
+            dangle_dcos[:, np.newaxis]
+            * np.einsum("ij,ijk->ik", xy_plane_unit, drow1_dx_axis),
+        )
+        add_derivatives(
+            2,
+            alf[2],
+            dangle_dcos[:, np.newaxis] * np.einsum("ij,ijk->ik", row1, dxy_plane_unit),
+        )
+        if natoms == 3:
+            continue
+
+        # derivatives of the second and third rows of the C matrix wrt. the x-axis and xy-plane vectors
+        x_axis_dot = np.einsum("ij,ij->i", x_axis_diff, x_axis_diff)
+        x_axis_dot_xy_plane = np.einsum("ij,ij->i", x_axis_diff, xy_plane_diff)
+        sigma_fflux = -x_axis_dot_xy_plane / x_axis_dot
+        y_vec = sigma_fflux[:, np.newaxis] * x_axis_diff + xy_plane_diff
+        row2, drow2_dy_vec = _unit_vectors_with_derivatives(y_vec)
+
+        dsigma_dx_axis = (
+            -xy_plane_diff / x_axis_dot[:, np.newaxis]
+            + 2.0 * (x_axis_dot_xy_plane / x_axis_dot**2)[:, np.newaxis] * x_axis_diff
+        )
+        dy_vec_dx_axis = sigma_fflux[:, np.newaxis, np.newaxis] * np.eye(3) + (
+            x_axis_diff[:, :, np.newaxis] * dsigma_dx_axis[:, np.newaxis, :]
+        )
+        dy_vec_dxy_plane = (
+            np.eye(3)
+            - x_axis_diff[:, :, np.newaxis]
+            * x_axis_diff[:, np.newaxis, :]
+            / x_axis_dot[:, np.newaxis, np.newaxis]
+        )
+        drow2_dx_axis = drow2_dy_vec @ dy_vec_dx_axis
+        drow2_dxy_plane = drow2_dy_vec @ dy_vec_dxy_plane
+
+        # the third row is the cross product of the first two rows
+        row1_cross, row2_cross = (
+            _cross_product_matrices(row1),
+            _cross_product_matrices(row2),
+        )
+        drow3_dx_axis = row1_cross @ drow2_dx_axis - row2_cross @ drow1_dx_axis
+        drow3_dxy_plane = row1_cross @ drow2_dxy_plane
+
+        c_matrices = np.stack((row1, row2, np.cross(row1, row2)), axis=1)
+        dc_dx_axis = np.stack((drow1_dx_axis, drow2_dx_axis, drow3_dx_axis), axis=1)
+        dc_dxy_plane = np.stack(
+            (np.zeros_like(drow1_dx_axis), drow2_dxy_plane, drow3_dxy_plane), axis=1
+        )
+
+        # the remaining atoms are described by r, theta, phi of their position in the local frame (zeta)
+        non_local_atoms = [j for j in range(natoms) if j not in alf]
+        r_vect = coordinates[:, non_local_atoms] - coordinates[:, np.newaxis, alf[0]]
+        r_norm = np.linalg.norm(r_vect, axis=-1)
+        zeta = np.einsum("tij,tkj->tki", c_matrices, r_vect)
+
+        # derivatives of zeta (and r) wrt. the x-axis vector, xy-plane vector and the vector to the atom
+        zeta_derivatives = {
+            alf[1]: np.einsum("tkj,tijl->tkil", r_vect, dc_dx_axis),
+            alf[2]: np.einsum("tkj,tijl->tkil", r_vect, dc_dxy_plane),
+            None: np.broadcast_to(c_matrices[:, np.newaxis], zeta.shape + (3,)),
+        }
+        dr_dr_vect = r_vect / r_norm[..., np.newaxis]
+
+        cos_theta = zeta[..., 2] / r_norm
+        dtheta_dcos = -1.0 / np.sqrt(1.0 - cos_theta**2)
+        xy_norm_squared = zeta[..., 0] ** 2 + zeta[..., 1] ** 2
+
+        for atom_idx, dzeta in zeta_derivatives.items():
+            dr = dr_dr_vect if atom_idx is None else 0.0
+            dr_features = np.broadcast_to(dr, r_vect.shape)
+            dtheta = (dtheta_dcos / r_norm)[..., np.newaxis] * (
+                dzeta[..., 2, :] - cos_theta[..., np.newaxis] * dr
+            )
+            dphi = (
+                zeta[..., 0, np.newaxis] * dzeta[..., 1, :]
+                - zeta[..., 1, np.newaxis] * dzeta[..., 0, :]
+            ) / xy_norm_squared[..., np.newaxis]
+
+            for k, non_local_atm in enumerate(non_local_atoms):
+                # the derivatives wrt. the vector to the atom are for the atom itself
+                target_atom = non_local_atm if atom_idx is None else atom_idx
+                for feature_idx, derivatives in zip(
+                    range(3 + 3 * k, 6 + 3 * k), (dr_features, dtheta, dphi)
+                ):
+                    add_derivatives(feature_idx, target_atom, derivatives[:, k])
+
+    return b_matrices.reshape(b_matrices.shape[:3] + (3 * natoms,))
+
+
 def form_g_matrix(b_matrix: np.ndarray):
     """Forms the G matrix as in Gaussian.
 
@@ -214,8 +397,23 @@ def form_g_inverse(g_matrix: np.ndarray):
     return g_inv
 
 
+def _warn_unused_alf_arguments(func_name: str, system_alf, central_atom_idx):
+    """Warns that the ALF and central atom passed to a force conversion are not used. The columns of the
+    B matrix are in the original ordering of the atoms, so the forces no longer need to be reordered with them."""
+    if system_alf is not None or central_atom_idx is not None:
+        warnings.warn(
+            f"The 'system_alf' and 'central_atom_idx' arguments of '{func_name}' are not used "
+            "and will be removed, the forces are converted with the B matrix only.",
+            DeprecationWarning,
+            stacklevel=3,
+        )
+
+
 def convert_to_feature_forces(
-    global_cartesian_forces: np.ndarray, b_matrix, system_alf, central_atom_idx
+    global_cartesian_forces: np.ndarray,
+    b_matrix: np.ndarray,
+    system_alf: Optional[List[ALF]] = None,
+    central_atom_idx: Optional[int] = None,
 ):
     """
     Compute -dE/df (since the global Cartesian forces are negative of the derivative of the potential).
@@ -225,45 +423,29 @@ def convert_to_feature_forces(
     dE/df are the values that need to be used when adding derivatives to GP model.
 
     :param global_cartesian_forces: A 2D numpy array of shape (N_atoms, 3) containing the global Cartesian forces.
-        The rows of this array are swapped internally to match the rows of the b-matrix.
+        The rows of this array are in the same order as the atoms, which is also the order of the columns of
+        the b-matrix.
     :param b_matrix: Wilson B matrix to be used to calculate, as well as dE/df. Should be of shape
         (3N-6) x 3N where N is the number of atoms.
-    :param system_alf: A list of ALF instances containing the ALF of every atom.
-    :param central_atom_idx: The index of the atom (0-indexed) which was the central ALF atom for which
-        features (and feature derivatives) were calculated.
+    :param system_alf: Deprecated and not used, defaults to None
+    :param central_atom_idx: Deprecated and not used, defaults to None
 
     .. note::
-        The ordering of the forces should match up with the ordering of the b_matrix.
+        The ordering of the forces should match up with the ordering of the b_matrix. The columns
+        of the b_matrix returned by `form_b_matrix` are in the original ordering of the atoms, so
+        the forces are not reordered and the ALF of the central atom is not needed.
 
     See Using Redundant Internal Coordinates to Optimize Equilibrium Geometries and Transition States
     https://doi.org/10.1002/(SICI)1096-987X(19960115)17:1<49::AID-JCC5>3.0.CO;2-0
     https://doi.org/10.1063/1.462844
     """
 
-    # copy array so that original array is not altered unintentionally.
-    copied_forces_array = global_cartesian_forces.copy()
-    natoms = global_cartesian_forces.shape[0]
+    _warn_unused_alf_arguments(
+        "convert_to_feature_forces", system_alf, central_atom_idx
+    )
 
-    # original row indices
-    original_row_indices = [i for i in range(natoms)]
-
-    # contains indices of central atom, x-axis atom, xy-plane atom
-    alf_atom_indices = list(system_alf[central_atom_idx])
-    if None in alf_atom_indices:
-        alf_atom_indices.remove(None)
-
-    # contains all other atom indices not in the alf
-    non_local_atom_indices = [
-        t for t in range(natoms) if t not in system_alf[central_atom_idx]
-    ]
-    # the correct order which the forces array should be in
-    atom_indices_new_order = alf_atom_indices + non_local_atom_indices
-
-    # swap rows of forces array
-    copied_forces_array[
-        [atom_indices_new_order, original_row_indices], :
-    ] = copied_forces_array[[original_row_indices, atom_indices_new_order], :]
-    copied_forces_array = copied_forces_array.flatten()
+    # flatten makes a copy, so that original array is not altered unintentionally.
+    copied_forces_array = global_cartesian_forces.flatten()
 
     g_matrix = form_g_matrix(b_matrix)
     # can use np.linalg.pinv here as well
@@ -277,50 +459,59 @@ def convert_to_feature_forces(
     return feature_forces
 
 
+def convert_to_feature_forces_batch(
+    global_cartesian_forces: np.ndarray, b_matrices: np.ndarray
+) -> np.ndarray:
+    """Computes -dE/df for a whole batch of geometries (and central atoms) at once. This is the batched
+    version of `convert_to_feature_forces`, where the G matrices of all geometries are inverted
+    with one call to `np.linalg.pinv` on the stacked G matrices.
+
+    :param global_cartesian_forces: An array of shape `n_geometries` x `n_atoms` x 3 containing the
+        global Cartesian forces of every geometry (in the same order as the atoms).
+    :param b_matrices: An array of shape `n_geometries` x `n_features` x `3*n_atoms` containing the
+        Wilson B matrices (e.g. from `form_b_matrices`). Any leading dimensions which broadcast with the
+        forces are also accepted, e.g. `n_central_atoms` x `n_geometries` x `n_features` x `3*n_atoms`.
+    :return: An array of shape `n_geometries` x `n_features` (with the same leading dimensions as
+        `b_matrices`) containing -dE/df.
+    """
+
+    global_cartesian_forces = np.asarray(global_cartesian_forces, dtype=float)
+    flat_forces = global_cartesian_forces.reshape(
+        global_cartesian_forces.shape[:-2] + (-1, 1)
+    )
+
+    g_matrices = b_matrices @ np.swapaxes(b_matrices, -1, -2)
+    return (np.linalg.pinv(g_matrices) @ (b_matrices @ flat_forces))[..., 0]
+
+
 def convert_to_cartesian_forces(
     dE_df_array: np.ndarray,
     b_matrix: np.ndarray,
-    system_alf: List[ALF],
-    central_atom_idx: int,
+    system_alf: Optional[List[ALF]] = None,
+    central_atom_idx: Optional[int] = None,
 ):
     """Converts from local 'feature' forces to global Cartesian forces, as given by Gaussian.
 
     :param dE_df_array: 1D array of shape n_features x 1 containing 'feature' forces.
     :param b_matrix: Wilson B matrix to be used to calculate, as well as dE/df. Should be of shape
         (3N-6) x 3N where N is the number of atoms.
-    :param system_alf: A list of ALF instances containing the ALF of every atom.
-    :param central_atom_idx: The index of the atom (0-indexed) which was the central ALF atom for which
-        features (and feature derivatives) were calculated.
+    :param system_alf: Deprecated and not used, defaults to None
+    :param central_atom_idx: Deprecated and not used, defaults to None
+    :return: An array of shape N_atoms x 3, in which the rows are in the original ordering of the atoms
+        (the ordering of the columns of the b_matrix)
     """
 
+    _warn_unused_alf_arguments(
+        "convert_to_cartesian_forces", system_alf, central_atom_idx
+    )
+
     # add a dimension if necessary, so that it is n_features x 1. This is needed when you
     # only have 1 feature (i.e. the input dE_df_array is a float)
     if dE_df_array.ndim == 0:
         dE_df_array = dE_df_array[..., np.newaxis]
 
-    natoms = int(b_matrix.shape[-1] / 3)
-
-    # original row indices
-    original_row_indices = [i for i in range(natoms)]
-
-    # contains indices of central atom, x-axis atom, xy-plane atom
-    alf_atom_indices = list(system_alf[central_atom_idx])
-    if None in alf_atom_indices:
-        alf_atom_indices.remove(None)
-
-    # contains all other atom indices not in the alf
-    non_local_atom_indices = [
-        t for t in range(natoms) if t not in system_alf[central_atom_idx]
-    ]
-    # the correct order which the forces array should be in
-    atom_indices_new_order = alf_atom_indices + non_local_atom_indices
-
-    # form a N_atoms x 3 Cartesian Forces array
+    # form a N_atoms x 3 Cartesian Forces array, the columns of the b_matrix are
+    # in the original ordering of the atoms, so the rows do not need to be reordered
     dE_dCart = np.matmul(b_matrix.T, dE_df_array).reshape(-1, 3)
 
-    # swap rows of Cartesian array to match the original Atoms ordering
-    dE_dCart[[original_row_indices, atom_indices_new_order], :] = dE_dCart[
-        [atom_indices_new_order, original_row_indices], :
-    ]
-
     return dE_dCart
@@ -0,0 +1,197 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from ichor.core.models.kernels.kernel import Kernel, KernelProd
+from ichor.core.models.kernels.periodic_kernel import PeriodicKernel
+from ichor.core.models.kernels.rbf import RBF
+from ichor.core.models.kernels.rbf_cyclic import RBFCyclic
+from ichor.core.models.model import Model
+
+# the maximum number of elements of the arrays made for one chunk of test points (about 32 MB of float64 values)
+_MAX_CHUNK_ELEMENTS = 2**22
+
+
+def _kernel_terms(kernel: Kernel) -> Optional[List[Tuple[tuple, np.ndarray]]]:
+    """Returns the terms of the exponent of a kernel, so that the kernel is `exp(-sum(T_key @ coefficients))`,
+    where `T_key` is an array of (transformed) feature differences which only depends on the key of the term
+    and not on the hyperparameters of the kernel. Models whose terms have the same keys share these arrays.
+
+    :param kernel: The kernel of a model
+    :return: A list of tuples of the key of a term and its coefficients (one for every active dimension),
+        or None if the kernel cannot be written in this way (e.g. sums of kernels)
+    """
+
+    if isinstance(kernel, KernelProd):
+        k1_terms, k2_terms = _kernel_terms(kernel.k1), _kernel_terms(kernel.k2)
+        if k1_terms is None or k2_terms is None:
+            return None
+        return k1_terms + k2_terms
+
+    if type(kernel) not in (RBF, RBFCyclic, PeriodicKernel):
+        return None
+
+    active_dims = tuple(np.asarray(kernel.active_dims).tolist())
+    # RBF: exp(-0.5 * sum((d / l)^2)) with l^2 = 1 / (2 theta), so the exponent is sum(theta * d^2)
+    if type(kernel) is RBF:
+        return [(("squared", active_dims), np.asarray(kernel._thetas, dtype=float))]
+    # the phi differences are wrapped into [-pi, pi) before they are squared
+    if type(kernel) is RBFCyclic:
+        return [(("cyclic", active_dims), np.asarray(kernel._thetas, dtype=float))]
+    # Periodic: exp(-2 * sum(sin^2(pi * d / p) / l)) with l = 1 / (2 theta)
+    period = tuple(np.broadcast_to(kernel._period_length, len(active_dims)))
+    return [
+        (
+            ("periodic", active_dims, period),
+            4.0 * np.asarray(kernel._thetas, dtype=float),
+        )
+    ]
+
+
+def _transformed_differences(key: tuple, diff: np.ndarray) -> np.ndarray:
+    """Returns the array of transformed feature differences of a kernel term with the given key.
+
+    :param key: The key of the kernel term, see `_kernel_terms`
+    :param diff: The differences between the test and training points, of shape n_train x n_test x n_features
+    :return: An array of shape n_train x n_test x n_active_dims
+    """
+
+    kind, active_dims, *args = key
+    t = diff[:, :, list(active_dims)]
+
+    if kind == "cyclic":
+        # the same phi features as `RBFCyclic.mask`
+        mask = np.arange(2, len(active_dims), 3)
+        t[:, :, mask] = (t[:, :, mask] + np.pi) % (2 * np.pi) - np.pi
+    elif kind == "periodic":
+        t *= np.pi / np.asarray(args[0])
+        np.sin(t, out=t)
+
+    t *= t
+    return t
+
+
+class _ModelGroup:
+    """Models with the same training inputs, whose predictions are made from the same feature differences."""
+
+    def __init__(self, x_train: np.ndarray):
+        self.x_train = x_train
+        self.indices = []
+        self.models = []
+        self.terms = []
+
+    def add(self, index: int, model: Model, terms: List[Tuple[tuple, np.ndarray]]):
+        self.indices.append(index)
+        self.models.append(model)
+        self.terms.append(terms)
+
+    def coefficients(self) -> Dict[tuple, np.ndarray]:
+        """Returns the coefficients of all models for every key of the kernel terms, as arrays of shape
+        n_active_dims x n_models. The coefficients are zero for models whose kernel does not have the term."""
+        coefficients = {}
+        for i, terms in enumerate(self.terms):
+            for key, term_coefficients in terms:
+                if key not in coefficients:
+                    coefficients[key] = np.zeros((len(key[1]), len(self.models)))
+                coefficients[key][:, i] += term_coefficients
+        return coefficients
+
+
+class GroupedPredictor:
+    """Makes the predictions of many models at once, e.g. the models of all properties (iqa and the multipole moments)
+    of one atom. Models with the same training inputs share the differences between the test and training features,
+    which are only calculated once for all of these models (instead of once for every model in `Model.predict`).
+    The exponents of the kernels of all models are then calculated with one matrix product and the predictions
+    with one contraction with the weights of the models.
+
+    Kernels which are products of `RBF`, `RBFCyclic` and `PeriodicKernel` kernels are calculated in this way,
+    models with other kernels are predicted with `Model.predict`.
+
+    :param models: The models to make predictions with. All models have to use the same test features.
+    :param chunk_size: The number of test points for which the predictions are made at once, defaults to None,
+        in which case it is chosen so that the arrays made for one chunk have about 4 million elements
+    """
+
+    def __init__(self, models: Sequence[Model], chunk_size: Optional[int] = None):
+
+        self.models = list(models)
+        self.chunk_size = chunk_size
+
+        self._groups: List[_ModelGroup] = []
+        self._other_models: List[Tuple[int, Model]] = []
+
+        for index, model in enumerate(self.models):
+            terms = _kernel_terms(model.kernel)
+            if terms is None:
+                self._other_models.append((index, model))
+                continue
+            for group in self._groups:
+                if group.x_train.shape == model.x.shape and np.array_equal(
+                    group.x_train, model.x
+                ):
+                    break
+            else:
+                group = _ModelGroup(model.x)
+                self._groups.append(group)
+            group.add(index, model, terms)
+
+        # the coefficients of all kernel terms are stacked, so that the exponents of all models are one matrix product
+        self._group_arrays = []
+        for group in self._groups:
+            coefficients = group.coefficients()
+            self._group_arrays.append(
+                (
+                    list(coefficients),
+                    np.vstack(list(coefficients.values())),
+                    np.hstack([model.weights for model in group.models]),
+                )
+            )
+
+    def predict(self, x_test: np.ndarray) -> np.ndarray:
+        """Returns the predictions of all models for the test points.
+
+        :param x_test: An array of shape n_test x n_features (or a 1D array of the features of one point)
+        :return: An array of shape n_models x n_test, containing the predictions in the order of the models
+        """
+
+        # make into a 2d array in case a 1d is passed in
+        if x_test.ndim == 1:
+            x_test = x_test[np.newaxis, ...]
+
+        predictions = np.empty((len(self.models), len(x_test)))
+
+        for group, (keys, coefficients, weights) in zip(
+            self._groups, self._group_arrays
+        ):
+
+            ntrain = len(group.x_train)
+            chunk_size = self.chunk_size or max(
+                1,
+                _MAX_CHUNK_ELEMENTS
+                // (ntrain * max(x_test.shape[1], *coefficients.shape)),
+            )
+
+            for start in range(0, len(x_test), chunk_size):
+                x_chunk = x_test[start : start + chunk_size]
+                diff = x_chunk[np.newaxis, :, :] - group.x_train[:, np.newaxis, :]
+
+                # the transformed differences of all kernel terms, of shape n_train x n_chunk x n_terms
+                transformed = np.concatenate(
+                    [_transformed_differences(key, diff) for key in keys], axis=2
+                )
+                # n_train x n_chunk x n_models exponents of the kernels of all models
+                exponent = (
+                    transformed.reshape(-1, transformed.shape[2]) @ coefficients
+                ).reshape(len(group.x_train), len(x_chunk), -1)
+                np.negative(exponent, out=exponent)
+                np.exp(exponent, out=exponent)
+
+                chunk_predictions = np.einsum("tnm,tm->mn", exponent, weights)
+                for i, (index, model) in enumerate(zip(group.indices, group.models)):
+                    predictions[index, start : start + chunk_size] = (
+                        model.mean.value(x_chunk).flatten() + chunk_predictions[i]
+                    )
+
+        for index, model in self._other_models:
+            predictions[index] = model.predict(x_test)
+
+        return predictions
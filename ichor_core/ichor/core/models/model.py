@@ -1,12 +1,23 @@
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 from ichor.core.atoms import ALF
 from ichor.core.common.io import mkdir
 from ichor.core.common.str import get_digits
 from ichor.core.common.types import Version
-from ichor.core.files.file import FileContents, ReadFile, WriteFile
+from ichor.core.files.file import FileContents, FileState, ReadFile, WriteFile
+from ichor.core.models.binary_model import (
+    binary_model_path,
+    is_binary_model_current,
+    read_binary_model,
+    write_binary_model,
+)
+from ichor.core.models.blocked_evaluation import (
+    DEFAULT_MEMORY_BUDGET,
+    map_test_blocks,
+    train_test_covariance,
+)
 from ichor.core.models.kernels import (
     ConstantKernel,
     Kernel,
@@ -50,6 +61,41 @@ class Model(ReadFile, WriteFile):
 
     _filetype = ".model"
 
+    # arrays which are calculated from these attributes are cached (see `_cached`)
+    # and have to be recalculated when any of the attributes are changed
+    _cache_dependencies = ("x", "y", "mean", "kernel", "jitter", "weights")
+    # the covariance matrix of the training data (and its decomposition) only depends on these attributes
+    _covariance_dependencies = ("x", "kernel", "jitter")
+    # the number of bytes which the temporary arrays made for predictions can use, the test points are predicted
+    # in blocks which fit into this budget (see `ichor.core.models.blocked_evaluation`). It can be changed
+    # for all models, e.g. `Model.memory_budget = 4 * 2**30`, or only for one model.
+    memory_budget: int = DEFAULT_MEMORY_BUDGET
+    # whether the arrays of binary models are memory-mapped instead of read into memory. Every memory-mapped
+    # model keeps its binary model open, so this should only be used for a limited number of large models.
+    memory_map_binary_models: bool = False
+
+    # the header of the model file (everything before the training data) can be read without the training data
+    _partial_read_methods = {
+        attr: "read_header"
+        for attr in (
+            "program",
+            "program_version",
+            "jitter",
+            "likelihood",
+            "system_name",
+            "atom_name",
+            "prop",
+            "alf",
+            "natoms",
+            "nfeats",
+            "ntrain",
+            "mean",
+            "kernel",
+            "input_units",
+            "output_unit",
+        )
+    }
+
     def __init__(
         self,
         path: Path,
@@ -75,6 +121,8 @@ class Model(ReadFile, WriteFile):
     ):
         super(ReadFile, self).__init__(path)
 
+        self._cache = {}
+
         self.program = program
         self.system_name = system_name
         self.atom_name = atom_name
@@ -97,210 +145,269 @@ class Model(ReadFile, WriteFile):
 
     def _read_file(self, up_to: Optional[str] = None):
         """Read in a FEREBUS output file which contains the optimized
-        hyperparameters, mean function, and other information that is needed to make predictions."""
+        hyperparameters, mean function, and other information that is needed to make predictions.
+        If the binary model of the file (see `ichor.core.models.binary_model`) was written from the current
+        version of the file, the model is read from the binary model instead, which is much faster."""
+
+        if up_to is None and is_binary_model_current(self.path):
+            contents = read_binary_model(
+                binary_model_path(self.path),
+                mmap_mode="r" if self.memory_map_binary_models else None,
+            )
+            self._read_lines(iter(contents.metadata.splitlines(keepends=True)), up_to)
+            self.x = self.x or contents.x
+            self.y = self.y or contents.y
+            self.weights = self.weights or contents.weights
+        else:
+            with open(self.path, "r") as f:
+                self._read_lines(f, up_to)
+
+    def read_header(self):
+        """Reads only the header of the model file (the metadata, system, dimensions, mean, kernel and units),
+        without the training data and weights. This is automatically called if one of these attributes is
+        accessed before the model has been read, so the training data is only read when it is needed,
+        e.g. when the model is used for predictions."""
+        if self.state is not FileState.Unread or not self.path.exists():
+            return
+        # attributes which are accessed while the header is read do not read the file again
+        self.state = FileState.Reading
+        try:
+            self._read_file(up_to="units.y")
+        finally:
+            self.state = FileState.Unread
+
+    def _read_lines(self, lines: Iterator[str], up_to: Optional[str] = None):
+        """Reads the lines of a model file (or the metadata of a binary model)."""
         kernel_composition = ""
         kernel_dict = {}
         notes = {}
 
         stop_reading = False
 
-        with open(self.path, "r") as f:
-            for line in f:
-                if stop_reading:
-                    break
-
-                if up_to is not None and up_to in line:
-                    stop_reading = True
-
-                if "<TODO>" in line:
-                    continue
-
-                if "program" in line:
-                    self.program = self.program or line.split()[-1]
-                    continue
-
-                if "version" in line:
-                    self.program_version = self.program_version or Version(
-                        line.split()[-1]
+        for line in lines:
+            if stop_reading:
+                break
+
+            if up_to is not None and up_to in line:
+                stop_reading = True
+
+            if "<TODO>" in line:
+                continue
+
+            if "program" in line:
+                self.program = self.program or line.split()[-1]
+                continue
+
+            if "version" in line:
+                self.program_version = self.program_version or Version(line.split()[-1])
+                continue
+
+            if "jitter" in line or "nugget" in line or "noise" in line:
+                # noise to add to the diagonal to help with numerical stability.
+                # Typically on the scale 1e-6 to 1e-10
+                self.jitter = self.jitter or float(line.split()[-1])
+                continue
+
+            if "likelihood" in line:
+                self.likelihood = self.likelihood or float(line.split()[-1])
+                continue
+
+            if "#" in line and "=" in line:
+                line = line.lstrip("#")
+                key, val = line.split("=")
+                notes[key.strip()] = val.strip()
+                continue
+
+            if line.startswith("#"):
+                line = line.lstrip("#")
+                notes[line.strip()] = None
+
+            if "name" in line:  # system name e.g. WATER
+                self.system_name = self.system_name or line.split()[1]
+                continue
+
+            if line.startswith("atom"):  # atom for which a GP model was made eg. O1
+                self.atom_name = self.atom_name or line.split()[1].capitalize()
+                continue
+
+            if (
+                "property" in line
+            ):  # property (such as iqa or particular multipole moment) for which a GP model was made
+                self.prop = self.prop or line.split()[1]
+                continue
+
+            if "ALF" in line:
+                tmp_line_split = line.split()[1:]
+                if tmp_line_split[-1] == "None":
+                    self.alf = self.alf or ALF(
+                        *[int(a) - 1 for a in line.split()[1:-1]], None
+                    )
+                else:
+                    self.alf = self.alf or ALF(*[int(a) - 1 for a in line.split()[1:]])
+                continue
+
+            if "number_of_atoms" in line:
+                self.natoms = self.natoms or int(line.split()[1])
+                continue
+
+            if "number_of_features" in line:  # number of inputs to the GP
+                self.nfeats = self.nfeats or int(line.split()[1])
+                continue
+
+            if (
+                "number_of_training_points" in line
+            ):  # number of training points to make the GP model
+                self.ntrain = self.ntrain or int(line.split()[1])
+                continue
+
+            # GP mean (mu) section
+            if "[mean]" in line:
+                mean_type = next(lines).split()[-1]  # type
+                if mean_type == "constant":
+                    mean = ConstantMean(float(next(lines).split()[1]))
+                elif mean_type == "zero":
+                    mean = ZeroMean()
+                elif mean_type in ["linear", "quadratic"]:
+                    beta = np.array([float(b) for b in next(lines).split()[1:]])
+                    xmin = np.array([float(x) for x in next(lines).split()[1:]])
+                    ymin = float(next(lines).split()[-1])
+                    if mean_type == "linear":
+                        mean = LinearMean(beta, xmin, ymin)
+                    elif mean_type == "quadratic":
+                        mean = QuadraticMean(beta, xmin, ymin)
+
+                self.mean = self.mean or mean
+                continue
+
+            if "composition" in line:
+                # which kernels were used to make the GP model.
+                # Different kernels can be specified for different input dimensions
+                kernel_composition = line.split()[-1]
+                continue
+
+            # GP kernel section
+            if "[kernel." in line:
+                kernel_name = line.split(".")[-1].rstrip().rstrip("]")
+                line = next(lines)
+                kernel_type = line.split()[-1].strip()
+                ndims = int(next(lines).split()[-1])  # number of dimensions
+                line = next(lines)
+                if "TODO" not in line:
+                    active_dims = np.array([int(ad) - 1 for ad in line.split()[1:]])
+                else:
+                    active_dims = np.arange(ndims)
+
+                if kernel_type == "rbf":
+                    thetas = np.array([float(hp) for hp in next(lines).split()[1:]])
+                    kernel_dict[kernel_name] = RBF(
+                        kernel_name, thetas, active_dims=active_dims
+                    )
+                elif kernel_type in [
+                    "rbf-cyclic",
+                    "rbf-cylic",
+                ]:  # Due to typo in FEREBUS 7.0
+                    thetas = np.array([float(hp) for hp in next(lines).split()[1:]])
+                    kernel_dict[kernel_name] = RBFCyclic(
+                        kernel_name, thetas, active_dims=active_dims
+                    )
+                elif kernel_type == "constant":
+                    value = float(next(lines).split()[-1])
+                    kernel_dict[kernel_name] = ConstantKernel(
+                        kernel_name, value, active_dims=active_dims
+                    )
+                elif kernel_type == "periodic":
+                    thetas = np.array([float(hp) for hp in next(lines).split()[1:]])
+                    kernel_dict[kernel_name] = PeriodicKernel(
+                        kernel_name,
+                        thetas,
+                        np.full(thetas.shape, 2 * np.pi),
+                        active_dims=active_dims,
                     )
-                    continue
-
-                if "jitter" in line or "nugget" in line or "noise" in line:
-                    # noise to add to the diagonal to help with numerical stability.
-                    # Typically on the scale 1e-6 to 1e-10
-                    self.jitter = self.jitter or float(line.split()[-1])
-                    continue
-
-                if "likelihood" in line:
-                    self.likelihood = self.likelihood or float(line.split()[-1])
-                    continue
-
-                if "#" in line and "=" in line:
-                    line = line.lstrip("#")
-                    key, val = line.split("=")
-                    notes[key.strip()] = val.strip()
-                    continue
-
-                if line.startswith("#"):
-                    line = line.lstrip("#")
-                    notes[line.strip()] = None
-
-                if "name" in line:  # system name e.g. WATER
-                    self.system_name = self.system_name or line.split()[1]
-                    continue
-
-                if line.startswith("atom"):  # atom for which a GP model was made eg. O1
-                    self.atom_name = self.atom_name or line.split()[1].capitalize()
-                    continue
-
-                if (
-                    "property" in line
-                ):  # property (such as iqa or particular multipole moment) for which a GP model was made
-                    self.prop = self.prop or line.split()[1]
-                    continue
-
-                if "ALF" in line:
-                    tmp_line_split = line.split()[1:]
-                    if tmp_line_split[-1] == "None":
-                        self.alf = self.alf or ALF(
-                            *[int(a) - 1 for a in line.split()[1:-1]], None
-                        )
-                    else:
-                        self.alf = self.alf or ALF(
-                            *[int(a) - 1 for a in line.split()[1:]]
-                        )
-                    continue
-
-                if "number_of_atoms" in line:
-                    self.natoms = self.natoms or int(line.split()[1])
-                    continue
-
-                if "number_of_features" in line:  # number of inputs to the GP
-                    self.nfeats = self.nfeats or int(line.split()[1])
-                    continue
-
-                if (
-                    "number_of_training_points" in line
-                ):  # number of training points to make the GP model
-                    self.ntrain = self.ntrain or int(line.split()[1])
-                    continue
-
-                # GP mean (mu) section
-                if "[mean]" in line:
-                    mean_type = next(f).split()[-1]  # type
-                    if mean_type == "constant":
-                        mean = ConstantMean(float(next(f).split()[1]))
-                    elif mean_type == "zero":
-                        mean = ZeroMean()
-                    elif mean_type in ["linear", "quadratic"]:
-                        beta = np.array([float(b) for b in next(f).split()[1:]])
-                        xmin = np.array([float(x) for x in next(f).split()[1:]])
-                        ymin = float(next(f).split()[-1])
-                        if mean_type == "linear":
-                            mean = LinearMean(beta, xmin, ymin)
-                        elif mean_type == "quadratic":
-                            mean = QuadraticMean(beta, xmin, ymin)
-
-                    self.mean = self.mean or mean
-                    continue
-
-                if "composition" in line:
-                    # which kernels were used to make the GP model.
-                    # Different kernels can be specified for different input dimensions
-                    kernel_composition = line.split()[-1]
-                    continue
-
-                # GP kernel section
-                if "[kernel." in line:
-                    kernel_name = line.split(".")[-1].rstrip().rstrip("]")
-                    line = next(f)
-                    kernel_type = line.split()[-1].strip()
-                    ndims = int(next(f).split()[-1])  # number of dimensions
-                    line = next(f)
-                    if "TODO" not in line:
-                        active_dims = np.array([int(ad) - 1 for ad in line.split()[1:]])
-                    else:
-                        active_dims = np.arange(ndims)
-
-                    if kernel_type == "rbf":
-                        thetas = np.array([float(hp) for hp in next(f).split()[1:]])
-                        kernel_dict[kernel_name] = RBF(
-                            kernel_name, thetas, active_dims=active_dims
-                        )
-                    elif kernel_type in [
-                        "rbf-cyclic",
-                        "rbf-cylic",
-                    ]:  # Due to typo in FEREBUS 7.0
-                        thetas = np.array([float(hp) for hp in next(f).split()[1:]])
-                        kernel_dict[kernel_name] = RBFCyclic(
-                            kernel_name, thetas, active_dims=active_dims
-                        )
-                    elif kernel_type == "constant":
-                        value = float(next(f).split()[-1])
-                        kernel_dict[kernel_name] = ConstantKernel(
-                            kernel_name, value, active_dims=active_dims
-                        )
-                    elif kernel_type == "periodic":
-                        thetas = np.array([float(hp) for hp in next(f).split()[1:]])
-                        kernel_dict[kernel_name] = PeriodicKernel(
-                            kernel_name,
-                            thetas,
-                            np.full(thetas.shape, 2 * np.pi),
-                            active_dims=active_dims,
-                        )
-
-                    continue
-
-                if "units.x" in line:
-                    self.input_units = self.input_units or line.split()[1:]
-
-                if "units.y" in line:
-                    self.output_unit = self.output_unit or line.split()[-1]
-
-                # training inputs data
-                if "[training_data.x]" in line:
-                    line = next(f)
-                    x = np.empty((self.ntrain, self.nfeats))
-                    i = 0
-                    while line.strip() != "":
-                        x[i, :] = np.array([float(num) for num in line.split()])
-                        i += 1
-                        line = next(f)
-                    self.x = self.x or x
-                    continue
-
-                # training labels data
-                if "[training_data.y]" in line:
-                    line = next(f)
-                    y = np.empty((self.ntrain, 1))
-                    i = 0
-                    while line.strip() != "":
-                        y[i, 0] = float(line)
-                        i += 1
-                        line = next(f)
-                    self.y = self.y or y
-                    continue
-
-                if "[weights]" in line:
-                    line = next(f)
-                    weights = np.empty((self.ntrain, 1))
-                    i = 0
-                    while line.strip() != "":
-                        weights[i, 0] = float(line)
-                        i += 1
-                        try:
-                            line = next(f)
-                        except StopIteration:
-                            break
-
-                    self.weights = self.weights or weights
 
+                continue
+
+            if "units.x" in line:
+                self.input_units = self.input_units or line.split()[1:]
+
+            if "units.y" in line:
+                self.output_unit = self.output_unit or line.split()[-1]
+
+            # training inputs data
+            if "[training_data.x]" in line:
+                line = next(lines)
+                x = np.empty((self.ntrain, self.nfeats))
+                i = 0
+                while line.strip() != "":
+                    x[i, :] = np.array([float(num) for num in line.split()])
+                    i += 1
+                    line = next(lines)
+                self.x = self.x or x
+                continue
+
+            # training labels data
+            if "[training_data.y]" in line:
+                line = next(lines)
+                y = np.empty((self.ntrain, 1))
+                i = 0
+                while line.strip() != "":
+                    y[i, 0] = float(line)
+                    i += 1
+                    line = next(lines)
+                self.y = self.y or y
+                continue
+
+            if "[weights]" in line:
+                line = next(lines)
+                weights = np.empty((self.ntrain, 1))
+                i = 0
+                while line.strip() != "":
+                    weights[i, 0] = float(line)
+                    i += 1
+                    try:
+                        line = next(lines)
+                    except StopIteration:
+                        break
+
+                self.weights = self.weights or weights
         self.kernel = (
             self.kernel
             if self.kernel or not kernel_composition
             else KernelInterpreter(kernel_composition, kernel_dict).interpret()
         )
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in self._cache_dependencies and "_cache" in self.__dict__:
+            for key in [
+                key
+                for key, (dependencies, _) in self._cache.items()
+                if name in dependencies
+            ]:
+                del self._cache[key]
+
+    def _cached(
+        self,
+        key,
+        calculate: Callable,
+        dependencies: Sequence[str] = _cache_dependencies,
+    ):
+        """Returns an array (or any other object) calculated from the model data, which is only
+        calculated the first time it is needed. The cached object is removed when any of the
+        attributes it depends on are set again.
+
+        .. note::
+            Only setting the attributes removes cached objects, so a kernel which is modified in place
+            (e.g. by changing its hyperparameters) has to be set again, e.g. `model.kernel = model.kernel`
+
+        :param key: The key under which the calculated object is stored
+        :param calculate: A function without arguments which calculates the object
+        :param dependencies: The attributes from which the object is calculated,
+            by default the training data, mean, kernel, jitter and weights of the model
+        """
+        if key not in self._cache:
+            self._cache[key] = (tuple(dependencies), calculate())
+        return self._cache[key][1]
+
     @property
     def ialf(self) -> np.ndarray:
         """Returns the atomic local frame, indices start at 0 (as in Python).
@@ -330,26 +437,84 @@ class Model(ReadFile, WriteFile):
         This is the index of the atom in Python objects such as lists (as indeces start at 0)."""
         return self.atom_num - 1
 
-    def r(self, x_test: np.ndarray) -> np.ndarray:
-        """Returns the n_train by n_test covariance matrix"""
-        return self.kernel.r(self.x, x_test)
+    def r(self, x_test: np.ndarray, memory_budget: Optional[int] = None) -> np.ndarray:
+        """Returns the n_train by n_test covariance matrix. The training points are split into blocks
+        if the arrays made by the kernel for all training points do not fit into the memory budget."""
+        return train_test_covariance(
+            self.kernel, self.x, x_test, memory_budget or self.memory_budget
+        )
+
+    @property
+    def _bytes_per_test_point(self) -> int:
+        """The number of bytes of the arrays made to predict one test point, which are the
+        n_train x n_features differences made by kernels and the covariance (and temporary) vectors."""
+        return 8 * self.ntrain * (self.nfeats + 2)
+
+    def _map_test_blocks(
+        self,
+        func: Callable,
+        x_test: np.ndarray,
+        memory_budget: Optional[int] = None,
+        ncores: int = 1,
+        block_size: Optional[int] = None,
+    ) -> list:
+        """Applies a function of a block of test points and its covariance matrix to the blocks of test points,
+        see `ichor.core.models.blocked_evaluation.map_test_blocks`."""
+        memory_budget = memory_budget or self.memory_budget
+        return map_test_blocks(
+            lambda x_block: func(x_block, self.r(x_block, memory_budget // ncores)),
+            x_test,
+            self._bytes_per_test_point,
+            memory_budget,
+            ncores,
+            block_size,
+        )
+
+    def _predict_from_covariance(
+        self, x_test: np.ndarray, train_test_covar: np.ndarray
+    ) -> np.ndarray:
+        """Returns the predictions of test points from the n_train by n_test covariance matrix."""
+        return (
+            self.mean.value(x_test) + np.dot(train_test_covar.T, self.weights)[:, -1]
+        ).flatten()
 
     @property
     def R(self) -> np.ndarray:
         """Returns the covariance matrix and adds a jitter
         to the diagonal for numerical stability. This jitter is a very
-        small number on the order of 1e-6 to 1e-10."""
+        small number on the order of 1e-6 to 1e-10.
+
+        .. note::
+            Only the decomposition of the covariance matrix (see `lower_cholesky`) is kept,
+            the covariance matrix is calculated again every time it is accessed.
+        """
         return self.kernel.R(self.x) + (self.jitter * np.identity(self.ntrain))
 
     @property
     def invR(self) -> np.ndarray:
-        """Returns the inverse of the covariance matrix R"""
-        return np.linalg.inv(self.R)
+        """Returns the inverse of the covariance matrix R, calculated from its decomposition.
+
+        .. note::
+            The inverse is not needed for the weights or variance, which are calculated by solving
+            triangular systems with L instead. It is calculated again every time it is accessed.
+        """
+        # scipy is slow to import and is only needed here
+        from scipy.linalg import cho_solve
+
+        return cho_solve((self.lower_cholesky, True), np.identity(self.ntrain))
 
     @property
     def lower_cholesky(self) -> np.ndarray:
-        """Decomposes the covariance matrix into L and L^T. Returns the lower triangular matrix L."""
-        return np.linalg.cholesky(self.R)
+        """Decomposes the covariance matrix into L and L^T. Returns the lower triangular matrix L.
+
+        .. note::
+            The decomposition is only calculated once and is recalculated when x, kernel or jitter are set again.
+        """
+        return self._cached(
+            "lower_cholesky",
+            lambda: np.linalg.cholesky(self.R),
+            self._covariance_dependencies,
+        )
 
     @property
     def _y_minus_mean(self):
@@ -357,41 +522,135 @@ class Model(ReadFile, WriteFile):
 
     @property
     def logdet(self):
-        sign, logdet = np.linalg.slogdet(self.R)
-        return sign * logdet
+        """Returns the log determinant of the covariance matrix, calculated from the diagonal of L."""
+        return self._cached(
+            "logdet",
+            lambda: 2.0 * np.sum(np.log(np.diag(self.lower_cholesky))),
+            self._covariance_dependencies,
+        )
 
     def compute_weights(self) -> np.ndarray:
-        """Computes the training weights from the data given"""
-        return np.linalg.solve(self.lower_cholesky, self._y_minus_mean)
+        """Computes the training weights (R^-1 (y - mean)) from the data given,
+        by solving the triangular systems of the decomposition R = L L^T"""
+        # scipy is slow to import and is only needed here
+        from scipy.linalg import cho_solve
+
+        return cho_solve((self.lower_cholesky, True), self._y_minus_mean)
 
     def compute_likelihood(self) -> float:
-        """Computes the marginal likelihood from the data given"""
+        """Computes the (log) marginal likelihood from the data given"""
         return (
-            0.5 * np.dot(self._y_minus_mean.T, self.compute_weights()).item()
+            -0.5 * np.dot(self._y_minus_mean.T, self.compute_weights()).item()
             - 0.5 * self.logdet
             - 0.5 * self.ntrain * np.log(2 * np.pi)
         )
 
-    def predict(self, x_test: np.ndarray) -> np.ndarray:
-        """Returns an array containing the test point predictions."""
+    def predict(
+        self,
+        x_test: np.ndarray,
+        memory_budget: Optional[int] = None,
+        ncores: int = 1,
+    ) -> np.ndarray:
+        """Returns an array containing the test point predictions. The test points are predicted in blocks,
+        so that the arrays made for the blocks fit into the memory budget.
+
+        :param x_test: An array of shape n_test x n_features (or a 1D array of the features of one point)
+        :param memory_budget: The number of bytes the arrays made for the predictions can use,
+            defaults to None, in which case `memory_budget` of the model is used
+        :param ncores: The number of threads in which blocks of test points are predicted, defaults to 1
+        """
 
         # make into a 2d array in case a 1d is passed in
         if x_test.ndim == 1:
             x_test = x_test[np.newaxis, ...]
 
-        return (
-            self.mean.value(x_test) + np.dot(self.r(x_test).T, self.weights)[:, -1]
-        ).flatten()
+        return np.concatenate(
+            self._map_test_blocks(
+                self._predict_from_covariance, x_test, memory_budget, ncores
+            )
+        )
+
+    def _variance_from_covariance(self, train_test_covar: np.ndarray) -> np.ndarray:
+        """Returns the variance of test points from the n_train by n_test covariance matrix."""
+        # scipy is slow to import and is only needed here
+        from scipy.linalg import solve_triangular
 
-    def variance(self, x_test: np.ndarray) -> np.ndarray:
-        """Return the variance for the test data points."""
-        train_test_covar = self.r(x_test)
         # temporary matrix, see Rasmussen Williams page 19 algo. 2.1
-        v = np.linalg.solve(self.lower_cholesky, train_test_covar)
+        v = solve_triangular(self.lower_cholesky, train_test_covar, lower=True)
 
         # TODO: need to multiply by tau^2 in order to get "true" variance which can be used for error estimations.
         # here it can only be used to compare points to figure out which point has the largest variance.
-        return 1.0 - np.diag(np.matmul(v.T, v)).flatten()
+        # only the diagonal of v^T v is needed, so the n_test by n_test matrix is never formed
+        return 1.0 - np.einsum("ij,ij->j", v, v)
+
+    def variance(
+        self,
+        x_test: np.ndarray,
+        memory_budget: Optional[int] = None,
+        ncores: int = 1,
+    ) -> np.ndarray:
+        """Return the variance for the test data points. The test points are calculated in blocks,
+        see `predict` for the parameters."""
+
+        # make into a 2d array in case a 1d is passed in
+        if x_test.ndim == 1:
+            x_test = x_test[np.newaxis, ...]
+
+        # the decomposition is calculated before the blocks, which can be calculated in different threads
+        self.lower_cholesky
+
+        return np.concatenate(
+            self._map_test_blocks(
+                lambda x_block, train_test_covar: self._variance_from_covariance(
+                    train_test_covar
+                ),
+                x_test,
+                memory_budget,
+                ncores,
+            )
+        )
+
+    def predict_with_variance(
+        self,
+        x_test: np.ndarray,
+        chunk_size: Optional[int] = None,
+        memory_budget: Optional[int] = None,
+        ncores: int = 1,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the predictions and variances of the test points. The test points are handled in chunks,
+        so that only an n_train by `chunk_size` covariance matrix is in memory at once, and the covariance
+        matrix of every chunk is used for both the predictions and the variances.
+
+        :param x_test: An array of shape n_test x n_features (or a 1D array of the features of one point)
+        :param chunk_size: The maximum number of test points for which predictions are made at once,
+            defaults to None, in which case it is calculated from the memory budget
+        :param memory_budget: The number of bytes the arrays made for the predictions can use,
+            defaults to None, in which case `memory_budget` of the model is used
+        :param ncores: The number of threads in which chunks of test points are predicted, defaults to 1
+        :return: A tuple of two 1D arrays of length n_test, the predictions and the variances
+        """
+
+        # make into a 2d array in case a 1d is passed in
+        if x_test.ndim == 1:
+            x_test = x_test[np.newaxis, ...]
+
+        # the decomposition is calculated before the chunks, which can be calculated in different threads
+        self.lower_cholesky
+
+        predictions, variances = zip(
+            *self._map_test_blocks(
+                lambda x_chunk, train_test_covar: (
+                    self._predict_from_covariance(x_chunk, train_test_covar),
+                    self._variance_from_covariance(train_test_covar),
+                ),
+                x_test,
+                memory_budget,
+                ncores,
+                chunk_size,
+            )
+        )
+
+        return np.concatenate(predictions), np.concatenate(variances)
 
     def _write_file(self, path: Path) -> None:
         if not path.parent.exists():
@@ -458,5 +717,10 @@ class Model(ReadFile, WriteFile):
 
         return write_str
 
+    def write_binary(self, path: Optional[Union[Path, str]] = None) -> Path:
+        """Writes the binary model of the model, which is read instead of the model file (while the model file is
+        not changed) and is much faster to read. See `ichor.core.models.binary_model.write_binary_model`."""
+        return write_binary_model(self, path)
+
     def __repr__(self):
         return f"{self.__class__.__name__}(system={self.system_name}, atom={self.atom_name}, type={self.prop})"
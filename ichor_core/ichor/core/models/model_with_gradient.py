@@ -5,6 +5,7 @@ import numpy as np
 from ichor.core.atoms import ALF
 from ichor.core.common.str import get_digits
 from ichor.core.files.file import FileContents, ReadFile
+from ichor.core.models.blocked_evaluation import map_test_blocks
 from ichor.core.models.kernels import Kernel, MixedKernelWithDerivatives
 
 
@@ -254,12 +255,27 @@ class ModelWithGradients(ReadFile):
         sign, logdet = np.linalg.slogdet(self.R)
         return sign * logdet
 
-    def predict(self, x_test: np.ndarray) -> np.ndarray:
-        """Returns an array containing the test point predictions.
+    @property
+    def _bytes_per_test_point(self) -> int:
+        """The number of bytes of the arrays made to predict one test point. The kernel makes
+        n_train(D+1) x (D+1) blocks of the covariance matrix and a few temporary arrays of the same size."""
+        return 4 * 8 * self.ntrain * (self.nfeats + 1) ** 2
+
+    def predict(
+        self,
+        x_test: np.ndarray,
+        memory_budget: Optional[int] = None,
+        ncores: int = 1,
+    ) -> np.ndarray:
+        """Returns an array containing the test point predictions. The test points are predicted in blocks,
+        so that the arrays made for the blocks fit into the memory budget.
 
         param x_test: an array containing the test set point features
             It should either be a 2D array with shape npoints x nfeatures
             Or a 1D array of shape nfeatures which are the features for a single point
+        param memory_budget: The number of bytes the arrays made for the predictions can use,
+            defaults to None, in which case `DEFAULT_MEMORY_BUDGET` is used
+        param ncores: The number of threads in which blocks of test points are predicted, defaults to 1
         """
 
         # make into a 2d array in case a 1d is passed in
@@ -274,19 +290,60 @@ class ModelWithGradients(ReadFile):
         # reshape the predictions from an npoints * (D+1) vector into a
         # matrix of shape npoints x (D+1)
         # then add the mean.T (which is of shape 1 x ndimensions+1)
-        return self.mean.T + (self.r(x_test).T @ self.weights).reshape(
-            npoints, ndimensions + 1
+        return np.concatenate(
+            map_test_blocks(
+                lambda x_block: self.mean.T
+                + (self.r(x_block).T @ self.weights).reshape(
+                    len(x_block), ndimensions + 1
+                ),
+                x_test,
+                self._bytes_per_test_point,
+                memory_budget,
+                ncores,
+            )
         )
 
-    def variance(self, x_test: np.ndarray) -> np.ndarray:
-        """Return the variance for the test data points."""
-        train_test_covar = self.r(x_test)
+    def _variance_of_block(
+        self, x_block: np.ndarray, lower_cholesky: np.ndarray
+    ) -> np.ndarray:
+        """Return the variance for one block of test data points."""
+        train_test_covar = self.r(x_block)
+        # scipy is slow to import and is only needed here
+        from scipy.linalg import solve_triangular
+
         # temporary matrix, see Rasmussen Williams page 19 algo. 2.1
-        v = np.linalg.solve(self.lower_cholesky, train_test_covar)
+        v = solve_triangular(lower_cholesky, train_test_covar, lower=True)
 
         # TODO: need to multiply by tau^2 in order to get "true" variance which can be used for error estimations.
         # here it can only be used to compare points to figure out which point has the largest variance.
-        return 1.0 - np.diag(np.matmul(v.T, v)).flatten()
+        # only the diagonal of v.T @ v is calculated
+        return 1.0 - np.einsum("ij,ij->j", v, v)
+
+    def variance(
+        self,
+        x_test: np.ndarray,
+        memory_budget: Optional[int] = None,
+        ncores: int = 1,
+    ) -> np.ndarray:
+        """Return the variance for the test data points. The test points are calculated in blocks,
+        see `predict` for the parameters."""
+
+        # make into a 2d array in case a 1d is passed in
+        if x_test.ndim == 1:
+            x_test = x_test[np.newaxis, ...]
+
+        # the decomposition is calculated once for all blocks, which can be calculated in different threads
+        lower_cholesky = self.lower_cholesky
+
+        return np.concatenate(
+            map_test_blocks(
+                lambda x_block: self._variance_of_block(x_block, lower_cholesky),
+                x_test,
+                self._bytes_per_test_point,
+                memory_budget,
+                ncores,
+            )
+        )
 
     def __repr__(self):
         return f"{self.__class__.__name__}(system={self.system_name}, atom={self.atom_name}, type={self.prop})"
@@ -10,7 +10,9 @@ from ichor.core.common.sorting import ignore_alpha
 from ichor.core.common.types.itypes import F
 from ichor.core.files.directory import Directory
 from ichor.core.files.file_data import HasAtoms
+from ichor.core.models.grouped_predictor import GroupedPredictor
 from ichor.core.models.model import Model
+from ichor.core.models.models_index import ModelsIndex
 from natsort import natsorted
 
 
@@ -45,10 +47,34 @@ class Models(Directory, list):
         Directory.__init__(self, path)
 
     def _parse(self) -> None:
-        """Parse a directory and add any `.model` files to the `Models` instance"""
+        """Parse a directory and add any `.model` files to the `Models` instance. The headers of the models
+        (e.g. the atom and property of every model) are set from the index of the directory (see `ModelsIndex`)
+        if it has been written with `write_index`, so models can be selected without reading the model files.
+        The training data of a model is only read when the model is used."""
+        self.index = ModelsIndex(self.path)
         for f in self:
             if Model.check_path(f):
-                self.append(Model(f))
+                model = Model(f)
+                self.index.set_header(model)
+                self.append(model)
+        self.index.remove_missing()
+
+    def write_index(self) -> Path:
+        """Writes the index of the headers of the models in the directory (see `ModelsIndex`), which is used
+        instead of reading the headers of the model files when the directory is parsed again.
+
+        :return: The path of the index file
+        """
+        self.index.save()
+        return ModelsIndex.index_path(self.path)
+
+    def write_binary_models(self) -> List[Path]:
+        """Writes the binary models of all models (see `Model.write_binary`). The models are read from
+        the binary models, which is much faster than parsing the model files, until the model files are changed.
+
+        :return: A list of the paths of the binary models
+        """
+        return [model.write_binary() for model in self]
 
     def dirpattern(self, pattern):
         """A regex pattern used to find directories containing models."""
@@ -108,13 +134,18 @@ class Models(Directory, list):
     @x_to_features
     def predict(self, x_test) -> pd.DataFrame:
         # todo: update docs
-        """Returns dictionary of DataFrame({"atom": {"property": [values]}})"""
-        return pd.DataFrame(
-            {
-                atom: {model.type: model.predict(features) for model in self[atom]}
-                for atom, features in x_test.items()
-            }
-        )
+        """Returns dictionary of DataFrame({"atom": {"property": [values]}})
+        The predictions of all models of one atom are made at once, see `GroupedPredictor`."""
+        predictions = {}
+        for atom, features in x_test.items():
+            atom_models = list(self[atom])
+            predictions[atom] = dict(
+                zip(
+                    [model.type for model in atom_models],
+                    GroupedPredictor(atom_models).predict(features),
+                )
+            )
+        return pd.DataFrame(predictions)
 
     @x_to_features
     def variance(self, x_test) -> pd.DataFrame:
@@ -199,6 +230,10 @@ class ModelsView(Models):
                 if arg in (model.atom, model.type):
                     self.append(model)
 
+    def _parse(self) -> None:
+        """The models of a view are selected from the models it is made from, the directory is not parsed again."""
+        pass
+
     def __getattr__(self, item):
         if len(self) == 1:
             return getattr(self[0], item)
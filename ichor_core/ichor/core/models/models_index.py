@@ -0,0 +1,134 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from ichor.core.atoms import ALF
+from ichor.core.models.kernels.kernel import CompositeKernel, Kernel, KernelSum
+
+
+def _kernel_type(kernel: Kernel) -> str:
+    """Returns the types of the kernels a kernel is made of, e.g. `(RBF*PeriodicKernel)`."""
+    if isinstance(kernel, CompositeKernel):
+        operator = "+" if isinstance(kernel, KernelSum) else "*"
+        return f"({_kernel_type(kernel.k1)}{operator}{_kernel_type(kernel.k2)})"
+    return type(kernel).__name__
+
+
+class ModelsIndex:
+    """
+    Index of the headers of the model files in a directory, which is stored in one (json) index file in the
+    directory. The header of a model contains the system, atom, property, ALF, dimensions and kernel type
+    of the model, so models can be selected (e.g. all models of one atom) without reading the model files.
+    The header of a model file is only read (without the training data, see `Model.read_header`) if the file is
+    not in the index, or if the size or modification time of the file has changed since it was indexed.
+
+    The index file is only written when `save` is called (e.g. by `Models.write_index`),
+    so no files are written in a models directory unless asked for.
+
+    :param directory: The directory containing the model files
+    """
+
+    _filename = ".ichor_models_index.json"
+
+    # attributes of the models which are stored in the index and set on the models read from the index
+    _attributes = (
+        "system_name",
+        "atom_name",
+        "prop",
+        "alf",
+        "natoms",
+        "nfeats",
+        "ntrain",
+    )
+
+    def __init__(self, directory: Union[Path, str]):
+        self.directory = Path(directory)
+        self._entries = None
+        self._changed = False
+
+    @classmethod
+    def index_path(cls, directory: Union[Path, str]) -> Path:
+        """Returns the path of the index file of a directory."""
+        return Path(directory) / cls._filename
+
+    @property
+    def entries(self) -> Dict[str, list]:
+        """Returns a dictionary of file name to a list of the size, modification time and header of the model file.
+        An index file which cannot be loaded is ignored."""
+        if self._entries is None:
+            self._entries = {}
+            index_path = self.index_path(self.directory)
+            if index_path.exists():
+                try:
+                    with open(index_path, "r") as f:
+                        self._entries = json.load(f)
+                except (OSError, ValueError):
+                    self._entries = {}
+        return self._entries
+
+    def get(self, path: Union[Path, str]) -> Optional[dict]:
+        """Returns the header of a model file, or None if the file is not in the index
+        or if it has been modified since it was indexed.
+
+        :param path: The path to the model file, which has to be in the indexed directory
+        """
+        path = Path(path)
+        stat = path.stat()
+        entry = self.entries.get(path.name)
+        if entry is None or entry[:2] != [stat.st_size, stat.st_mtime_ns]:
+            return None
+        return entry[2]
+
+    def set_header(self, model: "ichor.core.models.Model"):  # noqa F821
+        """Sets the header attributes of a model from the index. If the model file is not in the index
+        (or has changed), only the header of the model file is read and added to the index.
+
+        :param model: The model, whose file has to be in the indexed directory
+        """
+
+        header = self.get(model.path)
+        if header is not None:
+            model._set_read_contents(
+                **{
+                    attr: ALF(*header[attr]) if attr == "alf" else header[attr]
+                    for attr in self._attributes
+                },
+            )
+            return
+
+        model.read_header()
+        stat = model.path.stat()
+        header = {attr: getattr(model, attr) for attr in self._attributes}
+        header["alf"] = list(header["alf"])
+        header["kernel"] = _kernel_type(model.kernel)
+        self.entries[model.path.name] = [stat.st_size, stat.st_mtime_ns, header]
+        self._changed = True
+
+    def headers(self) -> Dict[str, dict]:
+        """Returns a dictionary of the names of the indexed model files and their headers."""
+        return {name: entry[2] for name, entry in self.entries.items()}
+
+    def remove_missing(self):
+        """Removes the model files which are no longer in the directory from the index."""
+        for name in list(self.entries):
+            if not (self.directory / name).exists():
+                del self.entries[name]
+                self._changed = True
+
+    def save(self):
+        """Writes the index file if it does not exist or if any model files were added to (or removed from) the index.
+        The index is written to a temporary file first, so that the index file is never left half written.
+        Directories which cannot be written to are not indexed, the headers of the model files are read every time
+        instead."""
+        if not self._changed and self.index_path(self.directory).exists():
+            return
+        index_path = self.index_path(self.directory)
+        tmp_path = index_path.with_name(index_path.name + ".tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, index_path)
+        except OSError:
+            return
+        self._changed = False
@@ -2,10 +2,64 @@ from typing import Dict, List
 
 import numpy as np
 from ichor.core.atoms import ALF, Atoms
-from ichor.core.models.calculate_fflux_derivatives import (
-    fflux_derivs,
-    fflux_derivs_rbf_only_one_dimensional,
-)
+from ichor.core.calculators import calculate_alf_features_batch
+from ichor.core.common.units import AtomicDistance
+from ichor.core.models.calculate_fflux_derivatives import fflux_predict_values
+from ichor.core.models.gaussian_energy_derivative_wrt_features import form_b_matrices
+
+
+def _iqa_models_in_atom_order(
+    models: "ichor.core.models.Models", atom_names: List[str]  # noqa F821
+) -> List["ichor.core.models.Model"]:  # noqa F821
+    """Returns the iqa models ordered in the same way as the atoms."""
+    models_list = []
+    for atom_name in atom_names:
+        for model in models:
+            if model.atom_name == atom_name and model.prop == "iqa":
+                models_list.append(model)
+    return models_list
+
+
+def _predict_fflux_forces(
+    atoms: Atoms,  # noqa F821
+    models: "ichor.core.models.Models",  # noqa F821
+    system_alf: List[ALF],  # noqa F821
+    rbf_only: bool = False,
+) -> np.ndarray:
+    """Predicts the forces on all atoms from the derivatives of the iqa energies of all atoms.
+    The iqa energy of every atom, as well as its derivatives with respect to the features, are only
+    predicted once and are then used to calculate the forces on every atom with the chain rule,
+    using the B matrices of all atoms (which are calculated at once with `form_b_matrices`).
+    See `predict_fflux_forces_for_all_atoms` for the arguments."""
+
+    # make sure the coords are in Bohr because forces are calculated per Bohr
+    atoms = atoms.to_bohr()
+    natoms = len(atoms)
+
+    # make sure the ordering of the models is the same as the sequence of atoms
+    models_list = _iqa_models_in_atom_order(models, atoms.atom_names)
+
+    features = calculate_alf_features_batch(
+        atoms.coordinates, system_alf, coordinates_unit=AtomicDistance.Bohr
+    )
+
+    # derivatives of the features of every atom wrt. the Cartesian coordinates of all atoms
+    b_matrices = form_b_matrices(
+        atoms.coordinates, system_alf, coordinates_unit=AtomicDistance.Bohr
+    )[:, 0]
+
+    forces = np.zeros(3 * natoms)
+    for jatm_idx in range(natoms):
+        # derivatives of the iqa energy of atom jatm_idx with respect to its features
+        _, dQ_df = fflux_predict_values(
+            models_list[jatm_idx], features[jatm_idx], rbf_only=rbf_only
+        )
+        # forces exerted on every atom by the change of the iqa energy of atom jatm_idx
+        forces -= dQ_df[0] @ b_matrices[jatm_idx]
+
+    forces = forces.reshape(natoms, 3)
+
+    return forces
 
 
 def predict_fflux_forces_for_all_atoms(
@@ -29,46 +83,7 @@ def predict_fflux_forces_for_all_atoms(
     :return: A np.ndarray of shape n_atoms x 3 containing the x,y,z force for every atom
     """
 
-    atomic_forces_list = []
-
-    # make sure the coords are in Bohr because forces are calculated per Bohr
-    atoms = atoms.to_bohr()
-    atom_names = atoms.atom_names
-    natoms = len(atoms)
-
-    # make sure the ordering of the models is the same as the sequence of atoms
-    models_list = []
-    for atom_name in atom_names:
-        for model in models:
-            if model.atom_name == atom_name and model.prop == "iqa":
-                models_list.append(model)
-
-    for atm_idx in range(natoms):
-
-        # forces exerted on atom atoms[atom_idx]
-        local_forces = np.zeros(3)
-        non_local_atoms = [t for t in range(natoms) if t not in system_alf[atm_idx]]
-
-        # first three atoms that are central, x-axis, xy-plane
-        for j in range(3):
-            force = fflux_derivs(
-                atm_idx,
-                system_alf[atm_idx][j],
-                atoms,
-                system_alf,
-                models_list[system_alf[atm_idx][j]],
-            )
-            local_forces = local_forces - force
-        # rest of atoms in molecule
-        for non_local_atm in non_local_atoms:
-            force = fflux_derivs(
-                atm_idx, non_local_atm, atoms, system_alf, models_list[non_local_atm]
-            )
-            local_forces = local_forces - force
-
-        atomic_forces_list.append(local_forces)
-
-    return np.array(atomic_forces_list)
+    return _predict_fflux_forces(atoms, models, system_alf)
 
 
 def predict_fflux_forces_for_all_atoms_dict(
@@ -119,36 +134,4 @@ def predict_fflux_forces_for_all_atoms_one_dimensional(
     :return: A np.ndarray of shape n_atoms x 3 containing the x,y,z force for every atom
     """
 
-    atomic_forces_list = []
-
-    # make sure the coords are in Bohr because forces are calculated per Bohr
-    atoms = atoms.to_bohr()
-    atom_names = atoms.atom_names
-    natoms = len(atoms)
-
-    # make sure the ordering of the models is the same as the sequence of atoms
-    models_list = []
-    for atom_name in atom_names:
-        for model in models:
-            if model.atom_name == atom_name and model.prop == "iqa":
-                models_list.append(model)
-
-    for atm_idx in range(natoms):
-
-        # forces exerted on atom atoms[atom_idx]
-        local_forces = np.zeros(3)
-
-        # first three atoms that are central, x-axis, xy-plane
-        for j in range(2):
-            force = fflux_derivs_rbf_only_one_dimensional(
-                atm_idx,
-                system_alf[atm_idx][j],
-                atoms,
-                system_alf,
-                models_list[system_alf[atm_idx][j]],
-            )
-            local_forces = local_forces - force
-
-        atomic_forces_list.append(local_forces)
-
-    return np.array(atomic_forces_list)
+    return _predict_fflux_forces(atoms, models, system_alf, rbf_only=True)
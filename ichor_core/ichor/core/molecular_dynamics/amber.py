@@ -1,6 +1,7 @@
 from enum import Enum
+from itertools import islice
 from pathlib import Path
-from typing import Union
+from typing import Iterator, List, Union
 
 import numpy as np
 from ichor.core.common.str import get_characters
@@ -230,16 +231,10 @@ def write_mdin(
     ).write()
 
 
-def mdcrd_to_xyz(
-    mdcrd: Union[str, Path],  # contains geometry
-    prmtop: Union[str, Path],  # contains atom names
-    mdin: Union[str, Path],  # contains temperature information
-    system_name: str,
-    every: int = 1,
-):
+def _read_prmtop_atom_types(prmtop: Union[str, Path]) -> List[str]:
+    """Reads the atom types (elements) from the ATOM_NAME section of an Amber prmtop file."""
     atom_names = []
 
-    # read in atom names
     with open(prmtop, "r") as f:
         for line in f:
             if "ATOM_NAME" in line:
@@ -249,29 +244,112 @@ def mdcrd_to_xyz(
                     atom_names += [get_characters(a).capitalize() for a in line.split()]
                     line = next(f)
 
+    return atom_names
+
+
+def _amber_output_name(mdin: Union[str, Path], system_name: str) -> str:
+    """Name (without suffix) of trajectories converted from Amber outputs, containing the temperature
+    of the simulation if the mdin file exists."""
     mdin_inst = AmberMDIn(mdin)
 
     temperature = ""
     if mdin_inst.exists():
         temperature = mdin_inst.temperature
 
-    output_f_name = Path(f"{system_name}-amber{temperature}K.xyz")
+    return f"{system_name}-amber{temperature}K"
 
-    natoms = len(atom_names)
-    with open(mdcrd, "r") as f:
+
+def _iter_mdcrd(
+    mdcrd: Union[str, Path], natoms: int, chunk_size: int = 100000
+) -> Iterator[np.ndarray]:
+    """Reads the coordinates in an Amber mdcrd file in chunks of lines. The numbers of a chunk
+    are converted to floats at once instead of line by line.
+
+    :param mdcrd: The mdcrd file
+    :param natoms: The number of atoms in the system
+    :param chunk_size: The number of lines to read at once
+    :return: Yields `n_timesteps` x `n_atoms` x `3` arrays of coordinates
+    """
+    values_per_timestep = natoms * 3
+
+    with open(mdcrd, "rb") as f:
         _ = next(f)
-        traj = np.array([])
-        i = 0
-        with open(output_f_name, "w") as o:
-            for line in f:
-                traj = np.hstack((traj, np.array(line.split(), dtype=float)))
-                if len(traj) == natoms * 3:
-                    if i % every == 0:
-                        traj = traj.reshape(natoms, 3)
-                        o.write(f"{natoms}\n{i}\n")
-                        for atom_name, atom in zip(atom_names, traj):
-                            o.write(
-                                f"{atom_name} {atom[0]:16.8f} {atom[1]:16.8f} {atom[2]:16.8f}\n"
-                            )
-                    i += 1
-                    traj = np.array([])
+        remaining = np.empty(0)
+        while True:
+            lines = list(islice(f, chunk_size))
+            if not lines:
+                break
+            values = np.concatenate(
+                (remaining, np.array(b" ".join(lines).split()).astype(float))
+            )
+            ntimesteps = len(values) // values_per_timestep
+            yield values[: ntimesteps * values_per_timestep].reshape(
+                ntimesteps, natoms, 3
+            )
+            remaining = values[ntimesteps * values_per_timestep :]
+
+
+def mdcrd_to_xyz(
+    mdcrd: Union[str, Path],  # contains geometry
+    prmtop: Union[str, Path],  # contains atom names
+    mdin: Union[str, Path],  # contains temperature information
+    system_name: str,
+    every: int = 1,
+):
+    atom_names = _read_prmtop_atom_types(prmtop)
+
+    output_f_name = Path(f"{_amber_output_name(mdin, system_name)}.xyz")
+
+    natoms = len(atom_names)
+    i = 0
+    with open(output_f_name, "w") as o:
+        for coordinates in _iter_mdcrd(mdcrd, natoms):
+            for traj in coordinates:
+                if i % every == 0:
+                    o.write(f"{natoms}\n{i}\n")
+                    for atom_name, atom in zip(atom_names, traj):
+                        o.write(
+                            f"{atom_name} {atom[0]:16.8f} {atom[1]:16.8f} {atom[2]:16.8f}\n"
+                        )
+                i += 1
+
+
+def mdcrd_to_binary_trajectory(
+    mdcrd: Union[str, Path],
+    prmtop: Union[str, Path],
+    mdin: Union[str, Path],
+    system_name: str,
+    every: int = 1,
+    dtype: np.dtype = np.float64,
+) -> Path:
+    """Converts an Amber mdcrd file to a binary trajectory file (see `BinaryTrajectory`), which
+    can be opened without parsing the coordinates again. The mdcrd file is converted in chunks,
+    so it does not need to fit into memory.
+
+    :param mdcrd: The mdcrd file containing the geometries
+    :param prmtop: The prmtop file containing the atom names
+    :param mdin: The mdin file containing the temperature of the simulation
+    :param system_name: The name of the system, used for the name of the binary trajectory
+    :param every: Only write every nth timestep, default is 1
+    :param dtype: The floating point type in which the coordinates are stored
+    :return: The path to the binary trajectory file
+    """
+    from ichor.core.files.binary_trajectory import (
+        BinaryTrajectory,
+        BinaryTrajectoryWriter,
+    )
+
+    atom_names = _read_prmtop_atom_types(prmtop)
+    output_f_name = Path(
+        f"{_amber_output_name(mdin, system_name)}{BinaryTrajectory.get_filetype()}"
+    )
+
+    i = 0
+    with BinaryTrajectoryWriter(output_f_name, atom_names, dtype=dtype) as writer:
+        for coordinates in _iter_mdcrd(mdcrd, len(atom_names)):
+            # indices of the timesteps in this chunk that are written
+            to_write = (np.arange(i, i + len(coordinates)) % every) == 0
+            writer.append(coordinates[to_write])
+            i += len(coordinates)
+
+    return output_f_name
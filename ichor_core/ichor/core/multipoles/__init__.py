@@ -39,6 +39,15 @@ from ichor.core.multipoles.quadrupole import (
     rotate_quadrupole,
     unpack_cartesian_quadrupole,
 )
+from ichor.core.multipoles.rotation import (
+    rotate_dipoles,
+    rotate_hexadecapoles,
+    rotate_multipoles,
+    rotate_octupoles,
+    rotate_quadrupoles,
+    rotate_spherical_multipoles,
+    spherical_rotation_matrices,
+)
 
 
 __all__ = [
@@ -75,4 +84,11 @@ __all__ = [
     "displace_quadrupole_cartesian",
     "displace_dipole_cartesian",
     "displace_octupole_cartesian",
+    "rotate_dipoles",
+    "rotate_quadrupoles",
+    "rotate_octupoles",
+    "rotate_hexadecapoles",
+    "rotate_multipoles",
+    "rotate_spherical_multipoles",
+    "spherical_rotation_matrices",
 ]
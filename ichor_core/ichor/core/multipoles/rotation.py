@@ -0,0 +1,164 @@
+from functools import lru_cache
+
+import numpy as np
+from ichor.core.multipoles.dipole import (
+    dipole_cartesian_to_spherical,
+    dipole_spherical_to_cartesian,
+)
+from ichor.core.multipoles.hexadecapole import (
+    hexadecapole_cartesian_to_spherical,
+    hexadecapole_spherical_to_cartesian,
+)
+from ichor.core.multipoles.octupole import (
+    octupole_cartesian_to_spherical,
+    octupole_spherical_to_cartesian,
+)
+from ichor.core.multipoles.quadrupole import (
+    quadrupole_cartesian_to_spherical,
+    quadrupole_spherical_to_cartesian,
+)
+
+# functions converting between the spherical and Cartesian forms of every rank of multipole moments
+_conversion_functions = {
+    1: (dipole_spherical_to_cartesian, dipole_cartesian_to_spherical),
+    2: (quadrupole_spherical_to_cartesian, quadrupole_cartesian_to_spherical),
+    3: (octupole_spherical_to_cartesian, octupole_cartesian_to_spherical),
+    4: (hexadecapole_spherical_to_cartesian, hexadecapole_cartesian_to_spherical),
+}
+
+
+@lru_cache()
+def _conversion_matrices(rank: int):
+    """Returns the matrices of the (linear) conversions between the spherical and Cartesian forms of
+    multipole moments of a given rank. These are built once by converting unit vectors with the functions
+    that are used to convert a single multipole moment, so the same conventions are used.
+
+    :param rank: The rank of the multipole moments (1 for dipole, up to 4 for hexadecapole)
+    :return: A `3**rank` x `2*rank+1` matrix which converts spherical moments to (flattened) Cartesian
+        tensors and a `2*rank+1` x `3**rank` matrix which converts Cartesian tensors to spherical moments
+    """
+    spherical_to_cartesian, cartesian_to_spherical = _conversion_functions[rank]
+    n_spherical, n_cartesian = 2 * rank + 1, 3**rank
+
+    to_cartesian = np.column_stack(
+        [
+            np.asarray(spherical_to_cartesian(*unit_vector)).ravel()
+            for unit_vector in np.eye(n_spherical)
+        ]
+    )
+    to_spherical = np.column_stack(
+        [
+            cartesian_to_spherical(unit_tensor.reshape((3,) * rank))
+            for unit_tensor in np.eye(n_cartesian)
+        ]
+    )
+
+    return to_cartesian, to_spherical
+
+
+def _rotate_cartesian_tensors(tensors: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Rotates batches of Cartesian tensors of any rank, one index at a time.
+
+    :param tensors: An array of shape `n` x `m` x 3 x ... x 3 containing `m` tensors for each C matrix
+    :param C: An `n` x 3 x 3 array of C matrices
+    :return: An array of the same shape as `tensors` containing the rotated tensors
+    """
+    shape = tensors.shape
+    C_transpose = np.swapaxes(C, 1, 2)
+    # the last index is rotated and then moved in front of the other Cartesian indices, so the
+    # original order of the indices is restored after all indices have been rotated
+    for _ in range(tensors.ndim - 2):
+        tensors = (tensors.reshape(shape[0], -1, 3) @ C_transpose).reshape(shape)
+        tensors = np.moveaxis(tensors, -1, 2)
+    return tensors
+
+
+def spherical_rotation_matrices(C: np.ndarray, rank: int) -> np.ndarray:
+    """Returns the matrices which rotate spherical multipole moments of a given rank with the C matrices.
+    These are the real spherical (Wigner D) rotation matrices of the spherical moments as they are
+    ordered in ichor (e.g. q20, q21c, q21s, q22c, q22s). Rotating the moments with these matrices is the
+    same as rotating them with `rotate_dipole`, `rotate_quadrupole`, etc. The matrices are useful when many
+    multipole moments are rotated with the same C matrices.
+
+    :param C: An `n` x 3 x 3 array of C matrices (a single 3 x 3 matrix is also accepted)
+    :param rank: The rank of the multipole moments (1 for dipole, up to 4 for hexadecapole)
+    :return: An `n` x `2*rank+1` x `2*rank+1` array of rotation matrices
+    """
+    C = np.asarray(C, dtype=float).reshape(-1, 3, 3)
+    to_cartesian, to_spherical = _conversion_matrices(rank)
+
+    # rotate the Cartesian tensors of every spherical unit vector
+    unit_tensors = to_cartesian.T.reshape((2 * rank + 1,) + (3,) * rank)
+    rotated = _rotate_cartesian_tensors(
+        np.broadcast_to(unit_tensors, (len(C),) + unit_tensors.shape), C
+    )
+    return np.einsum(
+        "sx,nkx->nsk", to_spherical, rotated.reshape(len(C), 2 * rank + 1, -1)
+    )
+
+
+def rotate_spherical_multipoles(
+    multipoles: np.ndarray, C: np.ndarray, rank: int
+) -> np.ndarray:
+    """Rotates many spherical multipole moments of one rank from the global to local frame at once.
+
+    :param multipoles: An `n` x `2*rank+1` array of spherical multipole moments
+    :param C: An `n` x 3 x 3 array of C matrices, one for each row of `multipoles`
+    :param rank: The rank of the multipole moments (1 for dipole, up to 4 for hexadecapole)
+    :return: An `n` x `2*rank+1` array of the rotated spherical multipole moments
+    """
+    multipoles = np.asarray(multipoles, dtype=float).reshape(-1, 2 * rank + 1)
+    C = np.asarray(C, dtype=float).reshape(-1, 3, 3)
+    to_cartesian, to_spherical = _conversion_matrices(rank)
+
+    # global spherical -> global Cartesian -> local Cartesian -> local spherical, for all moments at once
+    cartesian = (multipoles @ to_cartesian.T).reshape(
+        (len(multipoles), 1) + (3,) * rank
+    )
+    rotated = _rotate_cartesian_tensors(cartesian, C)
+    return rotated.reshape(len(multipoles), -1) @ to_spherical.T
+
+
+def rotate_dipoles(dipoles: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Rotates an `n` x 3 array of dipole moments (q10, q11c, q11s) with an `n` x 3 x 3 array of C matrices.
+    This is the batched version of `rotate_dipole`."""
+    return rotate_spherical_multipoles(dipoles, C, 1)
+
+
+def rotate_quadrupoles(quadrupoles: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Rotates an `n` x 5 array of quadrupole moments with an `n` x 3 x 3 array of C matrices.
+    This is the batched version of `rotate_quadrupole`."""
+    return rotate_spherical_multipoles(quadrupoles, C, 2)
+
+
+def rotate_octupoles(octupoles: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Rotates an `n` x 7 array of octupole moments with an `n` x 3 x 3 array of C matrices.
+    This is the batched version of `rotate_octupole`."""
+    return rotate_spherical_multipoles(octupoles, C, 3)
+
+
+def rotate_hexadecapoles(hexadecapoles: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Rotates an `n` x 9 array of hexadecapole moments with an `n` x 3 x 3 array of C matrices.
+    This is the batched version of `rotate_hexadecapole`."""
+    return rotate_spherical_multipoles(hexadecapoles, C, 4)
+
+
+def rotate_multipoles(multipoles: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Rotates the spherical multipole moments (monopole up to hexadecapole) of many atoms or points
+    from the global to local frame at once. The monopole is not changed by the rotation.
+
+    :param multipoles: An `n` x 25 array of spherical multipole moments, ordered as in
+        `ichor.core.common.constants.multipole_names` (q00, q10, q11c, ..., q44s)
+    :param C: An `n` x 3 x 3 array of C matrices, one for each row of `multipoles`
+    :return: An `n` x 25 array of the rotated multipole moments
+    """
+    multipoles = np.asarray(multipoles, dtype=float).reshape(-1, 25)
+    rotated = np.empty_like(multipoles)
+    rotated[:, 0] = multipoles[:, 0]
+    for rank in range(1, 5):
+        # the spherical moments of rank l are the 2l+1 columns after the l**2 lower rank ones
+        columns = slice(rank**2, (rank + 1) ** 2)
+        rotated[:, columns] = rotate_spherical_multipoles(
+            multipoles[:, columns], C, rank
+        )
+    return rotated
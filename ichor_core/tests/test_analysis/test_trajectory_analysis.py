@@ -0,0 +1,80 @@
+"""Tests if the distributions of distances calculated in one pass over chunks of a trajectory are the same
+as the ones calculated by counting the distances in every bin separately."""
+
+import numpy as np
+from ichor.core.analysis import Stability, TrajectoryAnalysis
+from ichor.core.analysis.pair_distances import PairDistanceHistogram
+from ichor.core.common.pairwise import pairwise
+
+from tests.path import get_cwd
+
+example_trajectory = (
+    get_cwd(__file__) / ".." / ".." / ".." / "example_files" / "xyz" / "WATER-3000.xyz"
+)
+
+
+def test_hr():
+
+    traj = TrajectoryAnalysis(example_trajectory)
+    nbins, max_dist = 200, 2.0
+
+    natoms, ntimesteps = traj.trajectory.natoms, len(traj.trajectory)
+    expected = [
+        traj.delta_dirac(r0, r1) / (ntimesteps * natoms * (natoms - 1))
+        for r0, r1 in pairwise(traj.r(nbins, max_dist))
+    ]
+    np.testing.assert_allclose(traj.hr(nbins, max_dist), expected)
+
+    # the distributions of all pair types add up to the distribution of all distances
+    by_pair_type = traj.hr_by_pair_type(nbins, max_dist)
+    assert list(by_pair_type) == [("O", "H"), ("H", "H")]
+    np.testing.assert_allclose(sum(by_pair_type.values()), expected)
+
+    # the histogram does not depend on the number of timesteps in a chunk
+    histogram = traj.pair_distance_histogram(nbins, max_dist, chunk_size=7)
+    assert histogram.ntimesteps == ntimesteps
+    np.testing.assert_allclose(histogram.hr(), expected)
+
+
+def test_pair_types():
+
+    histogram = PairDistanceHistogram(["C", "H", "O", "H"], np.linspace(0.0, 5.0, 6))
+    assert histogram.pair_types == [("C", "H"), ("C", "O"), ("H", "O"), ("H", "H")]
+
+    coordinates = np.array(
+        [[0.0, 0.0, 0.0], [1.5, 0.0, 0.0], [0.0, 2.5, 0.0], [0.0, 0.0, 3.5]]
+    )
+    histogram.add(coordinates)
+    assert histogram.ntimesteps == 1
+    np.testing.assert_array_equal(histogram.counts[0], [0, 1, 0, 1, 0])
+    np.testing.assert_array_equal(histogram.total_counts.sum(), 6)
+
+    # distances equal to an edge of a bin are not counted (as in `delta_dirac`)
+    coordinates[1] = [1.0, 0.0, 0.0]
+    histogram.add(coordinates)
+    np.testing.assert_array_equal(histogram.counts[0], [0, 1, 0, 2, 0])
+    np.testing.assert_array_equal(histogram.total_counts.sum(), 6 + 5)
+
+
+def test_stable_trajectory():
+
+    traj = Stability(example_trajectory, example_trajectory, threshold=0.3)
+    unstable = [
+        timestep
+        for timestep, differences in enumerate(
+            traj.iter_bond_lengths_differences_matrices()
+        )
+        if differences.any()
+    ]
+
+    # the bond lengths matrix of a timestep only contains the bonded distances
+    bond_lengths = next(traj.iter_bond_lengths_matrices())
+    np.testing.assert_allclose(bond_lengths, bond_lengths.T)
+    np.testing.assert_array_equal(bond_lengths != 0, traj.connectivity_ref != 0)
+
+    first_unstable = traj.first_unstable_timestep(chunk_size=100)
+    assert first_unstable == (unstable[0] if len(unstable) else None)
+
+    traj.stable_trajectory()
+    if first_unstable is not None:
+        assert len(traj.trajectory) == first_unstable
@@ -0,0 +1,120 @@
+import numpy as np
+from ichor.core.atoms import Atom, Atoms, AtomsArray
+from ichor.core.common.units import AtomicDistance
+from ichor.core.files import Trajectory
+
+from tests.path import get_cwd
+from tests.test_atoms import _test_atoms_coords
+
+example_trajectory = (
+    get_cwd(__file__) / ".." / ".." / ".." / "example_files" / "xyz" / "WATER-3000.xyz"
+)
+
+
+def _water(offset: float = 0.0) -> Atoms:
+    return Atoms(
+        [
+            Atom("O", -0.03348733 + offset, -0.46689766, -0.00424905),
+            Atom("H", -0.50428226 + offset, 0.20263196, 0.56694849),
+            Atom("H", 0.53776959 + offset, 0.26426570, -0.56269944),
+        ]
+    )
+
+
+def test_atoms_array_views():
+
+    atoms_array = AtomsArray.from_atoms(_water())
+    for i in range(40):
+        atoms_array.append(_water(i).coordinates)
+
+    assert len(atoms_array) == 40
+    assert atoms_array.atom_names == ["O1", "H2", "H3"]
+    assert atoms_array.coordinates.shape == (40, 3, 3)
+
+    atoms = atoms_array.atoms(-1)
+    _test_atoms_coords(atoms, _water(39), AtomicDistance.Angstroms)
+    # coordinates of Atoms instances are views of the array
+    assert np.shares_memory(atoms.coordinates, atoms_array.coordinates)
+    atoms.centre()
+    np.testing.assert_allclose(
+        atoms_array.coordinates[-1].mean(axis=0), 0.0, atol=1e-12
+    )
+
+
+def test_trajectory_array_storage(tmp_path):
+
+    trajectory = Trajectory(example_trajectory)
+    assert trajectory.atom_names == ["O1", "H2", "H3"]
+
+    # coordinates are not copied, slices are views as well
+    coordinates = trajectory.coordinates
+    assert np.shares_memory(coordinates, trajectory[100].coordinates)
+    assert np.shares_memory(coordinates, trajectory[100:200].coordinates)
+    assert len(trajectory[100:200]) == 100
+    np.testing.assert_allclose(trajectory[[3, 7]].coordinates, coordinates[[3, 7]])
+
+    # written trajectory is the same as the original one
+    trajectory[:50].write(tmp_path / "trajectory.xyz")
+    np.testing.assert_allclose(
+        Trajectory(tmp_path / "trajectory.xyz").coordinates, coordinates[:50]
+    )
+
+    # adding a timestep with different atoms still works
+    mixed_trajectory = Trajectory(tmp_path / "mixed.xyz", trajectory[:2])
+    mixed_trajectory.add(Atoms([Atom("C", 0.0, 0.0, 0.0)]))
+    assert [len(atoms) for atoms in mixed_trajectory] == [3, 3, 1]
+
+
+def test_trajectory_mutators():
+
+    coordinates = Trajectory(example_trajectory).coordinates.copy()
+    # the timesteps of a streamed trajectory are read into memory before they are modified
+    for trajectory in (
+        Trajectory(example_trajectory),
+        Trajectory(example_trajectory, stream=True),
+    ):
+        trajectory[0] = _water(10.0)
+        np.testing.assert_allclose(trajectory[0].coordinates, _water(10.0).coordinates)
+        np.testing.assert_allclose(trajectory[1:].coordinates, coordinates[1:])
+
+        del trajectory[0]
+        assert len(trajectory) == len(coordinates) - 1
+        np.testing.assert_allclose(trajectory.coordinates, coordinates[1:])
+
+        np.testing.assert_allclose(trajectory.pop().coordinates, coordinates[-1])
+        assert len(trajectory) == len(coordinates) - 2
+
+        trajectory.insert(0, _water(20.0))
+        assert len(trajectory) == len(coordinates) - 1
+        np.testing.assert_allclose(trajectory[0].coordinates, _water(20.0).coordinates)
+        np.testing.assert_allclose(trajectory[1:].coordinates, coordinates[1:-1])
+
+
+def test_trajectory_timesteps_changed_in_place(tmp_path):
+
+    trajectory = Trajectory(example_trajectory)
+    coordinates = trajectory.coordinates.copy()
+    centred_coordinates = coordinates - coordinates.mean(axis=1, keepdims=True)
+
+    # timesteps which are indexed or iterated over are views of the stored coordinates
+    trajectory[0].centre()
+    for atoms in trajectory[1:3]:
+        atoms.centre()
+    np.testing.assert_allclose(trajectory[:3].coordinates, centred_coordinates[:3])
+
+    # writing a centred trajectory centres the timesteps of the trajectory (as for `Atoms` instances)
+    trajectory[:10].write(tmp_path / "centred.xyz", center=True)
+    np.testing.assert_allclose(trajectory[:10].coordinates, centred_coordinates[:10])
+    np.testing.assert_allclose(
+        Trajectory(tmp_path / "centred.xyz").coordinates,
+        centred_coordinates[:10],
+        atol=1e-11,
+    )
+
+    # changes are kept when the trajectory switches to storing `Atoms` instances
+    atoms = trajectory[10]
+    atoms.centre()
+    trajectory.pop()
+    np.testing.assert_allclose(trajectory[10].coordinates, centred_coordinates[10])
+    trajectory[11].centre()
+    np.testing.assert_allclose(trajectory[:12].coordinates, centred_coordinates[:12])
@@ -1,10 +1,66 @@
 import numpy as np
 from ichor.core.atoms import ALF, Atom, Atoms
-from ichor.core.calculators import calculate_alf_features
+from ichor.core.calculators import calculate_alf_features, calculate_alf_features_batch
 
 
 def test_alf_features_calculator():
 
+    alf, atoms, true_features = _six_atom_system()
+
+    features_array = atoms.features(calculate_alf_features, alf)
+
+    # check all the individual atoms
+    for i, atm in enumerate(atoms):
+        atm_features = atm.features(calculate_alf_features, alf)
+        np.testing.assert_allclose(atm_features, true_features[i])
+        assert atm_features.shape == (12,)
+
+    # should contain the features for all atoms, atoms x nfeatures
+    assert features_array.shape == (6, 12)
+    np.testing.assert_allclose(features_array, true_features)
+
+
+def test_alf_features_batch_calculator():
+
+    alf, atoms, true_features = _six_atom_system()
+
+    # make a batch of geometries by rotating and translating the original geometry,
+    # which should not change the features
+    rng = np.random.default_rng(0)
+    coordinates = []
+    for _ in range(10):
+        rotation, _ = np.linalg.qr(rng.normal(size=(3, 3)))
+        coordinates.append(atoms.coordinates.dot(rotation.T) + rng.normal(size=3))
+    coordinates = np.array(coordinates)
+
+    features_array = calculate_alf_features_batch(coordinates, alf)
+
+    # atoms x timesteps x nfeatures
+    assert features_array.shape == (6, 10, 12)
+    for timestep_features in features_array.transpose(1, 0, 2):
+        np.testing.assert_allclose(timestep_features, true_features, rtol=1e-6)
+
+    # should match the per-atom calculator for every timestep
+    for timestep_idx, timestep_coordinates in enumerate(coordinates):
+        timestep_atoms = Atoms(
+            [
+                Atom(atm.type, *atom_coordinates)
+                for atm, atom_coordinates in zip(atoms, timestep_coordinates)
+            ]
+        )
+        np.testing.assert_allclose(
+            features_array[:, timestep_idx, :],
+            timestep_atoms.features(calculate_alf_features, alf),
+        )
+
+    # only one central atom
+    one_atom_features = calculate_alf_features_batch(coordinates, alf[3])
+    assert one_atom_features.shape == (1, 10, 12)
+    np.testing.assert_allclose(one_atom_features[0], features_array[3])
+
+
+def _six_atom_system():
+
     alf = [
         ALF(0, 1, 2),
         ALF(1, 0, 2),
@@ -115,14 +171,4 @@ def test_alf_features_calculator():
         ]
     )
 
-    features_array = atoms.features(calculate_alf_features, alf)
-
-    # check all the individual atoms
-    for i, atm in enumerate(atoms):
-        atm_features = atm.features(calculate_alf_features, alf)
-        np.testing.assert_allclose(atm_features, true_features[i])
-        assert atm_features.shape == (12,)
-
-    # should contain the features for all atoms, atoms x nfeatures
-    assert features_array.shape == (6, 12)
-    np.testing.assert_allclose(features_array, true_features)
+    return alf, atoms, true_features
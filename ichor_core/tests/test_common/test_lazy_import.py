@@ -0,0 +1,52 @@
+"""Tests that importing the ichor.core packages does not import the (slow to import) libraries
+which are only needed by some of their modules, so that the import time of ichor does not regress."""
+
+import subprocess
+import sys
+
+import pytest
+
+from tests.path import get_cwd
+
+# libraries which take most of the import time of ichor if they are imported
+_SLOW_LIBRARIES = ["pandas", "sqlalchemy", "matplotlib", "pyarrow", "scipy"]
+
+
+def _imported_modules(code: str) -> set:
+    """Runs code in a new interpreter and returns the names of all modules which were imported."""
+    output = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys\nprint(' '.join(sys.modules))"],
+        cwd=get_cwd(__file__) / ".." / "..",
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return set(output.split())
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import ichor.core.files, ichor.core.analysis, ichor.core.models",
+        "from ichor.core.files import GJF, WFN, XYZ, Trajectory, PointsDirectory",
+        "from ichor.core.analysis import TrajectoryAnalysis",
+        "from ichor.core.models import Model",
+    ],
+)
+def test_no_slow_imports(code):
+    imported_modules = _imported_modules(code)
+    assert not [library for library in _SLOW_LIBRARIES if library in imported_modules]
+
+
+def test_lazy_attributes():
+
+    import ichor.core.files
+    from ichor.core.files.gaussian import GJF
+
+    assert ichor.core.files.GJF is GJF
+    assert set(ichor.core.files.__all__) <= set(dir(ichor.core.files))
+    for name in ichor.core.files.__all__:
+        assert getattr(ichor.core.files, name).__name__ == name
+
+    with pytest.raises(AttributeError):
+        ichor.core.files.NotAFile
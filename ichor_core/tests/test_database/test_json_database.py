@@ -0,0 +1,69 @@
+"""Tests if a json database contains the same data as a SQLite database written from the same points."""
+
+import json
+import shutil
+
+import pandas as pd
+from ichor.core.database import get_database_info_from_db_type
+from ichor.core.database.json import get_json_db_info
+from ichor.core.files import PointsDirectory
+
+from tests.path import get_cwd
+
+example_points_dir = (
+    get_cwd(__file__)
+    / ".."
+    / ".."
+    / ".."
+    / "example_files"
+    / "example_points_directory"
+    / "WATER_MONOMER.pointsdir"
+)
+
+
+def test_json_database(tmp_path):
+
+    points_dir = PointsDirectory(example_points_dir)
+
+    sqlite_path = points_dir.write_to_sqlite3_database(
+        tmp_path / "water", print_missing_data=False
+    )
+    json_path = points_dir.write_to_json_database(
+        tmp_path / "water", npoints_per_json=3, print_missing_data=False
+    )
+    # points for which AIMAll crashed are written as null and are not read
+    (json_path / "water_json_2.json").write_text(json.dumps([None]))
+
+    sqlite_ids, sqlite_atom_names, sqlite_df = get_database_info_from_db_type(
+        sqlite_path, "sqlite"
+    )
+    json_ids, json_atom_names, json_df = get_database_info_from_db_type(
+        json_path, "json"
+    )
+    assert json_ids == sqlite_ids
+    assert json_atom_names == sqlite_atom_names
+    assert list(json_df.columns) == list(sqlite_df.columns)
+    pd.testing.assert_frame_equal(
+        json_df.drop(columns="date_added"),
+        sqlite_df.drop(columns="date_added"),
+        check_dtype=False,
+    )
+
+    # only the rows of the selected atoms are read
+    _, atom_names, h_df = get_json_db_info(json_path, atom_names=["H2", "H3"])
+    assert atom_names == ["H2", "H3"]
+    pd.testing.assert_frame_equal(
+        h_df,
+        json_df.loc[json_df["atom_name"] != "O1"].reset_index(drop=True),
+    )
+
+    # the ids continue over the json directories of many points directories
+    parent_path = tmp_path / "water_json_parent"
+    for i in range(2):
+        shutil.copytree(json_path, parent_path / f"water{i}_json")
+    parent_ids, _, parent_df = get_json_db_info(parent_path)
+    assert parent_ids == list(range(1, 9))
+    pd.testing.assert_frame_equal(
+        parent_df.iloc[12:].drop(columns="id").reset_index(drop=True),
+        json_df.drop(columns="id"),
+    )
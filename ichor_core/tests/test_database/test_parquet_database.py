@@ -0,0 +1,107 @@
+"""Tests if a parquet database contains the same data as a SQLite database written from the same points."""
+
+import numpy as np
+import pandas as pd
+from ichor.core.database import (
+    get_alf_from_first_db_geometry,
+    get_database_info_from_db_type,
+)
+from ichor.core.database.parquet import read_parquet_database
+from ichor.core.database.query_database import write_processed_data_for_atoms
+from ichor.core.files import PointsDirectory
+
+from tests.path import get_cwd
+
+example_points_dir = (
+    get_cwd(__file__)
+    / ".."
+    / ".."
+    / ".."
+    / "example_files"
+    / "example_points_directory"
+    / "WATER_MONOMER.pointsdir"
+)
+
+
+def test_parquet_database(tmp_path):
+
+    points_dir = PointsDirectory(example_points_dir)
+
+    sqlite_path = points_dir.write_to_sqlite3_database(
+        tmp_path / "water", print_missing_data=False
+    )
+    parquet_path = points_dir.write_to_parquet_database(
+        tmp_path / "water", print_missing_data=False, npoints_per_file=3
+    )
+    # one directory for every atom, containing one file for every 3 points
+    assert sorted(p.name for p in parquet_path.iterdir()) == [
+        "atom_name=H2",
+        "atom_name=H3",
+        "atom_name=O1",
+    ]
+    assert len(list((parquet_path / "atom_name=O1").iterdir())) == 2
+
+    sqlite_ids, sqlite_atom_names, sqlite_df = get_database_info_from_db_type(
+        sqlite_path, "sqlite"
+    )
+    parquet_ids, parquet_atom_names, parquet_df = get_database_info_from_db_type(
+        parquet_path, "parquet"
+    )
+    assert parquet_ids == sqlite_ids
+    assert parquet_atom_names == sqlite_atom_names
+    assert list(parquet_df.columns) == list(sqlite_df.columns)
+    pd.testing.assert_frame_equal(
+        parquet_df.drop(columns="date_added"),
+        sqlite_df.drop(columns="date_added"),
+        check_dtype=False,
+    )
+    assert get_alf_from_first_db_geometry(
+        parquet_path, "parquet"
+    ) == get_alf_from_first_db_geometry(sqlite_path, "sqlite")
+
+    # only the requested columns, atoms and rows are read
+    h2_df = read_parquet_database(
+        parquet_path, columns=["iqa"], atom_names=["H2"], max_integration_error=1.5e-5
+    )
+    assert list(h2_df.columns) == ["id", "iqa", "atom_name"]
+    expected = sqlite_df.loc[
+        (sqlite_df["atom_name"] == "H2")
+        & (sqlite_df["integration_error"].abs() < 1.5e-5)
+    ]
+    assert 0 < len(h2_df) < 4
+    np.testing.assert_array_equal(h2_df["iqa"], expected["iqa"])
+
+    # points added to an existing database get new ids
+    points_dir.write_to_parquet_database(parquet_path, print_missing_data=False)
+    ids, _, _ = get_database_info_from_db_type(parquet_path, "parquet")
+    assert ids == list(range(1, 9))
+
+
+def test_parquet_processed_csvs(tmp_path, monkeypatch):
+
+    points_dir = PointsDirectory(example_points_dir)
+    sqlite_path = points_dir.write_to_sqlite3_database(
+        tmp_path / "water", print_missing_data=False
+    )
+    parquet_path = points_dir.write_to_parquet_database(
+        tmp_path / "water", print_missing_data=False, npoints_per_file=3
+    )
+    alf = get_alf_from_first_db_geometry(sqlite_path, "sqlite")
+
+    # the parquet database is read atom by atom, which gives the same csvs as reading the whole database
+    for db_path, db_type in ((sqlite_path, "sqlite"), (parquet_path, "parquet")):
+        (tmp_path / db_type).mkdir()
+        monkeypatch.chdir(tmp_path / db_type)
+        write_processed_data_for_atoms(
+            db_path, db_type, alf, max_integration_error=1.5e-5, calc_forces=True
+        )
+
+    sqlite_csvs = sorted((tmp_path / "sqlite" / "processed_csvs").iterdir())
+    parquet_csvs = sorted((tmp_path / "parquet" / "processed_csvs").iterdir())
+    assert [p.name for p in parquet_csvs] == [p.name for p in sqlite_csvs]
+    # the integration errors of all O1 points are above the threshold, so its csv has no points
+    assert [len(pd.read_csv(p)) for p in parquet_csvs] == [3, 0, 0]
+    for sqlite_csv, parquet_csv in zip(sqlite_csvs, parquet_csvs):
+        pd.testing.assert_frame_equal(
+            pd.read_csv(parquet_csv), pd.read_csv(sqlite_csv), check_dtype=False
+        )
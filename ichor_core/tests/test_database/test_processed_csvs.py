@@ -0,0 +1,121 @@
+"""Tests if the processed csvs written from a database contain the same features and rotated multipoles
+as the ones calculated point by point from `Atoms` instances."""
+
+import numpy as np
+import pandas as pd
+from ichor.core.calculators import calculate_alf_features
+from ichor.core.common.constants import (
+    spherical_dipole_labels,
+    spherical_hexadecapole_labels,
+    spherical_octupole_labels,
+    spherical_quadrupole_labels,
+)
+from ichor.core.database import (
+    get_alf_from_first_db_geometry,
+    get_database_info_from_db_type,
+)
+from ichor.core.database.query_database import write_processed_one_atom_data_to_csv
+from ichor.core.database.sql.query_database import get_atoms_from_sqlite_point_id
+from ichor.core.multipoles import (
+    rotate_dipole,
+    rotate_hexadecapole,
+    rotate_octupole,
+    rotate_quadrupole,
+)
+
+from tests.path import get_cwd
+
+example_db = (
+    get_cwd(__file__)
+    / ".."
+    / ".."
+    / ".."
+    / "example_files"
+    / "urea_example_points_directory_sqlite.db"
+)
+
+
+def _rotate_multipole_moments(row_with_atom_info, C) -> dict:
+    """Rotates the multipole moments of one atom in one point, one rank at a time."""
+    local_multipoles = {"q00": row_with_atom_info["q00"].item()}
+    for rotate, labels in (
+        (rotate_dipole, spherical_dipole_labels),
+        (rotate_quadrupole, spherical_quadrupole_labels),
+        (rotate_octupole, spherical_octupole_labels),
+        (rotate_hexadecapole, spherical_hexadecapole_labels),
+    ):
+        rotated = rotate(*(row_with_atom_info[label].item() for label in labels), C)
+        local_multipoles.update(zip(labels, rotated))
+    return local_multipoles
+
+
+def test_processed_csv(tmp_path):
+
+    point_ids, atom_names, full_df = get_database_info_from_db_type(
+        example_db, "sqlite"
+    )
+    alf = get_alf_from_first_db_geometry(example_db, "sqlite")
+
+    for atom_name in atom_names:
+
+        write_processed_one_atom_data_to_csv(
+            full_df, point_ids, atom_name, alf, parent_directory=tmp_path
+        )
+        alf_str = "alf_" + "_".join(
+            str(i + 1) for i in alf[atom_names.index(atom_name)]
+        )
+        processed_df = pd.read_csv(
+            tmp_path / f"{atom_name}_processed_data_{alf_str}.csv"
+        )
+        assert processed_df["point_id"].tolist() == point_ids
+
+        for point_id, processed_row in processed_df.iterrows():
+
+            atoms = get_atoms_from_sqlite_point_id(full_df, point_ids[point_id])
+            np.testing.assert_allclose(
+                processed_row.filter(regex="^f[0-9]+_").to_numpy(dtype=float),
+                atoms[atom_name].features(calculate_alf_features, alf),
+            )
+
+            row_with_atom_info = full_df.loc[
+                (full_df["id"] == point_ids[point_id])
+                & (full_df["atom_name"] == atom_name)
+            ]
+            rotated_multipoles = _rotate_multipole_moments(
+                row_with_atom_info, atoms[atom_name].C(alf)
+            )
+            np.testing.assert_allclose(
+                processed_row[list(rotated_multipoles)].to_numpy(dtype=float),
+                list(rotated_multipoles.values()),
+                atol=1e-12,
+            )
+
+
+def test_processed_csv_missing_iqa(tmp_path):
+
+    point_ids, _, full_df = get_database_info_from_db_type(example_db, "sqlite")
+    alf = get_alf_from_first_db_geometry(example_db, "sqlite")
+
+    # points without iqa energies (missing .int files) are written with features only
+    full_df = full_df.astype({"iqa": object})
+    full_df.loc[full_df["id"] == point_ids[0], "iqa"] = None
+    # points with a large integration error for the atom are not written
+    full_df.loc[
+        (full_df["id"] == point_ids[1]) & (full_df["atom_name"] == "O2"),
+        "integration_error",
+    ] = 0.1
+
+    write_processed_one_atom_data_to_csv(
+        full_df, point_ids, "C1", alf, parent_directory=tmp_path
+    )
+    write_processed_one_atom_data_to_csv(
+        full_df, point_ids, "O2", alf, parent_directory=tmp_path
+    )
+
+    c1_df = pd.read_csv(next(tmp_path.glob("C1_*.csv")))
+    assert c1_df["point_id"].tolist() == point_ids
+    assert np.isnan(c1_df["iqa"][0]) and np.isnan(c1_df["q00"][0])
+    assert not c1_df.filter(regex="^f[0-9]+_").isnull().values.any()
+
+    o2_df = pd.read_csv(next(tmp_path.glob("O2_*.csv")))
+    assert o2_df["point_id"].tolist() == point_ids[:1]
@@ -0,0 +1,283 @@
+"""Tests if points written to SQLite databases in batches contain the same data as the points directory."""
+
+import shutil
+
+import numpy as np
+import pandas as pd
+from ichor.core.database.json import get_data_for_point
+from ichor.core.database.sql import (
+    add_atom_names_to_database,
+    add_point_to_database,
+    add_points_data_to_database,
+    create_database,
+    create_database_indexes,
+    create_database_session,
+    read_point_fingerprints,
+    sync_points_to_database,
+)
+from ichor.core.database.sql.query_database import (
+    create_sqlite_db_engine,
+    get_full_dataframe_for_all_atoms,
+)
+from ichor.core.files import ParsedFileCache, PointsDirectory
+from sqlalchemy import text
+
+from tests.path import get_cwd
+
+example_files = get_cwd(__file__) / ".." / ".." / ".." / "example_files"
+example_points_dir = (
+    example_files / "example_points_directory" / "WATER_MONOMER.pointsdir"
+)
+example_db = example_files / "urea_example_points_directory_sqlite.db"
+
+
+def _index_names(db_path):
+    with create_sqlite_db_engine(db_path).connect() as conn:
+        return set(
+            conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'index'")
+            ).scalars()
+        )
+
+
+def test_write_points_in_batches(tmp_path):
+
+    points_dir = PointsDirectory(example_points_dir)
+
+    db_path = points_dir.write_to_sqlite3_database(
+        tmp_path / "water", print_missing_data=False, batch_size=3
+    )
+    assert {"ix_dataset_point_id", "ix_dataset_atom_id"} <= _index_names(db_path)
+    with create_sqlite_db_engine(db_path).connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+
+    # adding the points again to the existing database
+    points_dir.write_to_sqlite3_database(
+        db_path, print_missing_data=False, batch_size=3
+    )
+
+    full_df = get_full_dataframe_for_all_atoms(db_path)
+    assert len(full_df) == 2 * 4 * 3
+    for point_id, point_df in full_df.groupby("id"):
+        point = points_dir[(point_id - 1) % 4]
+        assert point_df["name"].iloc[0] == point.name_without_suffix
+        assert point_df["atom_name"].tolist() == point.atom_names
+        np.testing.assert_allclose(
+            point_df[["x", "y", "z"]].to_numpy(), point.coordinates
+        )
+        np.testing.assert_allclose(
+            point_df["iqa"].to_numpy(), [point.ints[a].iqa for a in point.atom_names]
+        )
+
+
+def test_add_points_data(tmp_path):
+
+    db_path = tmp_path / "water.sqlite"
+    create_database(db_path)
+    session = create_database_session(db_path, pragmas={})
+
+    point_data = get_data_for_point(
+        PointsDirectory(example_points_dir)[0], print_missing_data=False
+    )
+    # a point without .int files for an atom which is not in the atom_names table yet
+    other_point_data = {
+        "name": "OTHER",
+        "date_added": point_data["date_added"],
+        "wfn_energy": None,
+        "atomic_data": {
+            "N1": {"coordinates": [0.0, 0.0, 0.0], "global_forces": [None] * 3}
+        },
+    }
+
+    npoints = add_points_data_to_database(
+        session, [point_data, None, other_point_data, point_data], batch_size=2
+    )
+    assert npoints == 3
+
+    full_df = get_full_dataframe_for_all_atoms(db_path)
+    assert full_df["id"].tolist() == [1, 1, 1, 2, 3, 3, 3]
+    assert full_df["atom_name"].tolist() == ["O1", "H2", "H3", "N1"] + [
+        "O1",
+        "H2",
+        "H3",
+    ]
+    other_row = full_df.loc[full_df["id"] == 2].iloc[0]
+    assert other_row[["iqa", "q00", "force_x", "wfn_energy"]].isna().all()
+
+
+def test_create_indexes_for_existing_database(tmp_path):
+
+    db_path = tmp_path / "urea.db"
+    shutil.copy(example_db, db_path)
+    full_df = get_full_dataframe_for_all_atoms(db_path)
+
+    assert "ix_dataset_point_id" not in _index_names(db_path)
+    create_database_indexes(create_sqlite_db_engine(db_path))
+    assert {"ix_dataset_point_id", "ix_dataset_atom_id"} <= _index_names(db_path)
+
+    pd.testing.assert_frame_equal(get_full_dataframe_for_all_atoms(db_path), full_df)
+
+
+def test_points_with_shell_script_are_not_added(tmp_path, capsys):
+
+    points_dir_path = tmp_path / example_points_dir.name
+    shutil.copytree(example_points_dir, points_dir_path)
+    # AIMAll deletes its shell script if it ran successfully, so this point likely crashed
+    (points_dir_path / "WATER_MONOMER0001.pointdir" / "aimall.sh").touch()
+
+    points_dir = PointsDirectory(points_dir_path)
+    db_path = tmp_path / "water.sqlite"
+    create_database(db_path)
+    session = create_database_session(db_path)
+    add_atom_names_to_database(session, points_dir[0].atom_names)
+    # the point is skipped also when missing data is not printed
+    for point in points_dir:
+        add_point_to_database(session, point, print_missing_data=False)
+    session.close()
+    assert capsys.readouterr().out == ""
+
+    full_df = get_full_dataframe_for_all_atoms(db_path)
+    assert full_df["name"].unique().tolist() == [
+        "WATER_MONOMER0000",
+        "WATER_MONOMER0002",
+        "WATER_MONOMER0003",
+    ]
+
+    db_path = points_dir.write_to_sqlite3_database(
+        tmp_path / "water_batches", print_missing_data=False
+    )
+    assert len(get_full_dataframe_for_all_atoms(db_path)) == 3 * 3
+
+
+def _copy_point(point_path, path):
+    """Copies a point directory, renaming its files to the name of the new point."""
+    shutil.copytree(point_path, path)
+    for f in sorted(path.rglob("*"), reverse=True):
+        f.rename(f.with_name(f.name.replace(point_path.stem, path.stem)))
+
+
+def test_sync_points_to_database(tmp_path):
+
+    points_dir_path = tmp_path / "WATER_MONOMER.pointsdir"
+    for i in range(2):
+        _copy_point(
+            example_points_dir / f"WATER_MONOMER000{i}.pointdir",
+            points_dir_path / f"WATER_MONOMER000{i}.pointdir",
+        )
+
+    # a database made without the manifest, so all of its points are updated the first time
+    db_path = PointsDirectory(points_dir_path).write_to_sqlite3_database(
+        tmp_path / "water", print_missing_data=False
+    )
+    session = create_database_session(db_path)
+    report = sync_points_to_database(
+        session, PointsDirectory(points_dir_path), print_missing_data=False
+    )
+    assert report.added == [] and len(report.updated) == 2
+    report = sync_points_to_database(
+        session, PointsDirectory(points_dir_path), print_missing_data=False
+    )
+    assert len(report.unchanged) == 2
+
+    # the parsed file cache files written when the points are read do not change the points
+    ParsedFileCache.enable()
+    try:
+        PointsDirectory(points_dir_path).raw_data
+    finally:
+        ParsedFileCache.disable()
+        ParsedFileCache._loaded.clear()
+    assert ParsedFileCache.info(points_dir_path)["directories"] == 2 * 2
+    report = sync_points_to_database(
+        session, PointsDirectory(points_dir_path), print_missing_data=False
+    )
+    assert len(report.unchanged) == 2
+
+    # one point is changed (it now contains the files of another point) and one point is added
+    shutil.rmtree(points_dir_path / "WATER_MONOMER0001.pointdir")
+    _copy_point(
+        example_points_dir / "WATER_MONOMER0003.pointdir",
+        points_dir_path / "WATER_MONOMER0001.pointdir",
+    )
+    _copy_point(
+        example_points_dir / "WATER_MONOMER0002.pointdir",
+        points_dir_path / "WATER_MONOMER0002.pointdir",
+    )
+    report = sync_points_to_database(
+        session, PointsDirectory(points_dir_path), print_missing_data=False, ncores=2
+    )
+    assert report.added == ["WATER_MONOMER0002"]
+    assert report.updated == ["WATER_MONOMER0001"]
+    assert report.unchanged == ["WATER_MONOMER0000"]
+    assert {
+        name: point_id
+        for name, (point_id, _) in read_point_fingerprints(session).items()
+    } == {
+        "WATER_MONOMER0000": 1,
+        "WATER_MONOMER0001": 2,
+        "WATER_MONOMER0002": 3,
+    }
+    session.close()
+
+    full_df = get_full_dataframe_for_all_atoms(db_path)
+    assert len(full_df) == 3 * 3
+    original_points_dir = PointsDirectory(example_points_dir)
+    for point_id, point_df in full_df.groupby("id"):
+        point = original_points_dir[[0, 3, 2][point_id - 1]]
+        np.testing.assert_allclose(
+            point_df[["x", "y", "z"]].to_numpy(), point.coordinates
+        )
+        np.testing.assert_allclose(
+            point_df["iqa"].to_numpy(), [point.ints[a].iqa for a in point.atom_names]
+        )
+
+
+def test_sync_points_which_cannot_be_read(tmp_path):
+
+    points_dir_path = tmp_path / "WATER_MONOMER.pointsdir"
+    for i in range(2):
+        _copy_point(
+            example_points_dir / f"WATER_MONOMER000{i}.pointdir",
+            points_dir_path / f"WATER_MONOMER000{i}.pointdir",
+        )
+    db_path = tmp_path / "water.sqlite"
+    create_database(db_path)
+    session = create_database_session(db_path)
+    report = sync_points_to_database(
+        session, PointsDirectory(points_dir_path), print_missing_data=False
+    )
+    assert report.added == ["WATER_MONOMER0000", "WATER_MONOMER0001"]
+    assert report.not_written == []
+
+    # AIMAll likely crashed for a changed point and for a new point
+    shutil.rmtree(points_dir_path / "WATER_MONOMER0001.pointdir")
+    for i in range(1, 3):
+        _copy_point(
+            example_points_dir / f"WATER_MONOMER000{i + 1}.pointdir",
+            points_dir_path / f"WATER_MONOMER000{i}.pointdir",
+        )
+        (points_dir_path / f"WATER_MONOMER000{i}.pointdir" / "aimall.sh").touch()
+    report = sync_points_to_database(
+        session, PointsDirectory(points_dir_path), print_missing_data=False
+    )
+    assert report.added == [] and report.updated == []
+    assert report.not_written == ["WATER_MONOMER0001", "WATER_MONOMER0002"]
+
+    # the rows written before are kept and the points are read again the next time
+    full_df = get_full_dataframe_for_all_atoms(db_path)
+    assert full_df["name"].unique().tolist() == [
+        "WATER_MONOMER0000",
+        "WATER_MONOMER0001",
+    ]
+    np.testing.assert_allclose(
+        full_df[full_df["name"] == "WATER_MONOMER0001"][["x", "y", "z"]].to_numpy(),
+        PointsDirectory(example_points_dir)[1].coordinates,
+    )
+    for i in range(1, 3):
+        (points_dir_path / f"WATER_MONOMER000{i}.pointdir" / "aimall.sh").unlink()
+    report = sync_points_to_database(
+        session, PointsDirectory(points_dir_path), print_missing_data=False
+    )
+    session.close()
+    assert report.added == ["WATER_MONOMER0002"]
+    assert report.updated == ["WATER_MONOMER0001"]
+    assert report.not_written == []
@@ -29,4 +29,26 @@ def _compare_nested_dicts(dict1, dict2):
     return True
 
 
-__all__ = ["_assert_val_optional", "_compare_nested_dicts"]
+def _write_history(path, positions, velocities=None, forces=None, corrupt=()):
+    """Writes a DL_POLY HISTORY file of water molecules. The trajectory key depends on whether
+    velocities and forces are given. Binary data is written to the timesteps in `corrupt`."""
+    vectors = [v for v in (positions, velocities, forces) if v is not None]
+    key = len(vectors) - 1
+    nframes, natoms, _ = positions.shape
+    lines = ["water\n", f"{key:10d}{0:10d}{natoms:10d}{nframes:10d}\n"]
+    for i in range(nframes):
+        lines.append(
+            f"timestep{i:10d}{natoms:10d}{key:10d}{1:10d}{0.001:12.6f}{i * 0.001:12.6f}\n"
+        )
+        lines += ["".join(f"{x:20.10f}" for x in row) + "\n" for row in 20 * np.eye(3)]
+        for j, ty in enumerate(["O", "H", "H"]):
+            atom_line = f"{ty:8s}{j + 1:10d}{1.0:12.6f}{0.0:12.6f}\n"
+            if i in corrupt and j == 1:
+                atom_line = "\x00\x00\x00" + atom_line
+            lines.append(atom_line)
+            for values in vectors:
+                lines.append("".join(f"{x:20.10f}" for x in values[i, j]) + "\n")
+    path.write_text("".join(lines))
+
+
+__all__ = ["_assert_val_optional", "_compare_nested_dicts", "_write_history"]
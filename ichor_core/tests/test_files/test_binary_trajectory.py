@@ -0,0 +1,76 @@
+"""Tests if trajectories converted to binary trajectory files contain the same timesteps."""
+
+import numpy as np
+from ichor.core.files import BinaryTrajectory, DlPolyHistory, Trajectory
+
+from tests.path import get_cwd
+from tests.test_files import _write_history
+
+example_trajectory = (
+    get_cwd(__file__) / ".." / ".." / ".." / "example_files" / "xyz" / "WATER-3000.xyz"
+)
+
+
+def test_binary_trajectory(tmp_path):
+
+    trajectory = Trajectory(example_trajectory)
+
+    binary_trajectory = BinaryTrajectory.from_trajectory(
+        trajectory, tmp_path / "water.btraj"
+    )
+    assert len(binary_trajectory) == len(trajectory)
+    # the coordinates are memory mapped, not read into memory
+    assert isinstance(binary_trajectory._atoms_array._coordinates.base, np.memmap)
+    assert binary_trajectory.atom_names == trajectory.atom_names
+    np.testing.assert_array_equal(binary_trajectory.coordinates, trajectory.coordinates)
+    np.testing.assert_array_equal(
+        binary_trajectory[100:200:3].coordinates, trajectory[100:200:3].coordinates
+    )
+
+    # streamed trajectories are converted in chunks, float32 halves the file size
+    binary_trajectory_32 = BinaryTrajectory.from_trajectory(
+        Trajectory(example_trajectory, stream=True),
+        tmp_path / "water32.btraj",
+        dtype=np.float32,
+        chunk_size=3000,
+    )
+    assert binary_trajectory_32.coordinates.dtype == np.float32
+    np.testing.assert_allclose(
+        binary_trajectory_32.coordinates, trajectory.coordinates, atol=1e-5
+    )
+    assert (tmp_path / "water32.btraj").stat().st_size < 0.6 * (
+        tmp_path / "water.btraj"
+    ).stat().st_size
+
+    # modifying timesteps does not change the file until it is written
+    binary_trajectory[0].centre()
+    np.testing.assert_array_equal(
+        BinaryTrajectory(tmp_path / "water.btraj")[0].coordinates,
+        trajectory[0].coordinates,
+    )
+    binary_trajectory.write()
+    np.testing.assert_allclose(
+        BinaryTrajectory(tmp_path / "water.btraj")[0].coordinates.mean(axis=0),
+        0.0,
+        atol=1e-12,
+    )
+
+
+def test_binary_trajectory_from_history(tmp_path):
+
+    rng = np.random.default_rng(0)
+    positions, velocities, forces = rng.normal(size=(3, 5, 3, 3))
+    _write_history(tmp_path / "HISTORY", positions, velocities, forces)
+
+    binary_trajectory = BinaryTrajectory.from_trajectory(
+        DlPolyHistory(tmp_path / "HISTORY"), tmp_path / "history.btraj"
+    )
+    np.testing.assert_allclose(binary_trajectory.coordinates, positions, atol=1e-10)
+    np.testing.assert_allclose(binary_trajectory.velocities, velocities, atol=1e-10)
+    np.testing.assert_allclose(binary_trajectory.forces, forces, atol=1e-10)
+    np.testing.assert_array_equal(
+        binary_trajectory.timestep_data["ntimestep"], np.arange(5)
+    )
+    np.testing.assert_array_equal(
+        binary_trajectory.timestep_data["unit_cell"], np.tile(20 * np.eye(3), (5, 1, 1))
+    )
@@ -0,0 +1,115 @@
+"""Tests if files read from the parsed file cache have the same contents as the parsed files."""
+
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+from ichor.core.files import Int, ParsedFileCache, PointsDirectory, WFN
+
+from tests.path import get_cwd
+
+from tests.test_files import _compare_nested_dicts
+
+example_dir = (
+    get_cwd(__file__)
+    / ".."
+    / ".."
+    / ".."
+    / "example_files"
+    / "example_points_directory"
+    / "WATER_MONOMER.pointsdir"
+)
+
+
+@pytest.fixture
+def parsed_file_cache():
+    ParsedFileCache.enable()
+    ParsedFileCache.reset_statistics()
+    yield ParsedFileCache
+    ParsedFileCache.disable()
+    ParsedFileCache._loaded.clear()
+
+
+def test_parsed_file_cache(tmp_path, parsed_file_cache):
+
+    points_dir_path = tmp_path / example_dir.name
+    shutil.copytree(example_dir, points_dir_path)
+
+    raw_data = PointsDirectory(points_dir_path).raw_data
+    assert parsed_file_cache.statistics["hits"] == 0
+    nfiles = parsed_file_cache.statistics["misses"]
+    assert nfiles > 0
+    # the cache file of every directory (of the 4 points and their atomic files) is only written once
+    assert parsed_file_cache.statistics["writes"] == 4 * 2
+
+    # the cache files are loaded from disk again, nothing is parsed
+    parsed_file_cache._loaded.clear()
+    points_dir = PointsDirectory(points_dir_path)
+    assert _compare_nested_dicts(points_dir.raw_data, raw_data)
+    assert parsed_file_cache.statistics["hits"] == nfiles
+    assert parsed_file_cache.info(points_dir_path)["files"] == nfiles
+    assert points_dir[0].xyz.atoms.atom_names == ["O1", "H2", "H3"]
+
+    # modified files are parsed again
+    int_path = points_dir[0].ints.ints[0].path
+    int_path.write_text(int_path.read_text() + "\n")
+    parsed_file_cache.reset_statistics()
+    int_file = Int(int_path)
+    assert int_file.iqa == points_dir[0].ints.ints[0].iqa
+    assert parsed_file_cache.statistics["misses"] == 1
+    assert Int(int_path).wfn_file_path == int_file.wfn_file_path
+    assert parsed_file_cache.statistics["hits"] == 1
+
+    assert parsed_file_cache.clear(points_dir_path) == 4 * 2
+    assert parsed_file_cache.info(points_dir_path)["files"] == 0
+
+
+def test_parsed_file_cache_after_partial_read(tmp_path, parsed_file_cache):
+
+    wfn_path = tmp_path / "WATER_MONOMER0000.wfn"
+    shutil.copy(
+        example_dir / "WATER_MONOMER0000.pointdir" / "WATER_MONOMER0000.wfn", wfn_path
+    )
+
+    # the energy and header are read without reading the whole file, and are stored in the cache
+    # together with the rest of the contents when the whole file is read
+    wfn = WFN(wfn_path)
+    total_energy = wfn.total_energy
+    n_orbitals = wfn.n_orbitals
+    wfn.read()
+    assert parsed_file_cache.statistics["misses"] == 1
+    parsed_file_cache.save_all()
+
+    parsed_file_cache._loaded.clear()
+    cached_wfn = WFN(wfn_path).read()
+    assert parsed_file_cache.statistics["hits"] == 1
+    assert cached_wfn.total_energy == total_energy
+    assert cached_wfn.n_orbitals == n_orbitals
+    assert len(cached_wfn.molecular_orbitals) == len(wfn.molecular_orbitals)
+
+
+def test_enable_parsed_file_cache_with_environment_variable():
+    def enabled_in_new_interpreter(env):
+        return subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "from ichor.core.files import ParsedFileCache; print(ParsedFileCache.enabled)",
+            ],
+            cwd=get_cwd(__file__) / ".." / "..",
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key != ParsedFileCache.environment_variable
+    }
+    assert enabled_in_new_interpreter(env) == "False"
+    env[ParsedFileCache.environment_variable] = "1"
+    assert enabled_in_new_interpreter(env) == "True"
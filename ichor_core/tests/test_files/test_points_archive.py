@@ -0,0 +1,76 @@
+"""Tests if points packed into a points archive contain the same data as the PointsDirectory they were packed from."""
+
+import filecmp
+
+import pytest
+from ichor.core.database.json import get_data_for_point
+from ichor.core.files import ArchivedPointDirectory, PointsArchive, PointsDirectory
+
+from tests.path import get_cwd
+
+from tests.test_files import _compare_nested_dicts
+
+example_dir = (
+    get_cwd(__file__)
+    / ".."
+    / ".."
+    / ".."
+    / "example_files"
+    / "example_points_directory"
+    / "WATER_MONOMER.pointsdir"
+)
+
+
+def _point_data(point):
+    point_data = get_data_for_point(point, print_missing_data=False)
+    point_data.pop("date_added")
+    return point_data
+
+
+def test_points_archive(tmp_path):
+
+    points_dir = PointsDirectory(example_dir)
+    archive = PointsArchive.pack(points_dir, tmp_path / "WATER_MONOMER", ncores=2)
+    assert archive.path.name == "WATER_MONOMER.pointsarchive"
+
+    archive = PointsArchive(archive.path)
+    assert archive.point_names == [p.path.name for p in points_dir]
+    assert isinstance(archive[0], ArchivedPointDirectory)
+    assert (
+        archive["WATER_MONOMER0002.pointdir"].wfn.total_energy
+        == points_dir[2].wfn.total_energy
+    )
+    assert [_point_data(p) for p in archive] == [_point_data(p) for p in points_dir]
+    assert list(archive.map_points(_point_data, ncores=2)) == [
+        _point_data(p) for p in points_dir
+    ]
+    assert _compare_nested_dicts(archive.raw_data, points_dir.raw_data)
+
+    # unpacking restores the files of the points
+    unpacked_dir = archive.unpack(tmp_path / "unpacked.pointsdir")
+    for point, unpacked_point in zip(points_dir, unpacked_dir):
+        comparison = filecmp.dircmp(point.path, unpacked_point.path)
+        assert not (comparison.left_only or comparison.right_only)
+        assert not comparison.diff_files
+
+
+def test_points_archive_append(tmp_path):
+
+    points_dir = PointsDirectory(example_dir)
+    archive = PointsArchive.create(tmp_path / "WATER_MONOMER")
+    archive.add_points(points_dir[:2])
+    archive.add_points(points_dir[1:], store_files=False)
+    assert len(archive) == 4
+    assert [p.wfn.total_energy for p in archive] == [
+        p.wfn.total_energy for p in points_dir
+    ]
+    # points are looked up by name in the updated archive, replaced points are the new records
+    assert archive.get_point("WATER_MONOMER0001.pointdir") is archive[1]
+    assert archive[1].entry[2] == 0
+    with pytest.raises(KeyError):
+        archive.get_point("WATER_MONOMER0004.pointdir")
+
+    # an archive whose index was not written is recovered from the records
+    contents = archive.path.read_bytes()
+    archive.path.write_bytes(contents[:-10])
+    assert PointsArchive(archive.path).point_names == archive.point_names
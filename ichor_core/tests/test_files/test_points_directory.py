@@ -1,6 +1,8 @@
+import json
 from pathlib import Path
 
 import numpy as np
+import pandas as pd
 
 from ichor.core.files import PointDirectory, PointsDirectory
 from ichor.core.files.gaussian.gaussian_output import (
@@ -755,3 +757,51 @@ def _test_points_directory(
 def test_water_monomer_point_directory1():
 
     _test_points_directory(example_dir)
+
+
+def _wfn_energy(point):
+    return point.wfn.total_energy
+
+
+def test_points_directory_parallel(tmp_path):
+
+    points_dir = PointsDirectory(example_dir)
+
+    # the points are read in worker processes and the results are returned in order
+    assert list(points_dir.map_points(_wfn_energy, ncores=2)) == [
+        p.wfn.total_energy for p in points_dir
+    ]
+    assert points_dir.processed_data(_wfn_energy, ncores=3) == {
+        p.stem: p.wfn.total_energy for p in points_dir
+    }
+    assert _compare_nested_dicts(points_dir.get_raw_data(ncores=2), points_dir.raw_data)
+
+    serial_db = points_dir.write_to_sqlite3_database(tmp_path / "serial", echo=False)
+    parallel_db = points_dir.write_to_sqlite3_database(tmp_path / "parallel", ncores=2)
+    for table in ["points", "dataset", "atom_names"]:
+        serial_df, parallel_df = (
+            pd.read_sql_table(table, f"sqlite:///{db}")
+            for db in (serial_db, parallel_db)
+        )
+        pd.testing.assert_frame_equal(
+            serial_df.drop(columns="date_added", errors="ignore"),
+            parallel_df.drop(columns="date_added", errors="ignore"),
+        )
+    assert len(serial_df) == 3
+
+    serial_json = points_dir.write_to_json_database(
+        tmp_path / "serial", npoints_per_json=3
+    )
+    parallel_json = points_dir.write_to_json_database(
+        tmp_path / "parallel", npoints_per_json=3, ncores=2
+    )
+    for i in range(2):
+        serial_points, parallel_points = (
+            json.loads((root / f"{root.name}_{i}.json").read_text())
+            for root in (serial_json, parallel_json)
+        )
+        for serial_point, parallel_point in zip(serial_points, parallel_points):
+            serial_point.pop("date_added")
+            parallel_point.pop("date_added")
+            assert serial_point == parallel_point
+        assert len(serial_points) == (3 if i == 0 else 1)
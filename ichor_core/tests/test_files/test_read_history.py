@@ -0,0 +1,64 @@
+"""Tests if the timesteps read from a DL_POLY HISTORY file are the ones written to it,
+also when binary data is written to some of the timesteps."""
+
+import numpy as np
+import pytest
+from ichor.core.files import DlPolyHistory
+from ichor.core.files.dl_poly.dl_poly_history import ForceNotDefined
+
+from tests.test_files import _write_history
+
+
+def test_read_history(tmp_path):
+
+    rng = np.random.default_rng(0)
+    positions, velocities, forces = rng.normal(size=(3, 20, 3, 3))
+    _write_history(tmp_path / "HISTORY", positions, velocities, forces, corrupt=(3, 4))
+
+    history = DlPolyHistory(tmp_path / "HISTORY")
+    # only the corrupted timesteps are removed, not the ones after them
+    assert history.removed_timesteps == [3, 4]
+    assert len(history) == 18
+    kept = [i for i in range(20) if i not in (3, 4)]
+    assert history.existing_timesteps == kept
+    assert history.atom_names == ["O1", "H2", "H3"]
+
+    np.testing.assert_allclose(history.positions, positions[kept], atol=1e-10)
+    np.testing.assert_allclose(history.velocities, velocities[kept], atol=1e-10)
+    np.testing.assert_allclose(history.forces, forces[kept], atol=1e-10)
+
+    timestep = history[3]
+    assert timestep.ntimestep == 5
+    np.testing.assert_array_equal(timestep.unit_cell, 20 * np.eye(3))
+    np.testing.assert_allclose(timestep[0].force, forces[5, 0], atol=1e-10)
+
+
+def test_read_history_coordinates_only(tmp_path):
+
+    positions = np.random.default_rng(1).normal(size=(5, 3, 3))
+    _write_history(tmp_path / "HISTORY", positions)
+
+    history = DlPolyHistory(tmp_path / "HISTORY")
+    np.testing.assert_allclose(history.positions, positions, atol=1e-10)
+    with pytest.raises(ForceNotDefined):
+        history.forces
+
+
+def test_read_history_timestep_in_record(tmp_path):
+
+    positions = np.random.default_rng(2).normal(size=(5, 3, 3))
+    _write_history(tmp_path / "HISTORY", positions)
+
+    # only lines which start with `timestep` are headers of timesteps, and only the fixed-width
+    # atom type field of atom records is read, so the rest of a record line does not matter
+    lines = (tmp_path / "HISTORY").read_text().splitlines(keepends=True)
+    # header lines, two timesteps of 10 lines, then the header, unit cell and first atom of the third timestep
+    record = 2 + 2 * 10 + 4 + 2
+    assert lines[record].startswith("H ")
+    lines[record] = lines[record].rstrip("\n") + "   timestep 99 3 0 1 0.001 0.099\n"
+    (tmp_path / "HISTORY").write_text("".join(lines))
+
+    history = DlPolyHistory(tmp_path / "HISTORY")
+    assert history.removed_timesteps == []
+    assert history.atom_names == ["O1", "H2", "H3"]
+    np.testing.assert_allclose(history.positions, positions, atol=1e-10)
@@ -0,0 +1,72 @@
+"""Tests if timesteps streamed from a .xyz trajectory file are the same as the ones read into memory."""
+
+import shutil
+
+import numpy as np
+from ichor.core.files import Trajectory, TrajectoryIndex
+
+from tests.path import get_cwd
+
+example_trajectory = (
+    get_cwd(__file__) / ".." / ".." / ".." / "example_files" / "xyz" / "WATER-3000.xyz"
+)
+
+
+def test_streamed_trajectory(tmp_path):
+
+    trajectory_path = tmp_path / "WATER-3000.xyz"
+    shutil.copy(example_trajectory, trajectory_path)
+    coordinates = Trajectory(trajectory_path).coordinates
+
+    trajectory = Trajectory(trajectory_path, stream=True, save_index=True)
+    assert trajectory.streamed
+    assert len(trajectory) == len(coordinates)
+    assert trajectory.atom_names == ["O1", "H2", "H3"]
+    np.testing.assert_array_equal(trajectory[-1].coordinates, coordinates[-1])
+    np.testing.assert_array_equal(
+        trajectory[10:5000:7].coordinates, coordinates[10:5000:7]
+    )
+    np.testing.assert_array_equal(
+        trajectory[[9000, 3, 4]].coordinates, coordinates[[9000, 3, 4]]
+    )
+    assert [len(chunk) for chunk in trajectory.iter_chunks(4000)] == [4000, 4000, 2001]
+    np.testing.assert_array_equal(trajectory.coordinates, coordinates)
+
+    # the saved index is used as long as the trajectory file is not modified
+    assert TrajectoryIndex.load(trajectory_path) is not None
+    with open(trajectory_path, "a") as f:
+        f.write("1\n\nO 0.0 0.0 0.0\n")
+    assert TrajectoryIndex.load(trajectory_path) is None
+    assert len(Trajectory(trajectory_path, stream=True)) == len(coordinates) + 1
+
+
+def test_streamed_irregular_trajectory(tmp_path):
+
+    # blank lines, different numbers of atoms and extra columns
+    trajectory_path = tmp_path / "irregular.xyz"
+    trajectory_path.write_text(
+        "3\ni = 0\nO 0.0 0.0 0.0 1.0\nH 1.0 0.0 0.0 1.0\nH 0.0 1.0 0.0 1.0\n\n"
+        "2\ni = 1\nC 1.0 1.0 1.0\nH 2.0 2.0 2.0\n"
+        "3\n\nO 0.0 0.0 1.0\nH 1.0 0.0 1.0\nH 0.0 1.0 1.0\n"
+    )
+
+    trajectory = Trajectory(trajectory_path, stream=True)
+    assert [len(atoms) for atoms in trajectory] == [3, 2, 3]
+    assert trajectory[1].atom_names == ["C1", "H2"]
+    np.testing.assert_array_equal(
+        trajectory[::2].coordinates, Trajectory(trajectory_path)[::2].coordinates
+    )
+
+
+def test_split_streamed_trajectory(tmp_path, monkeypatch):
+
+    monkeypatch.chdir(tmp_path)
+    trajectory = Trajectory(example_trajectory, stream=True)
+
+    trajectory.split_traj(tmp_path / "split", split_size=4000)
+    split_trajectories = sorted((tmp_path / "split").iterdir())
+    assert [len(Trajectory(path)) for path in split_trajectories] == [4000, 4000, 2001]
+
+    root_path = trajectory.to_dirs("water", split_size=200, every=20)
+    assert len(list(root_path.iterdir())) == 3
+    assert len(list(root_path.glob("*/*.xyz"))) == 501
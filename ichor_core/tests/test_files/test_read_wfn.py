@@ -8,6 +8,7 @@ import pytest
 from ichor.core.atoms import Atom, Atoms
 from ichor.core.common.units import AtomicDistance
 from ichor.core.files import WFN
+from ichor.core.files.file import FileContents, FileState
 from ichor.core.files.gaussian.wfn import MolecularOrbital
 
 from tests.path import get_cwd
@@ -37,7 +38,7 @@ def _test_molecular_orbitals(
         assert mo.index == ref_mo.index
         assert mo.occupation_number == pytest.approx(ref_mo.occupation_number)
         assert mo.energy == pytest.approx(ref_mo.energy)
-        assert mo.primitives == ref_mo.primitives
+        np.testing.assert_array_equal(mo.primitives, ref_mo.primitives)
 
 
 def _test_read_wfn(
@@ -62,9 +63,13 @@ def _test_read_wfn(
     _assert_val_optional(wfn_file.n_orbitals, n_orbitals)
     _assert_val_optional(wfn_file.n_primitives, n_primitives)
     _assert_val_optional(wfn_file.n_nuclei, n_nuclei)
-    _assert_val_optional(wfn_file.centre_assignments, centre_assignments)
-    _assert_val_optional(wfn_file.type_assignments, type_assignments)
-    _assert_val_optional(wfn_file.primitive_exponents, primitive_exponents)
+    # the basis and molecular orbitals are read as NumPy arrays
+    if centre_assignments is not None:
+        np.testing.assert_array_equal(wfn_file.centre_assignments, centre_assignments)
+    if type_assignments is not None:
+        np.testing.assert_array_equal(wfn_file.type_assignments, type_assignments)
+    if primitive_exponents is not None:
+        np.testing.assert_array_equal(wfn_file.primitive_exponents, primitive_exponents)
     _test_molecular_orbitals(wfn_file.molecular_orbitals, molecular_orbitals)
     _assert_val_optional(wfn_file.total_energy, total_energy)
     _assert_val_optional(wfn_file.virial_ratio, virial_ratio)
@@ -509,3 +514,45 @@ def test_water_monomer_wfn():
         total_energy=-76.421710687455,
         virial_ratio=2.01177209,
     )
+
+
+def test_read_wfn_header_and_energy_only():
+
+    wfn_file_path = example_dir / "WATER_MONOMER0000.wfn"
+
+    # the energy is read from the end of the file, without reading the rest of the file
+    wfn_file = WFN(wfn_file_path)
+    assert wfn_file.total_energy == -76.421710687455
+    assert wfn_file.virial_ratio == 2.01177209
+    assert wfn_file.state is FileState.Unread
+    assert vars(wfn_file)["atoms"] is FileContents
+
+    # the header is read without reading the molecular orbitals
+    assert wfn_file.n_primitives == 46
+    assert wfn_file.method == "B3LYP"
+    assert wfn_file.atoms.atom_names == ["O1", "H2", "H3"]
+    assert wfn_file.state is FileState.Unread
+    assert vars(wfn_file)["molecular_orbitals"] is FileContents
+
+    # the molecular orbitals are read when they are accessed
+    assert len(wfn_file.molecular_orbitals) == 5
+    assert wfn_file.state is FileState.Read
+    assert wfn_file.molecular_orbitals[0].primitives.shape == (46,)
+    assert wfn_file.total_energy == -76.421710687455
+
+
+def test_write_wfn(tmp_path):
+
+    wfn_file = WFN(example_dir / "WATER_MONOMER0000.wfn")
+    wfn_file.write(tmp_path / "WATER_MONOMER0000.wfn")
+
+    written_wfn_file = WFN(tmp_path / "WATER_MONOMER0000.wfn")
+    assert written_wfn_file.method == "B3LYP"
+    np.testing.assert_array_equal(
+        written_wfn_file.primitive_exponents, wfn_file.primitive_exponents
+    )
+    for mo, written_mo in zip(
+        wfn_file.molecular_orbitals, written_wfn_file.molecular_orbitals
+    ):
+        np.testing.assert_array_equal(written_mo.primitives, mo.primitives)
+    assert written_wfn_file.total_energy == wfn_file.total_energy
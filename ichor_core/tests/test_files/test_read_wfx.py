@@ -0,0 +1,75 @@
+"""Tests if the header and the energy of a .wfx file are read without reading the rest of the file."""
+
+from ichor.core.files.file import FileContents, FileState
+from ichor.core.files.gaussian.wfx import WFX
+
+wfx_contents = """<Title>
+ WATER_MONOMER0000
+</Title>
+<Keywords>
+ GTO
+</Keywords>
+<Model>
+ B3LYP
+</Model>
+<Number of Nuclei>
+ 3
+</Number of Nuclei>
+<Number of Occupied Molecular Orbitals>
+ 5
+</Number of Occupied Molecular Orbitals>
+<Atomic Numbers>
+ 8
+ 1
+ 1
+</Atomic Numbers>
+<Nuclear Cartesian Coordinates>
+ -6.328188E-02 -8.823087E-01 -8.029540E-03
+ -9.529554E-01  3.829189E-01  1.071377E+00
+  1.016237E+00  4.993898E-01 -1.063348E+00
+</Nuclear Cartesian Coordinates>
+<Number of Primitives>
+ 46
+</Number of Primitives>
+<Primitive Centers>
+{primitive_centers}
+</Primitive Centers>
+<Energy = T + Vne + Vee + Vnn>
+ -7.642171068745E+01
+</Energy = T + Vne + Vee + Vnn>
+<Virial Ratio (-V/T)>
+ 2.011772090000E+00
+</Virial Ratio (-V/T)>
+<Nuclear Cartesian Energy Gradients>
+O1 -2.953315E-02 -8.272040E-02  2.495305E-02
+H2 -5.789610E-03  2.428310E-02  8.424330E-03
+H3  3.532276E-02  5.843731E-02 -3.337739E-02
+</Nuclear Cartesian Energy Gradients>
+"""
+
+
+def test_read_wfx(tmp_path):
+
+    wfx_path = tmp_path / "WATER_MONOMER0000.wfx"
+    # many lines between the header and the energy, as for the basis and molecular orbitals
+    wfx_path.write_text(
+        wfx_contents.format(primitive_centers="\n".join([" 1 1 1 1 1"] * 200))
+    )
+
+    wfx_file = WFX(wfx_path)
+    assert wfx_file.total_energy == -76.42171068745
+    assert wfx_file.virial_ratio == 2.01177209
+    assert wfx_file.state is FileState.Unread
+    assert vars(wfx_file)["atoms"] is FileContents
+
+    assert wfx_file.method == "B3LYP"
+    assert wfx_file.n_primitives == 46
+    assert wfx_file.atoms.atom_names == ["O1", "H2", "H3"]
+    assert wfx_file.state is FileState.Unread
+
+    # reading the whole file gives the same contents
+    full_wfx_file = WFX(wfx_path)
+    full_wfx_file.read()
+    assert full_wfx_file.title == "WATER_MONOMER0000"
+    assert full_wfx_file.total_energy == wfx_file.total_energy
+    assert full_wfx_file.atoms.atom_names == wfx_file.atoms.atom_names
@@ -0,0 +1,113 @@
+"""Tests if the batched Wilson B matrices and -dE/df are the same as the ones calculated for every geometry."""
+
+import numpy as np
+import pytest
+from ichor.core.atoms import Atom, Atoms
+from ichor.core.calculators import calculate_alf_atom_sequence
+from ichor.core.models.gaussian_energy_derivative_wrt_features import (
+    b_matrix_true_finite_differences,
+    convert_to_cartesian_forces,
+    convert_to_feature_forces,
+    convert_to_feature_forces_batch,
+    form_b_matrices,
+    form_b_matrix,
+)
+
+ammonia = np.array(
+    [
+        [0.0, 0.0, 0.1],
+        [0.94, 0.0, -0.28],
+        [-0.47, 0.81, -0.28],
+        [-0.47, -0.81, -0.28],
+    ]
+)
+
+
+def _noisy_geometries(geometry, ngeometries, seed=0):
+    rng = np.random.default_rng(seed)
+    return geometry + rng.normal(scale=0.05, size=(ngeometries,) + geometry.shape)
+
+
+def test_b_matrices():
+
+    coordinates = _noisy_geometries(ammonia, 5)
+    atoms_list = [
+        Atoms([Atom(ty, *xyz) for ty, xyz in zip("NHHH", geometry)])
+        for geometry in coordinates
+    ]
+    alf = atoms_list[0].alf_list(calculate_alf_atom_sequence)
+
+    b_matrices = form_b_matrices(coordinates, alf)
+    assert b_matrices.shape == (4, 5, 6, 12)
+
+    for i, atoms in enumerate(atoms_list):
+        for central_atom_idx in range(4):
+            _, finite_differences = b_matrix_true_finite_differences(
+                atoms, alf, central_atom_idx
+            )
+            np.testing.assert_allclose(
+                b_matrices[central_atom_idx, i], finite_differences, atol=1e-8
+            )
+            np.testing.assert_allclose(
+                b_matrices[central_atom_idx, i],
+                form_b_matrix(atoms, alf, central_atom_idx),
+                atol=1e-12,
+            )
+
+
+def test_b_matrices_two_atoms():
+
+    coordinates = _noisy_geometries(ammonia[:2], 3)
+    atoms = Atoms([Atom(ty, *xyz) for ty, xyz in zip("NH", coordinates[0])])
+    alf = atoms.alf_list(calculate_alf_atom_sequence)
+
+    b_matrices = form_b_matrices(coordinates, alf, [1])
+    assert b_matrices.shape == (1, 3, 1, 6)
+    np.testing.assert_allclose(
+        b_matrices[0, 0], form_b_matrix(atoms, alf, 1), atol=1e-12
+    )
+
+
+def test_feature_forces_batch():
+
+    coordinates = _noisy_geometries(ammonia, 20, seed=1)
+    atoms = Atoms([Atom(ty, *xyz) for ty, xyz in zip("NHHH", coordinates[0])])
+    alf = atoms.alf_list(calculate_alf_atom_sequence)
+    b_matrices = form_b_matrices(coordinates, alf)
+
+    # Cartesian forces which come from known forces wrt. the features of every central atom
+    rng = np.random.default_rng(2)
+    feature_forces = rng.normal(size=b_matrices.shape[:3])
+    cartesian_forces = np.einsum("ctf,ctfx->ctx", feature_forces, b_matrices).reshape(
+        4, 20, 4, 3
+    )
+
+    np.testing.assert_allclose(
+        convert_to_feature_forces_batch(cartesian_forces, b_matrices),
+        feature_forces,
+        atol=1e-10,
+    )
+    for central_atom_idx in range(4):
+        np.testing.assert_allclose(
+            convert_to_feature_forces(
+                cartesian_forces[central_atom_idx, 0],
+                b_matrices[central_atom_idx, 0],
+            ),
+            feature_forces[central_atom_idx, 0],
+            atol=1e-10,
+        )
+        np.testing.assert_allclose(
+            convert_to_cartesian_forces(
+                feature_forces[central_atom_idx, 0], b_matrices[central_atom_idx, 0]
+            ),
+            cartesian_forces[central_atom_idx, 0],
+            atol=1e-10,
+        )
+
+    # the ALF and central atom are not used to convert the forces
+    with pytest.warns(DeprecationWarning):
+        np.testing.assert_allclose(
+            convert_to_feature_forces(cartesian_forces[1, 0], b_matrices[1, 0], alf, 1),
+            feature_forces[1, 0],
+            atol=1e-10,
+        )
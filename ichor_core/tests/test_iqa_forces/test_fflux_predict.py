@@ -0,0 +1,53 @@
+"""Tests if the FFLUX predictions (and derivatives with respect to features) of many test points
+are the same as the predictions of the model."""
+
+import numpy as np
+from ichor.core.models import Model
+from ichor.core.models.calculate_fflux_derivatives import (
+    fflux_predict_value,
+    fflux_predict_values,
+)
+
+from tests.path import get_cwd
+
+example_model = (
+    get_cwd(__file__)
+    / ".."
+    / ".."
+    / ".."
+    / "example_files"
+    / "models"
+    / "AMMONIA_iqa_N1.model"
+)
+
+
+def test_fflux_predict_values():
+
+    model = Model(example_model)
+    rng = np.random.default_rng(0)
+    x_test = model.x[:20] + rng.normal(scale=0.05, size=(20, model.nfeats))
+
+    Q, dQ_df = fflux_predict_values(model, x_test)
+    np.testing.assert_allclose(Q, model.predict(x_test), rtol=1e-12)
+
+    # derivatives with respect to features from central finite differences
+    h = 1e-4
+    for i in range(model.nfeats):
+        step = np.zeros(model.nfeats)
+        step[i] = h
+        np.testing.assert_allclose(
+            dQ_df[:, i],
+            (model.predict(x_test + step) - model.predict(x_test - step)) / (2 * h),
+            atol=1e-7,
+        )
+
+    # one test point at a time
+    Q_one, dQ_df_one = fflux_predict_value(model, x_test[3])
+    np.testing.assert_allclose(Q_one, Q[3], rtol=1e-12)
+    np.testing.assert_allclose(dQ_df_one, dQ_df[3], rtol=1e-9)
+
+    # cached arrays are recalculated when the model changes
+    model.weights = 2.0 * model.weights
+    np.testing.assert_allclose(
+        fflux_predict_values(model, x_test)[1], 2.0 * dQ_df, rtol=1e-9
+    )
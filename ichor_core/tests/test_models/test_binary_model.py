@@ -0,0 +1,71 @@
+"""Tests if models read from binary models are the same as the models read from the model files."""
+
+import os
+import shutil
+
+import ichor.core.models.model as model_module
+import numpy as np
+from ichor.core.models import Model, Models
+from ichor.core.models.binary_model import (
+    binary_model_path,
+    is_binary_model_current,
+    read_binary_model,
+)
+
+from tests.path import get_cwd
+
+example_models = get_cwd(__file__) / ".." / ".." / ".." / "example_files" / "models"
+
+
+def test_binary_model_round_trip(tmp_path, monkeypatch):
+
+    shutil.copytree(example_models, tmp_path / "models")
+    text_models = Models(tmp_path / "models")
+    written_text = {
+        model.path.name: model._write_file(tmp_path) for model in text_models
+    }
+
+    binary_paths = Models(tmp_path / "models").write_binary_models()
+    assert len(binary_paths) == len(text_models)
+    assert all(is_binary_model_current(model.path) for model in text_models)
+
+    # the model files are still there, so the binary models which are read are counted
+    binary_reads = []
+
+    def counted_read_binary_model(path, *args, **kwargs):
+        binary_reads.append(path)
+        return read_binary_model(path, *args, **kwargs)
+
+    monkeypatch.setattr(model_module, "read_binary_model", counted_read_binary_model)
+
+    binary_models = Models(tmp_path / "models")
+    assert len(binary_models) == len(text_models)
+    for model in binary_models:
+        assert model._write_file(tmp_path) == written_text[model.path.name]
+        np.testing.assert_array_equal(
+            model.predict(model.x[:5]),
+            Model(example_models / model.path.name).predict(model.x[:5]),
+        )
+
+    assert sorted(binary_reads) == sorted(binary_paths)
+
+    # memory-mapped arrays
+    contents = read_binary_model(binary_paths[0], mmap_mode="r")
+    np.testing.assert_array_equal(contents.weights, text_models[0].weights)
+
+
+def test_changed_model_file_is_read(tmp_path):
+
+    model_path = tmp_path / "AMMONIA_iqa_N1.model"
+    shutil.copy(example_models / model_path.name, model_path)
+    Model(model_path).write_binary()
+    assert is_binary_model_current(model_path)
+
+    # binary models of changed model files are not used
+    stat = os.stat(model_path)
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert not is_binary_model_current(model_path)
+
+    binary_model_path(model_path).write_bytes(b"not a binary model")
+    assert not is_binary_model_current(model_path)
+    assert Model(model_path).ntrain == 500
@@ -0,0 +1,73 @@
+"""Tests if predictions and variances calculated in blocks of test (and training) points, which fit into
+a small memory budget, are the same as the ones calculated from the whole covariance matrix."""
+
+import numpy as np
+from ichor.core.models import Model
+from ichor.core.models.blocked_evaluation import (
+    blocks_of_test_points,
+    train_test_covariance,
+)
+
+from tests.path import get_cwd
+
+example_model = (
+    get_cwd(__file__)
+    / ".."
+    / ".."
+    / ".."
+    / "example_files"
+    / "models"
+    / "AMMONIA_iqa_N1.model"
+)
+
+
+def test_blocks_of_test_points():
+
+    blocks = blocks_of_test_points(10, 8, memory_budget=24)
+    assert blocks == [slice(0, 3), slice(3, 6), slice(6, 9), slice(9, 12)]
+    # the budget is shared between the threads
+    assert len(blocks_of_test_points(10, 8, memory_budget=24, ncores=3)) == 10
+    assert blocks_of_test_points(10, 8, block_size=5) == [slice(0, 5), slice(5, 10)]
+    assert len(blocks_of_test_points(0, 8)) == 1
+
+
+def test_blocked_predictions():
+
+    model = Model(example_model)
+    rng = np.random.default_rng(0)
+    x_test = model.x[:101] + rng.normal(scale=0.05, size=(101, model.nfeats))
+
+    train_test_covar = model.kernel.r(model.x, x_test)
+    expected_predictions = (
+        model.mean.value(x_test) + (train_test_covar.T @ model.weights)[:, -1]
+    ).flatten()
+    v = np.linalg.solve(model.lower_cholesky, train_test_covar)
+    expected_variances = 1.0 - np.sum(v**2, axis=0)
+
+    # the training points are split into blocks when the differences of one test block are larger than the budget
+    np.testing.assert_allclose(
+        train_test_covariance(model.kernel, model.x, x_test, memory_budget=10_000),
+        train_test_covar,
+        rtol=1e-12,
+    )
+
+    # a budget which only fits a few test points at once
+    memory_budget = 5 * model._bytes_per_test_point
+    for ncores in (1, 2):
+        np.testing.assert_allclose(
+            model.predict(x_test, memory_budget=memory_budget, ncores=ncores),
+            expected_predictions,
+            rtol=1e-12,
+        )
+        np.testing.assert_allclose(
+            model.variance(x_test, memory_budget=memory_budget, ncores=ncores),
+            expected_variances,
+            atol=1e-10,
+        )
+        predictions, variances = model.predict_with_variance(
+            x_test, memory_budget=memory_budget, ncores=ncores
+        )
+        np.testing.assert_allclose(predictions, expected_predictions, rtol=1e-12)
+        np.testing.assert_allclose(variances, expected_variances, atol=1e-10)
+
+    assert model.predict(x_test[:0]).shape == (0,)
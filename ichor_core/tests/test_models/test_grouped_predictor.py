@@ -0,0 +1,54 @@
+"""Tests if the grouped predictions of many models are the same as the predictions of every model on its own."""
+
+import numpy as np
+from ichor.core.models import GroupedPredictor, Model
+from ichor.core.models.kernels import RBF, RBFCyclic
+
+from tests.path import get_cwd
+
+example_models = get_cwd(__file__) / ".." / ".." / ".." / "example_files" / "models"
+
+
+def _model_with(kernel=None, weights=None):
+    """Returns the example model (an RBF * Periodic kernel) with a different kernel or weights."""
+    model = Model(example_models / "AMMONIA_iqa_N1.model")
+    model.read()
+    if kernel is not None:
+        model.kernel = kernel
+    if weights is not None:
+        model.weights = weights
+    return model
+
+
+def test_grouped_predictor():
+
+    rng = np.random.default_rng(0)
+    model = _model_with()
+    nfeats = model.nfeats
+
+    models = [
+        model,
+        # models of other properties of the same atom have the same training inputs
+        *[_model_with(weights=rng.normal(size=model.weights.shape)) for _ in range(3)],
+        _model_with(kernel=RBFCyclic("c", rng.uniform(0.1, 1.0, nfeats))),
+        _model_with(kernel=RBF("r", rng.uniform(0.1, 1.0, nfeats))),
+        # a kernel which is not grouped is predicted on its own
+        _model_with(
+            kernel=RBF("r", rng.uniform(0.1, 1.0, nfeats))
+            + RBF("r2", rng.uniform(0.1, 1.0, nfeats))
+        ),
+        # a model of another atom has different training inputs
+        Model(example_models / "AMMONIA_iqa_H2.model"),
+    ]
+    x_test = model.x[:120] + rng.normal(scale=0.05, size=(120, nfeats))
+
+    expected = np.array([m.predict(x_test) for m in models])
+    predictor = GroupedPredictor(models)
+    assert len(predictor._groups) == 2
+    np.testing.assert_allclose(predictor.predict(x_test), expected, rtol=1e-10)
+    np.testing.assert_allclose(
+        GroupedPredictor(models, chunk_size=7).predict(x_test), expected, rtol=1e-10
+    )
+    np.testing.assert_allclose(
+        predictor.predict(x_test[0]), expected[:, :1], rtol=1e-10
+    )
@@ -0,0 +1,82 @@
+"""Tests if the cached decomposition of the covariance matrix gives the same variances, weights
+and likelihood as calculating them from the covariance matrix directly."""
+
+import numpy as np
+from ichor.core.models import Model
+
+from tests.path import get_cwd
+
+example_model = (
+    get_cwd(__file__)
+    / ".."
+    / ".."
+    / ".."
+    / "example_files"
+    / "models"
+    / "AMMONIA_iqa_N1.model"
+)
+
+
+def _covariance_matrix(model):
+    return model.kernel.R(model.x) + model.jitter * np.identity(model.ntrain)
+
+
+def test_predict_with_variance():
+
+    model = Model(example_model)
+    rng = np.random.default_rng(0)
+    x_test = model.x[:250] + rng.normal(scale=0.05, size=(250, model.nfeats))
+
+    v = np.linalg.solve(np.linalg.cholesky(_covariance_matrix(model)), model.r(x_test))
+    expected_variance = 1.0 - np.sum(v**2, axis=0)
+
+    np.testing.assert_allclose(model.variance(x_test), expected_variance, atol=1e-10)
+    predictions, variances = model.predict_with_variance(x_test, chunk_size=100)
+    np.testing.assert_allclose(predictions, model.predict(x_test), rtol=1e-12)
+    np.testing.assert_allclose(variances, expected_variance, atol=1e-10)
+
+    # a single point
+    prediction, variance = model.predict_with_variance(x_test[0])
+    np.testing.assert_allclose(variance, expected_variance[:1], atol=1e-10)
+
+
+def test_weights_and_likelihood():
+
+    model = Model(example_model)
+    R = _covariance_matrix(model)
+    y_minus_mean = model.y - model.mean.value(model.x).reshape((-1, 1))
+
+    weights = model.compute_weights()
+    np.testing.assert_allclose(R @ weights, y_minus_mean, atol=1e-9)
+    np.testing.assert_allclose(model.logdet, np.linalg.slogdet(R)[1], rtol=1e-9)
+    np.testing.assert_allclose(
+        model.compute_likelihood(),
+        -0.5 * (y_minus_mean.T @ weights).item()
+        - 0.5 * np.linalg.slogdet(R)[1]
+        - 0.5 * model.ntrain * np.log(2 * np.pi),
+        rtol=1e-9,
+    )
+
+
+def test_covariance_cache():
+
+    model = Model(example_model)
+    lower_cholesky = model.lower_cholesky
+    # the decomposition is only calculated once and is kept when the weights change
+    assert model.lower_cholesky is lower_cholesky
+    model.weights = model.compute_weights()
+    assert model.lower_cholesky is lower_cholesky
+
+    # changing the jitter changes the covariance matrix
+    model.jitter = 1e-4
+    assert model.lower_cholesky is not lower_cholesky
+    np.testing.assert_allclose(
+        model.lower_cholesky, np.linalg.cholesky(_covariance_matrix(model))
+    )
+
+    # only the decomposition is kept, the weights and variances are calculated with triangular solves
+    model.variance(model.x[:5])
+    assert list(model._cache) == ["lower_cholesky"]
+    np.testing.assert_allclose(
+        model.invR @ _covariance_matrix(model), np.identity(model.ntrain), atol=1e-6
+    )
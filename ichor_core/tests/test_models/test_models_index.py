@@ -0,0 +1,82 @@
+"""Tests if models are selected from the headers stored in the index of a models directory,
+without reading the training data of the models."""
+
+import os
+import shutil
+
+import numpy as np
+from ichor.core.files.file import FileState
+from ichor.core.models import Model, Models
+from ichor.core.models.models_index import ModelsIndex
+
+from tests.path import get_cwd
+
+example_models = get_cwd(__file__) / ".." / ".." / ".." / "example_files" / "models"
+
+
+def test_models_index(tmp_path, monkeypatch):
+
+    shutil.copytree(example_models, tmp_path / "models")
+
+    header_reads = []
+    read_header = Model.read_header
+
+    def counted_read_header(model):
+        header_reads.append(model.path.name)
+        read_header(model)
+
+    monkeypatch.setattr(Model, "read_header", counted_read_header)
+
+    models = Models(tmp_path / "models")
+    assert len(header_reads) == 4
+    assert models.index.headers()["AMMONIA_iqa_N1.model"]["kernel"] == (
+        "(RBF*PeriodicKernel)"
+    )
+    # the index is only written when asked for
+    assert not ModelsIndex.index_path(tmp_path / "models").exists()
+    assert len(Models(tmp_path / "models")) == 4
+    assert len(header_reads) == 8
+    assert models.write_index() == ModelsIndex.index_path(tmp_path / "models")
+    assert models.write_index().exists()
+    header_reads.clear()
+
+    # the headers of all models are read from the index
+    models = Models(tmp_path / "models")
+    assert len(header_reads) == 0
+    selected = models["N1"]["iqa"]
+    assert len(selected) == 1
+    assert sorted(models.atom_names) == ["H2", "H3", "H4", "N1"]
+    assert models.ntrain == 500
+    assert all(model.state is FileState.Unread for model in models)
+
+    # the training data is only read when the model is used
+    model = Model(tmp_path / "models" / "AMMONIA_iqa_N1.model")
+    x_test = model.x[:5]
+    np.testing.assert_array_equal(selected[0].predict(x_test), model.predict(x_test))
+    assert selected[0].state is FileState.Read
+
+    # changed model files are indexed again
+    changed = tmp_path / "models" / "AMMONIA_iqa_H2.model"
+    stat = os.stat(changed)
+    os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    (tmp_path / "models" / "AMMONIA_iqa_H3.model").unlink()
+    header_reads.clear()
+    models = Models(tmp_path / "models")
+    assert header_reads == ["AMMONIA_iqa_H2.model"]
+    assert len(models.index.headers()) == 3
+    models.write_index()
+    header_reads.clear()
+    Models(tmp_path / "models")
+    assert header_reads == []
+
+
+def test_read_header(tmp_path):
+
+    shutil.copy(example_models / "AMMONIA_iqa_N1.model", tmp_path)
+    model = Model(tmp_path / "AMMONIA_iqa_N1.model")
+    assert model.ntrain == 500
+    assert model.state is FileState.Unread
+    assert model.kernel.name == "(k1*k2)"
+    assert model.state is FileState.Unread
+    assert model.x.shape == (500, 6)
+    assert model.state is FileState.Read
@@ -0,0 +1,64 @@
+"""Tests if multipole moments rotated in batches are the same as the ones rotated one by one."""
+
+import numpy as np
+from ichor.core.multipoles import (
+    rotate_dipole,
+    rotate_hexadecapole,
+    rotate_multipoles,
+    rotate_octupole,
+    rotate_quadrupole,
+    rotate_spherical_multipoles,
+    spherical_rotation_matrices,
+)
+
+rng = np.random.default_rng(42)
+n_points = 100
+multipoles = rng.normal(size=(n_points, 25))
+# random rotation matrices (with determinant +1)
+q, _ = np.linalg.qr(rng.normal(size=(n_points, 3, 3)))
+C = q * np.sign(np.linalg.det(q))[:, np.newaxis, np.newaxis]
+
+rotate_functions = {
+    1: rotate_dipole,
+    2: rotate_quadrupole,
+    3: rotate_octupole,
+    4: rotate_hexadecapole,
+}
+
+
+def test_rotate_multipoles():
+
+    rotated = rotate_multipoles(multipoles, C)
+    np.testing.assert_array_equal(rotated[:, 0], multipoles[:, 0])
+
+    for rank, rotate_function in rotate_functions.items():
+        columns = slice(rank**2, (rank + 1) ** 2)
+        expected = np.array(
+            [
+                rotate_function(*moments, c_matrix)
+                for moments, c_matrix in zip(multipoles[:, columns], C)
+            ]
+        )
+        np.testing.assert_allclose(rotated[:, columns], expected, atol=1e-12)
+        np.testing.assert_allclose(
+            rotate_spherical_multipoles(multipoles[:, columns], C, rank), expected
+        )
+
+
+def test_spherical_rotation_matrices():
+
+    for rank in rotate_functions:
+        columns = slice(rank**2, (rank + 1) ** 2)
+        D = spherical_rotation_matrices(C, rank)
+        assert D.shape == (n_points, 2 * rank + 1, 2 * rank + 1)
+        # the rotation matrices of the spherical moments are orthogonal
+        np.testing.assert_allclose(
+            D @ np.swapaxes(D, 1, 2),
+            np.broadcast_to(np.eye(2 * rank + 1), D.shape),
+            atol=1e-12,
+        )
+        np.testing.assert_allclose(
+            np.einsum("nij,nj->ni", D, multipoles[:, columns]),
+            rotate_spherical_multipoles(multipoles[:, columns], C, rank),
+            atol=1e-12,
+        )
@@ -1,61 +1,179 @@
-from typing import List, Optional
+import os
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Union
 
 from ichor.core.common.functools import classproperty
+from ichor.hpc.batch_system import local_runner
+from ichor.hpc.batch_system.batch_system import BatchSystem
+from ichor.hpc.batch_system.jobs import CannotParseJobID, Job, JobID
 from ichor.hpc.batch_system.node import NodeType
 
 
-class LocalBatchSystem:
-    """LocalBatchSystem is to only be used for debugging purposes
-    (Unless one wants to implement a batch system to run on a local machine... would be a nice addition)"""
+class LocalBatchSystem(BatchSystem):
+    """A batch system which runs jobs on the local machine, which is used when no other batch system
+    (such as SGE or SLURM) is present, e.g. on workstations or cloud machines. Submitted scripts are run
+    in the background by `ichor.hpc.batch_system.local_runner`, which runs the tasks of array jobs
+    (e.g. Gaussian or AIMAll jobs for all points) in a pool of workers. The number of tasks which run at once
+    is the number of cores of the machine divided by the number of cores of each task (also limited by the
+    maximum number of running tasks of the job). Jobs can be held until other jobs have finished,
+    in the same way as on other batch systems.
+
+    .. note::
+        The number of cores jobs can use can be changed with the `ICHOR_LOCAL_CORES` environment variable
+        and the states of jobs are stored in `~/.ichor/local_jobs`, which can be changed with the
+        `ICHOR_LOCAL_JOBS` environment variable. Every job runs its own pool of workers,
+        so jobs which run at the same time (and are not held) can use more cores than available.
+    """
+
+    @staticmethod
+    def is_present() -> bool:
+        """The local machine is always present, so jobs can always be run locally."""
+        return True
 
     @staticmethod
     def current_node() -> NodeType:
-        return NodeType.LoginNode
+        """Return the current type of node ichor is running on. Tasks of local jobs
+        have the job id environment variable set, so they are treated as compute nodes."""
+        return (
+            NodeType.ComputeNode
+            if local_runner.JOB_ID in os.environ.keys()
+            else NodeType.LoginNode
+        )
+
+    @classproperty
+    def submit_script_command(self) -> List[str]:
+        """Return a list containing the command used to submit jobs to the local batch system."""
+        return [sys.executable, local_runner.__file__, "submit"]
+
+    @classmethod
+    def parse_job_id(cls, stdout) -> str:
+        """
+        Example script submission using the local batch system:
+
+        .. code-block:: text
+
+            $ python local_runner.py submit test.sh
+            > Your job 12 ("test.sh") has been submitted
+                       ^^
+
+        The job id is given by the number, this is parsed by finding the number in the return string
+        """
+        try:
+            return re.findall(r"\d+", stdout)[0]
+        except IndexError:
+            raise CannotParseJobID(f"Cannot parse job id from output: '{stdout}'")
+
+    @classmethod
+    def get_queued_jobs(cls) -> List[Job]:
+        """Returns the tasks of all local jobs which have not finished."""
+        jobs = []
+        for job in local_runner.queued_jobs():
+            start = datetime.fromisoformat(job["started"] or job["submitted"])
+            for task_id, task_state in job["tasks"].items():
+                if task_state == "Finished":
+                    continue
+                jobs.append(
+                    Job(
+                        job["id"],
+                        0.0,
+                        job["name"],
+                        os.environ.get("USER"),
+                        task_state if job["state"] == "Running" else job["state"],
+                        start,
+                        "local",
+                        job["ncores"],
+                        task_id=task_id,
+                    )
+                )
+        return jobs
+
+    @classmethod
+    def node_options(cls, include_nodes: List[str], exclude_nodes: List[str]) -> str:
+        """Jobs always run on the local machine, so nodes cannot be selected."""
+        return ""
+
+    @classmethod
+    def hold_job(cls, job_id: Union[JobID, List[JobID]]) -> List[str]:
+        """Return a list containing the `--hold` keyword and job ids, so that the submitted job
+        is only run after these jobs have finished."""
+        jid = (
+            job_id.id
+            if isinstance(job_id, JobID)
+            else ",".join(map(str, [j.id for j in job_id if j is not None]))
+        )
+        return ["--hold", f"{jid}"]
+
+    @classmethod
+    def delete(cls, job: JobID):
+        """Stops a local job and all of its running tasks."""
+        local_runner.delete(job.id)
 
     @classproperty
     def delete_job_command(self) -> List[str]:
-        return ["echo"]
+        """Return a list containing the command used to delete local jobs."""
+        return [sys.executable, local_runner.__file__, "delete"]
 
     @staticmethod
     def status() -> List[str]:
-        return ["echo"]
+        """Return a list containing the command used to check the status of local jobs."""
+        return [sys.executable, local_runner.__file__, "status"]
 
-    @classproperty
-    def submit_script_command(self) -> List[str]:
-        return ["echo"]
+    @classmethod
+    def change_working_directory(cls, path: Path) -> str:
+        """Return the line in the job script defining the working directory from where the job is going to run."""
+        return f"-wd {path.absolute()}"
 
     @classmethod
-    def parse_job_id(cls, stdout) -> List[str]:
-        return ["test1234"]
+    def output_directory(cls, path: Path, task_array: bool = False) -> str:
+        """Return the line in the job script defining the output directory where the output of the job
+        is written to. These files end in `.o{job_id}` (`.o{job_id}.{task_id}` for array jobs)."""
+        return f"-o {path}"
 
     @classmethod
-    def change_working_directory(cls, dir):
-        return "."
+    def error_directory(cls, path: Path, task_array: bool = False) -> str:
+        """Return the line in the job script defining the error directory where any errors of the job
+        are written to. These files end in `.e{job_id}` (`.e{job_id}.{task_id}` for array jobs)."""
+        return f"-e {path}"
 
     @classmethod
-    def output_directory(cls, d, task_array=False):
-        return "."
+    def parallel_environment(cls, ncores: int) -> Optional[str]:
+        """Returns the line in the job script defining the number of cores used by every task of the job."""
+        return f"-n {ncores}" if ncores > 1 else None
 
     @classmethod
-    def error_directory(cls, d, task_array=False):
-        return "."
+    def array_job(cls, njobs: int) -> str:
+        """Returns the line in the job script that specifies this job is an array job.
+        The tasks of the array job are run at the same time in the pool of workers."""
+        return f"-t 1-{njobs}"
 
     @classmethod
-    def parallel_environment(cls, cores):
-        return 2
+    def max_running_tasks(cls, max_running_tasks: int) -> str:
+        return f"-tc {max_running_tasks}"
 
-    @property
-    def OptionCmd(self) -> str:
-        return "test"
+    @classproperty
+    def JobID(self) -> str:
+        return local_runner.JOB_ID
 
-    @classmethod
-    def array_job(cls, njobs: int, max_running_tasks: Optional[int] = None) -> str:
-        """Returns the line in the job script that specifies this job is an array job.
-        These jobs are run at the same time in parallel
-        as they do not depend on one another. An example will be running 50 Gaussian
-        or AIMALL jobs at the same time without having to submit
-        50 separate jobs. Instead 1 array job can be submitted."""
-        array_str = f"-a 1-{njobs}"
-        if max_running_tasks is not None:
-            array_str += f"{min(njobs-1, max_running_tasks)}"
-        return array_str
+    @classproperty
+    def TaskID(self) -> str:
+        return local_runner.TASK_ID
+
+    @classproperty
+    def Host(self) -> str:
+        return local_runner.HOST
+
+    @classproperty
+    def TaskLast(self) -> str:
+        return local_runner.TASK_LAST
+
+    @classproperty
+    def NumProcs(self) -> str:
+        return local_runner.NUM_PROCS
+
+    @classproperty
+    def OptionCmd(self) -> str:
+        """Returns the string used to define local batch system options (defined at the top of the file)."""
+        return local_runner.OPTION_PREFIX[1:].strip()
@@ -0,0 +1,340 @@
+"""Runs submission scripts on the local machine, for machines without a batch system (such as SGE or SLURM).
+This is used by `LocalBatchSystem`, which submits scripts by running this file:
+
+.. code-block:: text
+
+    python local_runner.py submit [--hold JOB_ID[,JOB_ID...]] SCRIPT
+    python local_runner.py status
+    python local_runner.py delete JOB_ID
+
+A submitted job is run by a background process (`python local_runner.py run JOB_ID`), which waits
+for the jobs it is held by to finish and then runs the tasks of the (array) job in a pool of workers.
+The state of every job is stored as a json file in the jobs directory, which is shared by all jobs on the machine.
+
+.. note::
+    This file only uses the standard library, so that it can be run without importing ichor
+    (which reads the ichor config file when it is imported).
+"""
+
+import argparse
+import json
+import os
+import shlex
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+# prefix of the lines in submission scripts which contain options for the local batch system
+OPTION_PREFIX = "#ICHOR "
+# environment variables which are set for every task of a job
+JOB_ID = "ICHOR_JOB_ID"
+TASK_ID = "ICHOR_TASK_ID"
+TASK_LAST = "ICHOR_TASK_LAST"
+NUM_PROCS = "ICHOR_NSLOTS"
+HOST = "ICHOR_HOST"
+# environment variables which can be used to change the jobs directory and the number of cores jobs can use
+JOBS_DIRECTORY = "ICHOR_LOCAL_JOBS"
+CORES = "ICHOR_LOCAL_CORES"
+
+# states of jobs which have stopped, jobs held by these jobs can be run
+FINISHED_STATES = ("Finished", "Deleted")
+# number of seconds between checking if the jobs a job is held by have finished
+HOLD_POLL_INTERVAL = 1.0
+
+
+def jobs_directory() -> Path:
+    """Returns the directory which contains the state of all local jobs."""
+    return Path(
+        os.environ.get(JOBS_DIRECTORY, Path.home() / ".ichor" / "local_jobs")
+    ).absolute()
+
+
+def total_cores() -> int:
+    """Returns the number of cores which jobs can use, all cores of the machine unless set with `ICHOR_LOCAL_CORES`."""
+    return int(os.environ.get(CORES, 0)) or os.cpu_count() or 1
+
+
+def parse_options(script: Path) -> dict:
+    """Reads the options of the local batch system written at the top of a submission script.
+
+    :param script: The submission script
+    :return: A dictionary containing the working directory, output and error directories,
+        the number of cores per task, the number of tasks and the maximum number of running tasks
+    """
+
+    options = {
+        "cwd": str(script.parent.absolute()),
+        "output_directory": None,
+        "error_directory": None,
+        "ncores": 1,
+        "ntasks": 1,
+        "max_running_tasks": None,
+    }
+
+    with open(script, "r") as f:
+        for line in f:
+            if not line.startswith(OPTION_PREFIX):
+                continue
+            tokens = shlex.split(line[len(OPTION_PREFIX) :])
+            # lines without options (e.g. empty node options) are ignored
+            if not tokens:
+                continue
+            flag, *values = tokens
+            value = " ".join(values)
+            if flag == "-wd":
+                options["cwd"] = value
+            elif flag == "-o":
+                options["output_directory"] = value
+            elif flag == "-e":
+                options["error_directory"] = value
+            elif flag == "-n":
+                options["ncores"] = int(value)
+            elif flag == "-t":
+                options["ntasks"] = int(value.split("-")[-1])
+            elif flag == "-tc":
+                options["max_running_tasks"] = int(value)
+
+    # relative output and error directories are relative to the working directory of the job
+    for directory in ("output_directory", "error_directory"):
+        options[directory] = str(Path(options["cwd"]) / (options[directory] or ""))
+
+    return options
+
+
+def read_job(job_id: str) -> Optional[dict]:
+    """Returns the state of a job, or None if the job does not exist."""
+    try:
+        with open(jobs_directory() / f"{job_id}.json", "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_job(job: dict):
+    """Writes the state of a job. The state is written to a temporary file first, so that
+    the state of a job is never partially written when it is read by another process."""
+    path = jobs_directory() / f"{job['id']}.json"
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(job, f)
+    os.replace(tmp_path, path)
+
+
+def _new_job_id() -> str:
+    """Reserves the next job id by creating the (empty) state file of the job."""
+    directory = jobs_directory()
+    directory.mkdir(parents=True, exist_ok=True)
+    job_ids = [int(p.stem) for p in directory.glob("*.json") if p.stem.isdigit()]
+    job_id = max(job_ids, default=0) + 1
+    while True:
+        try:
+            os.close(os.open(directory / f"{job_id}.json", os.O_CREAT | os.O_EXCL))
+            return str(job_id)
+        except FileExistsError:
+            job_id += 1
+
+
+def submit(script: Path, hold: Optional[List[str]] = None) -> str:
+    """Submits a script to run in the background, after the jobs it is held by have finished.
+
+    :param script: The submission script to run
+    :param hold: Ids of jobs which have to finish before the script is run
+    :return: The id of the submitted job
+    """
+
+    script = Path(script).absolute()
+    options = parse_options(script)
+    job_id = _new_job_id()
+
+    write_job(
+        {
+            "id": job_id,
+            "script": str(script),
+            "name": script.name,
+            "state": "Holding" if hold else "Pending",
+            "hold": list(hold or []),
+            "submitted": datetime.now().isoformat(),
+            "started": None,
+            "pid": None,
+            "tasks": {str(task): "Pending" for task in range(1, options["ntasks"] + 1)},
+            "exit_codes": {},
+            **options,
+        }
+    )
+
+    # the job is run in a new session, so it keeps running after the submitting process exits
+    # and it can be deleted (with all of its tasks) by killing its process group
+    with open(os.devnull, "wb") as devnull:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).absolute()), "run", job_id],
+            stdin=subprocess.DEVNULL,
+            stdout=devnull,
+            stderr=devnull,
+            start_new_session=True,
+        )
+
+    return job_id
+
+
+def _run_task(job: dict, task: int, lock: threading.Lock) -> int:
+    """Runs one task of a job and returns its exit code."""
+
+    with lock:
+        job["tasks"][str(task)] = "Running"
+        write_job(job)
+
+    env = dict(os.environ)
+    env.update(
+        {
+            JOB_ID: job["id"],
+            TASK_ID: str(task),
+            TASK_LAST: str(len(job["tasks"])),
+            NUM_PROCS: str(job["ncores"]),
+            HOST: os.uname().nodename,
+        }
+    )
+
+    suffix = f"{job['id']}.{task}" if len(job["tasks"]) > 1 else job["id"]
+    with open(
+        Path(job["output_directory"]) / f"{job['name']}.o{suffix}", "w"
+    ) as stdout, open(
+        Path(job["error_directory"]) / f"{job['name']}.e{suffix}", "w"
+    ) as stderr:
+        exit_code = subprocess.run(
+            ["bash", job["script"]],
+            cwd=job["cwd"],
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=stdout,
+            stderr=stderr,
+        ).returncode
+
+    with lock:
+        job["tasks"][str(task)] = "Finished"
+        job["exit_codes"][str(task)] = exit_code
+        write_job(job)
+
+    return exit_code
+
+
+def _has_finished(job_id: str) -> bool:
+    """Returns whether a job has finished (or was deleted). Jobs which do not exist are treated as finished."""
+    job = read_job(job_id)
+    return job is None or job["state"] in FINISHED_STATES
+
+
+def run(job_id: str):
+    """Runs a submitted job (this is run in the background by `submit`). Waits until the jobs which the job is
+    held by have finished and then runs the tasks of the job in a pool of workers. Every task uses the number
+    of cores of the job, so the number of tasks which run at once is the number of available cores divided by
+    the number of cores per task (limited by the maximum number of running tasks of the job).
+    """
+
+    job = read_job(job_id)
+    if job is None or job["state"] in FINISHED_STATES:
+        return
+
+    job["pid"] = os.getpid()
+    write_job(job)
+
+    while not all(_has_finished(held_job_id) for held_job_id in job["hold"]):
+        time.sleep(HOLD_POLL_INTERVAL)
+
+    job["state"] = "Running"
+    job["started"] = datetime.now().isoformat()
+    write_job(job)
+
+    ntasks = len(job["tasks"])
+    nworkers = max(1, total_cores() // job["ncores"])
+    if job["max_running_tasks"]:
+        nworkers = min(nworkers, job["max_running_tasks"])
+
+    Path(job["output_directory"]).mkdir(parents=True, exist_ok=True)
+    Path(job["error_directory"]).mkdir(parents=True, exist_ok=True)
+
+    lock = threading.Lock()
+    try:
+        with ThreadPoolExecutor(max_workers=min(nworkers, ntasks)) as executor:
+            list(
+                executor.map(
+                    lambda task: _run_task(job, task, lock), range(1, ntasks + 1)
+                )
+            )
+    finally:
+        # jobs held by this job are also run if a task could not be started
+        job["state"] = "Finished"
+        write_job(job)
+
+
+def queued_jobs() -> List[dict]:
+    """Returns the states of all jobs which have not finished."""
+    jobs = []
+    for path in jobs_directory().glob("*.json"):
+        job = read_job(path.stem)
+        if job is not None and job["state"] not in FINISHED_STATES:
+            jobs.append(job)
+    return sorted(jobs, key=lambda job: int(job["id"]))
+
+
+def status() -> str:
+    """Returns a table of the jobs which have not finished and the states of their tasks."""
+    lines = [f"{'job-ID':<8} {'name':<24} {'state':<10} {'submitted':<20} tasks"]
+    for job in queued_jobs():
+        running = sum(state == "Running" for state in job["tasks"].values())
+        finished = sum(state == "Finished" for state in job["tasks"].values())
+        lines.append(
+            f"{job['id']:<8} {job['name']:<24} {job['state']:<10} {job['submitted'][:19]:<20} "
+            f"{finished}/{len(job['tasks'])} finished, {running} running"
+        )
+    return "\n".join(lines)
+
+
+def delete(job_id: str):
+    """Stops a job and all of its running tasks."""
+    job = read_job(job_id)
+    if job is None:
+        return
+    if job["pid"] is not None:
+        try:
+            os.killpg(job["pid"], signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            pass
+    job = read_job(job_id)
+    job["state"] = "Deleted"
+    write_job(job)
+
+
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Run submission scripts on the local machine."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    submit_parser = subparsers.add_parser("submit")
+    submit_parser.add_argument("--hold", default="")
+    submit_parser.add_argument("script", type=Path)
+    subparsers.add_parser("run").add_argument("job_id")
+    subparsers.add_parser("status")
+    subparsers.add_parser("delete").add_argument("job_id")
+
+    args = parser.parse_args(args)
+
+    if args.command == "submit":
+        hold = [job_id for job_id in args.hold.split(",") if job_id]
+        job_id = submit(args.script, hold)
+        print(f'Your job {job_id} ("{args.script.name}") has been submitted')
+    elif args.command == "run":
+        run(args.job_id)
+    elif args.command == "status":
+        print(status())
+    elif args.command == "delete":
+        delete(args.job_id)
+
+
+if __name__ == "__main__":
+    main()
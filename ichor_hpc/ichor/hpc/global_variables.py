@@ -7,11 +7,7 @@ import yaml
 
 from ichor.core.common.types import FileTree, FileType
 
-from ichor.hpc.batch_system import init_batch_system
-from ichor.hpc.batch_system.parallel_environment import ParallelEnvironment
-from ichor.hpc.log import setup_logger
 from ichor.hpc.submission_script.script_names import ScriptNames
-from ichor.hpc.useful_functions import get_current_python_environment_path, init_machine
 
 # added this so that  sphinx does not execute parts of the code when reading the files
 try:
@@ -60,61 +56,119 @@ def initialize_config(config_path):
 
 
 ICHOR_CONFIG_PATH: Path = Path.home() / "ichor_config.yaml"
-# check that config file exists
 
-if not __building_docs__:
+
+# the global variables below are only initialized when they are used for the first time (see `__getattr__`),
+# so that importing ichor.hpc does not read the config file, check for batch systems and set up the logger
+
+
+def _init_ichor_config() -> dict:
+    # check that config file exists
+    if __building_docs__:
+        return None
     if not ICHOR_CONFIG_PATH.exists():
         raise MissingIchorConfig(
             "The ichor_config.yaml file is not found in the home directory. Please add it in order to use ichor.hpc"
         )
+    return initialize_config(ICHOR_CONFIG_PATH)
 
-if not __building_docs__:
-    ICHOR_CONFIG: dict = initialize_config(ICHOR_CONFIG_PATH)
-else:
-    ICHOR_CONFIG = None
-
-# the MACHINE will be a key from the top layer of the config file
-# if it not found, it will be None
-MACHINE: str = init_machine(platform.node(), ICHOR_CONFIG)
-if not __building_docs__:
-    if not MACHINE:
-        warnings.warn(
-            "The current machine is not defined in the ichor_config.yaml file."
-        )
 
-# do not raise error that machine is not defined here, because it could be running on local
-# if not __building_docs__:
-# if not MACHINE:
-#         raise ValueError("The current machine is not defined in the config file.")
-
-# make parallel environment variables to run jobs on multiple cores
-PARALLEL_ENVIRONMENT = ParallelEnvironment()
-# if you do not specify parallel environments in config, then error out with KeyError
-# make the possible parallel environments for the current machine which ichor is launched on
-if not __building_docs__:
-    if MACHINE:
-        try:
-            for p_env_name, values in ICHOR_CONFIG[MACHINE]["hpc"][
-                "parallel_environments"
-            ].items():
-                PARALLEL_ENVIRONMENT[p_env_name] = values
-        # if parallel_environment is not found, but machine is defined
-        except KeyError:
+def _init_machine() -> str:
+    from ichor.hpc.useful_functions import init_machine
+
+    # the MACHINE will be a key from the top layer of the config file
+    # if it not found, it will be None
+    machine = init_machine(platform.node(), _global_variable("ICHOR_CONFIG"))
+    if not __building_docs__:
+        if not machine:
             warnings.warn(
-                "The parallel environment variables are not defined in the ichor_config.yaml file."
+                "The current machine is not defined in the ichor_config.yaml file."
             )
-        # if the machine is not defined (and so parallel environment is also not defined)
-        except TypeError:
+
+    # do not raise error that machine is not defined here, because it could be running on local
+    return machine
+
+
+def _init_parallel_environment():
+    from ichor.hpc.batch_system.parallel_environment import ParallelEnvironment
+
+    # make parallel environment variables to run jobs on multiple cores
+    parallel_environment = ParallelEnvironment()
+    # if you do not specify parallel environments in config, then error out with KeyError
+    # make the possible parallel environments for the current machine which ichor is launched on
+    ichor_config = _global_variable("ICHOR_CONFIG")
+    machine = _global_variable("MACHINE")
+    if not __building_docs__:
+        if machine:
+            try:
+                for p_env_name, values in ichor_config[machine]["hpc"][
+                    "parallel_environments"
+                ].items():
+                    parallel_environment[p_env_name] = values
+            # if parallel_environment is not found, but machine is defined
+            except KeyError:
+                warnings.warn(
+                    "The parallel environment variables are not defined in the ichor_config.yaml file."
+                )
+            # if the machine is not defined (and so parallel environment is also not defined)
+            except TypeError:
+                warnings.warn(
+                    "The current machine is not defined in the ichor_config.yaml file."
+                )
+        else:
             warnings.warn(
                 "The current machine is not defined in the ichor_config.yaml file."
             )
-    else:
-        warnings.warn(
-            "The current machine is not defined in the ichor_config.yaml file."
-        )
-        # raise KeyError(
-        #     "The parallel environments are not defined for the current machine."
-        # )
+
+    return parallel_environment
+
+
+def _init_batch_system():
+    from ichor.hpc.batch_system import init_batch_system
+
+    # batch system on current machine
+    return init_batch_system()
+
+
+def _init_logger():
+    from ichor.hpc.log import setup_logger
+
+    # set up loggers
+    return setup_logger("ICHOR", "ichor.log")
+
+
+def _init_current_python_environment_path():
+    from ichor.hpc.useful_functions import get_current_python_environment_path
+
+    # set up current python environment
+    return get_current_python_environment_path()
+
+
+_LAZY_GLOBAL_VARIABLES = {
+    "ICHOR_CONFIG": _init_ichor_config,
+    "MACHINE": _init_machine,
+    "PARALLEL_ENVIRONMENT": _init_parallel_environment,
+    "BATCH_SYSTEM": _init_batch_system,
+    "LOGGER": _init_logger,
+    "CURRENT_PYTHON_ENVIRONMENT_PATH": _init_current_python_environment_path,
+}
+
+
+def __getattr__(name: str):
+    """Initializes a global variable when it is accessed for the first time (see PEP 562).
+    The value is stored in the module, so it is only initialized once."""
+    if name not in _LAZY_GLOBAL_VARIABLES:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = _LAZY_GLOBAL_VARIABLES[name]()
+    globals()[name] = value
+    return value
+
+
+def _global_variable(name: str):
+    """Returns a global variable, which is initialized if it has not been used yet. This is needed in this module,
+    because global variables are looked up without calling the module `__getattr__`."""
+    return globals()[name] if name in globals() else __getattr__(name)
+
 
 # default file structure to be used for file handling
 FILE_STRUCTURE = FileTree()
@@ -196,12 +250,6 @@ FILE_STRUCTURE.add(
 FILE_STRUCTURE.add("GJF", "dlpoly_gjf", parent="dlpoly", type_=FileType.Directory)
 FILE_STRUCTURE.add("AMBER", "amber", type_=FileType.Directory)
 
-# batch system on current machine
-BATCH_SYSTEM = init_batch_system()
-
-# set up loggers
-LOGGER = setup_logger("ICHOR", "ichor.log")
-
 # set up script names that are implemented
 SCRIPT_NAMES = ScriptNames(
     {
@@ -258,7 +306,3 @@ SCRIPT_NAMES = ScriptNames(
     },
     parent=FILE_STRUCTURE["scripts"],
 )
-
-
-# set up current python environment
-CURRENT_PYTHON_ENVIRONMENT_PATH = get_current_python_environment_path()
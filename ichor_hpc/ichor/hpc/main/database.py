@@ -14,6 +14,7 @@ from ichor.hpc.useful_functions.submit_free_flow_python_on_compute import (
 AVAILABLE_DATABASE_FORMATS = {
     "sqlite": "write_to_sqlite3_database",
     "json": "write_to_json_database",
+    "parquet": "write_to_parquet_database",
 }
 
 
@@ -27,7 +28,7 @@ def submit_make_database(
     the directory
 
     :param points_dir_path: Path to PointsDirectory or parent to PointsDirectory-ies
-    :param database_format: the format, currently sqlite and json are supported
+    :param database_format: the format, currently sqlite, json and parquet are supported
     :param ncores: number of cores to use on compute node
     """
 
@@ -92,7 +93,7 @@ def submit_make_csvs_from_database(
     as the number of atoms in the system is the optimal choice.
 
     :param db_path: pathlib.Path object that holds path to database
-    :param db_type: The type of database, sqlite or json
+    :param db_type: The type of database, sqlite, json or parquet
     :param ncores: Number of cores to run job with
     :param float_difference_iqa_wfn: Absolute tolerance for difference of energy
         between WFN and sum of IQA energies.
@@ -4,6 +4,7 @@ from typing import List, Optional
 import ichor.hpc.global_variables
 
 from ichor.core.common.functools import classproperty
+from ichor.core.files import ParsedFileCache
 from ichor.hpc.submission_command import SubmissionCommand
 
 
@@ -49,8 +50,16 @@ class PythonCommand(SubmissionCommand):
             "Python environment was not found. Cannot submit Python command."
         )
 
+    @classproperty
+    def environment(self) -> str:
+        """Returns the lines which set environment variables for the python job. If the parsed file cache
+        is enabled, it is enabled in the job as well, so the files read by the job are read from the cache."""
+        if ParsedFileCache.enabled:
+            return f"export {ParsedFileCache.environment_variable}=1\n"
+        return ""
+
     def repr(self, variables: Optional[List[str]] = None) -> str:
         """Returns a string which is then written into the submission script in order to run a python job."""
-        activate_env = PythonCommand.command + "\n"
+        activate_env = PythonCommand.command + "\n" + PythonCommand.environment
         python_script_to_run = f"python3 {self.script} {' '.join(self.args)}"
         return activate_env + python_script_to_run
@@ -359,10 +359,15 @@ class SubmissionScript:
                     )
 
                 # compute nodes to include or exclude for job
+                # (batch systems which cannot select nodes, such as the local batch system, have no node options)
                 if self.include_nodes or self.exclude_nodes:
-                    f.write(
-                        f"#{ichor.hpc.global_variables.BATCH_SYSTEM.OptionCmd} {ichor.hpc.global_variables.BATCH_SYSTEM.node_options(self.include_nodes, self.exclude_nodes)}\n"  # noqa E501
+                    node_options = ichor.hpc.global_variables.BATCH_SYSTEM.node_options(
+                        self.include_nodes, self.exclude_nodes
                     )
+                    if node_options:
+                        f.write(
+                            f"#{ichor.hpc.global_variables.BATCH_SYSTEM.OptionCmd} {node_options}\n"
+                        )
 
                 # if writing an array jobs, then the batch system needs to know that
                 # on SGE, this is given by the #$ -t 1-{njobs}. SGE starts counting from 1 instead of 0.
@@ -0,0 +1,217 @@
+import importlib.util
+import stat
+import time
+from pathlib import Path
+
+import pytest
+
+# local_runner only uses the standard library, so it is loaded from its file
+# without importing ichor.hpc (which reads the ichor config file when it is imported)
+_spec = importlib.util.spec_from_file_location(
+    "local_runner",
+    Path(__file__).parents[2] / "ichor" / "hpc" / "batch_system" / "local_runner.py",
+)
+local_runner = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(local_runner)
+
+# stand-in for a program run by the tasks of a job (e.g. Gaussian), which records how many tasks run at once
+_STAND_IN_PROGRAM = """#!/bin/bash
+touch "$1/running.$ICHOR_JOB_ID.$ICHOR_TASK_ID"
+ls "$1" | grep -c '^running\\.' >> "$1/concurrent"
+echo "$ICHOR_TASK_ID $ICHOR_TASK_LAST $ICHOR_NSLOTS" >> "$1/tasks"
+sleep "$2"
+echo "$ICHOR_JOB_ID" >> "$1/finished"
+rm "$1/running.$ICHOR_JOB_ID.$ICHOR_TASK_ID"
+"""
+
+
+@pytest.fixture
+def local_jobs(tmp_path, monkeypatch):
+    """Runs local jobs in a temporary jobs directory with 4 cores. Returns the directory
+    in which the stand-in program (`run_program`) records the tasks that were run."""
+    monkeypatch.setenv(local_runner.JOBS_DIRECTORY, str(tmp_path / "jobs"))
+    monkeypatch.setenv(local_runner.CORES, "4")
+
+    bin_directory = tmp_path / "bin"
+    bin_directory.mkdir()
+    program = bin_directory / "run_program"
+    program.write_text(_STAND_IN_PROGRAM)
+    program.chmod(program.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_directory}:{local_runner.os.environ['PATH']}")
+
+    records = tmp_path / "records"
+    records.mkdir()
+    return records
+
+
+def write_script(path: Path, options, records: Path, sleep: float = 0.5) -> Path:
+    with open(path, "w") as f:
+        f.write("#!/bin/bash -l\n")
+        for option in options:
+            f.write(f"{local_runner.OPTION_PREFIX}{option}\n")
+        f.write(f"run_program {records} {sleep}\n")
+    return path
+
+
+def wait_for_jobs(*job_ids, timeout: float = 30.0):
+    start = time.time()
+    while not all(local_runner._has_finished(job_id) for job_id in job_ids):
+        if time.time() - start > timeout:
+            raise TimeoutError(f"Jobs {job_ids} have not finished.")
+        time.sleep(0.1)
+
+
+def max_concurrent_tasks(records: Path) -> int:
+    return max(int(n) for n in (records / "concurrent").read_text().split())
+
+
+def test_parse_options_with_node_options(tmp_path):
+
+    script = tmp_path / "script.sh"
+    with open(script, "w") as f:
+        f.write("#!/bin/bash -l\n")
+        f.write(f"{local_runner.OPTION_PREFIX}-wd {tmp_path}\n")
+        f.write(f"{local_runner.OPTION_PREFIX}-o {tmp_path / 'outputs'}\n")
+        # the local batch system has no node options, so the line of the node options can be empty
+        f.write(f"{local_runner.OPTION_PREFIX}\n")
+        f.write(f"{local_runner.OPTION_PREFIX.strip()}\n")
+        f.write(f"{local_runner.OPTION_PREFIX}-n 2\n")
+        f.write(f"{local_runner.OPTION_PREFIX}-t 1-10\n")
+        f.write(f"{local_runner.OPTION_PREFIX}-tc 3\n")
+        f.write("run_program\n")
+
+    assert local_runner.parse_options(script) == {
+        "cwd": str(tmp_path),
+        "output_directory": str(tmp_path / "outputs"),
+        "error_directory": str(tmp_path),
+        "ncores": 2,
+        "ntasks": 10,
+        "max_running_tasks": 3,
+    }
+
+
+def test_array_job(tmp_path, local_jobs):
+
+    script = write_script(
+        tmp_path / "array.sh",
+        ["-o outputs", "-e errors", "-t 1-5"],
+        local_jobs,
+        sleep=0.1,
+    )
+    job_id = local_runner.submit(script)
+    wait_for_jobs(job_id)
+
+    job = local_runner.read_job(job_id)
+    assert job["state"] == "Finished"
+    assert job["exit_codes"] == {str(task): 0 for task in range(1, 6)}
+    assert sorted((local_jobs / "tasks").read_text().splitlines()) == [
+        f"{task} 5 1" for task in range(1, 6)
+    ]
+    for task in range(1, 6):
+        assert (tmp_path / "outputs" / f"array.sh.o{job_id}.{task}").exists()
+        assert (tmp_path / "errors" / f"array.sh.e{job_id}.{task}").exists()
+
+
+def test_tasks_use_number_of_cores(tmp_path, local_jobs):
+
+    # 4 cores are available and every task uses 2 cores, so only 2 tasks can run at once
+    script = write_script(tmp_path / "ncores.sh", ["-n 2", "-t 1-4"], local_jobs)
+    job_id = local_runner.submit(script)
+    wait_for_jobs(job_id)
+
+    assert max_concurrent_tasks(local_jobs) == 2
+    assert {
+        line.split()[-1] for line in (local_jobs / "tasks").read_text().splitlines()
+    } == {"2"}
+
+
+def test_max_running_tasks(tmp_path, local_jobs):
+
+    script = write_script(tmp_path / "max_running.sh", ["-t 1-4", "-tc 1"], local_jobs)
+    job_id = local_runner.submit(script)
+    wait_for_jobs(job_id)
+
+    assert max_concurrent_tasks(local_jobs) == 1
+    assert local_runner.read_job(job_id)["exit_codes"] == {
+        str(task): 0 for task in range(1, 5)
+    }
+
+
+def test_hold(tmp_path, local_jobs):
+
+    first_job = local_runner.submit(
+        write_script(tmp_path / "first.sh", [], local_jobs, sleep=1.0)
+    )
+    second_job = local_runner.submit(
+        write_script(tmp_path / "second.sh", [], local_jobs, sleep=0.1),
+        hold=[first_job],
+    )
+    assert local_runner.read_job(second_job)["state"] == "Holding"
+
+    wait_for_jobs(first_job, second_job)
+
+    # the second job only runs once the first job has finished
+    assert (local_jobs / "finished").read_text().split() == [first_job, second_job]
+    assert max_concurrent_tasks(local_jobs) == 1
+
+
+def test_queued_jobs(tmp_path, local_jobs):
+
+    running_job = local_runner.submit(
+        write_script(tmp_path / "running.sh", ["-t 1-2"], local_jobs, sleep=1.0)
+    )
+    held_job = local_runner.submit(
+        write_script(tmp_path / "held.sh", [], local_jobs, sleep=0.1),
+        hold=[running_job],
+    )
+
+    start = time.time()
+    while local_runner.read_job(running_job)["state"] != "Running":
+        assert time.time() - start < 30.0
+        time.sleep(0.05)
+
+    queued_jobs = local_runner.queued_jobs()
+    assert [job["id"] for job in queued_jobs] == [running_job, held_job]
+    assert [job["state"] for job in queued_jobs] == ["Running", "Holding"]
+
+    status = local_runner.status().splitlines()
+    assert len(status) == 3
+    assert status[1].split()[:3] == [running_job, "running.sh", "Running"]
+    assert status[2].split()[:3] == [held_job, "held.sh", "Holding"]
+
+    wait_for_jobs(running_job, held_job)
+    assert local_runner.queued_jobs() == []
+
+
+def test_local_batch_system_queued_jobs(tmp_path, local_jobs):
+
+    # ichor.hpc.global_variables is imported first, as it is imported by the batch systems
+    pytest.importorskip("ichor.hpc.global_variables")
+    from ichor.hpc.batch_system import LocalBatchSystem
+
+    running_job = local_runner.submit(
+        write_script(
+            tmp_path / "running.sh", ["-t 1-3", "-tc 1"], local_jobs, sleep=1.0
+        )
+    )
+    held_job = local_runner.submit(
+        write_script(tmp_path / "held.sh", [], local_jobs, sleep=0.1),
+        hold=[running_job],
+    )
+
+    start = time.time()
+    while local_runner.read_job(running_job)["tasks"]["1"] != "Running":
+        assert time.time() - start < 30.0
+        time.sleep(0.05)
+
+    # every task which has not finished is a queued job
+    jobs = LocalBatchSystem.get_queued_jobs()
+    assert [(job.id, job.task_id, job.state) for job in jobs] == [
+        (running_job, "1", "Running"),
+        (running_job, "2", "Pending"),
+        (running_job, "3", "Pending"),
+        (held_job, "1", "Holding"),
+    ]
+
+    wait_for_jobs(running_job, held_job)
+    assert LocalBatchSystem.get_queued_jobs() == []